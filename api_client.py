@@ -0,0 +1,203 @@
+"""
+BADER Derneği - Paylaşılan Online API İstemcisi
+Tüm online mod yöneticileri tek bir keep-alive bağlantı havuzunu kullanır
+"""
+
+import re
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+class ApiClient:
+    """
+    Havuzlu requests.Session üzerinden API istemcisi
+    - Keep-alive bağlantı havuzu (her çağrıda yeni TCP/TLS yok)
+    - Ayarlanabilir bağlantı/okuma zaman aşımı
+    - Geri çekilmeli (backoff) yeniden deneme
+    - gzip yanıt sıkıştırma
+    - Uç nokta bazında gecikme sayaçları
+    """
+
+    _istemciler = {}
+    _kilit = threading.Lock()
+
+    # /db/uyeler/15 -> /db/uyeler/{id} (sayaçlar uç nokta şablonuna göre toplanır)
+    _ID_DESENI = re.compile(r'/\d+(?=/|$)')
+
+    def __init__(self, api_url: str = '', api_key: str = '',
+                 connect_timeout: float = 3.05, read_timeout: float = 10,
+                 retries: int = 2, backoff: float = 0.3, pool_size: int = 10):
+        self.api_url = (api_url or '').rstrip('/')
+        self.api_key = api_key or ''
+        self.timeout = (connect_timeout, read_timeout)
+
+        self._retries = retries
+        self._backoff = backoff
+        self._pool_size = pool_size
+        # Oturum ilk istekte kurulur: offline modda requests hiç import edilmez (açılış süresi)
+        self._session = None
+        self._session_kilit = threading.Lock()
+
+        self._sayac_kilit = threading.Lock()
+        self._sayaclar: Dict[str, Dict] = {}
+
+    @property
+    def session(self):
+        """Havuzlu requests.Session (ilk erişimde oluşturulur)"""
+        if self._session is None:
+            with self._session_kilit:
+                if self._session is None:
+                    self._session = self._session_olustur()
+        return self._session
+
+    def _session_olustur(self):
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        session = requests.Session()
+        session.headers.update({
+            'X-API-Key': self.api_key,
+            'Content-Type': 'application/json',
+            'Accept-Encoding': 'gzip, deflate',
+        })
+        # Okuma/durum hatalarında yalnızca idempotent metotlar tekrar denenir,
+        # bağlantı kurulamadıysa (istek sunucuya ulaşmadı) tüm metotlar denenir
+        retry = Retry(
+            total=self._retries,
+            connect=self._retries,
+            read=self._retries,
+            backoff_factor=self._backoff,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(['GET', 'PUT', 'DELETE']),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=self._pool_size, pool_maxsize=self._pool_size,
+                              max_retries=retry)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    @classmethod
+    def al(cls, api_url: str, api_key: str, **ayarlar) -> 'ApiClient':
+        """
+        (api_url, api_key) için süreç genelinde paylaşılan istemciyi getir
+        Verilen zaman aşımı/yeniden deneme ayarları öncekinden farklıysa paylaşılan
+        istemci yerinde güncellenir (ayar değişikliği yeniden başlatmadan etkili olur).
+        """
+        anahtar = (api_url or '', api_key or '')
+        with cls._kilit:
+            istemci = cls._istemciler.get(anahtar)
+            if istemci is None:
+                istemci = cls(api_url, api_key, **ayarlar)
+                cls._istemciler[anahtar] = istemci
+            elif ayarlar:
+                istemci.ayarla(**ayarlar)
+            return istemci
+
+    def ayarla(self, connect_timeout: float = None, read_timeout: float = None,
+               retries: int = None, backoff: float = None, pool_size: int = None):
+        """
+        Zaman aşımı ve yeniden deneme ayarlarını güncelle
+        Oturum ayarları (retries, backoff, pool_size) değiştiyse havuz bir sonraki
+        istekte yeniden kurulur; süren istekler eski oturumla tamamlanır.
+        """
+        connect, read = self.timeout
+        self.timeout = (connect if connect_timeout is None else connect_timeout,
+                        read if read_timeout is None else read_timeout)
+
+        oturum = (self._retries, self._backoff, self._pool_size)
+        yeni = (oturum[0] if retries is None else retries,
+                oturum[1] if backoff is None else backoff,
+                oturum[2] if pool_size is None else pool_size)
+        if yeni != oturum:
+            with self._session_kilit:
+                self._retries, self._backoff, self._pool_size = yeni
+                self._session = None
+
+    @property
+    def etkin(self) -> bool:
+        """API adresi tanımlı mı?"""
+        return bool(self.api_url)
+
+    def request(self, method: str, endpoint: str, data: dict = None) -> Optional[dict]:
+        """API isteği gönder (başarısızsa None - çağıran offline'a düşer)"""
+        if not self.etkin:
+            return None
+
+        method = method.upper()
+        url = f"{self.api_url}{endpoint}"
+        baslangic = time.perf_counter()
+        basarili = False
+        try:
+            if method == 'GET':
+                resp = self.session.get(url, params=data, timeout=self.timeout)
+            elif method in ('POST', 'PUT'):
+                resp = self.session.request(method, url, json=data, timeout=self.timeout)
+            elif method == 'DELETE':
+                resp = self.session.delete(url, timeout=self.timeout)
+            else:
+                return None
+            if resp.status_code in [200, 201]:
+                basarili = True
+                return resp.json()
+            return None
+        except Exception as e:
+            print(f"API Hatası: {e}")
+            return None
+        finally:
+            self._kaydet(method, endpoint, time.perf_counter() - baslangic, basarili)
+
+    def sayfali_getir(self, endpoint: str, params: dict = None, anahtar: str = 'data',
+                      sayfa_boyutu: int = 500) -> Optional[List[dict]]:
+        """
+        Cursor sayfalı liste uç noktasını next_cursor bitene kadar oku
+        Herhangi bir sayfa başarısızsa None (çağıran offline'a düşer)
+        """
+        params = dict(params or {}, limit=sayfa_boyutu)
+        kayitlar = []
+        while True:
+            sonuc = self.request('GET', endpoint, params)
+            if not isinstance(sonuc, dict) or not isinstance(sonuc.get(anahtar), list):
+                return None
+            kayitlar.extend(sonuc[anahtar])
+            cursor = sonuc.get('next_cursor')
+            if not cursor:
+                return kayitlar
+            params['after'] = cursor
+
+    def _kaydet(self, method: str, endpoint: str, sure: float, basarili: bool):
+        """Gecikme sayacını güncelle"""
+        anahtar = f"{method} {self._ID_DESENI.sub('/{id}', endpoint.split('?')[0])}"
+        sure_ms = sure * 1000
+        with self._sayac_kilit:
+            sayac = self._sayaclar.setdefault(anahtar, {'adet': 0, 'hata': 0, 'toplam_ms': 0.0, 'max_ms': 0.0})
+            sayac['adet'] += 1
+            sayac['toplam_ms'] += sure_ms
+            sayac['max_ms'] = max(sayac['max_ms'], sure_ms)
+            if not basarili:
+                sayac['hata'] += 1
+
+    def istatistikler(self) -> Dict[str, Dict]:
+        """Uç nokta bazında gecikme istatistikleri (adet, hata, ort_ms, max_ms)"""
+        with self._sayac_kilit:
+            return {
+                anahtar: {
+                    'adet': s['adet'],
+                    'hata': s['hata'],
+                    'ort_ms': s['toplam_ms'] / s['adet'] if s['adet'] else 0.0,
+                    'max_ms': s['max_ms'],
+                }
+                for anahtar, s in self._sayaclar.items()
+            }
+
+    def istatistikleri_sifirla(self):
+        """Gecikme sayaçlarını sıfırla"""
+        with self._sayac_kilit:
+            self._sayaclar.clear()
+
+    def close(self):
+        """Bağlantı havuzunu kapat"""
+        if self._session is not None:
+            self._session.close()
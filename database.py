@@ -7,38 +7,37 @@ import sqlite3
 from datetime import datetime
 from typing import Optional, List, Tuple
 import os
+import time
+import threading
+import atexit
+import weakref
+from contextlib import contextmanager
 import sys
-import requests
 import json
 
+from api_client import ApiClient
+
 
 def get_license_mode():
     """Lisans modunu kontrol et (online/offline)"""
-    try:
-        db_path = get_data_path()
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT deger FROM sistem_ayarlari WHERE anahtar = 'license_mode'")
-        result = cursor.fetchone()
-        conn.close()
-        return result[0] if result else 'offline'
-    except:
-        return 'offline'
+    return AyarDeposu.al().get('license_mode', 'offline')
 
 
 def get_api_config():
     """API yapılandırmasını al"""
-    try:
-        db_path = get_data_path()
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT anahtar, deger FROM sistem_ayarlari WHERE anahtar IN ('api_url', 'api_key', 'customer_id')")
-        results = cursor.fetchall()
-        conn.close()
-        config = {row[0]: row[1] for row in results}
-        return config
-    except:
-        return {}
+    return AyarDeposu.al().api_config()
+
+
+# Türkçe karakter katlama: İ/I/ı -> i, Ş -> s, Ğ -> g, Ç -> c, Ö -> o, Ü -> u
+_TR_KATLAMA = str.maketrans({
+    'İ': 'i', 'I': 'i', 'ı': 'i', 'Ş': 's', 'ş': 's', 'Ğ': 'g', 'ğ': 'g',
+    'Ç': 'c', 'ç': 'c', 'Ö': 'o', 'ö': 'o', 'Ü': 'u', 'ü': 'u',
+})
+
+
+def tr_normalize(metin: str) -> str:
+    """Arama için Türkçe duyarlı küçük harfe çevirme ve aksan katlama"""
+    return (metin or '').translate(_TR_KATLAMA).lower()
 
 
 def get_data_path():
@@ -53,36 +52,92 @@ def get_data_path():
         return os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bader_dernegi.db')
 
 
+class AyarDeposu:
+    """
+    sistem_ayarlari için süreç genelinde önbellek (veritabanı yolu başına tek örnek)
+    Ayarlar ilk okumada tek sorguyla yüklenir; yazma veya dış değişiklikte
+    gecersiz_kil() ile bir sonraki okumada yeniden yüklenir.
+    """
+
+    _depolar = {}
+    _kilit = threading.Lock()
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._ayarlar: Optional[dict] = None
+
+    @classmethod
+    def al(cls, db_path: str = None) -> 'AyarDeposu':
+        """Veritabanı yolu için paylaşılan depoyu getir"""
+        if db_path is None:
+            db_path = get_data_path()
+        with cls._kilit:
+            if db_path not in cls._depolar:
+                cls._depolar[db_path] = cls(db_path)
+            return cls._depolar[db_path]
+
+    def _yukle(self, conn: sqlite3.Connection = None) -> dict:
+        """Ayarları önbellekten ver, yoksa tek sorguyla yükle"""
+        ayarlar = self._ayarlar
+        if ayarlar is not None:
+            return ayarlar
+        try:
+            if conn is not None:
+                rows = conn.execute("SELECT anahtar, deger FROM sistem_ayarlari").fetchall()
+            else:
+                yeni_conn = sqlite3.connect(self.db_path)
+                try:
+                    rows = yeni_conn.execute("SELECT anahtar, deger FROM sistem_ayarlari").fetchall()
+                finally:
+                    yeni_conn.close()
+        except sqlite3.Error:
+            return {}  # Tablo henüz yok - önbelleğe alma
+        ayarlar = {row[0]: row[1] for row in rows}
+        # Açık işlemdeki okuma commit edilmemiş (geri alınabilir) değerleri görebilir
+        if conn is None or not conn.in_transaction:
+            self._ayarlar = ayarlar
+        return ayarlar
+
+    def get(self, anahtar: str, varsayilan=None, conn: sqlite3.Connection = None):
+        """Tek ayar değerini getir"""
+        return self._yukle(conn).get(anahtar, varsayilan)
+
+    def api_config(self, conn: sqlite3.Connection = None) -> dict:
+        """API yapılandırması (api_url, api_key, customer_id)"""
+        ayarlar = self._yukle(conn)
+        return {k: ayarlar[k] for k in ('api_url', 'api_key', 'customer_id') if k in ayarlar}
+
+    def kaydet(self, conn: sqlite3.Connection, anahtar: str, deger: str):
+        """
+        Ayarı yaz ve önbelleği geçersiz kıl
+        Commit etmez: çağıran (Database.sistem_ayari_kaydet) kendi commit yolunu kullanır,
+        böylece açık bir transaction() bloğu erken kaydedilmez.
+        """
+        conn.execute("""
+            INSERT OR REPLACE INTO sistem_ayarlari (anahtar, deger, guncelleme_tarihi)
+            VALUES (?, ?, CURRENT_TIMESTAMP)
+        """, (anahtar, deger))
+        self.gecersiz_kil()
+
+    def gecersiz_kil(self):
+        """Önbelleği boşalt (bir sonraki okumada yeniden yüklenir)"""
+        self._ayarlar = None
+
+
 class OnlineDatabase:
     """Online PostgreSQL API üzerinden veritabanı işlemleri"""
     
-    def __init__(self):
-        config = get_api_config()
+    def __init__(self, config: dict = None, api: ApiClient = None):
+        if config is None:
+            config = get_api_config()
         self.api_url = config.get('api_url', 'http://157.90.154.48:8080/api')
         self.api_key = config.get('api_key', '')
         self.customer_id = config.get('customer_id', '')
-        self.headers = {'X-API-Key': self.api_key, 'Content-Type': 'application/json'}
+        self.api = api or ApiClient.al(self.api_url, self.api_key)
     
     def _request(self, method, endpoint, data=None):
-        """API isteği gönder"""
-        try:
-            url = f"{self.api_url}{endpoint}"
-            if method == 'GET':
-                resp = requests.get(url, headers=self.headers, params=data, timeout=10)
-            elif method == 'POST':
-                resp = requests.post(url, headers=self.headers, json=data, timeout=10)
-            elif method == 'PUT':
-                resp = requests.put(url, headers=self.headers, json=data, timeout=10)
-            elif method == 'DELETE':
-                resp = requests.delete(url, headers=self.headers, timeout=10)
-            else:
-                return None
-            if resp.status_code in [200, 201]:
-                return resp.json()
-            return None
-        except Exception as e:
-            print(f"API Hatası: {e}")
-            return None
+        """API isteği gönder (paylaşılan havuzlu istemci)"""
+        return self.api.request(method, endpoint, data)
     
     def get_uyeler(self, durum='Aktif'):
         """Üyeleri getir"""
@@ -145,39 +200,277 @@ class Database:
         if db_path is None:
             db_path = get_data_path()
         self.db_path = db_path
-        self.conn: Optional[sqlite3.Connection] = None
-        self.cursor: Optional[sqlite3.Cursor] = None
-        self.online_mode = get_license_mode() == 'online'
-        self.online_db = OnlineDatabase() if self.online_mode else None
+        # Thread başına bağlantı havuzu (conn/cursor bu thread'in bağlantısını verir)
+        self._yerel = threading.local()
+        self._havuz: List[sqlite3.Connection] = []
+        self._havuz_kilit = threading.Lock()
+        self._bagli = False
+        self.ayarlar = AyarDeposu.al(db_path)
+        self.migration_raporu: List[dict] = []
+        self.migration_yedegi: Optional[str] = None
+        # İşlem logu tamponu (bkz. log_islem / log_bekleyenleri_yaz)
+        self._log_kuyrugu: List[tuple] = []
+        self._log_kilit = threading.Lock()
+        self._log_zamanlayici: Optional[threading.Timer] = None
+        Database._acik_ornekler.add(self)
         # Otomatik bağlantı kur
         self.connect()
+        self.online_mode = self.get_license_mode() == 'online'
+        self.online_db = None
+        if self.online_mode:
+            config = self.get_api_config()
+            config.setdefault('api_url', 'http://157.90.154.48:8080/api')
+            self.online_db = OnlineDatabase(config, self.api_client(config))
         
+    def get_license_mode(self) -> str:
+        """Lisans modu (önbellekli ayarlardan)"""
+        return self.ayarlar.get('license_mode', 'offline', self.conn)
+
+    def get_api_config(self) -> dict:
+        """API yapılandırması (önbellekli ayarlardan)"""
+        return self.ayarlar.api_config(self.conn)
+
+    def api_client(self, config: dict = None) -> ApiClient:
+        """
+        Paylaşılan API istemcisi (keep-alive havuzu, retry, gecikme sayaçları)
+        Zaman aşımı/yeniden deneme: sistem_ayarlari'ndaki api_connect_timeout,
+        api_read_timeout, api_retries. Offline modda etkin olmayan istemci döner.
+        """
+        if self.get_license_mode() != 'online':
+            return ApiClient.al('', '')
+        if config is None:
+            config = self.get_api_config()
+        ayar = lambda anahtar, varsayilan: self.ayarlar.get(anahtar, varsayilan, self.conn)
+        try:
+            return ApiClient.al(
+                config.get('api_url', ''), config.get('api_key', ''),
+                connect_timeout=float(ayar('api_connect_timeout', 3.05)),
+                read_timeout=float(ayar('api_read_timeout', 10)),
+                retries=int(ayar('api_retries', 2)),
+            )
+        except ValueError:
+            return ApiClient.al(config.get('api_url', ''), config.get('api_key', ''))
+
+    def sistem_ayari_kaydet(self, anahtar: str, deger: str):
+        """Sistem ayarını kaydet ve ayar önbelleğini geçersiz kıl (transaction() içindeyse blok sonunda kaydedilir)"""
+        self.ayarlar.kaydet(self.conn, anahtar, deger)
+        self.commit()
+        if anahtar in ('api_connect_timeout', 'api_read_timeout', 'api_retries'):
+            self.api_client()  # paylaşılan istemciyi yeni ayarlarla güncelle
+
     def is_online(self):
         """Online mod aktif mi?"""
         return self.online_mode and self.online_db is not None
         
+    BUSY_TIMEOUT_MS = 5000
+
     def connect(self):
-        """Veritabanı bağlantısı oluştur"""
-        # check_same_thread=False: Thread güvenliği sorununu çözer
-        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row  # Dict-like access
-        self.cursor = self.conn.cursor()
-        
+        """Bu thread için veritabanı bağlantısı oluştur"""
+        if getattr(self._yerel, 'conn', None) is not None:
+            self.thread_baglantisini_kapat()
+        self._bagli = True
+        self._thread_baglantisi_ac()
+
+    def _thread_baglantisi_ac(self) -> sqlite3.Connection:
+        """Bu thread'e havuzdan yeni bağlantı aç (WAL + busy_timeout)"""
+        # check_same_thread=False: havuz kapatılırken başka thread'den close() edilebilsin
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row  # Dict-like access
+        conn.execute(f"PRAGMA busy_timeout = {self.BUSY_TIMEOUT_MS}")
+        try:
+            # WAL: okuyucular yazarları bloklamaz, uzun export/devir tutarlı anlık görüntü okur
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+        except sqlite3.OperationalError:
+            pass  # WAL desteklenmeyen dosya sistemi - varsayılan journal ile devam
+        self._yerel.conn = conn
+        self._yerel.cursor = conn.cursor()
+        with self._havuz_kilit:
+            self._havuz.append(conn)
+        return conn
+
+    @property
+    def conn(self) -> Optional[sqlite3.Connection]:
+        """Bu thread'in bağlantısı (yoksa havuzdan açılır)"""
+        conn = getattr(self._yerel, 'conn', None)
+        if conn is None and self._bagli:
+            conn = self._thread_baglantisi_ac()
+        return conn
+
+    @property
+    def cursor(self) -> Optional[sqlite3.Cursor]:
+        """Bu thread'in paylaşılan cursor'ı"""
+        if self.conn is None:
+            return None
+        return self._yerel.cursor
+
+    def thread_baglantisini_kapat(self):
+        """Bu thread'in bağlantısını kapat (arka plan thread'leri bitişte çağırır)"""
+        conn = getattr(self._yerel, 'conn', None)
+        if conn is None:
+            return
+        with self._havuz_kilit:
+            if conn in self._havuz:
+                self._havuz.remove(conn)
+        try:
+            conn.commit()
+            conn.close()
+        except sqlite3.Error:
+            pass
+        self._yerel.conn = None
+        self._yerel.cursor = None
+
     def close(self):
-        """Veritabanı bağlantısını kapat"""
-        if self.conn:
-            self.conn.commit()
-            self.conn.close()
+        """Havuzdaki tüm bağlantıları kapat (bekleyen işlem logları önce yazılır)"""
+        self.log_bekleyenleri_yaz()
+        with self._havuz_kilit:
+            havuz, self._havuz = self._havuz, []
+        for conn in havuz:
+            try:
+                conn.commit()
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._yerel = threading.local()
+        self._bagli = False
             
     def commit(self):
-        """Değişiklikleri kaydet"""
+        """Değişiklikleri kaydet (transaction() bloğu içindeyse blok sonunda kaydedilir)"""
+        if getattr(self._yerel, 'islem_derinligi', 0):
+            return
         if self.conn:
             self.conn.commit()
+
+    @contextmanager
+    def transaction(self, readonly: bool = False):
+        """
+        Bu thread'in bağlantısında kendi cursor'ı ile işlem bloğu
+
+            with db.transaction() as cur:
+                cur.execute(...)
+
+        Hata olursa tüm blok geri alınır. Blok içindeki db.commit() çağrıları
+        (yönetici metotları) işlemi erken bitirmez; iç içe bloklar SAVEPOINT kullanır.
+        Bağlantıda commit edilmemiş örtük bir işlem varsa blok da SAVEPOINT olur:
+        çağıranın bekleyen yazımları burada commit edilmez, onun commit/rollback'ine kalır.
+        readonly=True: tutarlı okuma anlık görüntüsü (WAL ile UI yazmaya devam eder)
+        """
+        conn = self.conn
+        cur = conn.cursor()
+        derinlik = getattr(self._yerel, 'islem_derinligi', 0)
+        kendi_islemi = derinlik == 0 and not conn.in_transaction
+        if kendi_islemi:
+            cur.execute("BEGIN" if readonly else "BEGIN IMMEDIATE")
+        else:
+            cur.execute(f"SAVEPOINT islem_{derinlik}")
+        self._yerel.islem_derinligi = derinlik + 1
+        try:
+            yield cur
+        except BaseException:
+            if kendi_islemi:
+                conn.rollback()
+            else:
+                cur.execute(f"ROLLBACK TO islem_{derinlik}")
+                cur.execute(f"RELEASE islem_{derinlik}")
+            raise
+        else:
+            if kendi_islemi:
+                conn.commit()
+            else:
+                cur.execute(f"RELEASE islem_{derinlik}")
+        finally:
+            self._yerel.islem_derinligi = derinlik
+            cur.close()
             
-    def initialize_database(self):
-        """Tüm tabloları oluştur"""
-        self.connect()
-        
+    # Sıralı, numaralı şema göçleri: (sürüm, açıklama, metot adı)
+    # Yeni şema değişikliği = listenin sonuna yeni sürüm eklemek.
+    # Göçler idempotenttir; user_version'ı olmayan eski veritabanlarında
+    # hepsi baştan güvenle çalıştırılabilir.
+    MIGRATIONS = [
+        (1, "Temel şema ve varsayılan veriler", "_create_base_schema"),
+        (2, "Ek kolonlar (v1-v5)", "_migrate_add_columns"),
+        (3, "Yıl bazlı muhasebe tabloları", "_create_additional_tables"),
+        (4, "Alacak-verecek tabloları", "add_alacak_verecek_tables"),
+        (5, "Kasa bakiye defteri", "_create_kasa_bakiye_table"),
+        (6, "Aylık kasa bakiye özetleri", "_create_kasa_bakiye_ozet_table"),
+        (7, "Belge/işlem numarası sıraları", "_create_sequences_table"),
+        (8, "Tam metin arama indeksi", "_create_arama_indeksi"),
+        (9, "Aidat ödenen toplam önbelleği", "_create_aidat_odenen_onbellegi"),
+        (10, "Peşin tahakkuk indeksleri", "_create_tahakkuk_indeksleri"),
+        (11, "İşlem logu indeksleri", "_create_islem_log_indeksleri"),
+        (12, "Hareket veri sürümü sayacı", "_create_veri_surumu"),
+    ]
+
+    @property
+    def schema_version(self) -> int:
+        """Kodun beklediği şema sürümü"""
+        return self.MIGRATIONS[-1][0]
+
+    def initialize_database(self) -> List[dict]:
+        """
+        Şemayı güncel sürüme getir (PRAGMA user_version tabanlı)
+        Güncel veritabanı: tek pragma okuması, sıfır DDL.
+        Bekleyen göç varsa önce veritabanının anlık yedeği alınır.
+        Her göç, sürüm artışıyla birlikte tek işlemde çalışır; başarısız göç geri
+        alınır ve RuntimeError yükseltilir (uygulama yarım şemayla açılmaz).
+
+        Returns: Uygulanan göçlerin süre raporu [{'surum', 'aciklama', 'sure_ms'}]
+        """
+        if not self.conn:
+            self.connect()
+
+        self.cursor.execute("PRAGMA user_version")
+        mevcut_surum = self.cursor.fetchone()[0]
+        bekleyenler = [m for m in self.MIGRATIONS if m[0] > mevcut_surum]
+        self.migration_raporu = []
+        if not bekleyenler:
+            return self.migration_raporu
+
+        self.migration_yedegi = self._migration_yedegi_al(mevcut_surum)
+
+        for surum, aciklama, metot in bekleyenler:
+            baslangic = time.perf_counter()
+            try:
+                # Göç gövdesi ve sürüm numarası tek işlemde: ya tamamı uygulanır ya hiçbiri
+                with self.transaction():
+                    getattr(self, metot)()
+                    self.cursor.execute(f"PRAGMA user_version = {surum}")
+            except Exception as e:
+                mesaj = f"Migration hatası (v{surum} - {aciklama}): {e}"
+                if self.migration_yedegi:
+                    mesaj += f"\nGöç öncesi yedek: {self.migration_yedegi}"
+                print(mesaj)
+                raise RuntimeError(mesaj) from e
+            sure_ms = (time.perf_counter() - baslangic) * 1000
+            self.migration_raporu.append({'surum': surum, 'aciklama': aciklama, 'sure_ms': sure_ms})
+            print(f"Migration v{surum} ({aciklama}): {sure_ms:.1f} ms")
+
+        # Şema/varsayılan veriler değişti - ayarlar yeniden okunsun
+        self.ayarlar.gecersiz_kil()
+        return self.migration_raporu
+
+    def _migration_yedegi_al(self, mevcut_surum: int) -> Optional[str]:
+        """Bekleyen göçlerden önce veritabanının anlık yedeğini al"""
+        # Boş (yeni kurulum) veritabanında yedeğe gerek yok
+        self.cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table'")
+        if self.cursor.fetchone()[0] == 0:
+            return None
+
+        zaman = datetime.now().strftime('%Y%m%d_%H%M%S')
+        yedek_yolu = f"{self.db_path}.v{mevcut_surum}_{zaman}.bak"
+        try:
+            # Online backup API: açık bağlantıyla tutarlı kopya
+            hedef = sqlite3.connect(yedek_yolu)
+            with hedef:
+                self.conn.backup(hedef)
+            hedef.close()
+            return yedek_yolu
+        except Exception as e:
+            print(f"Göç öncesi yedekleme hatası: {e}")
+            return None
+
+    def _create_base_schema(self):
+        """Temel tabloları, indeksleri ve varsayılan verileri oluştur"""
         # 1. ÜYELER TABLOSU (Genişletilmiş - v2)
         self.cursor.execute("""
             CREATE TABLE IF NOT EXISTS uyeler (
@@ -611,10 +904,7 @@ class Database:
         self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_koy_gider_tarih ON koy_giderleri(tarih)")
         self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_koy_gelir_kasa ON koy_gelirleri(kasa_id)")
         self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_koy_gider_kasa ON koy_giderleri(kasa_id)")
-        
-        self.commit()
         self._populate_initial_data()
-        self._run_migrations()
         
     def _populate_initial_data(self):
         """İlk kurulumda varsayılan verileri ekle"""
@@ -731,69 +1021,58 @@ class Database:
             """, ("admin", default_password, "Sistem Yöneticisi", "admin@bader.org", "admin"))
         except:
             pass
-                
-        self.commit()
         
-    def _run_migrations(self):
-        """Mevcut veritabanını güncelle (yeni kolonlar ekle)"""
-        try:
-            # uyeler tablosuna yeni alanlar ekle
-            migrations = [
-                # Temel alanlar
-                ("uyeler", "kan_grubu", "TEXT"),
-                ("uyeler", "aile_durumu", "TEXT DEFAULT 'Bekar'"),
-                ("uyeler", "cocuk_sayisi", "INTEGER DEFAULT 0"),
-                ("uyeler", "il", "TEXT"),
-                ("uyeler", "ilce", "TEXT"),
-                ("uyeler", "mahalle", "TEXT"),
-                ("uyeler", "adres", "TEXT"),
-                ("uyeler", "posta_kodu", "TEXT"),
-                ("uyeler", "dogum_tarihi", "DATE"),
-                ("uyeler", "ayrilma_tarihi", "DATE"),
-                ("aidat_odemeleri", "dekont_no", "TEXT"),
-                ("gelirler", "dekont_no", "TEXT"),
-                # v2 - Yeni alanlar
-                ("uyeler", "uye_no", "TEXT UNIQUE"),
-                ("uyeler", "tc_kimlik", "TEXT"),
-                ("uyeler", "telefon2", "TEXT"),
-                ("uyeler", "uyelik_tipi", "TEXT DEFAULT 'Asil'"),
-                ("uyeler", "cinsiyet", "TEXT"),
-                ("uyeler", "dogum_yeri", "TEXT"),
-                ("uyeler", "meslek", "TEXT"),
-                ("uyeler", "is_yeri", "TEXT"),
-                ("uyeler", "egitim_durumu", "TEXT"),
-                ("uyeler", "referans_uye_id", "INTEGER"),
-                ("uyeler", "ozel_aidat_tutari", "REAL"),
-                ("uyeler", "aidat_indirimi_yuzde", "REAL DEFAULT 0"),
-                ("uyeler", "ayrilma_nedeni", "TEXT"),
-                # v3 - Kullanıcı izinleri
-                ("kullanicilar", "izinler", "TEXT"),
-                # v4 - Yıl bazlı muhasebe sistemi
-                ("gelirler", "ait_oldugu_yil", "INTEGER"),
-                ("gelirler", "tahakkuk_durumu", "TEXT DEFAULT 'NORMAL'"),
-                ("gelirler", "coklu_odeme_grup_id", "TEXT"),
-                ("giderler", "ait_oldugu_yil", "INTEGER"),
-                ("giderler", "tahakkuk_durumu", "TEXT DEFAULT 'NORMAL'"),
-                ("kasalar", "serbest_devir_bakiye", "REAL DEFAULT 0"),
-                ("kasalar", "tahakkuk_toplami", "REAL DEFAULT 0"),
-                ("kasalar", "son_devir_tarihi", "DATE"),
-                # v5 - Alt kategori desteği
-                ("gelirler", "alt_kategori", "TEXT"),
-                ("giderler", "alt_kategori", "TEXT"),
-            ]
-            
-            for table, column, col_type in migrations:
-                try:
-                    self.cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {col_type}")
-                except sqlite3.OperationalError:
-                    pass  # Kolon zaten var
-            
-            # Yeni tablolar oluştur
-            self._create_additional_tables()
-            
-            self.commit()
-        except Exception as e:
-            print(f"Migration hatası: {e}")
+    def _migrate_add_columns(self):
+        """Eski veritabanlarına sonradan eklenen kolonları ekle"""
+        migrations = [
+            # Temel alanlar
+            ("uyeler", "kan_grubu", "TEXT"),
+            ("uyeler", "aile_durumu", "TEXT DEFAULT 'Bekar'"),
+            ("uyeler", "cocuk_sayisi", "INTEGER DEFAULT 0"),
+            ("uyeler", "il", "TEXT"),
+            ("uyeler", "ilce", "TEXT"),
+            ("uyeler", "mahalle", "TEXT"),
+            ("uyeler", "adres", "TEXT"),
+            ("uyeler", "posta_kodu", "TEXT"),
+            ("uyeler", "dogum_tarihi", "DATE"),
+            ("uyeler", "ayrilma_tarihi", "DATE"),
+            ("aidat_odemeleri", "dekont_no", "TEXT"),
+            ("gelirler", "dekont_no", "TEXT"),
+            # v2 - Yeni alanlar
+            ("uyeler", "uye_no", "TEXT UNIQUE"),
+            ("uyeler", "tc_kimlik", "TEXT"),
+            ("uyeler", "telefon2", "TEXT"),
+            ("uyeler", "uyelik_tipi", "TEXT DEFAULT 'Asil'"),
+            ("uyeler", "cinsiyet", "TEXT"),
+            ("uyeler", "dogum_yeri", "TEXT"),
+            ("uyeler", "meslek", "TEXT"),
+            ("uyeler", "is_yeri", "TEXT"),
+            ("uyeler", "egitim_durumu", "TEXT"),
+            ("uyeler", "referans_uye_id", "INTEGER"),
+            ("uyeler", "ozel_aidat_tutari", "REAL"),
+            ("uyeler", "aidat_indirimi_yuzde", "REAL DEFAULT 0"),
+            ("uyeler", "ayrilma_nedeni", "TEXT"),
+            # v3 - Kullanıcı izinleri
+            ("kullanicilar", "izinler", "TEXT"),
+            # v4 - Yıl bazlı muhasebe sistemi
+            ("gelirler", "ait_oldugu_yil", "INTEGER"),
+            ("gelirler", "tahakkuk_durumu", "TEXT DEFAULT 'NORMAL'"),
+            ("gelirler", "coklu_odeme_grup_id", "TEXT"),
+            ("giderler", "ait_oldugu_yil", "INTEGER"),
+            ("giderler", "tahakkuk_durumu", "TEXT DEFAULT 'NORMAL'"),
+            ("kasalar", "serbest_devir_bakiye", "REAL DEFAULT 0"),
+            ("kasalar", "tahakkuk_toplami", "REAL DEFAULT 0"),
+            ("kasalar", "son_devir_tarihi", "DATE"),
+            # v5 - Alt kategori desteği
+            ("gelirler", "alt_kategori", "TEXT"),
+            ("giderler", "alt_kategori", "TEXT"),
+        ]
+        
+        for table, column, col_type in migrations:
+            try:
+                self.cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {col_type}")
+            except sqlite3.OperationalError:
+                pass  # Kolon zaten var
     
     def _create_additional_tables(self):
         """Yıl bazlı muhasebe için ek tablolar"""
@@ -862,44 +1141,648 @@ class Database:
                 FOREIGN KEY (uye_id) REFERENCES uyeler(uye_id) ON DELETE CASCADE
             )
         """)
-    
+
+    def _create_kasa_bakiye_table(self):
+        """
+        Kasa bakiye defteri (kasa başına güncel toplamlar)
+        gelirler/giderler/virmanlar tetikleyicileri ile anlık güncel tutulur,
+        böylece güncel bakiye tek indeksli okuma ile alınır.
+        """
+        self.cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'kasa_bakiye'"
+        )
+        yeni_tablo = self.cursor.fetchone() is None
+
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS kasa_bakiye (
+                kasa_id INTEGER PRIMARY KEY,
+                toplam_gelir REAL NOT NULL DEFAULT 0,
+                toplam_gider REAL NOT NULL DEFAULT 0,
+                virman_giden REAL NOT NULL DEFAULT 0,
+                virman_gelen REAL NOT NULL DEFAULT 0,
+                FOREIGN KEY (kasa_id) REFERENCES kasalar(kasa_id) ON DELETE CASCADE
+            )
+        """)
+
+        # Kasa açılış/kapanış
+        self.cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_kasa_bakiye_kasa_ekle
+            AFTER INSERT ON kasalar
+            BEGIN
+                INSERT OR IGNORE INTO kasa_bakiye (kasa_id) VALUES (NEW.kasa_id);
+            END
+        """)
+        self.cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_kasa_bakiye_kasa_sil
+            AFTER DELETE ON kasalar
+            BEGIN
+                DELETE FROM kasa_bakiye WHERE kasa_id = OLD.kasa_id;
+            END
+        """)
+
+        # Gelir / gider tetikleyicileri: (tablo, bakiye kolonu)
+        for tablo, kolon in (("gelirler", "toplam_gelir"), ("giderler", "toplam_gider")):
+            self.cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_kasa_bakiye_{tablo}_ekle
+                AFTER INSERT ON {tablo}
+                BEGIN
+                    INSERT OR IGNORE INTO kasa_bakiye (kasa_id) VALUES (NEW.kasa_id);
+                    UPDATE kasa_bakiye SET {kolon} = {kolon} + NEW.tutar
+                    WHERE kasa_id = NEW.kasa_id;
+                END
+            """)
+            self.cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_kasa_bakiye_{tablo}_guncelle
+                AFTER UPDATE OF tutar, kasa_id ON {tablo}
+                BEGIN
+                    UPDATE kasa_bakiye SET {kolon} = {kolon} - OLD.tutar
+                    WHERE kasa_id = OLD.kasa_id;
+                    INSERT OR IGNORE INTO kasa_bakiye (kasa_id) VALUES (NEW.kasa_id);
+                    UPDATE kasa_bakiye SET {kolon} = {kolon} + NEW.tutar
+                    WHERE kasa_id = NEW.kasa_id;
+                END
+            """)
+            self.cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_kasa_bakiye_{tablo}_sil
+                AFTER DELETE ON {tablo}
+                BEGIN
+                    UPDATE kasa_bakiye SET {kolon} = {kolon} - OLD.tutar
+                    WHERE kasa_id = OLD.kasa_id;
+                END
+            """)
+
+        # Virman tetikleyicileri (gönderen kasadan düş, alan kasaya ekle)
+        self.cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_kasa_bakiye_virmanlar_ekle
+            AFTER INSERT ON virmanlar
+            BEGIN
+                INSERT OR IGNORE INTO kasa_bakiye (kasa_id) VALUES (NEW.gonderen_kasa_id);
+                INSERT OR IGNORE INTO kasa_bakiye (kasa_id) VALUES (NEW.alan_kasa_id);
+                UPDATE kasa_bakiye SET virman_giden = virman_giden + NEW.tutar
+                WHERE kasa_id = NEW.gonderen_kasa_id;
+                UPDATE kasa_bakiye SET virman_gelen = virman_gelen + NEW.tutar
+                WHERE kasa_id = NEW.alan_kasa_id;
+            END
+        """)
+        self.cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_kasa_bakiye_virmanlar_guncelle
+            AFTER UPDATE OF tutar, gonderen_kasa_id, alan_kasa_id ON virmanlar
+            BEGIN
+                UPDATE kasa_bakiye SET virman_giden = virman_giden - OLD.tutar
+                WHERE kasa_id = OLD.gonderen_kasa_id;
+                UPDATE kasa_bakiye SET virman_gelen = virman_gelen - OLD.tutar
+                WHERE kasa_id = OLD.alan_kasa_id;
+                INSERT OR IGNORE INTO kasa_bakiye (kasa_id) VALUES (NEW.gonderen_kasa_id);
+                INSERT OR IGNORE INTO kasa_bakiye (kasa_id) VALUES (NEW.alan_kasa_id);
+                UPDATE kasa_bakiye SET virman_giden = virman_giden + NEW.tutar
+                WHERE kasa_id = NEW.gonderen_kasa_id;
+                UPDATE kasa_bakiye SET virman_gelen = virman_gelen + NEW.tutar
+                WHERE kasa_id = NEW.alan_kasa_id;
+            END
+        """)
+        self.cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_kasa_bakiye_virmanlar_sil
+            AFTER DELETE ON virmanlar
+            BEGIN
+                UPDATE kasa_bakiye SET virman_giden = virman_giden - OLD.tutar
+                WHERE kasa_id = OLD.gonderen_kasa_id;
+                UPDATE kasa_bakiye SET virman_gelen = virman_gelen - OLD.tutar
+                WHERE kasa_id = OLD.alan_kasa_id;
+            END
+        """)
+
+        # Mevcut veritabanında ilk kez oluşturulduysa hareketlerden doldur
+        if yeni_tablo:
+            self.kasa_bakiye_yeniden_olustur()
+
+    def _create_kasa_bakiye_ozet_table(self):
+        """
+        Aylık kümülatif kasa bakiye özetleri (prefix-sum)
+        Her satır, kasanın ilgili ay sonuna kadarki toplamlarını tutar. Geçmiş
+        tarihli bir hareket yalnızca o ay ve sonrasındaki özetleri geçersiz kılar;
+        özetler bakım adımında artımlı olarak tamamlanır (kasa_bakiye_ozetlerini_olustur).
+        Tablo oluşturulurken mevcut hareketlerden doldurulur.
+        """
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS kasa_bakiye_ozet (
+                kasa_id INTEGER NOT NULL,
+                donem TEXT NOT NULL,
+                toplam_gelir REAL NOT NULL DEFAULT 0,
+                toplam_gider REAL NOT NULL DEFAULT 0,
+                virman_giden REAL NOT NULL DEFAULT 0,
+                virman_gelen REAL NOT NULL DEFAULT 0,
+                PRIMARY KEY (kasa_id, donem),
+                FOREIGN KEY (kasa_id) REFERENCES kasalar(kasa_id) ON DELETE CASCADE
+            )
+        """)
+
+        # Özet sonrası delta taraması için kasa + tarih indeksleri
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_gelir_kasa_tarih ON gelirler(kasa_id, tarih)")
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_gider_kasa_tarih ON giderler(kasa_id, tarih)")
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_virman_gonderen_tarih ON virmanlar(gonderen_kasa_id, tarih)")
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_virman_alan_tarih ON virmanlar(alan_kasa_id, tarih)")
+
+        # Geçersiz kılma: hareketin ayı ve sonrasındaki özetler silinir
+        for tablo in ("gelirler", "giderler"):
+            self.cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_kasa_ozet_{tablo}_ekle
+                AFTER INSERT ON {tablo}
+                BEGIN
+                    DELETE FROM kasa_bakiye_ozet
+                    WHERE kasa_id = NEW.kasa_id AND donem >= substr(NEW.tarih, 1, 7);
+                END
+            """)
+            self.cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_kasa_ozet_{tablo}_guncelle
+                AFTER UPDATE OF tutar, kasa_id, tarih ON {tablo}
+                BEGIN
+                    DELETE FROM kasa_bakiye_ozet
+                    WHERE kasa_id = OLD.kasa_id AND donem >= substr(OLD.tarih, 1, 7);
+                    DELETE FROM kasa_bakiye_ozet
+                    WHERE kasa_id = NEW.kasa_id AND donem >= substr(NEW.tarih, 1, 7);
+                END
+            """)
+            self.cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_kasa_ozet_{tablo}_sil
+                AFTER DELETE ON {tablo}
+                BEGIN
+                    DELETE FROM kasa_bakiye_ozet
+                    WHERE kasa_id = OLD.kasa_id AND donem >= substr(OLD.tarih, 1, 7);
+                END
+            """)
+
+        self.cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_kasa_ozet_virmanlar_ekle
+            AFTER INSERT ON virmanlar
+            BEGIN
+                DELETE FROM kasa_bakiye_ozet
+                WHERE kasa_id IN (NEW.gonderen_kasa_id, NEW.alan_kasa_id)
+                AND donem >= substr(NEW.tarih, 1, 7);
+            END
+        """)
+        self.cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_kasa_ozet_virmanlar_guncelle
+            AFTER UPDATE OF tutar, gonderen_kasa_id, alan_kasa_id, tarih ON virmanlar
+            BEGIN
+                DELETE FROM kasa_bakiye_ozet
+                WHERE kasa_id IN (OLD.gonderen_kasa_id, OLD.alan_kasa_id)
+                AND donem >= substr(OLD.tarih, 1, 7);
+                DELETE FROM kasa_bakiye_ozet
+                WHERE kasa_id IN (NEW.gonderen_kasa_id, NEW.alan_kasa_id)
+                AND donem >= substr(NEW.tarih, 1, 7);
+            END
+        """)
+        self.cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_kasa_ozet_virmanlar_sil
+            AFTER DELETE ON virmanlar
+            BEGIN
+                DELETE FROM kasa_bakiye_ozet
+                WHERE kasa_id IN (OLD.gonderen_kasa_id, OLD.alan_kasa_id)
+                AND donem >= substr(OLD.tarih, 1, 7);
+            END
+        """)
+
+        # Mevcut hareketlerden ilk doldurma (tarihli sorgular ilk günden özet kullanır)
+        self.kasa_bakiye_ozetlerini_olustur()
+
+    def kasa_bakiye_yeniden_olustur(self):
+        """Kasa bakiye defterini tüm hareketlerden sıfırdan hesapla"""
+        self.cursor.execute("DELETE FROM kasa_bakiye")
+        self.cursor.execute("""
+            INSERT INTO kasa_bakiye (kasa_id, toplam_gelir, toplam_gider, virman_giden, virman_gelen)
+            SELECT k.kasa_id,
+                   COALESCE((SELECT SUM(tutar) FROM gelirler WHERE kasa_id = k.kasa_id), 0),
+                   COALESCE((SELECT SUM(tutar) FROM giderler WHERE kasa_id = k.kasa_id), 0),
+                   COALESCE((SELECT SUM(tutar) FROM virmanlar WHERE gonderen_kasa_id = k.kasa_id), 0),
+                   COALESCE((SELECT SUM(tutar) FROM virmanlar WHERE alan_kasa_id = k.kasa_id), 0)
+            FROM kasalar k
+        """)
+        self.commit()
+
+    def kasa_bakiye_ozetlerini_olustur(self, tam: bool = False):
+        """
+        Aylık kasa bakiye özetlerini güncelle (bakım adımı)
+        Artımlı: her kasanın son özetinden sonraki, içinde bulunulan aydan önceki tam
+        aylar eklenir (tetikleyiciler geçersiz kıldıklarını sildiğinden özetler her
+        zaman kesintisiz bir öneklemdir). tam=True: tablo sıfırdan üretilir.
+        Okuma ve yazma tek BEGIN IMMEDIATE işleminde yapılır: arada başka bağlantıdan
+        gelen geçmiş tarihli bir hareket, bayat bir özetin kalıcı olmasına yol açamaz.
+        """
+        sinir = datetime.now().strftime("%Y-%m-01")
+        with self.transaction() as cur:
+            if tam:
+                cur.execute("DELETE FROM kasa_bakiye_ozet")
+            cur.execute("""
+                WITH son AS (
+                    SELECT k.kasa_id,
+                           COALESCE(date(o.donem || '-01', '+1 month'), '') as alt_sinir,
+                           COALESCE(o.toplam_gelir, 0) as toplam_gelir,
+                           COALESCE(o.toplam_gider, 0) as toplam_gider,
+                           COALESCE(o.virman_giden, 0) as virman_giden,
+                           COALESCE(o.virman_gelen, 0) as virman_gelen
+                    FROM kasalar k
+                    LEFT JOIN kasa_bakiye_ozet o ON o.kasa_id = k.kasa_id
+                        AND o.donem = (SELECT MAX(donem) FROM kasa_bakiye_ozet WHERE kasa_id = k.kasa_id)
+                ),
+                aylik AS (
+                    SELECT kasa_id, donem, SUM(gelir) as gelir, SUM(gider) as gider,
+                           SUM(giden) as giden, SUM(gelen) as gelen
+                    FROM (
+                        SELECT g.kasa_id, substr(g.tarih, 1, 7) as donem,
+                               g.tutar as gelir, 0 as gider, 0 as giden, 0 as gelen
+                        FROM gelirler g JOIN son s ON s.kasa_id = g.kasa_id
+                        WHERE g.tarih >= s.alt_sinir AND g.tarih < :sinir
+                        UNION ALL
+                        SELECT d.kasa_id, substr(d.tarih, 1, 7), 0, d.tutar, 0, 0
+                        FROM giderler d JOIN son s ON s.kasa_id = d.kasa_id
+                        WHERE d.tarih >= s.alt_sinir AND d.tarih < :sinir
+                        UNION ALL
+                        SELECT v.gonderen_kasa_id, substr(v.tarih, 1, 7), 0, 0, v.tutar, 0
+                        FROM virmanlar v JOIN son s ON s.kasa_id = v.gonderen_kasa_id
+                        WHERE v.tarih >= s.alt_sinir AND v.tarih < :sinir
+                        UNION ALL
+                        SELECT v.alan_kasa_id, substr(v.tarih, 1, 7), 0, 0, 0, v.tutar
+                        FROM virmanlar v JOIN son s ON s.kasa_id = v.alan_kasa_id
+                        WHERE v.tarih >= s.alt_sinir AND v.tarih < :sinir
+                    )
+                    GROUP BY kasa_id, donem
+                )
+                INSERT INTO kasa_bakiye_ozet
+                (kasa_id, donem, toplam_gelir, toplam_gider, virman_giden, virman_gelen)
+                SELECT a.kasa_id, a.donem,
+                       s.toplam_gelir + SUM(a.gelir) OVER w, s.toplam_gider + SUM(a.gider) OVER w,
+                       s.virman_giden + SUM(a.giden) OVER w, s.virman_gelen + SUM(a.gelen) OVER w
+                FROM aylik a JOIN son s ON s.kasa_id = a.kasa_id
+                WINDOW w AS (PARTITION BY a.kasa_id ORDER BY a.donem)
+            """, {'sinir': sinir})
+
+    # Çıkışta tamponları yazılacak örnekler (bkz. _cikista_loglari_yaz)
+    _acik_ornekler: "weakref.WeakSet" = weakref.WeakSet()
+
+    @classmethod
+    def _cikista_loglari_yaz(cls):
+        """Yorumlayıcı kapanırken tüm örneklerin bekleyen loglarını yaz (atexit)"""
+        for db in list(cls._acik_ornekler):
+            db.log_bekleyenleri_yaz()
+
+    # İşlem logu grup yazımı: kuyruk bu sayıya ulaşınca çağıran thread'de hemen,
+    # aksi halde en geç LOG_GECIKME_SN sonra arka planda tek işlemde yazılır
+    LOG_KUYRUK_SINIRI = 500
+    LOG_GECIKME_SN = 1.0
+    _LOG_INSERT = """
+        INSERT INTO islem_loglari
+        (tarih, kullanici, islem_turu, tablo_adi, kayit_id, aciklama, eski_deger, yeni_deger)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """
+
     def log_islem(self, kullanici: str, islem_turu: str, tablo_adi: str, 
                   kayit_id: int, aciklama: str, eski_deger: str = "", yeni_deger: str = ""):
-        """İşlem logu kaydet"""
+        """
+        İşlem logu kaydet (hiçbir yolda commit etmez)
+        - açık işlem varsa (transaction() bloğu veya commit edilmemiş yazım): çağıranın
+          işlemine eklenir, onunla birlikte commit/rollback olur
+        - aksi halde tampona alınır, grup halinde yazılır (işlem başına ayrı commit yok)
+        Loglar son_islemler() ile okunur; o da önce tamponu yazar.
+        """
+        kayit = (time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime()), kullanici, islem_turu,
+                 tablo_adi, kayit_id, aciklama, eski_deger, yeni_deger)
+        if getattr(self._yerel, 'islem_derinligi', 0) or (self.conn is not None and self.conn.in_transaction):
+            self.cursor.execute(self._LOG_INSERT, kayit)
+            return
+
+        with self._log_kilit:
+            self._log_kuyrugu.append(kayit)
+            dolu = len(self._log_kuyrugu) >= self.LOG_KUYRUK_SINIRI
+            if not dolu and self._log_zamanlayici is None:
+                self._log_zamanlayici = threading.Timer(self.LOG_GECIKME_SN, self._zamanli_log_yaz)
+                self._log_zamanlayici.daemon = True
+                self._log_zamanlayici.start()
+        if dolu:
+            self.log_bekleyenleri_yaz()
+
+    def log_bekleyenleri_yaz(self) -> int:
+        """
+        Tampondaki işlem loglarını tek işlemde yaz
+        Returns: Yazılan kayıt sayısı
+        """
+        kayitlar = self._log_kuyrugunu_al()
+        if not kayitlar:
+            return 0
+        if self.conn is None:
+            print(f"İşlem logu yazılamadı: bağlantı kapalı ({len(kayitlar)} kayıt)")
+            return 0
+        return self._loglari_yaz(kayitlar)
+
+    def son_islemler(self, limit: int = 100, tablo_adi: Optional[str] = None,
+                     kayit_id: Optional[int] = None) -> List[dict]:
+        """İşlem logları (yeniden eskiye); tampondaki kayıtlar önce yazılır, hiçbiri kaçmaz"""
+        self.log_bekleyenleri_yaz()
+        kosullar, parametreler = [], []
+        if tablo_adi:
+            kosullar.append("tablo_adi = ?")
+            parametreler.append(tablo_adi)
+            if kayit_id is not None:
+                kosullar.append("kayit_id = ?")
+                parametreler.append(kayit_id)
+        where = f"WHERE {' AND '.join(kosullar)}" if kosullar else ""
+        self.cursor.execute(f"SELECT * FROM islem_loglari {where} ORDER BY log_id DESC LIMIT ?",
+                            (*parametreler, limit))
+        return [dict(row) for row in self.cursor.fetchall()]
+
+    def _log_kuyrugunu_al(self) -> List[tuple]:
+        """Tamponu boşalt ve bekleyen zamanlayıcıyı iptal et"""
+        with self._log_kilit:
+            kayitlar, self._log_kuyrugu = self._log_kuyrugu, []
+            if self._log_zamanlayici is not None:
+                self._log_zamanlayici.cancel()
+                self._log_zamanlayici = None
+        return kayitlar
+
+    def _loglari_yaz(self, kayitlar: List[tuple]) -> int:
+        """Kayıtları bu thread'in bağlantısında tek commit ile yaz (hata olursa tampona geri koy)"""
+        try:
+            with self.transaction() as cur:
+                cur.executemany(self._LOG_INSERT, kayitlar)
+        except sqlite3.Error as e:
+            self._log_kuyruguna_geri_koy(kayitlar, e)
+            return 0
+        return len(kayitlar)
+
+    def _log_kuyruguna_geri_koy(self, kayitlar: List[tuple], hata: Exception):
+        """Yazılamayan kayıtlar kaybolmasın: sıranın başına, sonraki yazımda tekrar denenir"""
+        with self._log_kilit:
+            self._log_kuyrugu[:0] = kayitlar
+            fazla = len(self._log_kuyrugu) - self.LOG_KUYRUK_SINIRI * 20
+            if fazla > 0:
+                del self._log_kuyrugu[:fazla]  # Yazım uzun süre başarısızsa bellek sınırsız büyümesin
+        print(f"İşlem logu yazılamadı: {hata}" + (f" ({fazla} eski kayıt atıldı)" if fazla > 0 else ""))
+
+    def _zamanli_log_yaz(self):
+        """Zamanlayıcı thread'i: tamponu yaz ve bu thread'in bağlantısını kapat"""
+        with self._log_kilit:
+            self._log_zamanlayici = None
+        try:
+            if self._bagli:
+                self.log_bekleyenleri_yaz()
+        finally:
+            self.thread_baglantisini_kapat()
+        
+    def _create_sequences_table(self):
+        """Belge/işlem numarası sıraları (önek + yıl başına son değer)"""
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS sequences (
+                ad TEXT NOT NULL,
+                yil INTEGER NOT NULL DEFAULT 0,
+                son_deger INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (ad, yil)
+            )
+        """)
+        self.sequences_tohumla()
+
+    def sequences_tohumla(self):
+        """
+        Sıraları mevcut kayıtlardaki en büyük numaradan başlat (tek seferlik)
+        Sıra zaten ilerideyse geri alınmaz.
+        """
+        kaynaklar = [
+            ('GEL', 'gelirler', 'belge_no'),
+            ('GID', 'giderler', 'islem_no'),
+            ('KGE', 'koy_gelirleri', 'belge_no'),
+            ('KGI', 'koy_giderleri', 'islem_no'),
+        ]
+        for onek, tablo, kolon in kaynaklar:
+            self.cursor.execute(f"""
+                INSERT INTO sequences (ad, yil, son_deger)
+                SELECT ?, 0, COALESCE(MAX(CAST(SUBSTR({kolon}, 4) AS INTEGER)), 0)
+                FROM {tablo} WHERE {kolon} LIKE ?
+                ON CONFLICT(ad, yil) DO UPDATE SET son_deger = MAX(son_deger, excluded.son_deger)
+            """, (onek, f"{onek}%"))
+
+        # Çok yıllık ödeme grupları: GRUP_<yil>_<no>
+        self.cursor.execute("""
+            INSERT INTO sequences (ad, yil, son_deger)
+            SELECT 'GRUP', CAST(SUBSTR(coklu_odeme_grup_id, 6, 4) AS INTEGER),
+                   MAX(CAST(SUBSTR(coklu_odeme_grup_id, 11) AS INTEGER))
+            FROM gelirler WHERE coklu_odeme_grup_id LIKE 'GRUP\\_%' ESCAPE '\\'
+            GROUP BY SUBSTR(coklu_odeme_grup_id, 6, 4)
+            ON CONFLICT(ad, yil) DO UPDATE SET son_deger = MAX(son_deger, excluded.son_deger)
+        """)
+
+    # modül -> (rowid kodu, tablo, birincil anahtar, başlık kolonu, içerik kolonları)
+    # İndeks satırı rowid = kayit_id * 8 + kod: tetikleyiciler tek satıra rowid ile erişir
+    ARAMA_KAYNAKLARI = {
+        'uye': (1, 'uyeler', 'uye_id', 'ad_soyad', ('uye_no', 'telefon', 'telefon2', 'email', 'tc_kimlik')),
+        'gelir': (2, 'gelirler', 'gelir_id', 'aciklama', ('gelir_turu', 'belge_no', 'tahsil_eden', 'dekont_no', 'notlar')),
+        'gider': (3, 'giderler', 'gider_id', 'aciklama', ('gider_turu', 'islem_no', 'odeyen', 'notlar')),
+        'alacak': (4, 'alacaklar', 'id', 'kisi_kurum', ('aciklama', 'alacak_turu', 'senet_no', 'notlar')),
+        'belge': (5, 'belgeler', 'belge_id', 'baslik', ('belge_turu', 'dosya_adi', 'aciklama')),
+    }
+
+    def _create_arama_indeksi(self):
+        """
+        Tüm modüller için tek FTS5 indeksi (tetikleyicilerle güncel tutulur)
+        unicode61 büyük/küçük harf ve aksanları katlar; yalnızca 'ı' katlanmadığı
+        için tetikleyicilerde 'i'ye çevrilir.
+        """
+        try:
+            self.cursor.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS arama_fts USING fts5(
+                    modul UNINDEXED,
+                    kayit_id UNINDEXED,
+                    baslik,
+                    icerik,
+                    tokenize = 'unicode61 remove_diacritics 2',
+                    prefix = '2 3'
+                )
+            """)
+        except sqlite3.OperationalError as e:
+            print(f"FTS5 kullanılamıyor, arama LIKE ile yapılacak: {e}")
+            return
+
+        for modul, (kod, tablo, pk, _, _) in self.ARAMA_KAYNAKLARI.items():
+            yeni_satir = self._arama_satiri(modul, 'new.')
+            self.cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_arama_{tablo}_ekle AFTER INSERT ON {tablo} BEGIN
+                    INSERT INTO arama_fts (rowid, modul, kayit_id, baslik, icerik) VALUES ({yeni_satir});
+                END
+            """)
+            self.cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_arama_{tablo}_guncelle AFTER UPDATE ON {tablo} BEGIN
+                    DELETE FROM arama_fts WHERE rowid = old.{pk} * 8 + {kod};
+                    INSERT INTO arama_fts (rowid, modul, kayit_id, baslik, icerik) VALUES ({yeni_satir});
+                END
+            """)
+            self.cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_arama_{tablo}_sil AFTER DELETE ON {tablo} BEGIN
+                    DELETE FROM arama_fts WHERE rowid = old.{pk} * 8 + {kod};
+                END
+            """)
+        self.arama_indeksini_yeniden_olustur()
+
+    def _arama_satiri(self, modul: str, onek: str = '') -> str:
+        """Bir kaynak satırı için (rowid, modul, kayit_id, baslik, icerik) SQL ifadeleri"""
+        kod, _, pk, baslik, icerik = self.ARAMA_KAYNAKLARI[modul]
+        icerik_sql = " || ' ' || ".join(f"COALESCE({onek}{kolon}, '')" for kolon in icerik)
+        return (f"{onek}{pk} * 8 + {kod}, '{modul}', {onek}{pk}, "
+                f"REPLACE(COALESCE({onek}{baslik}, ''), 'ı', 'i'), "
+                f"REPLACE({icerik_sql}, 'ı', 'i')")
+
+    @property
+    def arama_indeksi_var(self) -> bool:
+        """FTS5 arama indeksi oluşturulmuş mu?"""
+        self.cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'arama_fts'")
+        return self.cursor.fetchone() is not None
+
+    def arama_indeksini_yeniden_olustur(self):
+        """Arama indeksini kaynak tablolardan baştan doldur"""
+        if not self.arama_indeksi_var:
+            return
+        with self.transaction() as cur:
+            cur.execute("DELETE FROM arama_fts")
+            for modul, (_, tablo, _, _, _) in self.ARAMA_KAYNAKLARI.items():
+                cur.execute(f"""
+                    INSERT INTO arama_fts (rowid, modul, kayit_id, baslik, icerik)
+                    SELECT {self._arama_satiri(modul)} FROM {tablo}
+                """)
+            cur.execute("INSERT INTO arama_fts (arama_fts) VALUES ('optimize')")
+
+    def _create_aidat_odenen_onbellegi(self):
+        """
+        aidat_takip.toplam_odenen: aidatın ödemeler toplamı (tetikleyicilerle güncel)
+        Listeler satır başına SUM alt sorgusu yerine bu kolonu okur.
+        """
+        try:
+            self.cursor.execute("ALTER TABLE aidat_takip ADD COLUMN toplam_odenen REAL NOT NULL DEFAULT 0")
+        except sqlite3.OperationalError:
+            pass  # Kolon zaten var
+
+        # Ödeme toplamı indeksten okunur (tabloya inmeden)
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_aidat_odeme_aidat ON aidat_odemeleri(aidat_id, tutar)")
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_aidat_yil_durum ON aidat_takip(yil, durum)")
+
         self.cursor.execute("""
-            INSERT INTO islem_loglari 
-            (kullanici, islem_turu, tablo_adi, kayit_id, aciklama, eski_deger, yeni_deger)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (kullanici, islem_turu, tablo_adi, kayit_id, aciklama, eski_deger, yeni_deger))
+            CREATE TRIGGER IF NOT EXISTS trg_aidat_odenen_ekle
+            AFTER INSERT ON aidat_odemeleri
+            BEGIN
+                UPDATE aidat_takip SET toplam_odenen = toplam_odenen + NEW.tutar
+                WHERE aidat_id = NEW.aidat_id;
+            END
+        """)
+        self.cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_aidat_odenen_guncelle
+            AFTER UPDATE OF tutar, aidat_id ON aidat_odemeleri
+            BEGIN
+                UPDATE aidat_takip SET toplam_odenen = toplam_odenen - OLD.tutar
+                WHERE aidat_id = OLD.aidat_id;
+                UPDATE aidat_takip SET toplam_odenen = toplam_odenen + NEW.tutar
+                WHERE aidat_id = NEW.aidat_id;
+            END
+        """)
+        self.cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_aidat_odenen_sil
+            AFTER DELETE ON aidat_odemeleri
+            BEGIN
+                UPDATE aidat_takip SET toplam_odenen = toplam_odenen - OLD.tutar
+                WHERE aidat_id = OLD.aidat_id;
+            END
+        """)
+
+        self.aidat_odenen_yeniden_hesapla()
+
+    def _create_tahakkuk_indeksleri(self):
+        """Yıl sonu/tahakkuk hesapları için yalnızca peşin kayıtları içeren kısmi indeksler"""
+        self.cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_gelir_pesin ON gelirler(kasa_id, ait_oldugu_yil, tarih)
+            WHERE tahakkuk_durumu = 'PEŞİN'
+        """)
+        self.cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_gider_pesin ON giderler(kasa_id, ait_oldugu_yil, tarih)
+            WHERE tahakkuk_durumu = 'PEŞİN'
+        """)
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_virman_tarih ON virmanlar(tarih)")
+
+    def _create_islem_log_indeksleri(self):
+        """Kayıt geçmişi (tablo + kayıt) ve tarih aralığı sorguları için islem_loglari indeksleri"""
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_log_tablo_kayit ON islem_loglari(tablo_adi, kayit_id)")
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_log_tarih ON islem_loglari(tarih)")
+
+    def _create_veri_surumu(self):
+        """
+        Hareket verisi değişiklik sayacı
+        gelirler/giderler/virmanlar/kasalar üzerindeki her ekleme, güncelleme ve
+        silmede artar (ör. tarih veya tahakkuk durumu düzeltmesi). Önbelleğe alınmış
+        hesapların (yıl sonu devir önizlemesi) hâlâ geçerli olup olmadığını gösterir.
+        """
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS veri_surumu (
+                ad TEXT PRIMARY KEY,
+                surum INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        self.cursor.execute("INSERT OR IGNORE INTO veri_surumu (ad, surum) VALUES ('hareket', 0)")
+        for tablo in ("gelirler", "giderler", "virmanlar", "kasalar"):
+            for olay, ek in (("INSERT", "ekle"), ("UPDATE", "guncelle"), ("DELETE", "sil")):
+                self.cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS trg_veri_surumu_{tablo}_{ek}
+                    AFTER {olay} ON {tablo}
+                    BEGIN
+                        UPDATE veri_surumu SET surum = surum + 1 WHERE ad = 'hareket';
+                    END
+                """)
+
+    def veri_surumu(self) -> int:
+        """Hareket verisinin güncel değişiklik sayacı (bkz. _create_veri_surumu)"""
+        self.cursor.execute("SELECT surum FROM veri_surumu WHERE ad = 'hareket'")
+        satir = self.cursor.fetchone()
+        return satir[0] if satir else 0
+
+    def aidat_odenen_yeniden_hesapla(self):
+        """aidat_takip.toplam_odenen önbelleğini ödemelerden baştan hesapla (gruplanmış tek geçiş)"""
+        self.cursor.execute("""
+            UPDATE aidat_takip
+            SET toplam_odenen = COALESCE(o.toplam, 0)
+            FROM aidat_takip a
+            LEFT JOIN (
+                SELECT aidat_id, SUM(tutar) AS toplam
+                FROM aidat_odemeleri GROUP BY aidat_id
+            ) o ON o.aidat_id = a.aidat_id
+            WHERE a.aidat_id = aidat_takip.aidat_id
+              AND aidat_takip.toplam_odenen IS NOT COALESCE(o.toplam, 0)
+        """)
         self.commit()
-        
+
+    def sonraki_sira_no(self, ad: str, yil: int = 0, adet: int = 1) -> int:
+        """
+        Sıradaki numarayı atomik olarak al (ad + yıl başına)
+        Artış çağıranın işlemi içinde kalır: kayıt eklenemezse
+        transaction() ile birlikte geri alınır, numara boşluğu oluşmaz.
+        adet > 1 ise ardışık bir blok ayrılır ve bloğun son numarası döner.
+        """
+        self.cursor.execute("INSERT OR IGNORE INTO sequences (ad, yil, son_deger) VALUES (?, ?, 0)", (ad, yil))
+        self.cursor.execute("UPDATE sequences SET son_deger = son_deger + ? WHERE ad = ? AND yil = ?", (adet, ad, yil))
+        self.cursor.execute("SELECT son_deger FROM sequences WHERE ad = ? AND yil = ?", (ad, yil))
+        return self.cursor.fetchone()[0]
+
     def get_next_belge_no(self) -> str:
         """Yeni belge numarası üret (Gelirler için)"""
-        self.cursor.execute("SELECT MAX(CAST(SUBSTR(belge_no, 4) AS INTEGER)) FROM gelirler WHERE belge_no LIKE 'GEL%'")
-        result = self.cursor.fetchone()
-        max_no = result[0] if result[0] else 0
-        return f"GEL{max_no + 1:06d}"
+        return f"GEL{self.sonraki_sira_no('GEL'):06d}"
+        
+    def get_next_belge_nolari(self, adet: int) -> List[str]:
+        """Ardışık gelir belge numaraları (toplu ekleme için tek seferde ayrılır)"""
+        son = self.sonraki_sira_no('GEL', adet=adet)
+        return [f"GEL{n:06d}" for n in range(son - adet + 1, son + 1)]
         
     def get_next_islem_no(self) -> str:
         """Yeni işlem numarası üret (Giderler için)"""
-        self.cursor.execute("SELECT MAX(CAST(SUBSTR(islem_no, 4) AS INTEGER)) FROM giderler WHERE islem_no LIKE 'GID%'")
-        result = self.cursor.fetchone()
-        max_no = result[0] if result[0] else 0
-        return f"GID{max_no + 1:06d}"
+        return f"GID{self.sonraki_sira_no('GID'):06d}"
     
     def get_next_koy_belge_no(self) -> str:
         """Yeni belge numarası üret (Köy Gelirleri için)"""
-        self.cursor.execute("SELECT MAX(CAST(SUBSTR(belge_no, 4) AS INTEGER)) FROM koy_gelirleri WHERE belge_no LIKE 'KGE%'")
-        result = self.cursor.fetchone()
-        max_no = result[0] if result[0] else 0
-        return f"KGE{max_no + 1:06d}"
+        return f"KGE{self.sonraki_sira_no('KGE'):06d}"
     
     def get_next_koy_islem_no(self) -> str:
         """Yeni işlem numarası üret (Köy Giderleri için)"""
-        self.cursor.execute("SELECT MAX(CAST(SUBSTR(islem_no, 4) AS INTEGER)) FROM koy_giderleri WHERE islem_no LIKE 'KGI%'")
-        result = self.cursor.fetchone()
-        max_no = result[0] if result[0] else 0
-        return f"KGI{max_no + 1:06d}"
+        return f"KGI{self.sonraki_sira_no('KGI'):06d}"
     
     def add_alacak_verecek_tables(self):
         """Alacak-Verecek tablolarını ekle"""
@@ -996,14 +1879,17 @@ class Database:
                 FOREIGN KEY (gider_id) REFERENCES giderler(gider_id)
             )
         """)
-        
-        self.conn.commit()
+        self.commit()
         
     def backup_database(self, backup_path: str) -> bool:
         """Veritabanını yedekle"""
         try:
-            import shutil
-            shutil.copy2(self.db_path, backup_path)
+            self.log_bekleyenleri_yaz()
+            # Online backup API: WAL'daki henüz aktarılmamış sayfalar da kopyalanır
+            hedef = sqlite3.connect(backup_path)
+            with hedef:
+                self.conn.backup(hedef)
+            hedef.close()
             return True
         except Exception as e:
             print(f"Yedekleme hatası: {e}")
@@ -1016,8 +1902,13 @@ class Database:
             self.close()
             shutil.copy2(backup_path, self.db_path)
             self.connect()
+            self.ayarlar.gecersiz_kil()
             return True
         except Exception as e:
             print(f"Geri yükleme hatası: {e}")
             return False
 
+
+
+# Kapanışta tamponlanmış işlem logları kaybolmasın
+atexit.register(Database._cikista_loglari_yaz)
@@ -51,24 +51,9 @@ def get_dashboard_data(yil: int) -> dict:
         baslangic = f"{yil}-01-01"
         bitis = f"{yil}-12-31"
         
-        for ay in range(1, 13):
-            ay_baslangic = f"{yil}-{ay:02d}-01"
-            if ay == 12:
-                ay_bitis = f"{yil}-12-31"
-            else:
-                ay_bitis = f"{yil}-{ay+1:02d}-01"
-            
-            db.cursor.execute("""
-                SELECT COALESCE(SUM(tutar), 0) FROM gelirler 
-                WHERE tarih >= ? AND tarih < ?
-            """, (ay_baslangic, ay_bitis))
-            data['aylik_gelir'][ay-1] = db.cursor.fetchone()[0]
-            
-            db.cursor.execute("""
-                SELECT COALESCE(SUM(tutar), 0) FROM giderler 
-                WHERE tarih >= ? AND tarih < ?
-            """, (ay_baslangic, ay_bitis))
-            data['aylik_gider'][ay-1] = db.cursor.fetchone()[0]
+        for satir in rapor.aylik_gelir_gider(yil):
+            data['aylik_gelir'][satir['ay']-1] = satir['gelir']
+            data['aylik_gider'][satir['ay']-1] = satir['gider']
         
         # Gelir dağılımı
         data['gelir_dagilim'] = rapor.gelir_turu_dagilimi(baslangic, bitis) or []
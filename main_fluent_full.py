@@ -5,10 +5,15 @@ v1.0.0 - İzin kontrolü, OCR, Otomatik backup ve güncelleme
 
 import sys
 import os
+import time
+import logging
 
-# Matplotlib backend'ini herhangi bir Qt import'undan ÖNCE ayarla
-import matplotlib
-matplotlib.use('Qt5Agg')
+_ACILIS = time.perf_counter()
+
+# Ekran yükleme/sayfa oluşturma süreleri yalnızca BADER_DEBUG=1 ile yazdırılır
+logging.basicConfig(level=logging.DEBUG if os.environ.get("BADER_DEBUG") else logging.WARNING,
+                    format="[BADER] %(message)s")
+log = logging.getLogger("bader")
 
 from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout
 from PyQt5.QtCore import Qt, pyqtSignal, QTimer
@@ -18,32 +23,77 @@ from qfluentwidgets import (FluentWindow, NavigationItemPosition, FluentIcon as
 from database import Database
 from ui_login import LoginWidget, session
 
-# Import tüm widget'lar
-from ui_dashboard import DashboardWidget
-from ui_uyeler import UyeWidget
-from ui_uyeler_ayrilan import AyrilanUyelerWidget
-from ui_uye_detay import UyeDetayWidget
-from ui_uye_aidat import UyeAidatWidget
-from ui_aidat import AidatWidget
-from ui_gelir import GelirWidget
-from ui_gider import GiderWidget
-from ui_virman import VirmanWidget
-from ui_kasa import KasaWidget
-from ui_devir import DevirWidget
-from ui_export import ExportWidget
-from ui_raporlar import RaporlarWidget
-from ui_tahakkuk_rapor import TahakkukRaporWidget
-from ui_butce import ButceWidget
-from ui_etkinlik import EtkinlikWidget
-from ui_toplanti import ToplantiWidget
-from ui_kullanicilar import KullanicilarWidget
-from ui_ayarlar import AyarlarWidget
-from ui_belgeler import BelgelerWidget
-from ui_ocr import OCRWidget
-from ui_arama import GelismisAramaWidget
-# Köy modülleri
-from ui_koy_dashboard import KoyDashboardWidget
-from ui_koy_islemler import KoyGelirWidget, KoyGiderWidget, KoyKasaWidget, KoyVirmanWidget
+
+
+class BaslangicIzi:
+    """Açılış süresinin aşamalara göre dökümü (import, veritabanı, login, ilk çizim)"""
+
+    def __init__(self, baslangic: float):
+        self.baslangic = baslangic
+        self._onceki = baslangic
+        self.asamalar = []
+        self.bitti = False
+
+    def asama(self, ad: str):
+        """Önceki aşamadan bu yana geçen süreyi kaydet"""
+        if self.bitti:
+            return
+        simdi = time.perf_counter()
+        self.asamalar.append((ad, (simdi - self._onceki) * 1000))
+        self._onceki = simdi
+        print(f"[BADER] Açılış - {ad}: {self.asamalar[-1][1]:.0f} ms "
+              f"(toplam {(simdi - self.baslangic) * 1000:.0f} ms)")
+
+    def bitir(self, ad: str):
+        self.asama(ad)
+        self.bitti = True
+
+
+_iz = BaslangicIzi(_ACILIS)
+_iz.asama("import")
+
+
+class TembelSayfa(QWidget):
+    """
+    Navigasyon sayfası yer tutucusu
+    Asıl widget'ın modülü ilk gösterimde import edilir ve widget o an oluşturulur
+    (açılışta 30 sayfanın import'u ve __init__ içindeki DB yüklemeleri beklenmez).
+    """
+
+    olusturuldu = pyqtSignal(object)
+
+    def __init__(self, modul: str, sinif: str, db: Database, nesne_adi: str):
+        super().__init__()
+        self.setObjectName(nesne_adi)
+        self._modul = modul
+        self._sinif = sinif
+        self._db = db
+        self._icerik = None
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+    @property
+    def icerik(self) -> QWidget:
+        """Asıl sayfa widget'ı (gerekirse şimdi oluşturulur)"""
+        if self._icerik is None:
+            from importlib import import_module
+            baslangic = time.perf_counter()
+            self._icerik = getattr(import_module(self._modul), self._sinif)(self._db)
+            self.layout().addWidget(self._icerik)
+            log.debug("%s oluşturuldu: %.0f ms", self._sinif, (time.perf_counter() - baslangic) * 1000)
+            self.olusturuldu.emit(self._icerik)
+        return self._icerik
+
+    def olusunca(self, islev):
+        """Sayfa oluşturulduğunda islev(widget) çağır (oluşmuşsa hemen)"""
+        if self._icerik is not None:
+            islev(self._icerik)
+        else:
+            self.olusturuldu.connect(islev)
+
+    def showEvent(self, event):
+        self.icerik
+        super().showEvent(event)
 
 
 class FluentBADERWindow(FluentWindow):
@@ -77,14 +127,16 @@ class FluentBADERWindow(FluentWindow):
         self.navigationInterface.expand(useAni=False)
         
         # Üye detay/aidat widget'ları (navigation dışı)
-        self.uye_detay_widget = UyeDetayWidget(self.db)
-        self.uye_detay_widget.setObjectName("uye_detay_widget")
+        self.uye_detay_widget = self._sayfa("ui_uye_detay", "UyeDetayWidget", "uye_detay_widget")
         
-        self.uye_aidat_widget = UyeAidatWidget(self.db)
-        self.uye_aidat_widget.setObjectName("uye_aidat_widget")
+        self.uye_aidat_widget = self._sayfa("ui_uye_aidat", "UyeAidatWidget", "uye_aidat_widget")
         
         self.setup_navigation()
         self.setup_signals()
+    
+    def _sayfa(self, modul: str, sinif: str, nesne_adi: str) -> TembelSayfa:
+        """İlk ziyarette oluşturulan sayfa"""
+        return TembelSayfa(modul, sinif, self.db, nesne_adi)
         
     def setup_navigation(self):
         """Navigasyon menüsünü oluştur - TAM MENÜ"""
@@ -93,8 +145,7 @@ class FluentBADERWindow(FluentWindow):
         self.navigationInterface.addSeparator()
         
         # Dashboard
-        self.dashboard_widget = DashboardWidget(self.db)
-        self.dashboard_widget.setObjectName("dashboard_widget")
+        self.dashboard_widget = self._sayfa("ui_dashboard", "DashboardWidget", "dashboard_widget")
         self.addSubInterface(
             self.dashboard_widget,
             FIF.HOME,
@@ -103,8 +154,7 @@ class FluentBADERWindow(FluentWindow):
         )
         
         # Gelişmiş Arama
-        self.arama_widget = GelismisAramaWidget(self.db)
-        self.arama_widget.setObjectName("arama_widget")
+        self.arama_widget = self._sayfa("ui_arama", "GelismisAramaWidget", "arama_widget")
         self.addSubInterface(
             self.arama_widget,
             FIF.SEARCH,
@@ -114,8 +164,7 @@ class FluentBADERWindow(FluentWindow):
         
         # ========== ÜYE İŞLEMLERİ ==========
         # Üyeler
-        self.uye_widget = UyeWidget(self.db)
-        self.uye_widget.setObjectName("uye_widget")
+        self.uye_widget = self._sayfa("ui_uyeler", "UyeWidget", "uye_widget")
         self.addSubInterface(
             self.uye_widget,
             FIF.PEOPLE,
@@ -124,8 +173,7 @@ class FluentBADERWindow(FluentWindow):
         )
         
         # Ayrılan Üyeler
-        self.ayrilan_widget = AyrilanUyelerWidget(self.db)
-        self.ayrilan_widget.setObjectName("ayrilan_widget")
+        self.ayrilan_widget = self._sayfa("ui_uyeler_ayrilan", "AyrilanUyelerWidget", "ayrilan_widget")
         self.addSubInterface(
             self.ayrilan_widget,
             FIF.REMOVE_FROM,
@@ -134,8 +182,7 @@ class FluentBADERWindow(FluentWindow):
         )
         
         # Aidat Takip
-        self.aidat_widget = AidatWidget(self.db)
-        self.aidat_widget.setObjectName("aidat_widget")
+        self.aidat_widget = self._sayfa("ui_aidat", "AidatWidget", "aidat_widget")
         self.addSubInterface(
             self.aidat_widget,
             FIF.CERTIFICATE,
@@ -145,8 +192,7 @@ class FluentBADERWindow(FluentWindow):
         
         # ========== MALİ İŞLEMLER ==========
         # Gelir
-        self.gelir_widget = GelirWidget(self.db)
-        self.gelir_widget.setObjectName("gelir_widget")
+        self.gelir_widget = self._sayfa("ui_gelir", "GelirWidget", "gelir_widget")
         self.addSubInterface(
             self.gelir_widget,
             FIF.CARE_UP_SOLID,
@@ -155,8 +201,7 @@ class FluentBADERWindow(FluentWindow):
         )
         
         # Gider
-        self.gider_widget = GiderWidget(self.db)
-        self.gider_widget.setObjectName("gider_widget")
+        self.gider_widget = self._sayfa("ui_gider", "GiderWidget", "gider_widget")
         self.addSubInterface(
             self.gider_widget,
             FIF.CARE_DOWN_SOLID,
@@ -165,8 +210,7 @@ class FluentBADERWindow(FluentWindow):
         )
         
         # Virman
-        self.virman_widget = VirmanWidget(self.db)
-        self.virman_widget.setObjectName("virman_widget")
+        self.virman_widget = self._sayfa("ui_virman", "VirmanWidget", "virman_widget")
         self.addSubInterface(
             self.virman_widget,
             FIF.SYNC,
@@ -175,8 +219,7 @@ class FluentBADERWindow(FluentWindow):
         )
         
         # Kasa Yönetimi
-        self.kasa_widget = KasaWidget(self.db)
-        self.kasa_widget.setObjectName("kasa_widget")
+        self.kasa_widget = self._sayfa("ui_kasa", "KasaWidget", "kasa_widget")
         self.addSubInterface(
             self.kasa_widget,
             FIF.MARKET,
@@ -186,8 +229,7 @@ class FluentBADERWindow(FluentWindow):
         
         # ========== ETKİNLİK & TOPLANTI ==========
         # Etkinlikler
-        self.etkinlik_widget = EtkinlikWidget(self.db)
-        self.etkinlik_widget.setObjectName("etkinlik_widget")
+        self.etkinlik_widget = self._sayfa("ui_etkinlik", "EtkinlikWidget", "etkinlik_widget")
         self.addSubInterface(
             self.etkinlik_widget,
             FIF.DATE_TIME,
@@ -196,8 +238,7 @@ class FluentBADERWindow(FluentWindow):
         )
         
         # Toplantılar
-        self.toplanti_widget = ToplantiWidget(self.db)
-        self.toplanti_widget.setObjectName("toplanti_widget")
+        self.toplanti_widget = self._sayfa("ui_toplanti", "ToplantiWidget", "toplanti_widget")
         self.addSubInterface(
             self.toplanti_widget,
             FIF.BOOK_SHELF,
@@ -207,8 +248,7 @@ class FluentBADERWindow(FluentWindow):
         
         # ========== RAPORLAR & BELGELER ==========
         # Raporlar
-        self.raporlar_widget = RaporlarWidget(self.db)
-        self.raporlar_widget.setObjectName("raporlar_widget")
+        self.raporlar_widget = self._sayfa("ui_raporlar", "RaporlarWidget", "raporlar_widget")
         self.addSubInterface(
             self.raporlar_widget,
             FIF.PIE_SINGLE,
@@ -217,8 +257,7 @@ class FluentBADERWindow(FluentWindow):
         )
         
         # Tahakkuk Raporu
-        self.tahakkuk_widget = TahakkukRaporWidget(self.db)
-        self.tahakkuk_widget.setObjectName("tahakkuk_widget")
+        self.tahakkuk_widget = self._sayfa("ui_tahakkuk_rapor", "TahakkukRaporWidget", "tahakkuk_widget")
         self.addSubInterface(
             self.tahakkuk_widget,
             FIF.CALORIES,
@@ -227,8 +266,7 @@ class FluentBADERWindow(FluentWindow):
         )
         
         # Bütçe Planlama
-        self.butce_widget = ButceWidget(self.db)
-        self.butce_widget.setObjectName("butce_widget")
+        self.butce_widget = self._sayfa("ui_butce", "ButceWidget", "butce_widget")
         self.addSubInterface(
             self.butce_widget,
             FIF.FOLDER,
@@ -237,8 +275,7 @@ class FluentBADERWindow(FluentWindow):
         )
         
         # Belgeler
-        self.belgeler_widget = BelgelerWidget(self.db)
-        self.belgeler_widget.setObjectName("belgeler_widget")
+        self.belgeler_widget = self._sayfa("ui_belgeler", "BelgelerWidget", "belgeler_widget")
         self.addSubInterface(
             self.belgeler_widget,
             FIF.DOCUMENT,
@@ -248,8 +285,7 @@ class FluentBADERWindow(FluentWindow):
         
         # Belge Tara (OCR)
         if session.has_permission('ocr_kullan'):
-            self.ocr_widget = OCRWidget(self.db)
-            self.ocr_widget.setObjectName("ocr_widget")
+            self.ocr_widget = self._sayfa("ui_ocr", "OCRWidget", "ocr_widget")
             self.addSubInterface(
                 self.ocr_widget,
                 FIF.CAMERA,
@@ -259,8 +295,7 @@ class FluentBADERWindow(FluentWindow):
         
         # ========== SİSTEM ==========
         # Yıl Sonu Devir
-        self.devir_widget = DevirWidget(self.db)
-        self.devir_widget.setObjectName("devir_widget")
+        self.devir_widget = self._sayfa("ui_devir", "DevirWidget", "devir_widget")
         self.addSubInterface(
             self.devir_widget,
             FIF.HISTORY,
@@ -269,8 +304,7 @@ class FluentBADERWindow(FluentWindow):
         )
         
         # Export & Yedekleme
-        self.export_widget = ExportWidget(self.db)
-        self.export_widget.setObjectName("export_widget")
+        self.export_widget = self._sayfa("ui_export", "ExportWidget", "export_widget")
         self.addSubInterface(
             self.export_widget,
             FIF.SAVE_AS,
@@ -280,8 +314,7 @@ class FluentBADERWindow(FluentWindow):
         
         # Kullanıcılar - Admin kontrolü
         if session.has_permission('kullanici_yonet'):
-            self.kullanicilar_widget = KullanicilarWidget(self.db)
-            self.kullanicilar_widget.setObjectName("kullanicilar_widget")
+            self.kullanicilar_widget = self._sayfa("ui_kullanicilar", "KullanicilarWidget", "kullanicilar_widget")
             self.addSubInterface(
                 self.kullanicilar_widget,
                 FIF.FINGERPRINT,
@@ -293,8 +326,7 @@ class FluentBADERWindow(FluentWindow):
         self.navigationInterface.addSeparator()
         
         # Köy Dashboard
-        self.koy_dashboard_widget = KoyDashboardWidget(self.db)
-        self.koy_dashboard_widget.setObjectName("koy_dashboard_widget")
+        self.koy_dashboard_widget = self._sayfa("ui_koy_dashboard", "KoyDashboardWidget", "koy_dashboard_widget")
         self.addSubInterface(
             self.koy_dashboard_widget,
             FIF.TILES,
@@ -303,8 +335,7 @@ class FluentBADERWindow(FluentWindow):
         )
         
         # Köy Gelirleri
-        self.koy_gelir_widget = KoyGelirWidget(self.db)
-        self.koy_gelir_widget.setObjectName("koy_gelir_widget")
+        self.koy_gelir_widget = self._sayfa("ui_koy_islemler", "KoyGelirWidget", "koy_gelir_widget")
         self.addSubInterface(
             self.koy_gelir_widget,
             FIF.LEAF,
@@ -313,8 +344,7 @@ class FluentBADERWindow(FluentWindow):
         )
         
         # Köy Giderleri
-        self.koy_gider_widget = KoyGiderWidget(self.db)
-        self.koy_gider_widget.setObjectName("koy_gider_widget")
+        self.koy_gider_widget = self._sayfa("ui_koy_islemler", "KoyGiderWidget", "koy_gider_widget")
         self.addSubInterface(
             self.koy_gider_widget,
             FIF.CHECKBOX,
@@ -323,8 +353,7 @@ class FluentBADERWindow(FluentWindow):
         )
         
         # Köy Kasaları
-        self.koy_kasa_widget = KoyKasaWidget(self.db)
-        self.koy_kasa_widget.setObjectName("koy_kasa_widget")
+        self.koy_kasa_widget = self._sayfa("ui_koy_islemler", "KoyKasaWidget", "koy_kasa_widget")
         self.addSubInterface(
             self.koy_kasa_widget,
             FIF.SHOPPING_CART,
@@ -333,8 +362,7 @@ class FluentBADERWindow(FluentWindow):
         )
         
         # Köy Virmanları
-        self.koy_virman_widget = KoyVirmanWidget(self.db)
-        self.koy_virman_widget.setObjectName("koy_virman_widget")
+        self.koy_virman_widget = self._sayfa("ui_koy_islemler", "KoyVirmanWidget", "koy_virman_widget")
         self.addSubInterface(
             self.koy_virman_widget,
             FIF.UPDATE,
@@ -367,8 +395,7 @@ class FluentBADERWindow(FluentWindow):
         
         # ========== ALT MENÜ ==========
         # Ayarlar
-        self.ayarlar_widget = AyarlarWidget(self.db)
-        self.ayarlar_widget.setObjectName("ayarlar_widget")
+        self.ayarlar_widget = self._sayfa("ui_ayarlar", "AyarlarWidget", "ayarlar_widget")
         self.addSubInterface(
             self.ayarlar_widget,
             FIF.SETTING,
@@ -393,29 +420,35 @@ class FluentBADERWindow(FluentWindow):
         self.load_dynamic_menus()
     
     def setup_signals(self):
-        """Tüm sinyal bağlantıları"""
+        """Tüm sinyal bağlantıları (sayfalar oluştukça bağlanır)"""
         # Üye widget'ından detay sayfalarına geçişler
-        self.uye_widget.uye_detay_ac.connect(self.show_uye_detay)
-        self.uye_widget.uye_aidat_ac.connect(self.show_uye_aidat)
+        def uye_bagla(w):
+            w.uye_detay_ac.connect(self.show_uye_detay)
+            w.uye_aidat_ac.connect(self.show_uye_aidat)
+        self.uye_widget.olusunca(uye_bagla)
         
         # Detay sayfalarından geri dönüşler
-        self.uye_detay_widget.geri_don.connect(lambda: self.switchTo(self.uye_widget))
-        self.uye_detay_widget.aidat_sayfasi_ac.connect(self.show_uye_aidat)
+        def detay_bagla(w):
+            w.geri_don.connect(lambda: self.switchTo(self.uye_widget))
+            w.aidat_sayfasi_ac.connect(self.show_uye_aidat)
+        self.uye_detay_widget.olusunca(detay_bagla)
         
-        self.uye_aidat_widget.geri_don.connect(lambda: self.switchTo(self.uye_widget))
+        self.uye_aidat_widget.olusunca(
+            lambda w: w.geri_don.connect(lambda: self.switchTo(self.uye_widget)))
         
         # Ayrılan üyeler
-        self.ayrilan_widget.uye_detay_ac.connect(self.show_uye_detay)
-        self.ayrilan_widget.uye_aidat_ac.connect(self.show_uye_aidat)
+        self.ayrilan_widget.olusunca(uye_bagla)
         
         # Gelişmiş Arama sinyalleri
-        self.arama_widget.uye_secildi.connect(self.show_uye_detay)
-        self.arama_widget.gelir_secildi.connect(lambda gid: self.switchTo(self.gelir_widget))
-        self.arama_widget.gider_secildi.connect(lambda gid: self.switchTo(self.gider_widget))
+        def arama_bagla(w):
+            w.uye_secildi.connect(self.show_uye_detay)
+            w.gelir_secildi.connect(lambda gid: self.switchTo(self.gelir_widget))
+            w.gider_secildi.connect(lambda gid: self.switchTo(self.gider_widget))
+        self.arama_widget.olusunca(arama_bagla)
     
     def show_uye_detay(self, uye_id: int):
         """Üye detay sayfasını göster"""
-        self.uye_detay_widget.load_uye(uye_id)
+        self.uye_detay_widget.icerik.load_uye(uye_id)
         # Detay widget'ını stackedWidget'a ekle (gerekirse)
         if self.uye_detay_widget not in [self.stackedWidget.widget(i) for i in range(self.stackedWidget.count())]:
             self.stackedWidget.addWidget(self.uye_detay_widget)
@@ -423,7 +456,7 @@ class FluentBADERWindow(FluentWindow):
     
     def show_uye_aidat(self, uye_id: int):
         """Üye aidat sayfasını göster"""
-        self.uye_aidat_widget.load_uye(uye_id)
+        self.uye_aidat_widget.icerik.load_uye(uye_id)
         # Aidat widget'ını stackedWidget'a ekle (gerekirse)
         if self.uye_aidat_widget not in [self.stackedWidget.widget(i) for i in range(self.stackedWidget.count())]:
             self.stackedWidget.addWidget(self.uye_aidat_widget)
@@ -745,11 +778,33 @@ def main():
     
     # Fluent tema
     setTheme(Theme.AUTO)
+    _iz.asama("QApplication")
     
     # Database
     db = Database()
     db.connect()
-    db.initialize_database()  # Tabloları oluştur
+    try:
+        db.initialize_database()  # Tabloları oluştur
+    except Exception as e:
+        # Yarım göçle açılmak yerine hatayı (ve göç öncesi yedeği) göster ve çık
+        from PyQt5.QtWidgets import QMessageBox
+        QMessageBox.critical(None, "Veritabanı Güncelleme Hatası",
+                             f"{e}\n\nUygulama kapatılacak. Veriler göç öncesi yedekten geri yüklenebilir.")
+        sys.exit(1)
+    _iz.asama("veritabanı/migration")
+    
+    # Aylık kasa bakiye özetleri: yalnızca son özetten sonraki tam aylar eklenir
+    try:
+        db.kasa_bakiye_ozetlerini_olustur()
+    except Exception as e:
+        print(f"[BADER] Kasa bakiye özetleri güncellenemedi: {e}")
+    
+    # Kapanışta arka plan yüklemelerinin bitmesini bekle ve bekleyen işlem loglarını yaz (yedekten önce)
+    from PyQt5.QtCore import QThreadPool
+    def _kapanis():
+        QThreadPool.globalInstance().waitForDone(3000)
+        db.log_bekleyenleri_yaz()
+    app.aboutToQuit.connect(_kapanis)
     
     # Veritabanı yolu
     db_path = db.db_path if hasattr(db, 'db_path') else os.path.expanduser("~/Documents/BADER/bader.db")
@@ -794,8 +849,11 @@ def show_login(db, app):
         global _main_window
         login_widget.close()
         
+        _iz.asama("kullanıcı girişi")
         _main_window = FluentBADERWindow(db, kullanici)
         _main_window.show()
+        _iz.asama("ana pencere")
+        QTimer.singleShot(0, lambda: _iz.bitir("ana pencere ilk çizim"))
         
         # Başlangıçta güncelleme kontrolü (5 saniye sonra)
         from ui_auto_operations import startup_update_check
@@ -803,6 +861,8 @@ def show_login(db, app):
     
     login_widget.login_successful.connect(on_login_success)
     login_widget.show()
+    # Olay döngüsü ilk çizimi yaptıktan sonra
+    QTimer.singleShot(0, lambda: _iz.asama("login ekranı ilk çizim"))
 
 
 if __name__ == '__main__':
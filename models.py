@@ -3,11 +3,11 @@ BADER Derneği - İş Mantığı Katmanı
 Tüm CRUD işlemleri ve hesaplamalar
 """
 
-from database import Database, get_license_mode, get_api_config
+from database import Database, tr_normalize
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime, date
-import json
-import requests
+import time
+import re
 
 
 class UyeYoneticisi:
@@ -15,34 +15,9 @@ class UyeYoneticisi:
     
     def __init__(self, db: Database):
         self.db = db
-        self.online_mode = get_license_mode() == 'online'
-        if self.online_mode:
-            config = get_api_config()
-            self.api_url = config.get('api_url', '')
-            self.api_key = config.get('api_key', '')
-            self.headers = {'X-API-Key': self.api_key, 'Content-Type': 'application/json'}
+        self.online_mode = db.get_license_mode() == 'online'
+        self.api = db.api_client()
     
-    def _api_request(self, method, endpoint, data=None):
-        """Online API isteği"""
-        try:
-            url = f"{self.api_url}{endpoint}"
-            if method == 'GET':
-                resp = requests.get(url, headers=self.headers, params=data, timeout=10)
-            elif method == 'POST':
-                resp = requests.post(url, headers=self.headers, json=data, timeout=10)
-            elif method == 'PUT':
-                resp = requests.put(url, headers=self.headers, json=data, timeout=10)
-            elif method == 'DELETE':
-                resp = requests.delete(url, headers=self.headers, timeout=10)
-            else:
-                return None
-            if resp.status_code in [200, 201]:
-                return resp.json()
-            return None
-        except Exception as e:
-            print(f"API Hatası: {e}")
-            return None
-        
     def uye_ekle(self, ad_soyad: str, telefon: str = "", email: str = "", 
                  durum: str = "Aktif", notlar: str = "", kan_grubu: str = "",
                  aile_durumu: str = "Bekar", cocuk_sayisi: int = 0,
@@ -71,7 +46,7 @@ class UyeYoneticisi:
                 'aidat_indirimi_yuzde': aidat_indirimi_yuzde
             }
             data = {k: v for k, v in data.items() if v is not None and v != ''}
-            result = self._api_request('POST', '/db/uyeler', data)
+            result = self.api.request('POST', '/db/uyeler', data)
             if result and result.get('success'):
                 # API başarılı - uye_id döndü mü kontrol et
                 if result.get('uye_id'):
@@ -130,7 +105,7 @@ class UyeYoneticisi:
                 'ozel_aidat_tutari': ozel_aidat_tutari,
                 'aidat_indirimi_yuzde': aidat_indirimi_yuzde
             }
-            result = self._api_request('PUT', f'/db/uyeler/{uye_id}', data)
+            result = self.api.request('PUT', f'/db/uyeler/{uye_id}', data)
             if result and result.get('success'):
                 return
             # API başarısız - offline'a devam et
@@ -156,7 +131,7 @@ class UyeYoneticisi:
     def uye_ayir(self, uye_id: int):
         """Üyeyi ayrılan olarak işaretle (soft delete)"""
         if self.online_mode:
-            result = self._api_request('PUT', f'/db/uyeler/{uye_id}', {'durum': 'Ayrıldı'})
+            result = self.api.request('PUT', f'/db/uyeler/{uye_id}', {'durum': 'Ayrıldı'})
             if result and result.get('success'):
                 return
             # API başarısız - offline'a devam et
@@ -181,7 +156,7 @@ class UyeYoneticisi:
         """
         if self.online_mode:
             if mode == "cascade":
-                result = self._api_request('DELETE', f'/db/uyeler/{uye_id}')
+                result = self.api.request('DELETE', f'/db/uyeler/{uye_id}')
                 if result and result.get('success'):
                     return
             else:
@@ -210,9 +185,9 @@ class UyeYoneticisi:
                 params['durum'] = durum
             elif dahil_ayrilan:
                 params['dahil_ayrilan'] = 'true'
-            result = self._api_request('GET', '/db/uyeler', params)
-            if result and (result.get('data') or isinstance(result, list)):
-                return result.get('data', result) if isinstance(result, dict) else result
+            uyeler = self.api.sayfali_getir('/db/uyeler', params)
+            if uyeler:
+                return uyeler
             # API başarısız - offline'a devam et
         
         if durum:
@@ -231,9 +206,9 @@ class UyeYoneticisi:
     def ayrilan_uyeler(self) -> List[Dict]:
         """Ayrılan üyeleri listele"""
         if self.online_mode:
-            result = self._api_request('GET', '/db/uyeler', {'durum': 'Ayrıldı'})
-            if result and (result.get('data') or isinstance(result, list)):
-                return result.get('data', result) if isinstance(result, dict) else result
+            uyeler = self.api.sayfali_getir('/db/uyeler', {'durum': 'Ayrıldı'})
+            if uyeler:
+                return uyeler
             # API başarısız - offline'a devam et
         
         self.db.cursor.execute("""
@@ -244,7 +219,7 @@ class UyeYoneticisi:
     def uye_getir(self, uye_id: int) -> Optional[Dict]:
         """Tek bir üyeyi getir"""
         if self.online_mode:
-            result = self._api_request('GET', f'/db/uyeler/{uye_id}')
+            result = self.api.request('GET', f'/db/uyeler/{uye_id}')
             return result.get('data') if result else None
         
         self.db.cursor.execute("SELECT * FROM uyeler WHERE uye_id = ?", (uye_id,))
@@ -269,8 +244,7 @@ class UyeYoneticisi:
     def uye_aidat_yillari(self, uye_id: int) -> List[Dict]:
         """Üyenin tüm aidat yıllarını getir"""
         self.db.cursor.execute("""
-            SELECT at.*, 
-                   (SELECT COALESCE(SUM(tutar), 0) FROM aidat_odemeleri WHERE aidat_id = at.aidat_id) as toplam_odenen
+            SELECT at.*
             FROM aidat_takip at
             WHERE at.uye_id = ?
             ORDER BY at.yil DESC
@@ -278,7 +252,19 @@ class UyeYoneticisi:
         return [dict(row) for row in self.db.cursor.fetchall()]
         
     def uye_ara(self, arama_metni: str, dahil_ayrilan: bool = False) -> List[Dict]:
-        """Üye ara (ad, telefon, email'de)"""
+        """Üye ara (ad, üye no, telefon, email, TC'de) - indeksli, en iyi eşleşme önce"""
+        sorgu = AramaYoneticisi.fts_sorgusu(arama_metni)
+        # Yalnızca rakam girildiyse telefon/TC ortasında da aranır (önek araması yetmez)
+        if sorgu and not arama_metni.strip().isdigit() and self.db.arama_indeksi_var:
+            self.db.cursor.execute(f"""
+                SELECT u.* FROM arama_fts
+                JOIN uyeler u ON u.uye_id = arama_fts.kayit_id
+                WHERE arama_fts MATCH ? AND arama_fts.modul = 'uye'
+                {"" if dahil_ayrilan else "AND u.durum != 'Ayrıldı'"}
+                ORDER BY {AramaYoneticisi.SIRALAMA}, u.ad_soyad
+            """, (sorgu,))
+            return [dict(row) for row in self.db.cursor.fetchall()]
+        
         arama = f"%{arama_metni}%"
         if dahil_ayrilan:
             self.db.cursor.execute("""
@@ -301,34 +287,8 @@ class AileUyeYoneticisi:
     
     def __init__(self, db: Database):
         self.db = db
-        self.online_mode = get_license_mode() == 'online'
-        if self.online_mode:
-            config = get_api_config()
-            self.api_url = config.get('api_url', '')
-            self.api_key = config.get('api_key', '')
-            self.headers = {'X-API-Key': self.api_key, 'Content-Type': 'application/json'}
-    
-    def _api_request(self, method: str, endpoint: str, data: dict = None):
-        """API isteği gönder"""
-        if not self.online_mode:
-            return None
-        try:
-            url = f"{self.api_url}{endpoint}"
-            if method == 'GET':
-                resp = requests.get(url, headers=self.headers, params=data, timeout=10)
-            elif method == 'POST':
-                resp = requests.post(url, headers=self.headers, json=data, timeout=10)
-            elif method == 'PUT':
-                resp = requests.put(url, headers=self.headers, json=data, timeout=10)
-            elif method == 'DELETE':
-                resp = requests.delete(url, headers=self.headers, timeout=10)
-            else:
-                return None
-            if resp.status_code in [200, 201]:
-                return resp.json()
-            return None
-        except:
-            return None
+        self.online_mode = db.get_license_mode() == 'online'
+        self.api = db.api_client()
     
     def aile_uyesi_ekle(self, uye_id: int, yakinlik: str, ad_soyad: str,
                         dogum_tarihi: str = None, telefon: str = "",
@@ -340,7 +300,7 @@ class AileUyeYoneticisi:
                 'dogum_tarihi': dogum_tarihi, 'telefon': telefon,
                 'meslek': meslek, 'notlar': notlar
             }
-            result = self._api_request('POST', '/db/aile_uyeleri', data)
+            result = self.api.request('POST', '/db/aile_uyeleri', data)
             if result and result.get('aile_uye_id'):
                 return result.get('aile_uye_id', 0)
         
@@ -362,7 +322,7 @@ class AileUyeYoneticisi:
                 'dogum_tarihi': dogum_tarihi, 'telefon': telefon,
                 'meslek': meslek, 'notlar': notlar
             }
-            result = self._api_request('PUT', f'/db/aile_uyeleri/{aile_uye_id}', data)
+            result = self.api.request('PUT', f'/db/aile_uyeleri/{aile_uye_id}', data)
             if result and result.get('success'):
                 return
         
@@ -377,7 +337,7 @@ class AileUyeYoneticisi:
     def aile_uyesi_sil(self, aile_uye_id: int):
         """Aile üyesi sil"""
         if self.online_mode:
-            result = self._api_request('DELETE', f'/db/aile_uyeleri/{aile_uye_id}')
+            result = self.api.request('DELETE', f'/db/aile_uyeleri/{aile_uye_id}')
             if result and result.get('success'):
                 return
         
@@ -387,7 +347,7 @@ class AileUyeYoneticisi:
     def aile_uyeleri_listesi(self, uye_id: int) -> List[Dict]:
         """Belirli bir üyenin aile üyelerini listele"""
         if self.online_mode:
-            result = self._api_request('GET', '/db/aile_uyeleri', {'uye_id': uye_id})
+            result = self.api.request('GET', '/db/aile_uyeleri', {'uye_id': uye_id})
             if result:
                 if isinstance(result, list):
                     return result
@@ -413,7 +373,7 @@ class AileUyeYoneticisi:
     def aile_uyesi_getir(self, aile_uye_id: int) -> Optional[Dict]:
         """Tek aile üyesi getir"""
         if self.online_mode:
-            result = self._api_request('GET', f'/db/aile_uyeleri/{aile_uye_id}')
+            result = self.api.request('GET', f'/db/aile_uyeleri/{aile_uye_id}')
             if result:
                 return result.get('data') if isinstance(result, dict) else result
         
@@ -440,37 +400,9 @@ class AidatYoneticisi:
     
     def __init__(self, db: Database):
         self.db = db
-        self.online_mode = get_license_mode() == 'online'
-        if self.online_mode:
-            config = get_api_config()
-            self.api_url = config.get('api_url', '')
-            self.api_key = config.get('api_key', '')
-            self.headers = {'X-API-Key': self.api_key, 'Content-Type': 'application/json'}
-    
-    def _api_request(self, method: str, endpoint: str, data: dict = None) -> Optional[dict]:
-        """API isteği gönder"""
-        if not self.online_mode:
-            return None
-        try:
-            import requests
-            url = f"{self.api_url}{endpoint}"
-            if method == 'GET':
-                response = requests.get(url, headers=self.headers, params=data, timeout=10)
-            elif method == 'POST':
-                response = requests.post(url, headers=self.headers, json=data, timeout=10)
-            elif method == 'PUT':
-                response = requests.put(url, headers=self.headers, json=data, timeout=10)
-            elif method == 'DELETE':
-                response = requests.delete(url, headers=self.headers, timeout=10)
-            else:
-                return None
-            if response.status_code in [200, 201]:
-                return response.json()
-            return None
-        except Exception as e:
-            print(f"API Error: {e}")
-            return None
-        
+        self.online_mode = db.get_license_mode() == 'online'
+        self.api = db.api_client()
+    
     def aidat_kaydi_olustur(self, uye_id: int, yil: int, yillik_aidat_tutari: float) -> int:
         """Bir üye için yıllık aidat kaydı oluştur"""
         if self.online_mode:
@@ -480,7 +412,7 @@ class AidatYoneticisi:
                 'yillik_aidat_tutari': yillik_aidat_tutari,
                 'odenecek_tutar': yillik_aidat_tutari
             }
-            result = self._api_request('POST', '/db/aidat_takip', data)
+            result = self.api.request('POST', '/db/aidat_takip', data)
             if result and result.get('aidat_id'):
                 return result.get('aidat_id', -1)
             # API başarısız - offline'a devam et
@@ -516,7 +448,7 @@ class AidatYoneticisi:
                 'tahsilat_turu': tahsilat_turu,
                 'dekont_no': dekont_no
             }
-            result = self._api_request('POST', '/db/aidat_odemeleri', data)
+            result = self.api.request('POST', '/db/aidat_odemeleri', data)
             if result and result.get('odeme_id'):
                 return result.get('odeme_id', -1)
             # API başarısız - offline'a devam et
@@ -538,7 +470,7 @@ class AidatYoneticisi:
     def aidat_odeme_sil(self, odeme_id: int):
         """Aidat ödemesini sil"""
         if self.online_mode:
-            result = self._api_request('DELETE', f'/db/aidat_odemeleri/{odeme_id}')
+            result = self.api.request('DELETE', f'/db/aidat_odemeleri/{odeme_id}')
             if result and result.get('success'):
                 return
             # API başarısız - offline'a devam et
@@ -565,26 +497,20 @@ class AidatYoneticisi:
         Aidat durumunu kontrol et ve gerekirse Gelir kaydı oluştur/sil
         KRİTİK FONKSİYON: Aidat <-> Gelir senkronizasyonu
         """
-        # Toplam ödenen tutarı hesapla
-        self.db.cursor.execute("""
-            SELECT COALESCE(SUM(tutar), 0) as toplam_odenen
-            FROM aidat_odemeleri
-            WHERE aidat_id = ?
-        """, (aidat_id,))
-        result = self.db.cursor.fetchone()
-        toplam_odenen = result['toplam_odenen']
-        
-        # Aidat bilgilerini al
+        # Aidat bilgileri ve ödenen toplam (tetikleyicilerle güncel önbellek)
         self.db.cursor.execute("""
-            SELECT yillik_aidat_tutari, durum, aktarim_durumu, gelir_id, uye_id, yil
-            FROM aidat_takip
-            WHERE aidat_id = ?
+            SELECT a.yillik_aidat_tutari, a.durum, a.aktarim_durumu, a.gelir_id, a.uye_id, a.yil,
+                   a.toplam_odenen, g.coklu_odeme_grup_id
+            FROM aidat_takip a
+            LEFT JOIN gelirler g ON g.gelir_id = a.gelir_id
+            WHERE a.aidat_id = ?
         """, (aidat_id,))
         aidat = self.db.cursor.fetchone()
         
         if not aidat:
             return
             
+        toplam_odenen = aidat['toplam_odenen']
         yillik_aidat = aidat['yillik_aidat_tutari']
         eski_durum = aidat['durum']
         aktarim_durumu = aidat['aktarim_durumu']
@@ -644,8 +570,9 @@ class AidatYoneticisi:
             self.db.log_islem("Sistem", "OTOMATIK", "gelirler", gelir_id, 
                             f"Aidat tamamlandı, otomatik gelir kaydı oluşturuldu")
             
-        elif yeni_durum != "Tamamlandı" and aktarim_durumu == "Aktarıldı" and gelir_id:
-            # Gelir kaydını sil
+        elif (yeni_durum != "Tamamlandı" and aktarim_durumu == "Aktarıldı" and gelir_id
+              and not aidat['coklu_odeme_grup_id']):
+            # Gelir kaydını sil (çok yıllık ödeme geliri kısmi yılda da bağlı kalır)
             gelir_yoneticisi = GelirYoneticisi(self.db)
             gelir_yoneticisi.gelir_sil(gelir_id)
             
@@ -660,29 +587,247 @@ class AidatYoneticisi:
                             f"Aidat tamamlanmadı, gelir kaydı silindi")
         
         self.db.commit()
-        
-    def aidat_listesi(self, uye_id: Optional[int] = None, yil: Optional[int] = None) -> List[Dict]:
-        """Aidat kayıtlarını listele"""
-        query = """
-            SELECT at.*, u.ad_soyad,
-                   (SELECT COALESCE(SUM(tutar), 0) FROM aidat_odemeleri WHERE aidat_id = at.aidat_id) as toplam_odenen
+
+    # Mutabakat işlemleri (aidat_gelir_mutabakati fark raporundaki 'islem' değerleri)
+    MUTABAKAT_ISLEMLERI = {
+        'gelir_olustur': "Tamamlanan aidat için gelir kaydı oluşturulacak",
+        'bagla': "Mevcut gelir kaydı aidata bağlanacak (Aktarıldı)",
+        'tutar_duzelt': "Otomatik aidat gelirinin tutarı yıllık aidata eşitlenecek",
+        'gelir_sil': "Tamamlanmayan aidatın otomatik gelir kaydı silinecek",
+        'bag_temizle': "Olmayan gelire işaret eden aktarım bilgisi temizlenecek",
+        'incele': "Tamamlanmayan aidat elle girilmiş bir gelire bağlı (elle incelenmeli)",
+    }
+
+    def aidat_gelir_mutabakati(self, yil: Optional[int] = None, kuru_calisma: bool = False,
+                               fark_limiti: int = 500) -> Dict:
+        """
+        Aidat <-> Gelir toplu mutabakatı (küme bazlı, tek işlemde)
+        _aidat_durumunu_guncelle kurallarıyla durum, odenecek_tutar, toplam_odenen, aktarim_durumu
+        ve bağlı gelir kayıtları bir yıl (yil=None: tüm veritabanı) için yeniden hesaplanır.
+        İçe aktarma veya elle düzeltme sonrası senkronu toparlamak için kullanılır.
+
+        kuru_calisma=True: hiçbir şey yazılmaz, yalnızca fark raporu döner.
+        Çok yıllık ödeme gelirleri (coklu_odeme_grup_id) kısmi yılda da geçerli bağdır, silinmez;
+        elle girilmiş diğer gelirler 'incele' olarak raporlanır.
+
+        Returns: {'ozet': {islem: adet, 'durum': adet}, 'farklar': [satır, ...] (en çok fark_limiti),
+                  'toplam_aidat': n, 'kuru_calisma': bool}
+        """
+        with self.db.transaction(readonly=kuru_calisma) as cur:
+            cur.execute("DROP TABLE IF EXISTS temp.aidat_mutabakat")
+            try:
+                cur.execute("""
+                    CREATE TEMP TABLE aidat_mutabakat AS
+                    WITH odenen AS (
+                        SELECT o.aidat_id, SUM(o.tutar) AS toplam
+                        FROM aidat_odemeleri o
+                        JOIN aidat_takip a ON a.aidat_id = o.aidat_id
+                        WHERE (:yil IS NULL OR a.yil = :yil)
+                        GROUP BY o.aidat_id
+                    ), hesap AS (
+                        SELECT a.aidat_id, a.uye_id, a.yil,
+                               a.yillik_aidat_tutari AS yillik,
+                               a.durum AS eski_durum, a.odenecek_tutar AS eski_kalan,
+                               a.aktarim_durumu, a.gelir_id,
+                               a.toplam_odenen AS eski_odenen,
+                               COALESCE(o.toplam, 0) AS odenen,
+                               a.yillik_aidat_tutari - COALESCE(o.toplam, 0) AS yeni_kalan,
+                               CASE WHEN COALESCE(o.toplam, 0) >= a.yillik_aidat_tutari THEN 'Tamamlandı'
+                                    WHEN COALESCE(o.toplam, 0) > 0 THEN 'Kısmi'
+                                    ELSE 'Eksik' END AS yeni_durum,
+                               g.gelir_id IS NOT NULL AS gelir_var,
+                               g.tutar AS gelir_tutari,
+                               COALESCE(g.gelir_turu = 'AİDAT' AND g.coklu_odeme_grup_id IS NULL, 0) AS otomatik,
+                               g.coklu_odeme_grup_id IS NOT NULL AS coklu
+                        FROM aidat_takip a
+                        LEFT JOIN odenen o ON o.aidat_id = a.aidat_id
+                        LEFT JOIN gelirler g ON g.gelir_id = a.gelir_id
+                        WHERE (:yil IS NULL OR a.yil = :yil)
+                    )
+                    SELECT h.*,
+                           (h.eski_durum IS NOT h.yeni_durum
+                            OR ROUND(h.eski_kalan, 2) IS NOT ROUND(h.yeni_kalan, 2)
+                            OR ROUND(h.eski_odenen, 2) IS NOT ROUND(h.odenen, 2)) AS durum_degisti,
+                           CASE
+                               WHEN h.yeni_durum = 'Tamamlandı' AND NOT h.gelir_var THEN 'gelir_olustur'
+                               WHEN h.yeni_durum = 'Tamamlandı' AND h.aktarim_durumu != 'Aktarıldı' THEN 'bagla'
+                               WHEN h.yeni_durum = 'Tamamlandı' AND h.otomatik
+                                    AND ROUND(h.gelir_tutari, 2) != ROUND(h.yillik, 2) THEN 'tutar_duzelt'
+                               WHEN h.yeni_durum = 'Tamamlandı' THEN NULL
+                               WHEN h.gelir_var AND h.aktarim_durumu = 'Aktarıldı' AND h.otomatik THEN 'gelir_sil'
+                               WHEN h.gelir_var AND h.aktarim_durumu = 'Aktarıldı' AND h.coklu THEN NULL
+                               WHEN h.gelir_var AND h.aktarim_durumu = 'Aktarıldı' THEN 'incele'
+                               WHEN NOT h.gelir_var AND (h.aktarim_durumu = 'Aktarıldı' OR h.gelir_id IS NOT NULL)
+                                    THEN 'bag_temizle'
+                           END AS islem
+                    FROM hesap h
+                """, {'yil': yil})
+
+                cur.execute("""
+                    SELECT COUNT(*) AS toplam,
+                           COALESCE(SUM(durum_degisti), 0) AS durum,
+                           COALESCE(SUM(islem = 'gelir_olustur'), 0) AS gelir_olustur,
+                           COALESCE(SUM(islem = 'bagla'), 0) AS bagla,
+                           COALESCE(SUM(islem = 'tutar_duzelt'), 0) AS tutar_duzelt,
+                           COALESCE(SUM(islem = 'gelir_sil'), 0) AS gelir_sil,
+                           COALESCE(SUM(islem = 'bag_temizle'), 0) AS bag_temizle,
+                           COALESCE(SUM(islem = 'incele'), 0) AS incele
+                    FROM aidat_mutabakat
+                """)
+                sayimlar = dict(cur.fetchone())
+                toplam_aidat = sayimlar.pop('toplam')
+
+                cur.execute("""
+                    SELECT m.aidat_id, m.uye_id, u.ad_soyad, m.yil, m.yillik, m.odenen,
+                           m.eski_durum, m.yeni_durum, m.eski_kalan, m.yeni_kalan,
+                           m.aktarim_durumu, m.gelir_id, m.gelir_tutari, m.islem
+                    FROM aidat_mutabakat m
+                    LEFT JOIN uyeler u ON u.uye_id = m.uye_id
+                    WHERE m.durum_degisti OR m.islem IS NOT NULL
+                    ORDER BY m.yil, m.aidat_id
+                    LIMIT ?
+                """, (fark_limiti,))
+                farklar = [dict(row) for row in cur.fetchall()]
+
+                if not kuru_calisma and any(sayimlar.values()):
+                    self._mutabakati_uygula(cur, sayimlar['gelir_olustur'])
+                    self.db.log_islem("Sistem", "MUTABAKAT", "aidat_takip", 0,
+                                      f"Aidat-gelir mutabakatı ({yil or 'tüm yıllar'}): " +
+                                      ", ".join(f"{ad}={adet}" for ad, adet in sayimlar.items() if adet))
+            finally:
+                cur.execute("DROP TABLE IF EXISTS temp.aidat_mutabakat")
+
+        return {'ozet': sayimlar, 'farklar': farklar,
+                'toplam_aidat': toplam_aidat, 'kuru_calisma': kuru_calisma}
+
+    def _mutabakati_uygula(self, cur, gelir_olustur_adedi: int):
+        """temp.aidat_mutabakat farklarını çağıranın işlemi içinde küme bazlı uygula"""
+        cur.execute("""
+            UPDATE aidat_takip
+            SET durum = m.yeni_durum, odenecek_tutar = m.yeni_kalan, toplam_odenen = m.odenen,
+                guncelleme_tarihi = CURRENT_TIMESTAMP
+            FROM aidat_mutabakat m
+            WHERE m.aidat_id = aidat_takip.aidat_id AND m.durum_degisti
+        """)
+
+        # Bağ önce temizlenir, sonra otomatik gelirler silinir (gelir_sil ile aynı sıra)
+        cur.execute("""
+            UPDATE aidat_takip
+            SET aktarim_durumu = '', gelir_id = NULL
+            FROM aidat_mutabakat m
+            WHERE m.aidat_id = aidat_takip.aidat_id AND m.islem IN ('gelir_sil', 'bag_temizle')
+        """)
+        cur.execute("""
+            DELETE FROM gelirler
+            WHERE gelir_id IN (SELECT gelir_id FROM aidat_mutabakat WHERE islem = 'gelir_sil')
+        """)
+
+        cur.execute("""
+            UPDATE gelirler
+            SET tutar = m.yillik, guncelleme_tarihi = CURRENT_TIMESTAMP
+            FROM aidat_mutabakat m
+            WHERE m.gelir_id = gelirler.gelir_id AND m.islem = 'tutar_duzelt'
+        """)
+        cur.execute("""
+            UPDATE aidat_takip
+            SET aktarim_durumu = 'Aktarıldı', guncelleme_tarihi = CURRENT_TIMESTAMP
+            FROM aidat_mutabakat m
+            WHERE m.aidat_id = aidat_takip.aidat_id AND m.islem = 'bagla'
+        """)
+
+        if not gelir_olustur_adedi:
+            return
+
+        # Belge numaraları tek blokta ayrılır; yeni gelirler gelir_id aralığından bağlanır
+        son_belge = self.db.sonraki_sira_no('GEL', adet=gelir_olustur_adedi)
+        cur.execute("SELECT COALESCE(MAX(gelir_id), 0) FROM gelirler")
+        son_gelir_id = cur.fetchone()[0]
+        bugun = datetime.now().strftime("%Y-%m-%d")
+        cur.execute("""
+            INSERT INTO gelirler
+            (tarih, belge_no, gelir_turu, aciklama, tutar, kasa_id, aidat_id, ait_oldugu_yil, tahakkuk_durumu)
+            SELECT :tarih,
+                   printf('GEL%06d', :ilk_belge + ROW_NUMBER() OVER (ORDER BY m.aidat_id) - 1),
+                   'AİDAT',
+                   COALESCE(u.ad_soyad, 'Bilinmeyen') || ' - ' || m.yil || ' Yılı Aidatı',
+                   m.yillik,
+                   COALESCE((SELECT kasa_id FROM kasalar WHERE kasa_adi = 'DERNEK KASA TL' LIMIT 1), 1),
+                   m.aidat_id, :ait_yil, 'NORMAL'
+            FROM aidat_mutabakat m
+            LEFT JOIN uyeler u ON u.uye_id = m.uye_id
+            WHERE m.islem = 'gelir_olustur'
+            ORDER BY m.aidat_id
+        """, {'tarih': bugun, 'ilk_belge': son_belge - gelir_olustur_adedi + 1,
+              'ait_yil': int(bugun[:4])})
+        cur.execute("""
+            UPDATE aidat_takip
+            SET aktarim_durumu = 'Aktarıldı', gelir_id = g.gelir_id,
+                guncelleme_tarihi = CURRENT_TIMESTAMP
+            FROM gelirler g
+            WHERE g.gelir_id > ? AND g.aidat_id = aidat_takip.aidat_id
+        """, (son_gelir_id,))
+
+    def aidat_listesi(self, uye_id: Optional[int] = None, yil: Optional[int] = None,
+                      baslangic_yil: Optional[int] = None, bitis_yil: Optional[int] = None,
+                      durum: Optional[str] = None, limit: Optional[int] = None,
+                      offset: int = 0) -> List[Dict]:
+        """
+        Aidat kayıtlarını listele (üye, yıl/yıl aralığı ve durum filtreleri SQL'de)
+        toplam_odenen, tetikleyicilerle güncel tutulan önbellek kolonudur.
+        limit verilirse sayfalı döner (sonraki sayfa için offset).
+        """
+        kosul, params = self._aidat_filtresi(uye_id, yil, baslangic_yil, bitis_yil, durum)
+        query = f"""
+            SELECT at.*, u.ad_soyad
             FROM aidat_takip at
             JOIN uyeler u ON at.uye_id = u.uye_id
+            {kosul}
+            ORDER BY u.ad_soyad, at.yil DESC, at.aidat_id
         """
-        params = []
+        if limit:
+            query += " LIMIT ? OFFSET ?"
+            params += [limit, offset]
         
+        self.db.cursor.execute(query, params)
+        return [dict(row) for row in self.db.cursor.fetchall()]
+    
+    def aidat_ozeti(self, uye_id: Optional[int] = None, yil: Optional[int] = None,
+                    baslangic_yil: Optional[int] = None, bitis_yil: Optional[int] = None,
+                    durum: Optional[str] = None) -> Dict:
+        """aidat_listesi ile aynı filtrelerle kayıt sayıları ve tutar toplamları (sayfalama için)"""
+        kosul, params = self._aidat_filtresi(uye_id, yil, baslangic_yil, bitis_yil, durum)
+        self.db.cursor.execute(f"""
+            SELECT COUNT(*) AS toplam,
+                   COALESCE(SUM(at.durum = 'Tamamlandı'), 0) AS tamamlanan,
+                   COALESCE(SUM(at.durum = 'Kısmi'), 0) AS kismi,
+                   COALESCE(SUM(at.durum = 'Eksik'), 0) AS eksik,
+                   COALESCE(SUM(at.yillik_aidat_tutari), 0) AS tahakkuk_toplami,
+                   COALESCE(SUM(at.toplam_odenen), 0) AS odenen_toplami
+            FROM aidat_takip at
+            {kosul}
+        """, params)
+        return dict(self.db.cursor.fetchone())
+    
+    @staticmethod
+    def _aidat_filtresi(uye_id, yil, baslangic_yil, bitis_yil, durum) -> tuple:
+        """aidat_takip (at) için WHERE cümlesi ve parametreleri"""
+        kosullar, params = [], []
         if uye_id:
-            query += " WHERE at.uye_id = ?"
+            kosullar.append("at.uye_id = ?")
             params.append(uye_id)
-            
         if yil:
-            query += " AND at.yil = ?" if uye_id else " WHERE at.yil = ?"
+            kosullar.append("at.yil = ?")
             params.append(yil)
-            
-        query += " ORDER BY u.ad_soyad, at.yil DESC"
-        
-        self.db.cursor.execute(query, params)
-        return [dict(row) for row in self.db.cursor.fetchall()]
+        if baslangic_yil:
+            kosullar.append("at.yil >= ?")
+            params.append(baslangic_yil)
+        if bitis_yil:
+            kosullar.append("at.yil <= ?")
+            params.append(bitis_yil)
+        if durum:
+            kosullar.append("at.durum = ?")
+            params.append(durum)
+        return ("WHERE " + " AND ".join(kosullar) if kosullar else ""), params
         
     def uye_aidat_odemeleri(self, aidat_id: int) -> List[Dict]:
         """Bir aidatın tüm ödemelerini getir"""
@@ -693,20 +838,51 @@ class AidatYoneticisi:
         """, (aidat_id,))
         return [dict(row) for row in self.db.cursor.fetchall()]
         
-    def toplu_aidat_olustur(self, yil: int, yillik_aidat_tutari: float):
-        """Tüm aktif üyeler için aidat kaydı oluştur"""
-        self.db.cursor.execute("SELECT uye_id FROM uyeler WHERE durum = 'Aktif'")
+    def toplu_aidat_olustur(self, yil: int, yillik_aidat_tutari: float) -> Dict:
+        """
+        Tüm aktif üyeler için aidat kaydı oluştur (tek işlem, toplu INSERT)
+        Üyenin özel aidat tutarı varsa o, yoksa yillik_aidat_tutari kullanılır;
+        aidat indirimi yüzdesi uygulanır. Mevcut kayıtlar atlanır.
+
+        Returns: {'olusturulan': int, 'atlanan': int}
+        """
+        self.db.cursor.execute("""
+            SELECT uye_id, ozel_aidat_tutari, aidat_indirimi_yuzde
+            FROM uyeler WHERE durum = 'Aktif'
+        """)
         uyeler = self.db.cursor.fetchall()
-        
-        olusturulan = 0
+
+        if self.online_mode:
+            olusturulan = 0
+            for uye in uyeler:
+                if self.aidat_kaydi_olustur(uye['uye_id'], yil, self._uye_aidat_tutari(uye, yillik_aidat_tutari)) > 0:
+                    olusturulan += 1
+            return {'olusturulan': olusturulan, 'atlanan': len(uyeler) - olusturulan}
+
+        kayitlar = []
         for uye in uyeler:
-            try:
-                self.aidat_kaydi_olustur(uye['uye_id'], yil, yillik_aidat_tutari)
-                olusturulan += 1
-            except:
-                pass  # Zaten varsa atla
-                
-        return olusturulan
+            tutar = self._uye_aidat_tutari(uye, yillik_aidat_tutari)
+            kayitlar.append((uye['uye_id'], yil, tutar, tutar))
+
+        with self.db.transaction() as cur:
+            cur.executemany("""
+                INSERT INTO aidat_takip (uye_id, yil, yillik_aidat_tutari, odenecek_tutar)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(uye_id, yil) DO NOTHING
+            """, kayitlar)
+            olusturulan = max(cur.rowcount, 0)
+            atlanan = len(kayitlar) - olusturulan
+            self.db.log_islem("Sistem", "TOPLU_EKLE", "aidat_takip", 0,
+                              f"{yil} yılı toplu aidat: {olusturulan} kayıt oluşturuldu, {atlanan} mevcut kayıt atlandı")
+
+        return {'olusturulan': olusturulan, 'atlanan': atlanan}
+
+    @staticmethod
+    def _uye_aidat_tutari(uye, varsayilan_tutar: float) -> float:
+        """Üyenin yıllık aidatı: özel tutar (yoksa varsayılan) - indirim yüzdesi"""
+        tutar = uye['ozel_aidat_tutari'] or varsayilan_tutar
+        indirim = uye['aidat_indirimi_yuzde'] or 0
+        return round(tutar * (1 - indirim / 100.0), 2)
     
     def aidat_olustur_veya_getir(self, uye_id: int, yil: int) -> int:
         """Aidat kaydı oluştur veya mevcut kaydı getir"""
@@ -744,34 +920,9 @@ class GelirYoneticisi:
     
     def __init__(self, db: Database):
         self.db = db
-        self.online_mode = get_license_mode() == 'online'
-        if self.online_mode:
-            config = get_api_config()
-            self.api_url = config.get('api_url', '')
-            self.api_key = config.get('api_key', '')
-            self.headers = {'X-API-Key': self.api_key, 'Content-Type': 'application/json'}
+        self.online_mode = db.get_license_mode() == 'online'
+        self.api = db.api_client()
     
-    def _api_request(self, method, endpoint, data=None):
-        """Online API isteği"""
-        try:
-            url = f"{self.api_url}{endpoint}"
-            if method == 'GET':
-                resp = requests.get(url, headers=self.headers, params=data, timeout=10)
-            elif method == 'POST':
-                resp = requests.post(url, headers=self.headers, json=data, timeout=10)
-            elif method == 'PUT':
-                resp = requests.put(url, headers=self.headers, json=data, timeout=10)
-            elif method == 'DELETE':
-                resp = requests.delete(url, headers=self.headers, timeout=10)
-            else:
-                return None
-            if resp.status_code in [200, 201]:
-                return resp.json()
-            return None
-        except Exception as e:
-            print(f"API Hatası: {e}")
-            return None
-        
     def gelir_ekle(self, tarih: str, gelir_turu: str, aciklama: str, 
                    tutar: float, kasa_id: int, tahsil_eden: str = "", 
                    notlar: str = "", aidat_id: Optional[int] = None,
@@ -793,23 +944,23 @@ class GelirYoneticisi:
                 'coklu_odeme_grup_id': coklu_odeme_grup_id, 'alt_kategori': alt_kategori
             }
             data = {k: v for k, v in data.items() if v is not None and v != ''}
-            result = self._api_request('POST', '/db/gelirler', data)
+            result = self.api.request('POST', '/db/gelirler', data)
             if result and result.get('gelir_id'):
                 return result.get('gelir_id', 0)
             # API başarısız - offline'a devam et
         
-        belge_no = self.db.get_next_belge_no()
-        
-        self.db.cursor.execute("""
-            INSERT INTO gelirler 
-            (tarih, belge_no, gelir_turu, aciklama, tutar, kasa_id, tahsil_eden, notlar, aidat_id, dekont_no,
-             ait_oldugu_yil, tahakkuk_durumu, coklu_odeme_grup_id, alt_kategori)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (tarih, belge_no, gelir_turu, aciklama, tutar, kasa_id, tahsil_eden, notlar, aidat_id, dekont_no,
-              ait_oldugu_yil, tahakkuk_durumu, coklu_odeme_grup_id, alt_kategori))
-        self.db.commit()
-        
-        gelir_id = self.db.cursor.lastrowid
+        # Numara ve kayıt aynı işlemde: ekleme başarısızsa numara da geri alınır
+        with self.db.transaction() as cur:
+            belge_no = self.db.get_next_belge_no()
+
+            cur.execute("""
+                INSERT INTO gelirler 
+                (tarih, belge_no, gelir_turu, aciklama, tutar, kasa_id, tahsil_eden, notlar, aidat_id, dekont_no,
+                 ait_oldugu_yil, tahakkuk_durumu, coklu_odeme_grup_id, alt_kategori)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (tarih, belge_no, gelir_turu, aciklama, tutar, kasa_id, tahsil_eden, notlar, aidat_id, dekont_no,
+                  ait_oldugu_yil, tahakkuk_durumu, coklu_odeme_grup_id, alt_kategori))
+            gelir_id = cur.lastrowid
         
         # Tahakkuk kaydı (eğer peşin ödeme ise)
         if tahakkuk_durumu == 'PEŞİN':
@@ -830,7 +981,7 @@ class GelirYoneticisi:
                 'tutar': tutar, 'kasa_id': kasa_id, 'tahsil_eden': tahsil_eden,
                 'notlar': notlar, 'dekont_no': dekont_no, 'alt_kategori': alt_kategori
             }
-            result = self._api_request('PUT', f'/db/gelirler/{gelir_id}', data)
+            result = self.api.request('PUT', f'/db/gelirler/{gelir_id}', data)
             if result and result.get('success'):
                 return
             # API başarısız - offline'a devam et
@@ -848,7 +999,7 @@ class GelirYoneticisi:
     def gelir_sil(self, gelir_id: int):
         """Gelir kaydını sil"""
         if self.online_mode:
-            result = self._api_request('DELETE', f'/db/gelirler/{gelir_id}')
+            result = self.api.request('DELETE', f'/db/gelirler/{gelir_id}')
             if result and result.get('success'):
                 return
             # API başarısız - offline'a devam et
@@ -890,14 +1041,9 @@ class GelirYoneticisi:
                 params['gelir_turu'] = gelir_turu
             if kasa_id:
                 params['kasa_id'] = kasa_id
-            result = self._api_request('GET', '/db/gelirler', params)
-            if result:
-                if isinstance(result, list):
-                    return result
-                elif isinstance(result, dict) and 'gelirler' in result:
-                    return result['gelirler']
-                elif isinstance(result, dict) and 'incomes' in result:
-                    return result['incomes']
+            gelirler = self.api.sayfali_getir('/db/gelirler', params, anahtar='gelirler')
+            if gelirler is not None:
+                return gelirler
             # Online başarısız olursa offline'a düş
             
         query = """
@@ -929,6 +1075,27 @@ class GelirYoneticisi:
         self.db.cursor.execute(query, params)
         return [dict(row) for row in self.db.cursor.fetchall()]
     
+    def gelir_ara(self, arama_metni: str, limit: int = 200) -> List[Dict]:
+        """Gelirlerde ara (açıklama, tür, belge no, tahsil eden, dekont, not)"""
+        sorgu = AramaYoneticisi.fts_sorgusu(arama_metni)
+        if not sorgu:
+            return []
+        if self.online_mode or not self.db.arama_indeksi_var:
+            return AramaYoneticisi.listede_ara(
+                self.gelir_listesi(), arama_metni,
+                ('aciklama', 'gelir_turu', 'belge_no', 'tahsil_eden', 'dekont_no', 'notlar'))[:limit]
+        
+        self.db.cursor.execute(f"""
+            SELECT g.*, k.kasa_adi, k.para_birimi
+            FROM arama_fts
+            JOIN gelirler g ON g.gelir_id = arama_fts.kayit_id
+            JOIN kasalar k ON g.kasa_id = k.kasa_id
+            WHERE arama_fts MATCH ? AND arama_fts.modul = 'gelir'
+            ORDER BY {AramaYoneticisi.SIRALAMA}, g.tarih DESC
+            LIMIT ?
+        """, (sorgu, limit))
+        return [dict(row) for row in self.db.cursor.fetchall()]
+    
     def coklu_yil_gelir_ekle(self, gelir_turu: str, kasa_id: int,
                              baslangic_yil: int, bitis_yil: int,
                              yillik_tutar: float, tahsil_tarihi: str = None,
@@ -936,6 +1103,7 @@ class GelirYoneticisi:
                              tahsil_eden: str = "") -> str:
         """
         Çok yıllık ödeme (örn: 10 yıllık aidat)
+        Offline modda tüm yıllar tek işlemde yazılır (ya hepsi ya hiçbiri).
         
         Returns: odeme_grup_id
         """
@@ -943,95 +1111,152 @@ class GelirYoneticisi:
             tahsil_tarihi = datetime.now().strftime("%Y-%m-%d")
         
         tahsil_yili = int(tahsil_tarihi[:4])
-        odeme_grup_id = f"GRUP_{tahsil_yili}_{self._get_next_grup_no()}"
-        
-        gelir_idler = []
-        
-        for yil in range(baslangic_yil, bitis_yil + 1):
-            # Tahakkuk durumu belirle
-            if yil == tahsil_yili:
-                tahakkuk = 'NORMAL'
-            elif yil < tahsil_yili:
-                tahakkuk = 'GERİYE_DÖNÜK'
-            else:
-                tahakkuk = 'PEŞİN'
-            
-            # Gelir kaydı
-            gelir_id = self.gelir_ekle(
-                tarih=tahsil_tarihi,
-                gelir_turu=gelir_turu,
-                aciklama=f"{aciklama} ({yil} yılı)",
-                tutar=yillik_tutar,
-                kasa_id=kasa_id,
-                tahsil_eden=tahsil_eden,
-                ait_oldugu_yil=yil,
-                tahakkuk_durumu=tahakkuk,
-                coklu_odeme_grup_id=odeme_grup_id
-            )
-            
-            gelir_idler.append((yil, gelir_id))
-        
-        # Aidat bağlantısı (eğer üye ve aidat ise)
-        if uye_id and gelir_turu == 'AİDAT':
-            self._aidat_odemesi_bagla(uye_id, baslangic_yil, bitis_yil,
-                                     yillik_tutar, odeme_grup_id, gelir_idler, 
-                                     tahsil_tarihi, kasa_id)
+        yillar = list(range(baslangic_yil, bitis_yil + 1))
         
-        self.db.log_islem("Sistem", "EKLE", "gelirler", 0, 
-                         f"Çok yıllık gelir eklendi: {baslangic_yil}-{bitis_yil} ({bitis_yil-baslangic_yil+1} yıl)")
+        if self.online_mode:
+            odeme_grup_id = f"GRUP_{tahsil_yili}_{self._get_next_grup_no(tahsil_yili)}"
+            for yil in yillar:
+                self.gelir_ekle(
+                    tarih=tahsil_tarihi,
+                    gelir_turu=gelir_turu,
+                    aciklama=f"{aciklama} ({yil} yılı)",
+                    tutar=yillik_tutar,
+                    kasa_id=kasa_id,
+                    tahsil_eden=tahsil_eden,
+                    ait_oldugu_yil=yil,
+                    tahakkuk_durumu=self._tahakkuk_durumu(yil, tahsil_yili),
+                    coklu_odeme_grup_id=odeme_grup_id
+                )
+            return odeme_grup_id
+        
+        with self.db.transaction() as cur:
+            odeme_grup_id = f"GRUP_{tahsil_yili}_{self._get_next_grup_no(tahsil_yili)}"
+            belge_nolari = self.db.get_next_belge_nolari(len(yillar))
+            
+            cur.executemany("""
+                INSERT INTO gelirler 
+                (tarih, belge_no, gelir_turu, aciklama, tutar, kasa_id, tahsil_eden,
+                 ait_oldugu_yil, tahakkuk_durumu, coklu_odeme_grup_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, [(tahsil_tarihi, belge_no, gelir_turu, f"{aciklama} ({yil} yılı)", yillik_tutar,
+                   kasa_id, tahsil_eden, yil, self._tahakkuk_durumu(yil, tahsil_yili), odeme_grup_id)
+                  for yil, belge_no in zip(yillar, belge_nolari)])
+            
+            cur.execute("""
+                SELECT ait_oldugu_yil, gelir_id FROM gelirler
+                WHERE coklu_odeme_grup_id = ?
+            """, (odeme_grup_id,))
+            gelir_idler = [(row['ait_oldugu_yil'], row['gelir_id']) for row in cur.fetchall()]
+            
+            # Peşin tahsil edilen yıllar için tahakkuk
+            cur.executemany("""
+                INSERT INTO tahakkuklar (yil, tahakkuk_tipi, aciklama, tutar, kasa_id, ilgili_kayit_id)
+                VALUES (?, 'GELIR', ?, ?, ?, ?)
+            """, [(yil, f"Peşin tahsilat: {aciklama} ({yil} yılı)", yillik_tutar, kasa_id, gelir_id)
+                  for yil, gelir_id in gelir_idler if yil > tahsil_yili])
+            
+            # Aidat bağlantısı (eğer üye ve aidat ise)
+            if uye_id and gelir_turu == 'AİDAT':
+                self._aidat_odemesi_bagla(uye_id, baslangic_yil, bitis_yil,
+                                         yillik_tutar, odeme_grup_id, gelir_idler, 
+                                         tahsil_tarihi, kasa_id)
+            
+            self.db.log_islem("Sistem", "EKLE", "gelirler", 0, 
+                             f"Çok yıllık gelir eklendi: {odeme_grup_id} {baslangic_yil}-{bitis_yil} "
+                             f"({len(yillar)} yıl)")
         
         return odeme_grup_id
     
-    def _get_next_grup_no(self) -> int:
-        """Sonraki grup numarasını al"""
-        yil = datetime.now().year
-        self.db.cursor.execute("""
-            SELECT COUNT(*) as adet FROM gelirler
-            WHERE coklu_odeme_grup_id LIKE ?
-        """, (f"GRUP_{yil}_%",))
-        result = self.db.cursor.fetchone()
-        return (result['adet'] if result else 0) + 1
+    @staticmethod
+    def _tahakkuk_durumu(yil: int, tahsil_yili: int) -> str:
+        """Ait olunan yıla göre tahakkuk durumu"""
+        if yil == tahsil_yili:
+            return 'NORMAL'
+        elif yil < tahsil_yili:
+            return 'GERİYE_DÖNÜK'
+        return 'PEŞİN'
+    
+    def _get_next_grup_no(self, yil: Optional[int] = None) -> int:
+        """Sonraki grup numarasını al (yıl başına sıra)"""
+        if yil is None:
+            yil = datetime.now().year
+        return self.db.sonraki_sira_no('GRUP', yil)
     
     def _aidat_odemesi_bagla(self, uye_id, baslangic_yil, bitis_yil,
                             yillik_tutar, odeme_grup_id, gelir_idler, 
                             tahsil_tarihi, kasa_id):
-        """Aidat sistemine çok yıllık ödemeyi bağla"""
-        from models import AidatYoneticisi
-        aidat_yoneticisi = AidatYoneticisi(self.db)
-        
-        # Ana ödeme kaydı
-        toplam_tutar = yillik_tutar * (bitis_yil - baslangic_yil + 1)
-        self.db.cursor.execute("""
-            INSERT INTO aidat_odemeleri
-            (odeme_grup_id, tarih, toplam_tutar, kasa_id)
+        """
+        Aidat sistemine çok yıllık ödemeyi bağla (çağıranın işlemi içinde, toplu)
+        Her yıl için aidat kaydı + ödeme + detay yazılır, durumlar tek seferde güncellenir.
+        Gelir kayıtları zaten oluşturulduğu için her yıl (kısmi ödenenler dahil) bu gelirlere
+        bağlanır ve Aktarıldı işaretlenir; sonraki senkron aynı para için ikinci gelir açmaz.
+        """
+        cur = self.db.cursor
+        yillar = [yil for yil, _ in gelir_idler]
+        
+        # Eksik aidat kayıtları (özel tutar yoksa ayardaki varsayılan)
+        cur.execute("SELECT ozel_aidat_tutari FROM uyeler WHERE uye_id = ?", (uye_id,))
+        uye = cur.fetchone()
+        cur.execute("SELECT ayar_degeri FROM ayarlar WHERE ayar_adi = 'yillik_aidat_tutari'")
+        ayar = cur.fetchone()
+        varsayilan_tutar = float(ayar['ayar_degeri']) if ayar and ayar['ayar_degeri'] else 100.0
+        aidat_tutari = uye['ozel_aidat_tutari'] if uye and uye['ozel_aidat_tutari'] else varsayilan_tutar
+        cur.executemany("""
+            INSERT INTO aidat_takip (uye_id, yil, yillik_aidat_tutari, odenecek_tutar)
             VALUES (?, ?, ?, ?)
-        """, (odeme_grup_id, tahsil_tarihi, toplam_tutar, kasa_id))
-        
-        # Her yıl için detay
-        for yil, gelir_id in gelir_idler:
-            # Aidat kaydı oluştur/bul
-            aidat_id = aidat_yoneticisi.aidat_olustur_veya_getir(uye_id, yil)
-            
-            # Detay kaydı
-            self.db.cursor.execute("""
-                INSERT INTO aidat_odeme_detay
-                (odeme_grup_id, aidat_id, tutar, gelir_id)
-                VALUES (?, ?, ?, ?)
-            """, (odeme_grup_id, aidat_id, yillik_tutar, gelir_id))
-            
-            # Aidat durumunu güncelle
-            aidat_yoneticisi._aidat_durumunu_guncelle(aidat_id)
-        
-        self.db.commit()
+            ON CONFLICT(uye_id, yil) DO NOTHING
+        """, [(uye_id, yil, aidat_tutari, aidat_tutari) for yil in yillar])
+        
+        cur.execute("""
+            SELECT yil, aidat_id FROM aidat_takip
+            WHERE uye_id = ? AND yil BETWEEN ? AND ?
+        """, (uye_id, baslangic_yil, bitis_yil))
+        aidat_idler = {row['yil']: row['aidat_id'] for row in cur.fetchall()}
+        
+        # Yıl başına ödeme; detaylar bu işlemde eklenen ödemelerden türetilir
+        cur.execute("SELECT COALESCE(MAX(odeme_id), 0) FROM aidat_odemeleri")
+        son_odeme_id = cur.fetchone()[0]
+        cur.executemany("""
+            INSERT INTO aidat_odemeleri (aidat_id, tarih, tutar, aciklama)
+            VALUES (?, ?, ?, ?)
+        """, [(aidat_idler[yil], tahsil_tarihi, yillik_tutar, f"Çok yıllık ödeme {odeme_grup_id}")
+              for yil in yillar])
+        cur.execute("""
+            INSERT INTO aidat_odeme_detay (odeme_id, yil, tutar)
+            SELECT o.odeme_id, a.yil, o.tutar
+            FROM aidat_odemeleri o
+            JOIN aidat_takip a ON a.aidat_id = o.aidat_id
+            WHERE o.odeme_id > ?
+        """, (son_odeme_id,))
+        
+        cur.executemany("UPDATE gelirler SET aidat_id = ? WHERE gelir_id = ?",
+                        [(aidat_idler[yil], gelir_id) for yil, gelir_id in gelir_idler])
+        
+        # Durum güncellemesi (_aidat_durumunu_guncelle ile aynı kurallar, küme bazlı)
+        aidat_id_listesi = list(aidat_idler.values())
+        yer = ','.join('?' * len(aidat_id_listesi))
+        cur.execute(f"""
+            UPDATE aidat_takip
+            SET odenecek_tutar = yillik_aidat_tutari - toplam_odenen,
+                durum = CASE WHEN toplam_odenen >= yillik_aidat_tutari THEN 'Tamamlandı'
+                             ELSE 'Kısmi' END,
+                guncelleme_tarihi = CURRENT_TIMESTAMP
+            WHERE aidat_id IN ({yer})
+        """, aidat_id_listesi)
+        cur.executemany("""
+            UPDATE aidat_takip
+            SET aktarim_durumu = 'Aktarıldı', gelir_id = ?
+            WHERE aidat_id = ? AND aktarim_durumu != 'Aktarıldı'
+        """, [(gelir_id, aidat_idler[yil]) for yil, gelir_id in gelir_idler])
     
     def _tahakkuk_kaydet(self, tahakkuk_turu: str, kaynak_id: int,
                         tahsil_yili: int, ait_oldugu_yil: int, tutar: float):
-        """Tahakkuk kaydı oluştur"""
+        """Tahakkuk kaydı oluştur (peşin tahsil edilen gelir)"""
         self.db.cursor.execute("""
-            INSERT INTO tahakkuklar
-            (tahakkuk_turu, kaynak_tablo, kaynak_id, tahsil_yili, ait_oldugu_yil, tutar, durum)
-            VALUES (?, 'gelirler', ?, ?, ?, ?, 'AKTİF')
-        """, (tahakkuk_turu, kaynak_id, tahsil_yili, ait_oldugu_yil, tutar))
+            INSERT INTO tahakkuklar (yil, tahakkuk_tipi, aciklama, tutar, kasa_id, ilgili_kayit_id)
+            SELECT ?, 'GELIR', ?, tutar, kasa_id, gelir_id FROM gelirler WHERE gelir_id = ?
+        """, (ait_oldugu_yil, f"Peşin tahsilat ({tahsil_yili}): {tahakkuk_turu}", kaynak_id))
+        self.db.commit()
     
     def gelir_alt_kategorileri(self, tur_adi: str) -> List[str]:
         """Gelir türüne göre alt kategorileri getir"""
@@ -1053,37 +1278,9 @@ class GiderYoneticisi:
     
     def __init__(self, db: Database):
         self.db = db
-        self.online_mode = get_license_mode() == 'online'
-        if self.online_mode:
-            config = get_api_config()
-            self.api_url = config.get('api_url', '')
-            self.api_key = config.get('api_key', '')
-            self.headers = {'X-API-Key': self.api_key, 'Content-Type': 'application/json'}
-    
-    def _api_request(self, method: str, endpoint: str, data: dict = None) -> Optional[dict]:
-        """API isteği gönder"""
-        if not self.online_mode:
-            return None
-        try:
-            import requests
-            url = f"{self.api_url}{endpoint}"
-            if method == 'GET':
-                response = requests.get(url, headers=self.headers, params=data, timeout=10)
-            elif method == 'POST':
-                response = requests.post(url, headers=self.headers, json=data, timeout=10)
-            elif method == 'PUT':
-                response = requests.put(url, headers=self.headers, json=data, timeout=10)
-            elif method == 'DELETE':
-                response = requests.delete(url, headers=self.headers, timeout=10)
-            else:
-                return None
-            if response.status_code in [200, 201]:
-                return response.json()
-            return None
-        except Exception as e:
-            print(f"API Error: {e}")
-            return None
-        
+        self.online_mode = db.get_license_mode() == 'online'
+        self.api = db.api_client()
+    
     def gider_ekle(self, tarih: str, gider_turu: str, aciklama: str, 
                    tutar: float, kasa_id: int, odeyen: str = "", notlar: str = "",
                    ait_oldugu_yil: Optional[int] = None, tahakkuk_durumu: str = 'NORMAL',
@@ -1106,21 +1303,21 @@ class GiderYoneticisi:
                 'tahakkuk_durumu': tahakkuk_durumu,
                 'alt_kategori': alt_kategori
             }
-            result = self._api_request('POST', '/db/giderler', data)
+            result = self.api.request('POST', '/db/giderler', data)
             if result and result.get('gider_id'):
                 return result.get('gider_id', 0)
             # API başarısız - offline'a devam et
         
-        islem_no = self.db.get_next_islem_no()
-        self.db.cursor.execute("""
-            INSERT INTO giderler 
-            (tarih, islem_no, gider_turu, aciklama, tutar, kasa_id, odeyen, notlar,
-             ait_oldugu_yil, tahakkuk_durumu, alt_kategori)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (tarih, islem_no, gider_turu, aciklama, tutar, kasa_id, odeyen, notlar, ait_oldugu_yil, tahakkuk_durumu, alt_kategori))
-        self.db.commit()
-        
-        gider_id = self.db.cursor.lastrowid
+        # Numara ve kayıt aynı işlemde: ekleme başarısızsa numara da geri alınır
+        with self.db.transaction() as cur:
+            islem_no = self.db.get_next_islem_no()
+            cur.execute("""
+                INSERT INTO giderler 
+                (tarih, islem_no, gider_turu, aciklama, tutar, kasa_id, odeyen, notlar,
+                 ait_oldugu_yil, tahakkuk_durumu, alt_kategori)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (tarih, islem_no, gider_turu, aciklama, tutar, kasa_id, odeyen, notlar, ait_oldugu_yil, tahakkuk_durumu, alt_kategori))
+            gider_id = cur.lastrowid
         self.db.log_islem("Sistem", "EKLE", "giderler", gider_id, 
                          f"Gider eklendi: {gider_turu} - {tutar} TL")
         return gider_id
@@ -1140,7 +1337,7 @@ class GiderYoneticisi:
                 'notlar': notlar,
                 'alt_kategori': alt_kategori
             }
-            result = self._api_request('PUT', f'/db/giderler/{gider_id}', data)
+            result = self.api.request('PUT', f'/db/giderler/{gider_id}', data)
             if result and result.get('success'):
                 return
             # API başarısız - offline'a devam et
@@ -1158,7 +1355,7 @@ class GiderYoneticisi:
     def gider_sil(self, gider_id: int):
         """Gider kaydını sil"""
         if self.online_mode:
-            result = self._api_request('DELETE', f'/db/giderler/{gider_id}')
+            result = self.api.request('DELETE', f'/db/giderler/{gider_id}')
             if result and result.get('success'):
                 return
             # API başarısız - offline'a devam et
@@ -1190,14 +1387,9 @@ class GiderYoneticisi:
                 params['gider_turu'] = gider_turu
             if kasa_id:
                 params['kasa_id'] = kasa_id
-            result = self._api_request('GET', '/db/giderler', params)
-            if result:
-                if isinstance(result, list):
-                    return result
-                elif isinstance(result, dict) and 'giderler' in result:
-                    return result['giderler']
-                elif isinstance(result, dict) and 'expenses' in result:
-                    return result['expenses']
+            giderler = self.api.sayfali_getir('/db/giderler', params, anahtar='giderler')
+            if giderler is not None:
+                return giderler
             # Online başarısız olursa offline'a düş
             
         query = """
@@ -1228,6 +1420,27 @@ class GiderYoneticisi:
         
         self.db.cursor.execute(query, params)
         return [dict(row) for row in self.db.cursor.fetchall()]
+    
+    def gider_ara(self, arama_metni: str, limit: int = 200) -> List[Dict]:
+        """Giderlerde ara (açıklama, tür, işlem no, ödeyen, not)"""
+        sorgu = AramaYoneticisi.fts_sorgusu(arama_metni)
+        if not sorgu:
+            return []
+        if self.online_mode or not self.db.arama_indeksi_var:
+            return AramaYoneticisi.listede_ara(
+                self.gider_listesi(), arama_metni,
+                ('aciklama', 'gider_turu', 'islem_no', 'odeyen', 'notlar'))[:limit]
+        
+        self.db.cursor.execute(f"""
+            SELECT g.*, k.kasa_adi, k.para_birimi
+            FROM arama_fts
+            JOIN giderler g ON g.gider_id = arama_fts.kayit_id
+            JOIN kasalar k ON g.kasa_id = k.kasa_id
+            WHERE arama_fts MATCH ? AND arama_fts.modul = 'gider'
+            ORDER BY {AramaYoneticisi.SIRALAMA}, g.tarih DESC
+            LIMIT ?
+        """, (sorgu, limit))
+        return [dict(row) for row in self.db.cursor.fetchall()]
         
     def gider_turleri_listesi(self) -> List[str]:
         """Gider türlerini getir"""
@@ -1264,37 +1477,9 @@ class VirmanYoneticisi:
     
     def __init__(self, db: Database):
         self.db = db
-        self.online_mode = get_license_mode() == 'online'
-        if self.online_mode:
-            config = get_api_config()
-            self.api_url = config.get('api_url', '')
-            self.api_key = config.get('api_key', '')
-            self.headers = {'X-API-Key': self.api_key, 'Content-Type': 'application/json'}
-    
-    def _api_request(self, method: str, endpoint: str, data: dict = None) -> Optional[dict]:
-        """API isteği gönder"""
-        if not self.online_mode:
-            return None
-        try:
-            import requests
-            url = f"{self.api_url}{endpoint}"
-            if method == 'GET':
-                response = requests.get(url, headers=self.headers, params=data, timeout=10)
-            elif method == 'POST':
-                response = requests.post(url, headers=self.headers, json=data, timeout=10)
-            elif method == 'PUT':
-                response = requests.put(url, headers=self.headers, json=data, timeout=10)
-            elif method == 'DELETE':
-                response = requests.delete(url, headers=self.headers, timeout=10)
-            else:
-                return None
-            if response.status_code in [200, 201]:
-                return response.json()
-            return None
-        except Exception as e:
-            print(f"API Error: {e}")
-            return None
-        
+        self.online_mode = db.get_license_mode() == 'online'
+        self.api = db.api_client()
+    
     def virman_ekle(self, tarih: str, gonderen_kasa_id: int, alan_kasa_id: int, 
                     tutar: float, aciklama: str = "") -> int:
         """Kasalar arası transfer yap"""
@@ -1309,7 +1494,7 @@ class VirmanYoneticisi:
                 'tutar': tutar,
                 'aciklama': aciklama
             }
-            result = self._api_request('POST', '/db/virmanlar', data)
+            result = self.api.request('POST', '/db/virmanlar', data)
             if result and result.get('virman_id'):
                 return result.get('virman_id', 0)
             # API başarısız - offline'a devam et
@@ -1328,7 +1513,7 @@ class VirmanYoneticisi:
     def virman_sil(self, virman_id: int):
         """Virman işlemini sil"""
         if self.online_mode:
-            result = self._api_request('DELETE', f'/db/virmanlar/{virman_id}')
+            result = self.api.request('DELETE', f'/db/virmanlar/{virman_id}')
             if result and result.get('success'):
                 return
             # API başarısız - offline'a devam et
@@ -1351,7 +1536,7 @@ class VirmanYoneticisi:
                 params['baslangic_tarih'] = baslangic_tarih
             if bitis_tarih:
                 params['bitis_tarih'] = bitis_tarih
-            result = self._api_request('GET', '/db/virmanlar', params)
+            result = self.api.request('GET', '/db/virmanlar', params)
             if result:
                 if isinstance(result, list):
                     return result
@@ -1389,37 +1574,9 @@ class KasaYoneticisi:
     
     def __init__(self, db: Database):
         self.db = db
-        self.online_mode = get_license_mode() == 'online'
-        if self.online_mode:
-            config = get_api_config()
-            self.api_url = config.get('api_url', '')
-            self.api_key = config.get('api_key', '')
-            self.headers = {'X-API-Key': self.api_key, 'Content-Type': 'application/json'}
-    
-    def _api_request(self, method: str, endpoint: str, data: dict = None) -> Optional[dict]:
-        """API isteği gönder"""
-        if not self.online_mode:
-            return None
-        try:
-            import requests
-            url = f"{self.api_url}{endpoint}"
-            if method == 'GET':
-                response = requests.get(url, headers=self.headers, params=data, timeout=10)
-            elif method == 'POST':
-                response = requests.post(url, headers=self.headers, json=data, timeout=10)
-            elif method == 'PUT':
-                response = requests.put(url, headers=self.headers, json=data, timeout=10)
-            elif method == 'DELETE':
-                response = requests.delete(url, headers=self.headers, timeout=10)
-            else:
-                return None
-            if response.status_code in [200, 201]:
-                return response.json()
-            return None
-        except Exception as e:
-            print(f"API Error: {e}")
-            return None
-        
+        self.online_mode = db.get_license_mode() == 'online'
+        self.api = db.api_client()
+    
     def kasa_ekle(self, kasa_adi: str, para_birimi: str = "TL", 
                   devir_bakiye: float = 0, aciklama: str = "") -> int:
         """Yeni kasa ekle"""
@@ -1430,7 +1587,7 @@ class KasaYoneticisi:
                 'devir_bakiye': devir_bakiye,
                 'aciklama': aciklama
             }
-            result = self._api_request('POST', '/db/kasalar', data)
+            result = self.api.request('POST', '/db/kasalar', data)
             if result and result.get('kasa_id'):
                 return result.get('kasa_id', -1)
             # API başarısız - offline'a devam et
@@ -1458,7 +1615,7 @@ class KasaYoneticisi:
                 'devir_bakiye': devir_bakiye,
                 'aciklama': aciklama
             }
-            result = self._api_request('PUT', f'/db/kasalar/{kasa_id}', data)
+            result = self.api.request('PUT', f'/db/kasalar/{kasa_id}', data)
             if result and result.get('success'):
                 return
             # API başarısız - offline'a devam et
@@ -1474,7 +1631,7 @@ class KasaYoneticisi:
     def kasa_listesi(self) -> List[Dict]:
         """Tüm kasaları listele"""
         if self.online_mode:
-            result = self._api_request('GET', '/db/kasalar')
+            result = self.api.request('GET', '/db/kasalar')
             # API sonucu liste ise direkt döndür, dict ise içinden listeyi çıkar
             if result:
                 if isinstance(result, list):
@@ -1491,6 +1648,11 @@ class KasaYoneticisi:
     def kasa_bakiye_hesapla(self, kasa_id: int, baslangic_tarih: Optional[str] = None,
                            bitis_tarih: Optional[str] = None) -> Dict:
         """Bir kasanın bakiyesini hesapla"""
+        # Tarih filtresi yoksa güncel bakiye defterden tek okumayla gelir
+        if not baslangic_tarih and not bitis_tarih:
+            sonuc = self._defter_bakiyeleri(kasa_id)
+            return sonuc[0] if sonuc else {}
+
         # Kasa bilgileri
         self.db.cursor.execute("SELECT * FROM kasalar WHERE kasa_id = ?", (kasa_id,))
         kasa = self.db.cursor.fetchone()
@@ -1499,66 +1661,22 @@ class KasaYoneticisi:
             return {}
             
         devir = kasa['devir_bakiye']
-        
-        # Gelirler
-        query_gelir = "SELECT COALESCE(SUM(tutar), 0) as toplam FROM gelirler WHERE kasa_id = ?"
-        params_gelir = [kasa_id]
-        
-        if baslangic_tarih:
-            query_gelir += " AND tarih >= ?"
-            params_gelir.append(baslangic_tarih)
-            
-        if bitis_tarih:
-            query_gelir += " AND tarih <= ?"
-            params_gelir.append(bitis_tarih)
-            
-        self.db.cursor.execute(query_gelir, params_gelir)
-        toplam_gelir = self.db.cursor.fetchone()['toplam']
-        
-        # Giderler
-        query_gider = "SELECT COALESCE(SUM(tutar), 0) as toplam FROM giderler WHERE kasa_id = ?"
-        params_gider = [kasa_id]
-        
-        if baslangic_tarih:
-            query_gider += " AND tarih >= ?"
-            params_gider.append(baslangic_tarih)
-            
-        if bitis_tarih:
-            query_gider += " AND tarih <= ?"
-            params_gider.append(bitis_tarih)
-            
-        self.db.cursor.execute(query_gider, params_gider)
-        toplam_gider = self.db.cursor.fetchone()['toplam']
-        
-        # Virman giden
-        query_virman_giden = "SELECT COALESCE(SUM(tutar), 0) as toplam FROM virmanlar WHERE gonderen_kasa_id = ?"
-        params_virman_giden = [kasa_id]
-        
-        if baslangic_tarih:
-            query_virman_giden += " AND tarih >= ?"
-            params_virman_giden.append(baslangic_tarih)
-            
+
+        # Tarihli toplamlar = kümülatif(bitiş) - kümülatif(başlangıç öncesi)
         if bitis_tarih:
-            query_virman_giden += " AND tarih <= ?"
-            params_virman_giden.append(bitis_tarih)
-            
-        self.db.cursor.execute(query_virman_giden, params_virman_giden)
-        virman_giden = self.db.cursor.fetchone()['toplam']
-        
-        # Virman gelen
-        query_virman_gelen = "SELECT COALESCE(SUM(tutar), 0) as toplam FROM virmanlar WHERE alan_kasa_id = ?"
-        params_virman_gelen = [kasa_id]
-        
+            toplamlar = self._kumulatif_toplamlar(kasa_id, bitis_tarih)
+        else:
+            toplamlar = dict(self._defter_bakiyeleri(kasa_id)[0])
+
         if baslangic_tarih:
-            query_virman_gelen += " AND tarih >= ?"
-            params_virman_gelen.append(baslangic_tarih)
-            
-        if bitis_tarih:
-            query_virman_gelen += " AND tarih <= ?"
-            params_virman_gelen.append(bitis_tarih)
-            
-        self.db.cursor.execute(query_virman_gelen, params_virman_gelen)
-        virman_gelen = self.db.cursor.fetchone()['toplam']
+            onceki = self._kumulatif_toplamlar(kasa_id, baslangic_tarih, dahil=False)
+            for alan in self._BAKIYE_ALANLARI:
+                toplamlar[alan] -= onceki[alan]
+
+        toplam_gelir = toplamlar['toplam_gelir']
+        toplam_gider = toplamlar['toplam_gider']
+        virman_giden = toplamlar['virman_giden']
+        virman_gelen = toplamlar['virman_gelen']
         
         # Net bakiye
         net_bakiye = devir + toplam_gelir - toplam_gider - virman_giden + virman_gelen
@@ -1574,19 +1692,272 @@ class KasaYoneticisi:
             'virman_gelen': virman_gelen,
             'net_bakiye': net_bakiye
         }
+
+    _BAKIYE_ALANLARI = ('toplam_gelir', 'toplam_gider', 'virman_giden', 'virman_gelen')
+
+    def _kumulatif_toplamlar(self, kasa_id: int, tarih: str, dahil: bool = True) -> Dict:
+        """
+        Kasanın başlangıçtan verilen tarihe kadarki toplamları
+        Önceki ayın kümülatif özeti + o aydan sonraki hareketlerin delta taraması.
+        Salt okumadır; özetler bakım adımında üretilir (db.kasa_bakiye_ozetlerini_olustur).
+
+        dahil=False: tarih günü hariç (tarih < ?)
+        """
+        donem = tarih[:7]
+        self.db.cursor.execute("""
+            SELECT * FROM kasa_bakiye_ozet
+            WHERE kasa_id = ? AND donem < ?
+            ORDER BY donem DESC LIMIT 1
+        """, (kasa_id, donem))
+        ozet = self.db.cursor.fetchone()
+
+        if ozet:
+            toplamlar = {alan: ozet[alan] for alan in self._BAKIYE_ALANLARI}
+            yil, ay = int(ozet['donem'][:4]), int(ozet['donem'][5:7])
+            yil, ay = (yil + 1, 1) if ay == 12 else (yil, ay + 1)
+            alt_sinir = f"{yil:04d}-{ay:02d}-01"
+        else:
+            toplamlar = {alan: 0 for alan in self._BAKIYE_ALANLARI}
+            alt_sinir = ''
+
+        ust_op = '<=' if dahil else '<'
+        kosul = f"tarih >= ? AND tarih {ust_op} ?"
+        self.db.cursor.execute(f"""
+            SELECT SUM(gelir) as toplam_gelir, SUM(gider) as toplam_gider,
+                   SUM(giden) as virman_giden, SUM(gelen) as virman_gelen
+            FROM (
+                SELECT tutar as gelir, 0 as gider, 0 as giden, 0 as gelen
+                FROM gelirler WHERE kasa_id = ? AND {kosul}
+                UNION ALL
+                SELECT 0, tutar, 0, 0 FROM giderler WHERE kasa_id = ? AND {kosul}
+                UNION ALL
+                SELECT 0, 0, tutar, 0 FROM virmanlar WHERE gonderen_kasa_id = ? AND {kosul}
+                UNION ALL
+                SELECT 0, 0, 0, tutar FROM virmanlar WHERE alan_kasa_id = ? AND {kosul}
+            )
+        """, (kasa_id, alt_sinir, tarih) * 4)
+
+        delta = self.db.cursor.fetchone()
+        for alan in self._BAKIYE_ALANLARI:
+            toplamlar[alan] += delta[alan] or 0
+
+        return toplamlar
         
     def tum_kasalar_ozet(self, baslangic_tarih: Optional[str] = None,
                         bitis_tarih: Optional[str] = None) -> List[Dict]:
         """Tüm kasaların özetini getir"""
+        if not self.online_mode and not baslangic_tarih and not bitis_tarih:
+            return self._defter_bakiyeleri()
+
         kasalar = self.kasa_listesi()
         ozet = []
         
         for kasa in kasalar:
             bakiye = self.kasa_bakiye_hesapla(kasa['kasa_id'], baslangic_tarih, bitis_tarih)
             ozet.append(bakiye)
-            
+
         return ozet
-    
+
+    def _defter_bakiyeleri(self, kasa_id: Optional[int] = None) -> List[Dict]:
+        """Güncel bakiyeleri kasa_bakiye defterinden oku (tek sorgu)"""
+        query = """
+            SELECT k.kasa_id, k.kasa_adi, k.para_birimi,
+                   k.devir_bakiye,
+                   COALESCE(b.toplam_gelir, 0) as toplam_gelir,
+                   COALESCE(b.toplam_gider, 0) as toplam_gider,
+                   COALESCE(b.virman_giden, 0) as virman_giden,
+                   COALESCE(b.virman_gelen, 0) as virman_gelen
+            FROM kasalar k
+            LEFT JOIN kasa_bakiye b ON b.kasa_id = k.kasa_id
+        """
+        if kasa_id is not None:
+            query += " WHERE k.kasa_id = ?"
+            params = (kasa_id,)
+        else:
+            query += " WHERE k.aktif = 1 ORDER BY k.kasa_adi"
+            params = ()
+
+        self.db.cursor.execute(query, params)
+        sonuc = []
+        for row in self.db.cursor.fetchall():
+            bakiye = dict(row)
+            bakiye['net_bakiye'] = (bakiye['devir_bakiye'] + bakiye['toplam_gelir'] - bakiye['toplam_gider']
+                                    - bakiye['virman_giden'] + bakiye['virman_gelen'])
+            sonuc.append(bakiye)
+        return sonuc
+
+    # Hesap hareketleri: (tarih, sira, kayit_id) tüm kaynaklarda tekil ve sıralı anahtardır
+    _HAREKET_KAYNAKLARI = (
+        # sira, tablo, pk, kasa kolonu, tip, tür ifadesi, açıklama ifadesi, yön
+        (1, 'gelirler', 'gelir_id', 'kasa_id', 'GELİR', 'gelir_turu', 'aciklama', '+'),
+        (2, 'giderler', 'gider_id', 'kasa_id', 'GİDER', 'gider_turu', 'aciklama', '-'),
+        (3, 'virmanlar', 'virman_id', 'gonderen_kasa_id', 'VİRMAN', "'Giden'", "COALESCE(aciklama, 'Transfer')", '-'),
+        (4, 'virmanlar', 'virman_id', 'alan_kasa_id', 'VİRMAN', "'Gelen'", "COALESCE(aciklama, 'Transfer')", '+'),
+    )
+
+    def _kasa_bakiyesi(self, kasa_id: int, tarih: Optional[str] = None, dahil: bool = True) -> float:
+        """Kasanın verilen tarihteki bakiyesi (tarih yoksa güncel; dahil=False: o gün hariç)"""
+        if not tarih:
+            bakiye = self._defter_bakiyeleri(kasa_id)
+            return bakiye[0]['net_bakiye'] if bakiye else 0
+        self.db.cursor.execute("SELECT devir_bakiye FROM kasalar WHERE kasa_id = ?", (kasa_id,))
+        kasa = self.db.cursor.fetchone()
+        if not kasa:
+            return 0
+        t = self._kumulatif_toplamlar(kasa_id, tarih, dahil=dahil)
+        return (kasa['devir_bakiye'] + t['toplam_gelir'] - t['toplam_gider']
+                - t['virman_giden'] + t['virman_gelen'])
+
+    def kasa_hareketleri(self, kasa_id: int, baslangic_tarih: Optional[str] = None,
+                         bitis_tarih: Optional[str] = None, imlec: Optional[Dict] = None,
+                         limit: int = 500, yeni_once: bool = True) -> Tuple[List[Dict], Optional[Dict]]:
+        """
+        Kasa hesap hareketleri (gelir, gider, virman) - yürüyen bakiyeli, sayfalı
+        Tek UNION ALL sorgusu; sıralama ve bakiye (pencere fonksiyonu) SQL'de.
+        Sayfalama anahtar tabanlıdır: dönen imleç bir sonraki çağrıya verilir,
+        imleç sayfa sınırındaki bakiyeyi de taşır (önceki satırlar yeniden toplanmaz).
+
+        Returns: (satırlar, sonraki imleç veya None)
+            satır: tarih, tip, tur, aciklama, tutar, yon, kaynak, kayit_id, bakiye
+        """
+        if imlec is None:
+            # İlk sayfa: yeni→eski için dönem sonu, eski→yeni için dönem başı bakiyesi
+            if yeni_once:
+                baz = self._kasa_bakiyesi(kasa_id, bitis_tarih)
+            elif baslangic_tarih:
+                baz = self._kasa_bakiyesi(kasa_id, baslangic_tarih, dahil=False)
+            else:
+                self.db.cursor.execute("SELECT devir_bakiye FROM kasalar WHERE kasa_id = ?", (kasa_id,))
+                kasa = self.db.cursor.fetchone()
+                baz = kasa['devir_bakiye'] if kasa else 0
+        else:
+            baz = imlec['bakiye']
+
+        kosullar, kosul_params = [], []
+        if baslangic_tarih:
+            kosullar.append("tarih >= ?")
+            kosul_params.append(baslangic_tarih)
+        if bitis_tarih:
+            kosullar.append("tarih <= ?")
+            kosul_params.append(bitis_tarih)
+
+        yon_sql = 'DESC' if yeni_once else 'ASC'
+        kollar, params = [], []
+        for sira, tablo, pk, kasa_kolonu, tip, tur, aciklama, yon in self._HAREKET_KAYNAKLARI:
+            kol_kosullari = [f"{kasa_kolonu} = ?"] + kosullar
+            kol_params = [kasa_id] + kosul_params
+            if imlec is not None:
+                # (tarih, sira, kayit_id) imleçten sonra; sira sabit olduğundan kol başına açılır
+                t, s, i = imlec['anahtar']
+                op = '<' if yeni_once else '>'
+                # İlk koşul (kasa, tarih) indeks aralığını daraltır, ikincisi sınır gününü çözer
+                kol_kosullari.append(f"tarih {op}= ? AND (tarih, {sira}, {pk}) {op} (?, ?, ?)")
+                kol_params += [t, t, s, i]
+            isaret = '' if yon == '+' else '-'
+            # Her kol (kasa, tarih) indeksinden sıralı okunur ve kendi LIMIT'inde durur
+            kollar.append(f"""
+                SELECT * FROM (
+                    SELECT tarih, {sira} AS sira, {pk} AS kayit_id, '{tablo}' AS kaynak,
+                           '{tip}' AS tip, {tur} AS tur, {aciklama} AS aciklama,
+                           tutar, '{yon}' AS yon, {isaret}tutar AS net
+                    FROM {tablo} WHERE {' AND '.join(kol_kosullari)}
+                    ORDER BY tarih {yon_sql}, {pk} {yon_sql}
+                    LIMIT ?
+                )""")
+            params += kol_params + [limit]
+
+        sirala = f"tarih {yon_sql}, sira {yon_sql}, kayit_id {yon_sql}"
+        # Yeni→eski: bakiye = baz - (bu satırdan önce gelen daha yeni hareketlerin toplamı)
+        # Eski→yeni: bakiye = baz + (bu satıra kadar olan hareketlerin toplamı)
+        if yeni_once:
+            bakiye_sql = f"? - SUM(net) OVER (ORDER BY {sirala} ROWS UNBOUNDED PRECEDING) + net"
+        else:
+            bakiye_sql = f"? + SUM(net) OVER (ORDER BY {sirala} ROWS UNBOUNDED PRECEDING)"
+
+        self.db.cursor.execute(f"""
+            SELECT tarih, sira, kayit_id, kaynak, tip, tur, aciklama, tutar, yon, net,
+                   {bakiye_sql} AS bakiye
+            FROM (
+                SELECT * FROM ({' UNION ALL '.join(kollar)})
+                ORDER BY {sirala}
+                LIMIT ?
+            )
+            ORDER BY {sirala}
+        """, [baz] + params + [limit])
+        satirlar = [dict(row) for row in self.db.cursor.fetchall()]
+
+        sonraki = None
+        if len(satirlar) == limit:
+            son = satirlar[-1]
+            sonraki = {
+                'anahtar': (son['tarih'], son['sira'], son['kayit_id']),
+                'bakiye': son['bakiye'] - son['net'] if yeni_once else son['bakiye'],
+            }
+        for satir in satirlar:
+            del satir['sira'], satir['net']
+        return satirlar, sonraki
+
+    def kasa_hareketleri_akisi(self, kasa_id: int, baslangic_tarih: Optional[str] = None,
+                               bitis_tarih: Optional[str] = None, yeni_once: bool = True,
+                               sayfa_boyutu: int = 500):
+        """Tüm hareketleri sayfa sayfa okuyan üreteç (tablo görünümü ve ekstre için)"""
+        imlec = None
+        while True:
+            satirlar, imlec = self.kasa_hareketleri(kasa_id, baslangic_tarih, bitis_tarih,
+                                                    imlec, sayfa_boyutu, yeni_once)
+            yield from satirlar
+            if imlec is None:
+                return
+
+    def kasa_bakiye_dogrula(self, duzelt: bool = False) -> List[Dict]:
+        """
+        Bakiye defterini hareketlerden yeniden hesaplayarak karşılaştır
+        duzelt=True: fark varsa defteri sıfırdan yeniden oluştur
+
+        Returns: Farkı olan kasaların listesi (boş liste = defter tutarlı)
+        """
+        self.db.cursor.execute("""
+            SELECT k.kasa_id, k.kasa_adi,
+                   COALESCE(b.toplam_gelir, 0) as defter_gelir,
+                   COALESCE(b.toplam_gider, 0) as defter_gider,
+                   COALESCE(b.virman_giden, 0) as defter_virman_giden,
+                   COALESCE(b.virman_gelen, 0) as defter_virman_gelen,
+                   COALESCE(g.toplam, 0) as gercek_gelir,
+                   COALESCE(d.toplam, 0) as gercek_gider,
+                   COALESCE(vg.toplam, 0) as gercek_virman_giden,
+                   COALESCE(va.toplam, 0) as gercek_virman_gelen
+            FROM kasalar k
+            LEFT JOIN kasa_bakiye b ON b.kasa_id = k.kasa_id
+            LEFT JOIN (SELECT kasa_id, SUM(tutar) as toplam FROM gelirler GROUP BY kasa_id) g
+                ON g.kasa_id = k.kasa_id
+            LEFT JOIN (SELECT kasa_id, SUM(tutar) as toplam FROM giderler GROUP BY kasa_id) d
+                ON d.kasa_id = k.kasa_id
+            LEFT JOIN (SELECT gonderen_kasa_id, SUM(tutar) as toplam FROM virmanlar GROUP BY gonderen_kasa_id) vg
+                ON vg.gonderen_kasa_id = k.kasa_id
+            LEFT JOIN (SELECT alan_kasa_id, SUM(tutar) as toplam FROM virmanlar GROUP BY alan_kasa_id) va
+                ON va.alan_kasa_id = k.kasa_id
+            ORDER BY k.kasa_adi
+        """)
+
+        farklar = []
+        for row in self.db.cursor.fetchall():
+            fark = {}
+            for alan in ('gelir', 'gider', 'virman_giden', 'virman_gelen'):
+                defter = row[f'defter_{alan}']
+                gercek = row[f'gercek_{alan}']
+                if abs(defter - gercek) >= 0.01:
+                    fark[alan] = {'defter': defter, 'gercek': gercek, 'fark': gercek - defter}
+            if fark:
+                farklar.append({'kasa_id': row['kasa_id'], 'kasa_adi': row['kasa_adi'], 'farklar': fark})
+
+        if farklar and duzelt:
+            self.db.kasa_bakiye_yeniden_olustur()
+            self.db.kasa_bakiye_ozetlerini_olustur(tam=True)
+            self.db.log_islem("Sistem", "DÜZELT", "kasa_bakiye", 0,
+                              f"Kasa bakiye defteri yeniden oluşturuldu ({len(farklar)} kasada fark)")
+
+        return farklar
+
     def kasa_bakiye_tip(self, kasa_id: int, tarih: str = None, tip: str = 'fiziksel') -> float:
         """
         Kasa bakiyesini hesapla
@@ -1630,83 +2001,119 @@ class KasaYoneticisi:
     
     def kasa_tahakkuk_detay(self, kasa_id: int, tarih: str = None) -> Dict:
         """Kasanın tahakkuk detayı"""
+        durum = self.kasa_devir_durumlari(tarih, kasa_id)
+        if not durum:
+            return {'fiziksel_bakiye': 0, 'tahakkuk_toplami': 0, 'serbest_bakiye': 0, 'gelecek_yil_detay': []}
+        return {alan: durum[0][alan] for alan in
+                ('fiziksel_bakiye', 'tahakkuk_toplami', 'serbest_bakiye', 'gelecek_yil_detay')}
+
+    def kasa_devir_durumlari(self, tarih: str = None, kasa_id: Optional[int] = None) -> List[Dict]:
+        """
+        Kasaların tarihteki fiziksel, tahakkuk ve serbest bakiyeleri (kasa başına sorgu yok)
+        Tek okuma işleminde üç gruplu sorgu:
+        - güncel defter bakiyeleri (kasa_bakiye)
+        - tarihten sonraki hareketlerin kasa bazlı neti (fiziksel = defter - sonrası)
+        - peşin gelir/gider tahakkukları (kasa + ait olunan yıl bazlı)
+        kasa_id verilmezse tüm aktif kasalar döner.
+        """
         if tarih is None:
             tarih = datetime.now().strftime("%Y-%m-%d")
-        
         yil = int(tarih[:4])
-        
-        # Gelecek yıl tahakkukları (yıl bazlı)
-        self.db.cursor.execute("""
-            SELECT 
-                ait_oldugu_yil as yil,
-                COUNT(*) as adet,
-                SUM(tutar) as tutar
-            FROM gelirler
-            WHERE kasa_id = ?
-            AND tarih <= ?
-            AND ait_oldugu_yil > ?
-            AND tahakkuk_durumu = 'PEŞİN'
-            GROUP BY ait_oldugu_yil
-            ORDER BY ait_oldugu_yil
-        """, (kasa_id, tarih, yil))
-        
-        gelecek_yil_tahakkuklari = [dict(row) for row in self.db.cursor.fetchall()]
-        
-        toplam_tahakkuk = sum([t['tutar'] for t in gelecek_yil_tahakkuklari])
-        
-        fiziksel = self.kasa_bakiye_tip(kasa_id, tarih, 'fiziksel')
-        serbest = self.kasa_bakiye_tip(kasa_id, tarih, 'serbest')
-        
-        return {
-            'fiziksel_bakiye': fiziksel,
-            'tahakkuk_toplami': toplam_tahakkuk,
-            'serbest_bakiye': serbest,
-            'gelecek_yil_detay': gelecek_yil_tahakkuklari
-        }
+
+        with self.db.transaction(readonly=True) as cur:
+            kasalar = self._defter_bakiyeleri(kasa_id)
+
+            cur.execute("""
+                SELECT kasa_id, SUM(net) AS net FROM (
+                    SELECT kasa_id, tutar AS net FROM gelirler WHERE tarih > :tarih
+                    UNION ALL
+                    SELECT kasa_id, -tutar FROM giderler WHERE tarih > :tarih
+                    UNION ALL
+                    SELECT gonderen_kasa_id, -tutar FROM virmanlar WHERE tarih > :tarih
+                    UNION ALL
+                    SELECT alan_kasa_id, tutar FROM virmanlar WHERE tarih > :tarih
+                )
+                GROUP BY kasa_id
+            """, {'tarih': tarih})
+            sonraki = {row['kasa_id']: row['net'] for row in cur.fetchall()}
+
+            cur.execute("""
+                SELECT 'GELİR' AS tur, kasa_id, ait_oldugu_yil AS yil, COUNT(*) AS adet, SUM(tutar) AS tutar
+                FROM gelirler
+                WHERE tahakkuk_durumu = 'PEŞİN' AND tarih <= :tarih AND ait_oldugu_yil > :yil
+                GROUP BY kasa_id, ait_oldugu_yil
+                UNION ALL
+                SELECT 'GİDER', kasa_id, NULL, COUNT(*), SUM(tutar)
+                FROM giderler
+                WHERE tahakkuk_durumu = 'PEŞİN' AND tarih <= :tarih AND ait_oldugu_yil > :yil
+                GROUP BY kasa_id
+                ORDER BY 2, 3
+            """, {'tarih': tarih, 'yil': yil})
+            gelir_tahakkuk: Dict[int, List[Dict]] = {}
+            gider_tahakkuk: Dict[int, float] = {}
+            for row in cur.fetchall():
+                if row['tur'] == 'GELİR':
+                    gelir_tahakkuk.setdefault(row['kasa_id'], []).append(
+                        {'yil': row['yil'], 'adet': row['adet'], 'tutar': row['tutar']})
+                else:
+                    gider_tahakkuk[row['kasa_id']] = row['tutar']
+
+        sonuc = []
+        for kasa in kasalar:
+            kid = kasa['kasa_id']
+            fiziksel = kasa['net_bakiye'] - sonraki.get(kid, 0)
+            gelecek_yil_detay = gelir_tahakkuk.get(kid, [])
+            tahakkuk = sum(t['tutar'] for t in gelecek_yil_detay)
+            sonuc.append({
+                'kasa_id': kid,
+                'kasa_adi': kasa['kasa_adi'],
+                'para_birimi': kasa['para_birimi'],
+                'devir_bakiye': kasa['devir_bakiye'],
+                'fiziksel_bakiye': fiziksel,
+                'tahakkuk_toplami': tahakkuk,
+                'serbest_bakiye': fiziksel - tahakkuk + gider_tahakkuk.get(kid, 0),
+                'gelecek_yil_detay': gelecek_yil_detay
+            })
+        return sonuc
 
 
 class DevirYoneticisi:
     """Yıl sonu devir işlemleri yöneticisi - Online/Offline hybrid"""
     
+    # Önizleme raporunun onay adımında yeniden kullanılabileceği süre (sn)
+    ONIZLEME_GECERLILIK_SN = 600
+    
     def __init__(self, db: Database):
         self.db = db
-        self.online_mode = get_license_mode() == 'online'
-        if self.online_mode:
-            config = get_api_config()
-            self.api_url = config.get('api_url', '')
-            self.api_key = config.get('api_key', '')
-            self.headers = {'X-API-Key': self.api_key, 'Content-Type': 'application/json'}
-    
-    def _api_request(self, method: str, endpoint: str, data: dict = None) -> Optional[dict]:
-        """API isteği gönder"""
-        if not self.online_mode:
-            return None
-        try:
-            url = f"{self.api_url}{endpoint}"
-            if method == 'GET':
-                response = requests.get(url, headers=self.headers, params=data, timeout=10)
-            elif method == 'POST':
-                response = requests.post(url, headers=self.headers, json=data, timeout=10)
-            else:
-                return None
-            if response.status_code in [200, 201]:
-                return response.json()
-            return None
-        except Exception as e:
-            print(f"API Error: {e}")
-            return None
+        self.online_mode = db.get_license_mode() == 'online'
+        self.api = db.api_client()
+        self._onizleme: Optional[Dict] = None   # {'yil', 'imza', 'zaman', 'rapor'}
     
     def yil_sonu_devir(self, yil: int, onay: bool = False) -> Dict:
         """
         Yıl sonu kapanış ve devir işlemi
         
-        onay=False: Sadece rapor (simülasyon)
-        onay=True: Gerçek devir
+        onay=False: Sadece rapor (simülasyon), sonuç önbelleğe alınır
+        onay=True: Gerçek devir; aynı yılın önizlemesi hâlâ geçerliyse yeniden hesaplanmaz.
+            Geçerlilik yazma işleminin içinde (kilit alındıktan sonra) denetlenir; arada
+            veri değiştiyse rakamlar aynı işlemde yeniden hesaplanır.
         """
-        kasa_yoneticisi = KasaYoneticisi(self.db)
+        if not onay:
+            return self._devir_raporu_olustur(yil)
+        
+        with self.db.transaction():
+            devir_raporu = self._gecerli_onizleme(yil) or self._devir_raporu_olustur(yil)
+            self._devri_uygula(yil, devir_raporu)
+        self._onizleme = None
         
+        return devir_raporu
+    
+    def _devir_raporu_olustur(self, yil: int) -> Dict:
+        """Tüm kasaların devir rakamları (KasaYoneticisi.kasa_devir_durumlari, tek okuma işlemi)"""
         tarih = f"{yil}-12-31"
-        kasalar = kasa_yoneticisi.kasa_listesi()
+        with self.db.transaction(readonly=True):
+            imza = self._veri_imzasi()
+            durumlar = KasaYoneticisi(self.db).kasa_devir_durumlari(tarih)
         
         devir_raporu = {
             'yil': yil,
@@ -1720,15 +2127,12 @@ class DevirYoneticisi:
             }
         }
         
-        for kasa in kasalar:
-            kasa_id = kasa['kasa_id']
-            
-            # Tahakkuk detayı
-            detay = kasa_yoneticisi.kasa_tahakkuk_detay(kasa_id, tarih)
-            
+        for detay in durumlar:
             kasa_devir = {
-                'kasa_id': kasa_id,
-                'kasa_adi': kasa['kasa_adi'],
+                'kasa_id': detay['kasa_id'],
+                'kasa_adi': detay['kasa_adi'],
+                'para_birimi': detay['para_birimi'],
+                'onceki_devir': detay['devir_bakiye'],
                 'fiziksel_bakiye': detay['fiziksel_bakiye'],
                 'tahakkuk_toplami': detay['tahakkuk_toplami'],
                 'serbest_bakiye': detay['serbest_bakiye'],
@@ -1739,7 +2143,7 @@ class DevirYoneticisi:
             if detay['serbest_bakiye'] < 0:
                 devir_raporu['uyarilar'].append({
                     'tip': 'CARİ_AÇIK',
-                    'kasa': kasa['kasa_adi'],
+                    'kasa': detay['kasa_adi'],
                     'mesaj': f"Serbest bakiye negatif: {detay['serbest_bakiye']:,.2f} TL. "
                             f"Gelecek yılların parasını kullanmış durumdasınız!"
                 })
@@ -1747,7 +2151,7 @@ class DevirYoneticisi:
             if detay['fiziksel_bakiye'] > 0 and detay['tahakkuk_toplami'] > detay['fiziksel_bakiye'] * 0.8:
                 devir_raporu['uyarilar'].append({
                     'tip': 'YÜKSEK_TAHAKKUK',
-                    'kasa': kasa['kasa_adi'],
+                    'kasa': detay['kasa_adi'],
                     'mesaj': f"Tahakkuk oranı çok yüksek (%{detay['tahakkuk_toplami']/detay['fiziksel_bakiye']*100:.0f}). "
                             f"Üye ayrılma riski!"
                 })
@@ -1759,47 +2163,65 @@ class DevirYoneticisi:
             devir_raporu['toplam']['tahakkuk'] += detay['tahakkuk_toplami']
             devir_raporu['toplam']['serbest'] += detay['serbest_bakiye']
         
-        # Gerçek devir
-        if onay:
-            self._devri_uygula(yil, devir_raporu)
-        
+        self._onizleme = {'yil': yil, 'imza': imza, 'zaman': time.monotonic(), 'rapor': devir_raporu}
         return devir_raporu
     
+    def _gecerli_onizleme(self, yil: int) -> Optional[Dict]:
+        """Önizleme aynı yıl için, süresi dolmamış ve o günden beri veri değişmemişse rapor"""
+        onizleme = self._onizleme
+        if not onizleme or onizleme['yil'] != yil:
+            return None
+        if time.monotonic() - onizleme['zaman'] > self.ONIZLEME_GECERLILIK_SN:
+            return None
+        if onizleme['imza'] != self._veri_imzasi():
+            return None
+        return onizleme['rapor']
+    
+    def _veri_imzasi(self) -> int:
+        """
+        Devir rakamlarını etkileyen verinin değişiklik sayacı
+        gelir/gider/virman/kasa satırlarındaki her değişiklikte tetikleyicilerle artar
+        (tutar, tarih, ait_oldugu_yil, tahakkuk_durumu düzeltmeleri dahil).
+        """
+        return self.db.veri_surumu()
+    
     def _devri_uygula(self, yil: int, rapor: Dict):
-        """Devir işlemini uygula"""
-        for kasa_devir in rapor['kasalar']:
-            self.db.cursor.execute("""
+        """Devir işlemini uygula (tek yazma işlemi; kasa başına devir_islemleri kaydı)"""
+        devir_tarihi = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self.db.transaction() as cur:
+            # Önceki devir bakiyesi güncellemeden önce kayda geçer
+            cur.executemany("""
+                INSERT INTO devir_islemleri
+                (yil, devir_tarihi, kasa_id, onceki_bakiye, devir_bakiye,
+                 serbest_bakiye, tahakkuk_bakiye, aciklama, islem_yapan)
+                SELECT ?, ?, kasa_id, devir_bakiye, ?, ?, ?, ?, 'Sistem'
+                FROM kasalar WHERE kasa_id = ?
+            """, [(
+                yil, devir_tarihi,
+                kasa_devir['fiziksel_bakiye'],
+                kasa_devir['serbest_bakiye'],
+                kasa_devir['tahakkuk_toplami'],
+                f"{yil} yıl sonu devri",
+                kasa_devir['kasa_id']
+            ) for kasa_devir in rapor['kasalar']])
+            
+            cur.executemany("""
                 UPDATE kasalar
                 SET devir_bakiye = ?,
                     serbest_devir_bakiye = ?,
                     tahakkuk_toplami = ?,
                     son_devir_tarihi = CURRENT_TIMESTAMP
                 WHERE kasa_id = ?
-            """, (
+            """, [(
                 kasa_devir['fiziksel_bakiye'],
                 kasa_devir['serbest_bakiye'],
                 kasa_devir['tahakkuk_toplami'],
                 kasa_devir['kasa_id']
-            ))
-        
-        # Devir log kaydı
-        self.db.cursor.execute("""
-            INSERT INTO devir_islemleri
-            (yil, devir_tarihi, toplam_fiziksel, toplam_tahakkuk, 
-             toplam_serbest, rapor_json)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (
-            yil,
-            datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            rapor['toplam']['fiziksel'],
-            rapor['toplam']['tahakkuk'],
-            rapor['toplam']['serbest'],
-            json.dumps(rapor, ensure_ascii=False)
-        ))
-        
-        self.db.commit()
-        self.db.log_islem("Sistem", "DEVİR", "devir_islemleri", yil, 
-                         f"Yıl sonu devir: {yil}")
+            ) for kasa_devir in rapor['kasalar']])
+            
+            self.db.log_islem("Sistem", "DEVİR", "devir_islemleri", yil, 
+                             f"Yıl sonu devir: {yil} ({len(rapor['kasalar'])} kasa, "
+                             f"fiziksel {rapor['toplam']['fiziksel']:,.2f}, serbest {rapor['toplam']['serbest']:,.2f})")
 
 
 class TahakkukYoneticisi:
@@ -1807,31 +2229,8 @@ class TahakkukYoneticisi:
     
     def __init__(self, db: Database):
         self.db = db
-        self.online_mode = get_license_mode() == 'online'
-        if self.online_mode:
-            config = get_api_config()
-            self.api_url = config.get('api_url', '')
-            self.api_key = config.get('api_key', '')
-            self.headers = {'X-API-Key': self.api_key, 'Content-Type': 'application/json'}
-    
-    def _api_request(self, method: str, endpoint: str, data: dict = None) -> Optional[dict]:
-        """API isteği gönder"""
-        if not self.online_mode:
-            return None
-        try:
-            url = f"{self.api_url}{endpoint}"
-            if method == 'GET':
-                response = requests.get(url, headers=self.headers, params=data, timeout=10)
-            elif method == 'POST':
-                response = requests.post(url, headers=self.headers, json=data, timeout=10)
-            else:
-                return None
-            if response.status_code in [200, 201]:
-                return response.json()
-            return None
-        except Exception as e:
-            print(f"API Error: {e}")
-            return None
+        self.online_mode = db.get_license_mode() == 'online'
+        self.api = db.api_client()
     
     def tahakkuk_listesi(self, yil: int = None, durum: str = None) -> List[Dict]:
         """Tahakkuk listesi"""
@@ -1884,30 +2283,9 @@ class RaporYoneticisi:
     
     def __init__(self, db: Database):
         self.db = db
-        self.online_mode = get_license_mode() == 'online'
-        if self.online_mode:
-            config = get_api_config()
-            self.api_url = config.get('api_url', '')
-            self.api_key = config.get('api_key', '')
-            self.headers = {'X-API-Key': self.api_key, 'Content-Type': 'application/json'}
-    
-    def _api_request(self, method: str, endpoint: str, data: dict = None) -> Optional[dict]:
-        """API isteği gönder"""
-        if not self.online_mode:
-            return None
-        try:
-            url = f"{self.api_url}{endpoint}"
-            if method == 'GET':
-                response = requests.get(url, headers=self.headers, params=data, timeout=10)
-            else:
-                return None
-            if response.status_code in [200, 201]:
-                return response.json()
-            return None
-        except Exception as e:
-            print(f"API Error: {e}")
-            return None
-        
+        self.online_mode = db.get_license_mode() == 'online'
+        self.api = db.api_client()
+    
     def genel_ozet(self, yil: Optional[int] = None) -> Dict:
         """Genel mali durum özeti"""
         if yil:
@@ -2024,44 +2402,65 @@ class RaporYoneticisi:
         self.db.cursor.execute(query, params)
         return [dict(row) for row in self.db.cursor.fetchall()]
     
-    def aylik_gelir_gider(self, yil: int) -> List[Dict]:
-        """Aylık gelir-gider karşılaştırması"""
-        aylar = []
-        for ay in range(1, 13):
-            baslangic = f"{yil}-{ay:02d}-01"
-            if ay == 12:
-                bitis = f"{yil}-12-31"
+    AY_ADLARI = ['Ocak', 'Şubat', 'Mart', 'Nisan', 'Mayıs', 'Haziran',
+                 'Temmuz', 'Ağustos', 'Eylül', 'Ekim', 'Kasım', 'Aralık']
+
+    def aylik_kup(self, yil: Optional[int] = None, koy: bool = False) -> List[Dict]:
+        """
+        Aylık gelir-gider küpü - gelir ve gider tablolarında tek GROUP BY geçişi
+        Her satır: yil, ay, kasa_id, yon ('gelir'/'gider'), tur, toplam, adet
+
+        yil=None: tüm yıllar (yıl değiştirme için tek seferde)
+        koy=True: koy_gelirleri / koy_giderleri tabloları
+        """
+        gelir_tablo, gider_tablo = ('koy_gelirleri', 'koy_giderleri') if koy else ('gelirler', 'giderler')
+
+        kosul = ""
+        params = []
+        if yil:
+            kosul = " WHERE tarih >= ? AND tarih < ?"
+            params = [f"{yil}-01-01", f"{yil + 1}-01-01"]
+
+        self.db.cursor.execute(f"""
+            SELECT CAST(strftime('%Y', tarih) AS INTEGER) as yil,
+                   CAST(strftime('%m', tarih) AS INTEGER) as ay,
+                   kasa_id, yon, tur,
+                   SUM(tutar) as toplam, COUNT(*) as adet
+            FROM (
+                SELECT tarih, kasa_id, 'gelir' as yon, gelir_turu as tur, tutar
+                FROM {gelir_tablo}{kosul}
+                UNION ALL
+                SELECT tarih, kasa_id, 'gider' as yon, gider_turu as tur, tutar
+                FROM {gider_tablo}{kosul}
+            )
+            GROUP BY yil, ay, kasa_id, yon, tur
+            ORDER BY yil, ay
+        """, params * 2)
+        return [dict(row) for row in self.db.cursor.fetchall()]
+
+    def aylik_gelir_gider(self, yil: int, koy: bool = False,
+                          kup: Optional[List[Dict]] = None) -> List[Dict]:
+        """Aylık gelir-gider karşılaştırması (aylik_kup üzerinden)"""
+        if kup is None:
+            kup = self.aylik_kup(yil, koy)
+
+        gelirler = [0] * 12
+        giderler = [0] * 12
+        for satir in kup:
+            if satir['yil'] != yil or not satir['ay']:
+                continue
+            if satir['yon'] == 'gelir':
+                gelirler[satir['ay'] - 1] += satir['toplam']
             else:
-                import calendar
-                son_gun = calendar.monthrange(yil, ay)[1]
-                bitis = f"{yil}-{ay:02d}-{son_gun}"
-            
-            # Gelir
-            self.db.cursor.execute("""
-                SELECT COALESCE(SUM(tutar), 0) as toplam
-                FROM gelirler
-                WHERE tarih BETWEEN ? AND ?
-            """, (baslangic, bitis))
-            gelir = self.db.cursor.fetchone()['toplam']
-            
-            # Gider
-            self.db.cursor.execute("""
-                SELECT COALESCE(SUM(tutar), 0) as toplam
-                FROM giderler
-                WHERE tarih BETWEEN ? AND ?
-            """, (baslangic, bitis))
-            gider = self.db.cursor.fetchone()['toplam']
-            
-            aylar.append({
-                'ay': ay,
-                'ay_adi': ['Ocak', 'Şubat', 'Mart', 'Nisan', 'Mayıs', 'Haziran',
-                          'Temmuz', 'Ağustos', 'Eylül', 'Ekim', 'Kasım', 'Aralık'][ay-1],
-                'gelir': gelir,
-                'gider': gider,
-                'fark': gelir - gider
-            })
-        
-        return aylar
+                giderler[satir['ay'] - 1] += satir['toplam']
+
+        return [{
+            'ay': ay,
+            'ay_adi': self.AY_ADLARI[ay - 1],
+            'gelir': gelirler[ay - 1],
+            'gider': giderler[ay - 1],
+            'fark': gelirler[ay - 1] - giderler[ay - 1]
+        } for ay in range(1, 13)]
 
 
 class MaliTabloYoneticisi:
@@ -2069,30 +2468,9 @@ class MaliTabloYoneticisi:
     
     def __init__(self, db: Database):
         self.db = db
-        self.online_mode = get_license_mode() == 'online'
-        if self.online_mode:
-            config = get_api_config()
-            self.api_url = config.get('api_url', '')
-            self.api_key = config.get('api_key', '')
-            self.headers = {'X-API-Key': self.api_key, 'Content-Type': 'application/json'}
-    
-    def _api_request(self, method: str, endpoint: str, data: dict = None) -> Optional[dict]:
-        """API isteği gönder"""
-        if not self.online_mode:
-            return None
-        try:
-            url = f"{self.api_url}{endpoint}"
-            if method == 'GET':
-                response = requests.get(url, headers=self.headers, params=data, timeout=10)
-            else:
-                return None
-            if response.status_code in [200, 201]:
-                return response.json()
-            return None
-        except Exception as e:
-            print(f"API Error: {e}")
-            return None
-        
+        self.online_mode = db.get_license_mode() == 'online'
+        self.api = db.api_client()
+    
     def bilanco_raporu(self, tarih: str = None) -> Dict:
         """
         Bilanço benzeri rapor (Dernek muhasebesi için basitleştirilmiş)
@@ -2330,36 +2708,9 @@ class KoyKasaYoneticisi:
     
     def __init__(self, db: Database):
         self.db = db
-        self.online_mode = get_license_mode() == 'online'
-        if self.online_mode:
-            config = get_api_config()
-            self.api_url = config.get('api_url', '')
-            self.api_key = config.get('api_key', '')
-            self.headers = {'X-API-Key': self.api_key, 'Content-Type': 'application/json'}
-    
-    def _api_request(self, method: str, endpoint: str, data: dict = None) -> Optional[dict]:
-        """API isteği gönder"""
-        if not self.online_mode:
-            return None
-        try:
-            url = f"{self.api_url}{endpoint}"
-            if method == 'GET':
-                response = requests.get(url, headers=self.headers, params=data, timeout=10)
-            elif method == 'POST':
-                response = requests.post(url, headers=self.headers, json=data, timeout=10)
-            elif method == 'PUT':
-                response = requests.put(url, headers=self.headers, json=data, timeout=10)
-            elif method == 'DELETE':
-                response = requests.delete(url, headers=self.headers, timeout=10)
-            else:
-                return None
-            if response.status_code in [200, 201]:
-                return response.json()
-            return None
-        except Exception as e:
-            print(f"API Error: {e}")
-            return None
-        
+        self.online_mode = db.get_license_mode() == 'online'
+        self.api = db.api_client()
+    
     def kasa_ekle(self, kasa_adi: str, para_birimi: str = "TL", 
                   devir_bakiye: float = 0, aciklama: str = "") -> int:
         """Yeni köy kasası ekle"""
@@ -2455,50 +2806,23 @@ class KoyGelirYoneticisi:
     
     def __init__(self, db: Database):
         self.db = db
-        self.online_mode = get_license_mode() == 'online'
-        if self.online_mode:
-            config = get_api_config()
-            self.api_url = config.get('api_url', '')
-            self.api_key = config.get('api_key', '')
-            self.headers = {'X-API-Key': self.api_key, 'Content-Type': 'application/json'}
-    
-    def _api_request(self, method: str, endpoint: str, data: dict = None) -> Optional[dict]:
-        """API isteği gönder"""
-        if not self.online_mode:
-            return None
-        try:
-            url = f"{self.api_url}{endpoint}"
-            if method == 'GET':
-                response = requests.get(url, headers=self.headers, params=data, timeout=10)
-            elif method == 'POST':
-                response = requests.post(url, headers=self.headers, json=data, timeout=10)
-            elif method == 'PUT':
-                response = requests.put(url, headers=self.headers, json=data, timeout=10)
-            elif method == 'DELETE':
-                response = requests.delete(url, headers=self.headers, timeout=10)
-            else:
-                return None
-            if response.status_code in [200, 201]:
-                return response.json()
-            return None
-        except Exception as e:
-            print(f"API Error: {e}")
-            return None
-        
+        self.online_mode = db.get_license_mode() == 'online'
+        self.api = db.api_client()
+    
     def gelir_ekle(self, tarih: str, gelir_turu: str, aciklama: str, 
                    tutar: float, kasa_id: int, tahsil_eden: str = "", 
                    notlar: str = "", dekont_no: str = "") -> int:
         """Yeni köy gelir kaydı ekle"""
-        belge_no = self.db.get_next_koy_belge_no()
-        
-        self.db.cursor.execute("""
-            INSERT INTO koy_gelirleri 
-            (tarih, belge_no, gelir_turu, aciklama, tutar, kasa_id, tahsil_eden, notlar, dekont_no)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (tarih, belge_no, gelir_turu, aciklama, tutar, kasa_id, tahsil_eden, notlar, dekont_no))
-        self.db.commit()
-        
-        gelir_id = self.db.cursor.lastrowid
+        # Numara ve kayıt aynı işlemde: ekleme başarısızsa numara da geri alınır
+        with self.db.transaction() as cur:
+            belge_no = self.db.get_next_koy_belge_no()
+
+            cur.execute("""
+                INSERT INTO koy_gelirleri 
+                (tarih, belge_no, gelir_turu, aciklama, tutar, kasa_id, tahsil_eden, notlar, dekont_no)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (tarih, belge_no, gelir_turu, aciklama, tutar, kasa_id, tahsil_eden, notlar, dekont_no))
+            gelir_id = cur.lastrowid
         self.db.log_islem("Sistem", "EKLE", "koy_gelirleri", gelir_id, 
                          f"Köy geliri eklendi: {gelir_turu} - {tutar} TL")
         return gelir_id
@@ -2583,50 +2907,23 @@ class KoyGiderYoneticisi:
     
     def __init__(self, db: Database):
         self.db = db
-        self.online_mode = get_license_mode() == 'online'
-        if self.online_mode:
-            config = get_api_config()
-            self.api_url = config.get('api_url', '')
-            self.api_key = config.get('api_key', '')
-            self.headers = {'X-API-Key': self.api_key, 'Content-Type': 'application/json'}
-    
-    def _api_request(self, method: str, endpoint: str, data: dict = None) -> Optional[dict]:
-        """API isteği gönder"""
-        if not self.online_mode:
-            return None
-        try:
-            url = f"{self.api_url}{endpoint}"
-            if method == 'GET':
-                response = requests.get(url, headers=self.headers, params=data, timeout=10)
-            elif method == 'POST':
-                response = requests.post(url, headers=self.headers, json=data, timeout=10)
-            elif method == 'PUT':
-                response = requests.put(url, headers=self.headers, json=data, timeout=10)
-            elif method == 'DELETE':
-                response = requests.delete(url, headers=self.headers, timeout=10)
-            else:
-                return None
-            if response.status_code in [200, 201]:
-                return response.json()
-            return None
-        except Exception as e:
-            print(f"API Error: {e}")
-            return None
-        
+        self.online_mode = db.get_license_mode() == 'online'
+        self.api = db.api_client()
+    
     def gider_ekle(self, tarih: str, gider_turu: str, aciklama: str, 
                    tutar: float, kasa_id: int, odeyen: str = "", 
                    notlar: str = "", dekont_no: str = "") -> int:
         """Yeni köy gider kaydı ekle"""
-        islem_no = self.db.get_next_koy_islem_no()
-        
-        self.db.cursor.execute("""
-            INSERT INTO koy_giderleri 
-            (tarih, islem_no, gider_turu, aciklama, tutar, kasa_id, odeyen, notlar, dekont_no)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (tarih, islem_no, gider_turu, aciklama, tutar, kasa_id, odeyen, notlar, dekont_no))
-        self.db.commit()
-        
-        gider_id = self.db.cursor.lastrowid
+        # Numara ve kayıt aynı işlemde: ekleme başarısızsa numara da geri alınır
+        with self.db.transaction() as cur:
+            islem_no = self.db.get_next_koy_islem_no()
+
+            cur.execute("""
+                INSERT INTO koy_giderleri 
+                (tarih, islem_no, gider_turu, aciklama, tutar, kasa_id, odeyen, notlar, dekont_no)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (tarih, islem_no, gider_turu, aciklama, tutar, kasa_id, odeyen, notlar, dekont_no))
+            gider_id = cur.lastrowid
         self.db.log_islem("Sistem", "EKLE", "koy_giderleri", gider_id, 
                          f"Köy gideri eklendi: {gider_turu} - {tutar} TL")
         return gider_id
@@ -2697,34 +2994,9 @@ class KoyVirmanYoneticisi:
     
     def __init__(self, db: Database):
         self.db = db
-        self.online_mode = get_license_mode() == 'online'
-        if self.online_mode:
-            config = get_api_config()
-            self.api_url = config.get('api_url', '')
-            self.api_key = config.get('api_key', '')
-            self.headers = {'X-API-Key': self.api_key, 'Content-Type': 'application/json'}
-    
-    def _api_request(self, method: str, endpoint: str, data: dict = None) -> Optional[dict]:
-        """API isteği gönder"""
-        if not self.online_mode:
-            return None
-        try:
-            url = f"{self.api_url}{endpoint}"
-            if method == 'GET':
-                response = requests.get(url, headers=self.headers, params=data, timeout=10)
-            elif method == 'POST':
-                response = requests.post(url, headers=self.headers, json=data, timeout=10)
-            elif method == 'DELETE':
-                response = requests.delete(url, headers=self.headers, timeout=10)
-            else:
-                return None
-            if response.status_code in [200, 201]:
-                return response.json()
-            return None
-        except Exception as e:
-            print(f"API Error: {e}")
-            return None
-        
+        self.online_mode = db.get_license_mode() == 'online'
+        self.api = db.api_client()
+    
     def virman_ekle(self, tarih: str, gonderen_kasa_id: int, alan_kasa_id: int, 
                     tutar: float, aciklama: str = "") -> int:
         """Köy kasaları arası transfer"""
@@ -2787,36 +3059,9 @@ class KullaniciYoneticisi:
     
     def __init__(self, db: Database):
         self.db = db
-        self.online_mode = get_license_mode() == 'online'
-        if self.online_mode:
-            config = get_api_config()
-            self.api_url = config.get('api_url', '')
-            self.api_key = config.get('api_key', '')
-            self.headers = {'X-API-Key': self.api_key, 'Content-Type': 'application/json'}
-    
-    def _api_request(self, method: str, endpoint: str, data: dict = None) -> Optional[dict]:
-        """API isteği gönder"""
-        if not self.online_mode:
-            return None
-        try:
-            url = f"{self.api_url}{endpoint}"
-            if method == 'GET':
-                response = requests.get(url, headers=self.headers, params=data, timeout=10)
-            elif method == 'POST':
-                response = requests.post(url, headers=self.headers, json=data, timeout=10)
-            elif method == 'PUT':
-                response = requests.put(url, headers=self.headers, json=data, timeout=10)
-            elif method == 'DELETE':
-                response = requests.delete(url, headers=self.headers, timeout=10)
-            else:
-                return None
-            if response.status_code in [200, 201]:
-                return response.json()
-            return None
-        except Exception as e:
-            print(f"API Error: {e}")
-            return None
-        
+        self.online_mode = db.get_license_mode() == 'online'
+        self.api = db.api_client()
+    
     def kullanici_ekle(self, kullanici_adi: str, sifre: str, ad_soyad: str,
                        email: str = "", rol: str = "görüntüleyici") -> int:
         """Yeni kullanıcı ekle"""
@@ -2900,36 +3145,9 @@ class EtkinlikYoneticisi:
     
     def __init__(self, db: Database):
         self.db = db
-        self.online_mode = get_license_mode() == 'online'
-        if self.online_mode:
-            config = get_api_config()
-            self.api_url = config.get('api_url', '')
-            self.api_key = config.get('api_key', '')
-            self.headers = {'X-API-Key': self.api_key, 'Content-Type': 'application/json'}
-    
-    def _api_request(self, method: str, endpoint: str, data: dict = None) -> Optional[dict]:
-        """API isteği gönder"""
-        if not self.online_mode:
-            return None
-        try:
-            url = f"{self.api_url}{endpoint}"
-            if method == 'GET':
-                response = requests.get(url, headers=self.headers, params=data, timeout=10)
-            elif method == 'POST':
-                response = requests.post(url, headers=self.headers, json=data, timeout=10)
-            elif method == 'PUT':
-                response = requests.put(url, headers=self.headers, json=data, timeout=10)
-            elif method == 'DELETE':
-                response = requests.delete(url, headers=self.headers, timeout=10)
-            else:
-                return None
-            if response.status_code in [200, 201]:
-                return response.json()
-            return None
-        except Exception as e:
-            print(f"API Error: {e}")
-            return None
-        
+        self.online_mode = db.get_license_mode() == 'online'
+        self.api = db.api_client()
+    
     def etkinlik_ekle(self, etkinlik_turu: str, baslik: str, tarih: str,
                       aciklama: str = "", saat: str = "", bitis_tarihi: str = None,
                       mekan: str = "", tahmini_gelir: float = 0, tahmini_gider: float = 0,
@@ -3056,36 +3274,9 @@ class ToplantiYoneticisi:
     
     def __init__(self, db: Database):
         self.db = db
-        self.online_mode = get_license_mode() == 'online'
-        if self.online_mode:
-            config = get_api_config()
-            self.api_url = config.get('api_url', '')
-            self.api_key = config.get('api_key', '')
-            self.headers = {'X-API-Key': self.api_key, 'Content-Type': 'application/json'}
-    
-    def _api_request(self, method: str, endpoint: str, data: dict = None) -> Optional[dict]:
-        """API isteği gönder"""
-        if not self.online_mode:
-            return None
-        try:
-            url = f"{self.api_url}{endpoint}"
-            if method == 'GET':
-                response = requests.get(url, headers=self.headers, params=data, timeout=10)
-            elif method == 'POST':
-                response = requests.post(url, headers=self.headers, json=data, timeout=10)
-            elif method == 'PUT':
-                response = requests.put(url, headers=self.headers, json=data, timeout=10)
-            elif method == 'DELETE':
-                response = requests.delete(url, headers=self.headers, timeout=10)
-            else:
-                return None
-            if response.status_code in [200, 201]:
-                return response.json()
-            return None
-        except Exception as e:
-            print(f"API Error: {e}")
-            return None
-        
+        self.online_mode = db.get_license_mode() == 'online'
+        self.api = db.api_client()
+    
     def toplanti_ekle(self, toplanti_turu: str, baslik: str, tarih: str,
                       saat: str = "", mekan: str = "", gundem: str = "",
                       katilimcilar: str = "") -> int:
@@ -3147,36 +3338,9 @@ class ButceYoneticisi:
     
     def __init__(self, db: Database):
         self.db = db
-        self.online_mode = get_license_mode() == 'online'
-        if self.online_mode:
-            config = get_api_config()
-            self.api_url = config.get('api_url', '')
-            self.api_key = config.get('api_key', '')
-            self.headers = {'X-API-Key': self.api_key, 'Content-Type': 'application/json'}
-    
-    def _api_request(self, method: str, endpoint: str, data: dict = None) -> Optional[dict]:
-        """API isteği gönder"""
-        if not self.online_mode:
-            return None
-        try:
-            url = f"{self.api_url}{endpoint}"
-            if method == 'GET':
-                response = requests.get(url, headers=self.headers, params=data, timeout=10)
-            elif method == 'POST':
-                response = requests.post(url, headers=self.headers, json=data, timeout=10)
-            elif method == 'PUT':
-                response = requests.put(url, headers=self.headers, json=data, timeout=10)
-            elif method == 'DELETE':
-                response = requests.delete(url, headers=self.headers, timeout=10)
-            else:
-                return None
-            if response.status_code in [200, 201]:
-                return response.json()
-            return None
-        except Exception as e:
-            print(f"API Error: {e}")
-            return None
-        
+        self.online_mode = db.get_license_mode() == 'online'
+        self.api = db.api_client()
+    
     def butce_ekle(self, yil: int, kategori: str, tur: str, 
                    planlanan_tutar: float, ay: int = None, aciklama: str = "") -> int:
         """Bütçe kalemi ekle"""
@@ -3252,34 +3416,9 @@ class BelgeYoneticisi:
     
     def __init__(self, db: Database):
         self.db = db
-        self.online_mode = get_license_mode() == 'online'
-        if self.online_mode:
-            config = get_api_config()
-            self.api_url = config.get('api_url', '')
-            self.api_key = config.get('api_key', '')
-            self.headers = {'X-API-Key': self.api_key, 'Content-Type': 'application/json'}
-    
-    def _api_request(self, method: str, endpoint: str, data: dict = None) -> Optional[dict]:
-        """API isteği gönder"""
-        if not self.online_mode:
-            return None
-        try:
-            url = f"{self.api_url}{endpoint}"
-            if method == 'GET':
-                response = requests.get(url, headers=self.headers, params=data, timeout=10)
-            elif method == 'POST':
-                response = requests.post(url, headers=self.headers, json=data, timeout=10)
-            elif method == 'DELETE':
-                response = requests.delete(url, headers=self.headers, timeout=10)
-            else:
-                return None
-            if response.status_code in [200, 201]:
-                return response.json()
-            return None
-        except Exception as e:
-            print(f"API Error: {e}")
-            return None
-        
+        self.online_mode = db.get_license_mode() == 'online'
+        self.api = db.api_client()
+    
     def belge_ekle(self, belge_turu: str, baslik: str, dosya_adi: str, 
                    dosya_yolu: str, dosya_boyutu: int = 0,
                    ilgili_tablo: str = None, ilgili_kayit_id: int = None,
@@ -3335,38 +3474,11 @@ class AlacakYoneticisi:
     
     def __init__(self, db: Database):
         self.db = db
-        self.online_mode = get_license_mode() == 'online'
-        if self.online_mode:
-            config = get_api_config()
-            self.api_url = config.get('api_url', '')
-            self.api_key = config.get('api_key', '')
-            self.headers = {'X-API-Key': self.api_key, 'Content-Type': 'application/json'}
+        self.online_mode = db.get_license_mode() == 'online'
+        self.api = db.api_client()
         from models import GelirYoneticisi
         self.gelir_yoneticisi = GelirYoneticisi(db)
     
-    def _api_request(self, method: str, endpoint: str, data: dict = None) -> Optional[dict]:
-        """API isteği gönder"""
-        if not self.online_mode:
-            return None
-        try:
-            url = f"{self.api_url}{endpoint}"
-            if method == 'GET':
-                response = requests.get(url, headers=self.headers, params=data, timeout=10)
-            elif method == 'POST':
-                response = requests.post(url, headers=self.headers, json=data, timeout=10)
-            elif method == 'PUT':
-                response = requests.put(url, headers=self.headers, json=data, timeout=10)
-            elif method == 'DELETE':
-                response = requests.delete(url, headers=self.headers, timeout=10)
-            else:
-                return None
-            if response.status_code in [200, 201]:
-                return response.json()
-            return None
-        except Exception as e:
-            print(f"API Error: {e}")
-            return None
-    
     def alacak_ekle(self, alacak_turu: str, aciklama: str, kisi_kurum: str,
                     toplam_tutar: float, para_birimi: str = 'TRY',
                     alacak_tarihi: str = None, vade_tarihi: str = None,
@@ -3577,38 +3689,11 @@ class VerecekYoneticisi:
     
     def __init__(self, db: Database):
         self.db = db
-        self.online_mode = get_license_mode() == 'online'
-        if self.online_mode:
-            config = get_api_config()
-            self.api_url = config.get('api_url', '')
-            self.api_key = config.get('api_key', '')
-            self.headers = {'X-API-Key': self.api_key, 'Content-Type': 'application/json'}
+        self.online_mode = db.get_license_mode() == 'online'
+        self.api = db.api_client()
         from models import GiderYoneticisi
         self.gider_yoneticisi = GiderYoneticisi(db)
     
-    def _api_request(self, method: str, endpoint: str, data: dict = None) -> Optional[dict]:
-        """API isteği gönder"""
-        if not self.online_mode:
-            return None
-        try:
-            url = f"{self.api_url}{endpoint}"
-            if method == 'GET':
-                response = requests.get(url, headers=self.headers, params=data, timeout=10)
-            elif method == 'POST':
-                response = requests.post(url, headers=self.headers, json=data, timeout=10)
-            elif method == 'PUT':
-                response = requests.put(url, headers=self.headers, json=data, timeout=10)
-            elif method == 'DELETE':
-                response = requests.delete(url, headers=self.headers, timeout=10)
-            else:
-                return None
-            if response.status_code in [200, 201]:
-                return response.json()
-            return None
-        except Exception as e:
-            print(f"API Error: {e}")
-            return None
-    
     def verecek_ekle(self, verecek_turu: str, aciklama: str, kisi_kurum: str,
                      toplam_tutar: float, para_birimi: str = 'TRY',
                      verecek_tarihi: str = None, vade_tarihi: str = None,
@@ -3778,3 +3863,58 @@ class VerecekYoneticisi:
         verecek = dict(self.db.cursor.fetchone())
         verecek['odemeler'] = self.odeme_gecmisi(verecek_id)
         return verecek
+
+
+class AramaYoneticisi:
+    """Tüm modüllerde tam metin arama - tek FTS5 indeksi (Türkçe karakter katlamalı)"""
+    
+    # bm25 kolon ağırlıkları: modul, kayit_id (indekslenmez), baslik, icerik
+    SIRALAMA = "bm25(arama_fts, 0.0, 0.0, 10.0, 1.0)"
+    
+    def __init__(self, db: Database):
+        self.db = db
+    
+    @staticmethod
+    def fts_sorgusu(arama_metni: str) -> str:
+        """Kullanıcı metnini önek sorgusuna çevir: 'Işık yıl' -> "isik"* "yil"*"""
+        kelimeler = re.findall(r'\w+', tr_normalize(arama_metni))
+        return ' '.join(f'"{kelime}"*' for kelime in kelimeler)
+    
+    @staticmethod
+    def listede_ara(kayitlar: List[Dict], arama_metni: str, alanlar: Tuple[str, ...]) -> List[Dict]:
+        """İndeks yokken (online mod) bellekteki listede aynı kurallarla ara"""
+        kelimeler = re.findall(r'\w+', tr_normalize(arama_metni))
+        sonuc = []
+        for kayit in kayitlar:
+            metin = tr_normalize(' '.join(str(kayit.get(alan) or '') for alan in alanlar))
+            if all(kelime in metin for kelime in kelimeler):
+                sonuc.append(kayit)
+        return sonuc
+    
+    def ara(self, arama_metni: str, moduller: Optional[List[str]] = None, limit: int = 50) -> List[Dict]:
+        """
+        Tüm modüllerde tek sorguyla ara (en iyi eşleşme önce)
+        Returns: [{'modul': 'uye'|'gelir'|'gider'|'alacak'|'belge', 'kayit_id', 'skor'}]
+        """
+        sorgu = self.fts_sorgusu(arama_metni)
+        if not sorgu or not self.db.arama_indeksi_var:
+            return []
+        
+        query = f"""
+            SELECT modul, kayit_id, {self.SIRALAMA} AS skor
+            FROM arama_fts
+            WHERE arama_fts MATCH ?
+        """
+        params = [sorgu]
+        if moduller:
+            query += f" AND modul IN ({','.join('?' * len(moduller))})"
+            params.extend(moduller)
+        query += " ORDER BY skor LIMIT ?"
+        params.append(limit)
+        
+        self.db.cursor.execute(query, params)
+        return [dict(row) for row in self.db.cursor.fetchall()]
+    
+    def indeksi_yeniden_olustur(self):
+        """Arama indeksini baştan oluştur (toplu içe aktarma sonrası)"""
+        self.db.arama_indeksini_yeniden_olustur()
@@ -6,20 +6,33 @@ Desktop ve Web Entegrasyonu için Tam API
 from fastapi import FastAPI, HTTPException, Depends, Header, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, HTMLResponse
+from fastapi.responses import FileResponse, HTMLResponse, StreamingResponse
 from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings
-from typing import Optional, List, Any, Dict
+from typing import Optional, List, Any, Dict, Tuple
+from decimal import Decimal
 from datetime import datetime, date, timedelta
-from sqlalchemy import create_engine, Column, String, Integer, Boolean, DateTime, Date, Text, Numeric, ForeignKey, func
+from collections import OrderedDict
+from types import SimpleNamespace
+from sqlalchemy import create_engine, Column, String, Integer, Boolean, DateTime, Date, Text, Numeric, ForeignKey, func, tuple_
+from sqlalchemy import event, inspect, select, insert, delete, union_all, literal, case
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.dialects import postgresql, sqlite
 import uuid
 import secrets
 import bcrypt
 from jose import JWTError, jwt
 import os
+import io
+import csv
+import json
+import zlib
+import base64
+import tempfile
+import threading
+import time
 
 
 # ==================== CONFIGURATION ====================
@@ -30,6 +43,14 @@ class Settings(BaseSettings):
     admin_secret: str = "BADER_ADMIN_2025_SUPER_SECRET"
     algorithm: str = "HS256"
     access_token_expire_hours: int = 24
+    # API key -> müşteri önbelleği (süreç içi; diğer worker'lar için TTL ile tazelenir)
+    customer_cache_ttl_seconds: int = 60
+    customer_cache_max_size: int = 1024
+    # Liste uç noktaları (cursor sayfalama)
+    page_default_limit: int = 100
+    page_max_limit: int = 1000
+    # tenant_stats mutabakat aralığı (dakika, 0 = kapalı)
+    tenant_stats_reconcile_minutes: int = 60
     
     class Config:
         env_file = ".env"
@@ -315,6 +336,25 @@ class AssessmentReport(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
 
 
+class TenantStats(Base):
+    """Kiracı özet sayaçları - (customer_id, year) başına tek satır
+    year=0 satırı yıldan bağımsız sayaçları (üyeler, açık aidatlar, yılsız gelir/gider) tutar"""
+    __tablename__ = "tenant_stats"
+    
+    customer_id = Column(String(50), ForeignKey("customers.customer_id", ondelete="CASCADE"), primary_key=True)
+    year = Column(Integer, primary_key=True)
+    member_count = Column(Integer, nullable=False, default=0)
+    active_member_count = Column(Integer, nullable=False, default=0)
+    income_total = Column(Numeric(14,2), nullable=False, default=0)
+    income_count = Column(Integer, nullable=False, default=0)
+    expense_total = Column(Numeric(14,2), nullable=False, default=0)
+    expense_count = Column(Integer, nullable=False, default=0)
+    dues_assessed = Column(Numeric(14,2), nullable=False, default=0)
+    dues_collected = Column(Numeric(14,2), nullable=False, default=0)
+    dues_open_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
 # ==================== SCHEMAS ====================
 
 class MemberCreate(BaseModel):
@@ -416,15 +456,184 @@ def verify_api_key(x_api_key: str = Header(None), authorization: str = Header(No
         raise HTTPException(status_code=401, detail="API key gerekli")
     return api_key
 
+class CustomerCache:
+    """
+    API key -> müşteri çözümlemesi için süreç içi LRU + TTL önbellek
+    Kayıtlar Customer kolonlarının salt okunur kopyasıdır (oturumdan bağımsız).
+    customers tablosuna yazan admin endpoint'leri invalidate() çağırır;
+    TTL, başka worker'ların yaptığı değişiklikler için üst sınırdır.
+    Geçersiz anahtarlar önbelleğe alınmaz (rastgele anahtarlar LRU'yu dolduramaz).
+    """
+    
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[str, Tuple[float, SimpleNamespace]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.invalidations = 0
+    
+    def get(self, api_key: str) -> Optional[SimpleNamespace]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(api_key)
+            if entry is not None:
+                stored_at, customer = entry
+                if now - stored_at <= self.ttl_seconds:
+                    self._data.move_to_end(api_key)
+                    self.hits += 1
+                    return customer
+                del self._data[api_key]
+                self.expired += 1
+            self.misses += 1
+            return None
+    
+    def put(self, api_key: str, customer: Customer) -> SimpleNamespace:
+        snapshot = SimpleNamespace(**{c.name: getattr(customer, c.name) for c in Customer.__table__.columns})
+        with self._lock:
+            self._data[api_key] = (time.monotonic(), snapshot)
+            self._data.move_to_end(api_key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+        return snapshot
+    
+    def invalidate(self, customer_id: Optional[str] = None, api_key: Optional[str] = None):
+        """Müşterinin (veya anahtarın) kayıtlarını sil; ikisi de yoksa tüm önbelleği boşalt"""
+        with self._lock:
+            if customer_id is None and api_key is None:
+                removed = len(self._data)
+                self._data.clear()
+            else:
+                keys = [k for k, (_, c) in self._data.items()
+                        if k == api_key or (customer_id is not None and c.customer_id == customer_id)]
+                for k in keys:
+                    del self._data[k]
+                removed = len(keys)
+            self.invalidations += removed
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "invalidations": self.invalidations,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+customer_cache = CustomerCache(settings.customer_cache_max_size, settings.customer_cache_ttl_seconds)
+
+
 def get_customer_by_api_key(api_key: str, db: Session) -> Customer:
-    customer = db.query(Customer).filter(Customer.api_key == api_key).first()
-    if not customer:
-        raise HTTPException(status_code=401, detail="Geçersiz API key")
+    """API key'in müşterisi (önbellekten; yoksa tek SELECT ve önbelleğe al)"""
+    customer = customer_cache.get(api_key)
+    if customer is None:
+        customer = db.query(Customer).filter(Customer.api_key == api_key).first()
+        if not customer:
+            raise HTTPException(status_code=401, detail="Geçersiz API key")
+        customer = customer_cache.put(api_key, customer)
     if not customer.is_active:
         raise HTTPException(status_code=401, detail="Hesap devre dışı")
     return customer
 
 
+# ==================== SAYFALAMA ====================
+#
+# Liste uç noktaları OFFSET yerine cursor (keyset) kullanır: sıralama anahtarı
+# (örn. tarih, id) son satırdan devam eder, derin sayfalar da tek indeks aralığıdır.
+# fields= ile yalnızca istenen kolonlar SELECT edilir.
+
+def _as_is(value):
+    return value
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+def _str_or_none(value):
+    return str(value) if value else None
+
+def _money(value):
+    return float(value) if value else 0
+
+
+def encode_cursor(values) -> str:
+    """Son satırın sıralama anahtarlarını opak cursor'a çevir"""
+    raw = json.dumps([v.isoformat() if isinstance(v, (date, datetime)) else str(v) for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, key_columns: list) -> list:
+    """
+    Cursor'ı anahtar kolonlarının Python tiplerine geri çevir
+    encode_cursor çıktısı dışındaki her biçim (liste olmayan JSON, eksik/fazla
+    anahtar, metin olmayan değer) 400 döner.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(key_columns) \
+                or not all(isinstance(value, str) for value in values):
+            raise ValueError(cursor)
+        parsed = []
+        for value, column in zip(values, key_columns):
+            python_type = column.type.python_type
+            if python_type is datetime:
+                parsed.append(datetime.fromisoformat(value))
+            elif python_type is date:
+                parsed.append(date.fromisoformat(value))
+            elif python_type is uuid.UUID:
+                parsed.append(uuid.UUID(value))
+            else:
+                parsed.append(python_type(value))
+        return parsed
+    except (ValueError, TypeError, AttributeError):
+        raise HTTPException(status_code=400, detail="Geçersiz cursor")
+
+
+def select_fields(fields: Optional[str], fields_map: Dict[str, tuple]) -> List[str]:
+    """fields=a,b,c parametresini doğrula (boşsa tüm alanlar)"""
+    if not fields:
+        return list(fields_map)
+    names = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in names if f not in fields_map]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Bilinmeyen alan(lar): {', '.join(unknown)}")
+    return names
+
+
+def keyset_page(query, fields_map: Dict[str, tuple], key_columns: list, descending: bool,
+                fields: Optional[str], after: Optional[str], limit: int) -> Tuple[List[Dict], Optional[str]]:
+    """
+    Filtrelenmiş sorgudan bir sayfa getir
+    fields_map: çıktı adı -> (kolon, biçimlendirici); key_columns: benzersiz sıralama anahtarı
+    Returns: (kayıtlar, next_cursor - son sayfada None)
+    """
+    names = select_fields(fields, fields_map)
+    columns = [fields_map[name][0] for name in names]
+    q = query.with_entities(*columns, *key_columns)
+    if after:
+        keys = tuple_(*key_columns)
+        values = tuple_(*decode_cursor(after, key_columns))
+        q = q.filter(keys < values if descending else keys > values)
+    q = q.order_by(*[c.desc() if descending else c.asc() for c in key_columns])
+    rows = q.limit(limit + 1).all()
+    
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    items = [
+        {name: fields_map[name][1](row[i]) for i, name in enumerate(names)}
+        for row in rows
+    ]
+    next_cursor = encode_cursor(rows[-1][len(columns):]) if has_more else None
+    return items, next_cursor
+
+
 # ==================== APP ====================
 
 app = FastAPI(
@@ -577,38 +786,41 @@ def login(request: LoginRequest, db: Session = Depends(get_db)):
 
 # ==================== WEB API - MEMBERS ====================
 
+WEB_MEMBER_FIELDS = {
+    "id": (Member.id, str),
+    "member_no": (Member.member_no, _as_is),
+    "full_name": (Member.full_name, _as_is),
+    "tc_no": (Member.tc_no, _as_is),
+    "phone": (Member.phone, _as_is),
+    "email": (Member.email, _as_is),
+    "status": (Member.status, _as_is),
+    "membership_type": (Member.membership_type, _as_is),
+    "join_date": (Member.join_date, _iso),
+}
+
 @app.get("/web/members")
 def get_members(
     status: str = "active",
+    after: Optional[str] = None,
+    limit: int = Query(settings.page_default_limit, ge=1, le=settings.page_max_limit),
+    fields: Optional[str] = None,
     api_key: str = Depends(verify_api_key),
     db: Session = Depends(get_db)
 ):
-    """Üye listesi"""
+    """Üye listesi (cursor sayfalı; count yalnızca ilk sayfada)"""
     customer = get_customer_by_api_key(api_key, db)
     
     query = db.query(Member).filter(Member.customer_id == customer.customer_id)
     if status != "all":
         query = query.filter(Member.status == status)
     
-    members = query.order_by(Member.full_name).all()
+    members, next_cursor = keyset_page(query, WEB_MEMBER_FIELDS, [Member.full_name, Member.id],
+                                       False, fields, after, limit)
     
-    return {
-        "members": [
-            {
-                "id": str(m.id),
-                "member_no": m.member_no,
-                "full_name": m.full_name,
-                "tc_no": m.tc_no,
-                "phone": m.phone,
-                "email": m.email,
-                "status": m.status,
-                "membership_type": m.membership_type,
-                "join_date": m.join_date.isoformat() if m.join_date else None
-            }
-            for m in members
-        ],
-        "count": len(members)
-    }
+    result = {"members": members, "next_cursor": next_cursor}
+    if not after:
+        result["count"] = query.with_entities(func.count(Member.id)).scalar()
+    return result
 
 @app.get("/web/members/{member_id}")
 def get_member(
@@ -740,38 +952,41 @@ def delete_member(
 
 # ==================== WEB API - INCOMES ====================
 
+WEB_INCOME_FIELDS = {
+    "id": (Income.id, str),
+    "category": (Income.category, _as_is),
+    "amount": (Income.amount, float),
+    "date": (Income.date, _iso),
+    "description": (Income.description, _as_is),
+    "receipt_no": (Income.receipt_no, _as_is),
+    "cash_account": (Income.cash_account, _as_is),
+    "member_id": (Income.member_id, _str_or_none),
+}
+
 @app.get("/web/incomes")
 def get_incomes(
     year: Optional[int] = None,
+    after: Optional[str] = None,
+    limit: int = Query(settings.page_default_limit, ge=1, le=settings.page_max_limit),
+    fields: Optional[str] = None,
     api_key: str = Depends(verify_api_key),
     db: Session = Depends(get_db)
 ):
-    """Gelir listesi"""
+    """Gelir listesi (cursor sayfalı; count/total yalnızca ilk sayfada, SQL ile)"""
     customer = get_customer_by_api_key(api_key, db)
     
     query = db.query(Income).filter(Income.customer_id == customer.customer_id)
     if year:
         query = query.filter(Income.fiscal_year == year)
     
-    incomes = query.order_by(Income.date.desc()).all()
+    incomes, next_cursor = keyset_page(query, WEB_INCOME_FIELDS, [Income.date, Income.id],
+                                       True, fields, after, limit)
     
-    return {
-        "incomes": [
-            {
-                "id": str(i.id),
-                "category": i.category,
-                "amount": float(i.amount),
-                "date": i.date.isoformat(),
-                "description": i.description,
-                "receipt_no": i.receipt_no,
-                "cash_account": i.cash_account,
-                "member_id": str(i.member_id) if i.member_id else None
-            }
-            for i in incomes
-        ],
-        "count": len(incomes),
-        "total": sum(float(i.amount) for i in incomes)
-    }
+    result = {"incomes": incomes, "next_cursor": next_cursor}
+    if not after:
+        count, total = query.with_entities(func.count(Income.id), func.coalesce(func.sum(Income.amount), 0)).one()
+        result.update(count=count, total=float(total))
+    return result
 
 @app.post("/web/incomes")
 def create_income(
@@ -802,38 +1017,41 @@ def create_income(
 
 # ==================== WEB API - EXPENSES ====================
 
+WEB_EXPENSE_FIELDS = {
+    "id": (Expense.id, str),
+    "category": (Expense.category, _as_is),
+    "amount": (Expense.amount, float),
+    "date": (Expense.date, _iso),
+    "description": (Expense.description, _as_is),
+    "invoice_no": (Expense.invoice_no, _as_is),
+    "vendor": (Expense.vendor, _as_is),
+    "cash_account": (Expense.cash_account, _as_is),
+}
+
 @app.get("/web/expenses")
 def get_expenses(
     year: Optional[int] = None,
+    after: Optional[str] = None,
+    limit: int = Query(settings.page_default_limit, ge=1, le=settings.page_max_limit),
+    fields: Optional[str] = None,
     api_key: str = Depends(verify_api_key),
     db: Session = Depends(get_db)
 ):
-    """Gider listesi"""
+    """Gider listesi (cursor sayfalı; count/total yalnızca ilk sayfada, SQL ile)"""
     customer = get_customer_by_api_key(api_key, db)
     
     query = db.query(Expense).filter(Expense.customer_id == customer.customer_id)
     if year:
         query = query.filter(Expense.fiscal_year == year)
     
-    expenses = query.order_by(Expense.date.desc()).all()
+    expenses, next_cursor = keyset_page(query, WEB_EXPENSE_FIELDS, [Expense.date, Expense.id],
+                                        True, fields, after, limit)
     
-    return {
-        "expenses": [
-            {
-                "id": str(e.id),
-                "category": e.category,
-                "amount": float(e.amount),
-                "date": e.date.isoformat(),
-                "description": e.description,
-                "invoice_no": e.invoice_no,
-                "vendor": e.vendor,
-                "cash_account": e.cash_account
-            }
-            for e in expenses
-        ],
-        "count": len(expenses),
-        "total": sum(float(e.amount) for e in expenses)
-    }
+    result = {"expenses": expenses, "next_cursor": next_cursor}
+    if not after:
+        count, total = query.with_entities(func.count(Expense.id), func.coalesce(func.sum(Expense.amount), 0)).one()
+        result.update(count=count, total=float(total))
+    return result
 
 @app.post("/web/expenses")
 def create_expense(
@@ -969,36 +1187,18 @@ def get_dashboard(
     api_key: str = Depends(verify_api_key),
     db: Session = Depends(get_db)
 ):
-    """Dashboard özet verileri"""
+    """Dashboard özet verileri (tenant_stats)"""
     customer = get_customer_by_api_key(api_key, db)
-    cid = customer.customer_id
-    
-    # İstatistikler
-    total_members = db.query(Member).filter(Member.customer_id == cid, Member.status == 'active').count()
-    
     current_year = date.today().year
-    total_income = db.query(Income).filter(
-        Income.customer_id == cid, 
-        Income.fiscal_year == current_year
-    ).with_entities(func.sum(Income.amount)).scalar() or 0
-    
-    total_expense = db.query(Expense).filter(
-        Expense.customer_id == cid,
-        Expense.fiscal_year == current_year
-    ).with_entities(func.sum(Expense.amount)).scalar() or 0
-    
-    pending_dues = db.query(Due).filter(
-        Due.customer_id == cid,
-        Due.status.in_(['pending', 'partial'])
-    ).count()
+    general, yearly = tenant_stats_rows(db, customer.customer_id, current_year)
     
     return {
         "stats": {
-            "total_members": total_members,
-            "total_income": float(total_income),
-            "total_expense": float(total_expense),
-            "balance": float(total_income - total_expense),
-            "pending_dues": pending_dues,
+            "total_members": general["active_member_count"],
+            "total_income": yearly["income_total"],
+            "total_expense": yearly["expense_total"],
+            "balance": yearly["income_total"] - yearly["expense_total"],
+            "pending_dues": general["dues_open_count"],
             "year": current_year
         },
         "organization": {
@@ -1119,47 +1319,50 @@ if __name__ == "__main__":
 
 # ==================== DB API - DESKTOP İÇİN TAM CRUD ====================
 
+DB_UYE_ALANLARI = {
+    "uye_id": (Member.id, str),
+    "uye_no": (Member.member_no, _as_is),
+    "ad_soyad": (Member.full_name, _as_is),
+    "tc_kimlik": (Member.tc_no, _as_is),
+    "telefon": (Member.phone, _as_is),
+    "telefon2": (Member.phone2, _as_is),
+    "email": (Member.email, _as_is),
+    "adres": (Member.address, _as_is),
+    "il": (Member.city, _as_is),
+    "ilce": (Member.district, _as_is),
+    "dogum_tarihi": (Member.birth_date, _iso),
+    "cinsiyet": (Member.gender, _as_is),
+    "meslek": (Member.occupation, _as_is),
+    "uyelik_tipi": (Member.membership_type, _as_is),
+    "ozel_aidat_tutari": (Member.membership_fee, _money),
+    "durum": (Member.status, lambda v: v.capitalize() if v else 'Aktif'),
+    "notlar": (Member.notes, _as_is),
+}
+
 @app.get("/db/uyeler")
 def db_get_members(
     durum: str = "Aktif",
     dahil_ayrilan: bool = False,
+    after: Optional[str] = None,
+    limit: int = Query(settings.page_default_limit, ge=1, le=settings.page_max_limit),
+    fields: Optional[str] = None,
     api_key: str = Depends(verify_api_key),
     db: Session = Depends(get_db)
 ):
-    """Desktop için üye listesi"""
+    """Desktop için üye listesi (cursor sayfalı, next_cursor bitene kadar okunur)"""
     customer = get_customer_by_api_key(api_key, db)
     
     query = db.query(Member).filter(Member.customer_id == customer.customer_id)
     if durum and not dahil_ayrilan:
         query = query.filter(Member.status == durum.lower())
     
-    members = query.order_by(Member.full_name).all()
+    members, next_cursor = keyset_page(query, DB_UYE_ALANLARI, [Member.full_name, Member.id],
+                                       False, fields, after, limit)
     
-    return {
-        "success": True,
-        "data": [
-            {
-                "uye_id": str(m.id),
-                "uye_no": m.member_no,
-                "ad_soyad": m.full_name,
-                "tc_kimlik": m.tc_no,
-                "telefon": m.phone,
-                "telefon2": m.phone2,
-                "email": m.email,
-                "adres": m.address,
-                "il": m.city,
-                "ilce": m.district,
-                "dogum_tarihi": m.birth_date.isoformat() if m.birth_date else None,
-                "cinsiyet": m.gender,
-                "meslek": m.occupation,
-                "uyelik_tipi": m.membership_type,
-                "ozel_aidat_tutari": float(m.membership_fee) if m.membership_fee else 0,
-                "durum": m.status.capitalize() if m.status else 'Aktif',
-                "notlar": m.notes
-            }
-            for m in members
-        ]
-    }
+    result = {"success": True, "data": members, "next_cursor": next_cursor}
+    if not after:
+        result["adet"] = query.with_entities(func.count(Member.id)).scalar()
+    return result
 
 @app.get("/db/uyeler/{uye_id}")
 def db_get_member(
@@ -1334,16 +1537,29 @@ def db_create_cash_account(
     return {"success": True, "kasa_id": str(account.id)}
 
 
+DB_GELIR_ALANLARI = {
+    "gelir_id": (Income.id, str),
+    "tarih": (Income.date, _iso),
+    "gelir_turu": (Income.category, _as_is),
+    "aciklama": (Income.description, _as_is),
+    "tutar": (Income.amount, float),
+    "kasa_id": (Income.cash_account, str),
+    "dekont_no": (Income.receipt_no, _as_is),
+}
+
 @app.get("/db/gelirler")
 def db_get_incomes(
     baslangic_tarih: Optional[str] = None,
     bitis_tarih: Optional[str] = None,
     gelir_turu: Optional[str] = None,
     kasa_id: Optional[str] = None,
+    after: Optional[str] = None,
+    limit: int = Query(settings.page_default_limit, ge=1, le=settings.page_max_limit),
+    fields: Optional[str] = None,
     api_key: str = Depends(verify_api_key),
     db: Session = Depends(get_db)
 ):
-    """Desktop için gelir listesi"""
+    """Desktop için gelir listesi (cursor sayfalı, adet/toplam_tutar yalnızca ilk sayfada)"""
     customer = get_customer_by_api_key(api_key, db)
     
     query = db.query(Income).filter(Income.customer_id == customer.customer_id)
@@ -1355,23 +1571,14 @@ def db_get_incomes(
     if gelir_turu:
         query = query.filter(Income.category == gelir_turu)
     
-    incomes = query.order_by(Income.date.desc()).all()
+    kayitlar, next_cursor = keyset_page(query, DB_GELIR_ALANLARI, [Income.date, Income.id],
+                                        True, fields, after, limit)
     
-    return {
-        "success": True,
-        "gelirler": [
-            {
-                "gelir_id": str(i.id),
-                "tarih": i.date.isoformat(),
-                "gelir_turu": i.category,
-                "aciklama": i.description,
-                "tutar": float(i.amount),
-                "kasa_id": str(i.cash_account),
-                "dekont_no": i.receipt_no
-            }
-            for i in incomes
-        ]
-    }
+    result = {"success": True, "gelirler": kayitlar, "next_cursor": next_cursor}
+    if not after:
+        adet, toplam = query.with_entities(func.count(Income.id), func.coalesce(func.sum(Income.amount), 0)).one()
+        result.update(adet=adet, toplam_tutar=float(toplam))
+    return result
 
 @app.post("/db/gelirler")
 def db_create_income(
@@ -1399,16 +1606,29 @@ def db_create_income(
     return {"success": True, "gelir_id": str(income.id)}
 
 
+DB_GIDER_ALANLARI = {
+    "gider_id": (Expense.id, str),
+    "tarih": (Expense.date, _iso),
+    "gider_turu": (Expense.category, _as_is),
+    "aciklama": (Expense.description, _as_is),
+    "tutar": (Expense.amount, float),
+    "kasa_id": (Expense.cash_account, str),
+    "fatura_no": (Expense.invoice_no, _as_is),
+}
+
 @app.get("/db/giderler")
 def db_get_expenses(
     baslangic_tarih: Optional[str] = None,
     bitis_tarih: Optional[str] = None,
     gider_turu: Optional[str] = None,
     kasa_id: Optional[str] = None,
+    after: Optional[str] = None,
+    limit: int = Query(settings.page_default_limit, ge=1, le=settings.page_max_limit),
+    fields: Optional[str] = None,
     api_key: str = Depends(verify_api_key),
     db: Session = Depends(get_db)
 ):
-    """Desktop için gider listesi"""
+    """Desktop için gider listesi (cursor sayfalı, adet/toplam_tutar yalnızca ilk sayfada)"""
     customer = get_customer_by_api_key(api_key, db)
     
     query = db.query(Expense).filter(Expense.customer_id == customer.customer_id)
@@ -1420,23 +1640,14 @@ def db_get_expenses(
     if gider_turu:
         query = query.filter(Expense.category == gider_turu)
     
-    expenses = query.order_by(Expense.date.desc()).all()
+    kayitlar, next_cursor = keyset_page(query, DB_GIDER_ALANLARI, [Expense.date, Expense.id],
+                                        True, fields, after, limit)
     
-    return {
-        "success": True,
-        "giderler": [
-            {
-                "gider_id": str(e.id),
-                "tarih": e.date.isoformat(),
-                "gider_turu": e.category,
-                "aciklama": e.description,
-                "tutar": float(e.amount),
-                "kasa_id": str(e.cash_account),
-                "fatura_no": e.invoice_no
-            }
-            for e in expenses
-        ]
-    }
+    result = {"success": True, "giderler": kayitlar, "next_cursor": next_cursor}
+    if not after:
+        adet, toplam = query.with_entities(func.count(Expense.id), func.coalesce(func.sum(Expense.amount), 0)).one()
+        result.update(adet=adet, toplam_tutar=float(toplam))
+    return result
 
 @app.post("/db/giderler")
 def db_create_expense(
@@ -1560,37 +1771,43 @@ class SuperAdminAuth:
         return True
 
 
+ADMIN_CUSTOMER_FIELDS = {
+    "id": (Customer.id, str),
+    "customer_id": (Customer.customer_id, _as_is),
+    "api_key": (Customer.api_key, _as_is),
+    "name": (Customer.name, _as_is),
+    "email": (Customer.email, _as_is),
+    "phone": (Customer.phone, _as_is),
+    "plan": (Customer.plan, _as_is),
+    "license_mode": (Customer.license_mode, _as_is),
+    "max_users": (Customer.max_users, _as_is),
+    "max_members": (Customer.max_members, _as_is),
+    "is_active": (Customer.is_active, _as_is),
+    "expires_at": (Customer.expires_at, _iso),
+    "features": (Customer.features, _as_is),
+    "last_seen_at": (Customer.last_seen_at, _iso),
+    "created_at": (Customer.created_at, _iso),
+}
+
 @app.get("/admin/customers")
 def admin_list_customers(
+    after: Optional[str] = None,
+    limit: int = Query(settings.page_default_limit, ge=1, le=settings.page_max_limit),
+    fields: Optional[str] = None,
     _: bool = Depends(SuperAdminAuth.verify),
     db: Session = Depends(get_db)
 ):
-    """Tüm müşterileri listele"""
-    customers = db.query(Customer).order_by(Customer.created_at.desc()).all()
+    """Tüm müşterileri listele (en yeni önce, cursor sayfalı; total yalnızca ilk sayfada)"""
+    query = db.query(Customer)
+    # created_at NULL olabilir; cursor karşılaştırması için sabit bir alt değere çekilir
+    created_key = func.coalesce(Customer.created_at, datetime(1970, 1, 1))
+    customers, next_cursor = keyset_page(query, ADMIN_CUSTOMER_FIELDS, [created_key, Customer.id],
+                                         True, fields, after, limit)
     
-    return {
-        "customers": [
-            {
-                "id": str(c.id),
-                "customer_id": c.customer_id,
-                "api_key": c.api_key,
-                "name": c.name,
-                "email": c.email,
-                "phone": c.phone,
-                "plan": c.plan,
-                "license_mode": c.license_mode,
-                "max_users": c.max_users,
-                "max_members": c.max_members,
-                "is_active": c.is_active,
-                "expires_at": c.expires_at.isoformat() if c.expires_at else None,
-                "features": c.features,
-                "last_seen_at": c.last_seen_at.isoformat() if c.last_seen_at else None,
-                "created_at": c.created_at.isoformat() if c.created_at else None
-            }
-            for c in customers
-        ],
-        "total": len(customers)
-    }
+    result = {"customers": customers, "next_cursor": next_cursor}
+    if not after:
+        result["total"] = query.with_entities(func.count(Customer.id)).scalar()
+    return result
 
 @app.post("/admin/customers")
 def admin_create_customer(
@@ -1647,6 +1864,7 @@ def admin_update_customer(
             setattr(customer, key, value)
     
     db.commit()
+    customer_cache.invalidate(customer_id=customer_id)
     return {"success": True}
 
 @app.delete("/admin/customers/{customer_id}")
@@ -1662,6 +1880,7 @@ def admin_delete_customer(
     
     db.delete(customer)
     db.commit()
+    customer_cache.invalidate(customer_id=customer_id)
     return {"success": True}
 
 @app.get("/admin/stats")
@@ -1669,33 +1888,46 @@ def admin_stats(
     _: bool = Depends(SuperAdminAuth.verify),
     db: Session = Depends(get_db)
 ):
-    """Admin istatistikleri"""
-    total_customers = db.query(Customer).count()
-    active_customers = db.query(Customer).filter(Customer.is_active == True).count()
-    total_members = db.query(Member).count()
-    total_incomes = db.query(Income).count()
-    total_expenses = db.query(Expense).count()
-    
-    # Mod istatistikleri
-    local_mode = db.query(Customer).filter(Customer.license_mode == 'local').count()
-    internet_mode = db.query(Customer).filter(Customer.license_mode == 'internet').count()
-    hybrid_mode = db.query(Customer).filter(Customer.license_mode == 'hybrid').count()
+    """Admin istatistikleri (müşteriler tek GROUP BY, kayıt sayıları tenant_stats toplamı)"""
+    total_customers = active_customers = 0
+    modes = {"local": 0, "internet": 0, "hybrid": 0}
+    for mode, is_active, count in db.query(
+        Customer.license_mode, Customer.is_active, func.count(Customer.id)
+    ).group_by(Customer.license_mode, Customer.is_active):
+        total_customers += count
+        if is_active:
+            active_customers += count
+        if mode in modes:
+            modes[mode] += count
+    
+    total_members, total_incomes, total_expenses = db.query(
+        func.coalesce(func.sum(TenantStats.member_count), 0),
+        func.coalesce(func.sum(TenantStats.income_count), 0),
+        func.coalesce(func.sum(TenantStats.expense_count), 0)
+    ).one()
     
     return {
         "stats": {
             "total_customers": total_customers,
             "active_customers": active_customers,
-            "total_members": total_members,
-            "total_incomes": total_incomes,
-            "total_expenses": total_expenses,
-            "license_modes": {
-                "local": local_mode,
-                "internet": internet_mode,
-                "hybrid": hybrid_mode
-            }
-        }
+            "total_members": int(total_members),
+            "total_incomes": int(total_incomes),
+            "total_expenses": int(total_expenses),
+            "license_modes": modes
+        },
+        "customer_cache": customer_cache.stats()
     }
 
+@app.post("/admin/tenant-stats/reconcile")
+def admin_reconcile_tenant_stats(
+    customer_id: Optional[str] = None,
+    _: bool = Depends(SuperAdminAuth.verify),
+    db: Session = Depends(get_db)
+):
+    """tenant_stats sayaçlarını kaynak tablolardan yeniden hesapla"""
+    corrected = reconcile_tenant_stats(db, customer_id)
+    return {"success": True, "corrected": corrected}
+
 @app.put("/admin/customers/{customer_id}/mode")
 def admin_set_customer_mode(
     customer_id: str,
@@ -1714,6 +1946,7 @@ def admin_set_customer_mode(
     
     customer.license_mode = mode
     db.commit()
+    customer_cache.invalidate(customer_id=customer_id)
     
     return {
         "success": True, 
@@ -1736,6 +1969,7 @@ def admin_reset_api_key(
     new_api_key = f"bader_{secrets.token_hex(16)}"
     customer.api_key = new_api_key
     db.commit()
+    customer_cache.invalidate(customer_id=customer_id)
     
     return {"success": True, "new_api_key": new_api_key}
 
@@ -2532,52 +2766,28 @@ def web_generate_assessment_report(
     """Tahakkuk raporu oluştur"""
     customer = get_customer_by_api_key(api_key, db)
     year = data.get("year", datetime.now().year)
-    
-    # Üye sayısı
-    members = db.query(Member).filter(
-        Member.customer_id == customer.customer_id,
-        Member.status == 'active'
-    ).all()
-    member_count = len(members)
-    
-    # Tahakkuk hesapla
-    total_assessed = sum([float(m.membership_fee or 0) * 12 for m in members])
-    
-    # Tahsilat hesapla
-    total_collected = db.query(Due).filter(
-        Due.customer_id == customer.customer_id,
-        Due.year == year
-    ).with_entities(func.sum(Due.paid_amount)).scalar() or 0
-    
-    total_remaining = total_assessed - float(total_collected)
-    collection_rate = (float(total_collected) / total_assessed * 100) if total_assessed > 0 else 0
+    summary = report_assessment(db, customer.customer_id, year)
     
     report = AssessmentReport(
         customer_id=customer.customer_id,
         year=year,
         report_date=date.today(),
-        total_assessed=total_assessed,
-        total_collected=total_collected,
-        total_remaining=total_remaining,
-        member_count=member_count,
-        collection_rate=collection_rate,
+        total_assessed=summary["total_assessed"],
+        total_collected=summary["total_collected"],
+        total_remaining=summary["total_remaining"],
+        member_count=summary["member_count"],
+        collection_rate=summary["collection_rate"],
         details={"generated_at": datetime.now().isoformat()}
     )
     db.add(report)
     db.commit()
     db.refresh(report)
     
+    summary["collection_rate"] = round(summary["collection_rate"], 2)
     return {
         "success": True,
         "report_id": str(report.id),
-        "summary": {
-            "year": year,
-            "member_count": member_count,
-            "total_assessed": float(total_assessed),
-            "total_collected": float(total_collected),
-            "total_remaining": float(total_remaining),
-            "collection_rate": round(collection_rate, 2)
-        }
+        "summary": summary
     }
 
 
@@ -2860,43 +3070,37 @@ def web_search(
     return results
 
 
-# ==================== REPORTS (RAPORLAR) API ====================
-
-@app.get("/web/reports/income-expense")
-def web_report_income_expense(
-    year: Optional[int] = None,
-    start_date: Optional[str] = None,
-    end_date: Optional[str] = None,
-    api_key: str = Depends(verify_api_key),
-    db: Session = Depends(get_db)
-):
-    """Gelir-Gider raporu"""
-    customer = get_customer_by_api_key(api_key, db)
-    year = year or datetime.now().year
-    
-    incomes = db.query(Income).filter(
-        Income.customer_id == customer.customer_id,
-        Income.fiscal_year == year
-    ).all()
-    
-    expenses = db.query(Expense).filter(
-        Expense.customer_id == customer.customer_id,
-        Expense.fiscal_year == year
-    ).all()
-    
-    income_by_category = {}
-    for i in incomes:
-        cat = i.category or "Diğer"
-        income_by_category[cat] = income_by_category.get(cat, 0) + float(i.amount or 0)
-    
-    expense_by_category = {}
-    for e in expenses:
-        cat = e.category or "Diğer"
-        expense_by_category[cat] = expense_by_category.get(cat, 0) + float(e.amount or 0)
-    
+# ==================== RAPOR SORGULARI ====================
+#
+# Raporlar ORM nesnelerini yüklemez: gruplama ve toplama veritabanında yapılır
+# (GROUP BY + func.sum/count); Python'a yalnızca grup başına bir satır gelir.
+# İndeksler: schema.sql "RAPOR İNDEKSLERİ"
+
+def _category_totals(db: Session, model, customer_id: str, year: int) -> Tuple[Dict[str, float], int]:
+    """Kategori -> tutar toplamı ve kayıt adedi (tek GROUP BY)"""
+    rows = db.query(
+        model.category,
+        func.coalesce(func.sum(model.amount), 0),
+        func.count(model.id)
+    ).filter(
+        model.customer_id == customer_id,
+        model.fiscal_year == year
+    ).group_by(model.category).all()
+    
+    totals: Dict[str, float] = {}
+    for category, total, _ in rows:
+        # NULL ve boş kategori aynı grupta (eski `category or "Diğer"` davranışı)
+        label = category or "Diğer"
+        totals[label] = totals.get(label, 0) + float(total)
+    return totals, sum(count for _, _, count in rows)
+
+
+def report_income_expense(db: Session, customer_id: str, year: int) -> Dict[str, Any]:
+    """Yıllık gelir-gider özeti (kategori kırılımlı)"""
+    income_by_category, income_count = _category_totals(db, Income, customer_id, year)
+    expense_by_category, expense_count = _category_totals(db, Expense, customer_id, year)
     total_income = sum(income_by_category.values())
     total_expense = sum(expense_by_category.values())
-    
     return {
         "year": year,
         "total_income": total_income,
@@ -2904,38 +3108,41 @@ def web_report_income_expense(
         "balance": total_income - total_expense,
         "income_by_category": income_by_category,
         "expense_by_category": expense_by_category,
-        "income_count": len(incomes),
-        "expense_count": len(expenses)
+        "income_count": income_count,
+        "expense_count": expense_count
     }
 
-@app.get("/web/reports/members")
-def web_report_members(
-    api_key: str = Depends(verify_api_key),
-    db: Session = Depends(get_db)
-):
-    """Üye raporu"""
-    customer = get_customer_by_api_key(api_key, db)
-    members = db.query(Member).filter(
-        Member.customer_id == customer.customer_id
-    ).all()
-    
-    active = len([m for m in members if m.status == 'active'])
-    inactive = len([m for m in members if m.status == 'inactive'])
-    
-    by_type = {}
-    for m in members:
-        t = m.membership_type or "Belirsiz"
-        by_type[t] = by_type.get(t, 0) + 1
-    
-    by_gender = {}
-    for m in members:
-        g = m.gender or "Belirsiz"
-        by_gender[g] = by_gender.get(g, 0) + 1
-    
-    total_fees = sum([float(m.membership_fee or 0) for m in members if m.status == 'active'])
+
+def report_members(db: Session, customer_id: str) -> Dict[str, Any]:
+    """Üye dağılımı: (durum, tip, cinsiyet) gruplarından tek sorguda"""
+    rows = db.query(
+        Member.status,
+        Member.membership_type,
+        Member.gender,
+        func.count(Member.id),
+        func.coalesce(func.sum(Member.membership_fee), 0)
+    ).filter(
+        Member.customer_id == customer_id
+    ).group_by(Member.status, Member.membership_type, Member.gender).all()
+    
+    total = active = inactive = 0
+    total_fees = 0.0
+    by_type: Dict[str, int] = {}
+    by_gender: Dict[str, int] = {}
+    for status, mtype, mgender, count, fees in rows:
+        total += count
+        if status == 'active':
+            active += count
+            total_fees += float(fees)
+        elif status == 'inactive':
+            inactive += count
+        mtype = mtype or "Belirsiz"
+        mgender = mgender or "Belirsiz"
+        by_type[mtype] = by_type.get(mtype, 0) + count
+        by_gender[mgender] = by_gender.get(mgender, 0) + count
     
     return {
-        "total": len(members),
+        "total": total,
         "active": active,
         "inactive": inactive,
         "by_type": by_type,
@@ -2944,45 +3151,426 @@ def web_report_members(
         "total_yearly_fees": total_fees * 12
     }
 
-@app.get("/web/reports/dues")
-def web_report_dues(
-    year: Optional[int] = None,
-    api_key: str = Depends(verify_api_key),
-    db: Session = Depends(get_db)
-):
-    """Aidat raporu"""
-    customer = get_customer_by_api_key(api_key, db)
-    year = year or datetime.now().year
-    
-    dues = db.query(Due).filter(
-        Due.customer_id == customer.customer_id,
+
+def report_dues(db: Session, customer_id: str, year: int) -> Dict[str, Any]:
+    """Yıllık aidat tahsilat özeti: (ay, durum) gruplarından tek sorguda"""
+    rows = db.query(
+        Due.month,
+        Due.status,
+        func.count(Due.id),
+        func.coalesce(func.sum(Due.amount), 0),
+        func.coalesce(func.sum(Due.paid_amount), 0)
+    ).filter(
+        Due.customer_id == customer_id,
         Due.year == year
-    ).all()
-    
-    total_amount = sum([float(d.amount or 0) for d in dues])
-    total_paid = sum([float(d.paid_amount or 0) for d in dues])
-    total_remaining = total_amount - total_paid
-    
-    paid_count = len([d for d in dues if d.status == 'paid'])
-    pending_count = len([d for d in dues if d.status == 'pending'])
-    
-    by_month = {}
-    for d in dues:
-        by_month[d.month] = by_month.get(d.month, {"amount": 0, "paid": 0})
-        by_month[d.month]["amount"] += float(d.amount or 0)
-        by_month[d.month]["paid"] += float(d.paid_amount or 0)
+    ).group_by(Due.month, Due.status).order_by(Due.month).all()
+    
+    total_amount = total_paid = 0.0
+    paid_count = pending_count = 0
+    by_month: Dict[int, Dict[str, float]] = {}
+    for month, status, count, amount, paid in rows:
+        total_amount += float(amount)
+        total_paid += float(paid)
+        if status == 'paid':
+            paid_count += count
+        elif status == 'pending':
+            pending_count += count
+        bucket = by_month.setdefault(month, {"amount": 0, "paid": 0})
+        bucket["amount"] += float(amount)
+        bucket["paid"] += float(paid)
     
     return {
         "year": year,
         "total_amount": total_amount,
         "total_paid": total_paid,
-        "total_remaining": total_remaining,
+        "total_remaining": total_amount - total_paid,
         "collection_rate": round((total_paid / total_amount * 100) if total_amount > 0 else 0, 2),
         "paid_count": paid_count,
         "pending_count": pending_count,
         "by_month": by_month
     }
 
+
+def report_assessment(db: Session, customer_id: str, year: int) -> Dict[str, Any]:
+    """Tahakkuk özeti: aktif üye sayısı, yıllık tahakkuk ve tahsilat"""
+    member_count, monthly_fees = db.query(
+        func.count(Member.id),
+        func.coalesce(func.sum(Member.membership_fee), 0)
+    ).filter(
+        Member.customer_id == customer_id,
+        Member.status == 'active'
+    ).one()
+    total_collected = float(db.query(func.coalesce(func.sum(Due.paid_amount), 0)).filter(
+        Due.customer_id == customer_id,
+        Due.year == year
+    ).scalar())
+    total_assessed = float(monthly_fees) * 12
+    return {
+        "year": year,
+        "member_count": member_count,
+        "total_assessed": total_assessed,
+        "total_collected": total_collected,
+        "total_remaining": total_assessed - total_collected,
+        "collection_rate": (total_collected / total_assessed * 100) if total_assessed > 0 else 0
+    }
+
+
+# ==================== KİRACI ÖZETİ (tenant_stats) ====================
+#
+# Member/Income/Expense/Due yazan her flush, aynı transaction içinde ilgili
+# (customer_id, year) satırlarına artımlı UPSERT yapar (before_flush). Böylece
+# tüm yazma uç noktaları (sync dahil) kapsanır. Periyodik mutabakat
+# (reconcile_tenant_stats) kiracı başına sayaçları kaynak tablolarla
+# karşılaştırır ve yalnızca sapan satırları düzeltir.
+
+TENANT_STAT_COLUMNS = (
+    "member_count", "active_member_count",
+    "income_total", "income_count",
+    "expense_total", "expense_count",
+    "dues_assessed", "dues_collected", "dues_open_count",
+)
+OPEN_DUE_STATUSES = ('pending', 'partial')
+_STAT_ATTRIBUTES = {
+    Member: ("customer_id", "status"),
+    Income: ("customer_id", "fiscal_year", "amount"),
+    Expense: ("customer_id", "fiscal_year", "amount"),
+    Due: ("customer_id", "year", "amount", "paid_amount", "status"),
+}
+
+
+def _decimal(value) -> Decimal:
+    return Decimal(str(value)) if value is not None else Decimal(0)
+
+
+def _stat_contribution(model, values: Dict[str, Any], sign: int) -> List[Tuple[str, int, Dict[str, Any]]]:
+    """Tek kaydın tenant_stats katkısı: [(customer_id, year, {kolon: delta})]"""
+    cid = values["customer_id"]
+    if model is Member:
+        return [(cid, 0, {"member_count": sign,
+                          "active_member_count": sign if values["status"] == 'active' else 0})]
+    if model in (Income, Expense):
+        prefix = "income" if model is Income else "expense"
+        return [(cid, values["fiscal_year"] or 0, {f"{prefix}_total": sign * _decimal(values["amount"]),
+                                                   f"{prefix}_count": sign})]
+    return [
+        (cid, values["year"], {"dues_assessed": sign * _decimal(values["amount"]),
+                               "dues_collected": sign * _decimal(values["paid_amount"])}),
+        (cid, 0, {"dues_open_count": sign if values["status"] in OPEN_DUE_STATUSES else 0}),
+    ]
+
+
+def _stat_values(obj, attrs) -> Dict[str, Any]:
+    """Kaydın flush sonrası değerleri (yeni kayıtta kolon varsayılanı)"""
+    values = {}
+    for attr in attrs:
+        value = getattr(obj, attr)
+        if value is None:
+            default = obj.__table__.c[attr].default
+            if default is not None and default.is_scalar:
+                value = default.arg
+        values[attr] = value
+    return values
+
+
+def _persisted_values(session: Session, objs) -> Dict[Any, Dict[str, Any]]:
+    """Değişen/silinen kayıtların veritabanındaki (eski) değerleri, model başına tek SELECT
+    (commit sonrası expire edilmiş nesnelerde attribute history eski değeri bilmez)"""
+    by_model: Dict[Any, List[Any]] = {}
+    for obj in objs:
+        by_model.setdefault(type(obj), []).append(inspect(obj).identity[0])
+    values = {}
+    for model, ids in by_model.items():
+        attrs = _STAT_ATTRIBUTES[model]
+        for row in session.execute(select(model.id, *[getattr(model, a) for a in attrs]).where(model.id.in_(ids))):
+            values[(model, row[0])] = dict(zip(attrs, row[1:]))
+    return values
+
+
+def _dialect_insert(session: Session):
+    return postgresql.insert if session.bind.dialect.name == "postgresql" else sqlite.insert
+
+
+def apply_tenant_stats(session: Session, deltas: List[Tuple[str, int, Dict[str, Any]]]):
+    """Deltaları (customer_id, year) başına birleştirip tek UPSERT ile uygula"""
+    merged: Dict[Tuple[str, int], Dict[str, Any]] = {}
+    for cid, year, changes in deltas:
+        bucket = merged.setdefault((cid, year), {})
+        for column, value in changes.items():
+            bucket[column] = bucket.get(column, 0) + value
+    
+    insert_fn = _dialect_insert(session)
+    now = datetime.utcnow()
+    for (cid, year), changes in merged.items():
+        changes = {k: v for k, v in changes.items() if v}
+        if not changes:
+            continue
+        stmt = insert_fn(TenantStats).values(customer_id=cid, year=year, updated_at=now, **changes)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[TenantStats.customer_id, TenantStats.year],
+            set_={**{k: getattr(TenantStats, k) + stmt.excluded[k] for k in changes},
+                  "updated_at": stmt.excluded.updated_at}
+        )
+        session.execute(stmt)
+
+
+@event.listens_for(SessionLocal, "before_flush")
+def _track_tenant_stats(session: Session, flush_context, instances):
+    """Flush edilecek değişikliklerden tenant_stats deltalarını çıkar"""
+    deltas = []
+    for obj in session.new:
+        attrs = _STAT_ATTRIBUTES.get(type(obj))
+        if attrs:
+            deltas += _stat_contribution(type(obj), _stat_values(obj, attrs), 1)
+    
+    dirty = [o for o in session.dirty if type(o) in _STAT_ATTRIBUTES and session.is_modified(o)]
+    deleted = [o for o in session.deleted if type(o) in _STAT_ATTRIBUTES]
+    if not dirty and not deleted:
+        if deltas:
+            apply_tenant_stats(session, deltas)
+        return
+    persisted = _persisted_values(session, dirty + deleted)
+    
+    for obj in dirty:
+        old = persisted.get((type(obj), inspect(obj).identity[0]))
+        if old:
+            deltas += _stat_contribution(type(obj), old, -1)
+        deltas += _stat_contribution(type(obj), _stat_values(obj, _STAT_ATTRIBUTES[type(obj)]), 1)
+    for obj in deleted:
+        old = persisted.get((type(obj), inspect(obj).identity[0]))
+        if not old:
+            continue
+        deltas += _stat_contribution(type(obj), old, -1)
+        if type(obj) is Member:
+            # Üyenin aidatları veritabanında CASCADE ile silinir; ORM görmez
+            for year, amount, paid, open_count in session.query(
+                Due.year,
+                func.coalesce(func.sum(Due.amount), 0),
+                func.coalesce(func.sum(Due.paid_amount), 0),
+                func.count(case((Due.status.in_(OPEN_DUE_STATUSES), 1)))
+            ).filter(Due.member_id == obj.id).group_by(Due.year):
+                deltas += [(obj.customer_id, year, {"dues_assessed": -_decimal(amount),
+                                                    "dues_collected": -_decimal(paid)}),
+                           (obj.customer_id, 0, {"dues_open_count": -open_count})]
+    if deltas:
+        apply_tenant_stats(session, deltas)
+
+
+def _stats_select(model, year, where, group_by, **aggregates):
+    """Mutabakat için kaynak tablodan tenant_stats biçiminde grup satırları"""
+    columns = [model.customer_id.label("customer_id"), year.label("year")]
+    columns += [aggregates.get(name, literal(0)).label(name) for name in TENANT_STAT_COLUMNS]
+    return select(*columns).where(*where).group_by(model.customer_id, *group_by)
+
+
+def _expected_tenant_stats(db: Session, customer_id: str) -> Dict[int, Dict[str, Any]]:
+    """Kiracının kaynak tablolardan hesaplanan sayaçları: {year: {kolon: değer}} (tek sorgu)"""
+    def scope(model):
+        return [model.customer_id == customer_id]
+    
+    parts = [
+        _stats_select(Member, literal(0), scope(Member), [],
+                      member_count=func.count(Member.id),
+                      active_member_count=func.count(case((Member.status == 'active', 1)))),
+        _stats_select(Due, literal(0), scope(Due), [],
+                      dues_open_count=func.count(case((Due.status.in_(OPEN_DUE_STATUSES), 1)))),
+        _stats_select(Due, Due.year, scope(Due), [Due.year],
+                      dues_assessed=func.coalesce(func.sum(Due.amount), 0),
+                      dues_collected=func.coalesce(func.sum(Due.paid_amount), 0)),
+    ]
+    for model, prefix in ((Income, "income"), (Expense, "expense")):
+        year = func.coalesce(model.fiscal_year, 0)
+        parts.append(_stats_select(model, year, scope(model), [year], **{
+            f"{prefix}_total": func.coalesce(func.sum(model.amount), 0),
+            f"{prefix}_count": func.count(model.id)}))
+    
+    combined = union_all(*parts).subquery()
+    totals = select(
+        combined.c.year,
+        *[func.sum(combined.c[name]).label(name) for name in TENANT_STAT_COLUMNS]
+    ).group_by(combined.c.year)
+    return {row.year: {name: getattr(row, name) for name in TENANT_STAT_COLUMNS}
+            for row in db.execute(totals)}
+
+
+def _reconcile_tenant(db: Session, customer_id: str) -> int:
+    """
+    Tek kiracının tenant_stats satırlarını kaynakla karşılaştır, yalnızca sapanları düzelt
+    Kiracının mevcut satırları önce kilitlenir (FOR UPDATE): o an flush eden bir yazma
+    bitene kadar beklenir, hesap onun sonucunu görür; yeni satırlar ON CONFLICT ile yazılır.
+    """
+    stored = {row.year: row for row in db.query(TenantStats).filter(
+        TenantStats.customer_id == customer_id).with_for_update()}
+    expected = _expected_tenant_stats(db, customer_id)
+    
+    insert_fn = _dialect_insert(db)
+    now = datetime.utcnow()
+    corrected = 0
+    for year, values in expected.items():
+        row = stored.pop(year, None)
+        if row is not None and all(_decimal(getattr(row, k)) == _decimal(v) for k, v in values.items()):
+            continue
+        stmt = insert_fn(TenantStats).values(customer_id=customer_id, year=year, updated_at=now, **values)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[TenantStats.customer_id, TenantStats.year],
+            set_={**{k: stmt.excluded[k] for k in values}, "updated_at": stmt.excluded.updated_at}))
+        corrected += 1
+    
+    # Kaynakta karşılığı kalmamış, sıfır olmayan satırlar
+    stale = [year for year, row in stored.items() if any(getattr(row, k) for k in TENANT_STAT_COLUMNS)]
+    if stale:
+        db.execute(delete(TenantStats).where(TenantStats.customer_id == customer_id,
+                                             TenantStats.year.in_(stale)))
+        corrected += len(stale)
+    return corrected
+
+
+def reconcile_tenant_stats(db: Session, customer_id: Optional[str] = None) -> int:
+    """
+    tenant_stats'ı kaynak tablolarla mutabık kıl (customer_id verilmezse tüm kiracılar)
+    Her kiracı ayrı ve kısa bir transaction'da işlenir; yalnızca sapan satırlar yazılır.
+    Returns: düzeltilen satır sayısı
+    """
+    if customer_id:
+        customer_ids = [customer_id]
+    else:
+        customer_ids = [cid for (cid,) in db.query(Customer.customer_id).order_by(Customer.customer_id)]
+        db.commit()
+    
+    corrected = 0
+    for cid in customer_ids:
+        try:
+            corrected += _reconcile_tenant(db, cid)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+    return corrected
+
+
+def tenant_stats_rows(db: Session, customer_id: str, year: int) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """(yıldan bağımsız sayaçlar, yıl sayaçları) - tek sorgu, satır yoksa sıfırlar"""
+    rows = {r.year: r for r in db.query(TenantStats).filter(
+        TenantStats.customer_id == customer_id,
+        TenantStats.year.in_([0, year])
+    )}
+    
+    def as_dict(row):
+        return {name: (float(getattr(row, name)) if row else 0) if name.endswith(("_total", "_assessed", "_collected"))
+                else (getattr(row, name) if row else 0) for name in TENANT_STAT_COLUMNS}
+    return as_dict(rows.get(0)), as_dict(rows.get(year))
+
+
+# Periyodik mutabakat için Postgres advisory lock anahtarı: birden çok worker
+# sürecinden yalnızca kilidi alan çalışır
+TENANT_STATS_LOCK_KEY = 0x42414452
+
+
+def _run_scheduled_reconcile() -> Optional[int]:
+    """Kilidi alabilirse tüm kiracıları mutabık kıl; başka worker çalıştırıyorsa None"""
+    with engine.connect() as lock_conn:
+        if engine.dialect.name == "postgresql":
+            if not lock_conn.execute(select(func.pg_try_advisory_lock(TENANT_STATS_LOCK_KEY))).scalar():
+                return None
+        db = SessionLocal()
+        try:
+            return reconcile_tenant_stats(db)
+        finally:
+            db.close()
+            if engine.dialect.name == "postgresql":
+                lock_conn.execute(select(func.pg_advisory_unlock(TENANT_STATS_LOCK_KEY)))
+
+
+def seed_tenant_stats(bind) -> Optional[int]:
+    """
+    tenant_stats boşsa (yeni oluşturulmuş tablo / mevcut kurulum) tüm kiracıları bir kez doldur
+    Artımlı UPSERT'ler dolu bir tabana eklenmelidir; aksi halde yalnızca deltalar sayılır.
+    Worker'lar kilidi sırayla alır: ilki doldurur, diğerleri tabloyu dolu bulup geçer.
+    Returns: yazılan satır sayısı, tablo zaten doluysa None
+    """
+    postgres = bind.dialect.name == "postgresql"
+    with bind.connect() as lock_conn:
+        if postgres:
+            lock_conn.execute(select(func.pg_advisory_lock(TENANT_STATS_LOCK_KEY)))
+        try:
+            db = SessionLocal(bind=bind)
+            try:
+                if db.query(TenantStats.customer_id).first() is not None:
+                    return None
+                return reconcile_tenant_stats(db)
+            finally:
+                db.close()
+        finally:
+            if postgres:
+                lock_conn.execute(select(func.pg_advisory_unlock(TENANT_STATS_LOCK_KEY)))
+
+
+def _tenant_stats_reconcile_loop(interval_minutes: int):
+    # Açılışta değil, ilk aralık dolduğunda başlar (worker'lar yeniden başlarken yük oluşmaz)
+    while True:
+        time.sleep(interval_minutes * 60)
+        try:
+            corrected = _run_scheduled_reconcile()
+            if corrected:
+                print(f"tenant_stats mutabakatı: {corrected} satır düzeltildi")
+        except Exception as e:
+            print(f"tenant_stats mutabakat hatası: {e}")
+
+
+@app.on_event("startup")
+def start_tenant_stats():
+    """tenant_stats tablosunu oluştur ve doldur (eski kurulumlar), periyodik mutabakat zamanlayıcısını başlat"""
+    try:
+        TenantStats.__table__.create(bind=engine, checkfirst=True)
+    except Exception as e:
+        print(f"tenant_stats tablosu oluşturulamadı: {e}")
+        return
+    # İstek kabul edilmeden önce: boş tablo kaynak verilerden doldurulur
+    try:
+        seeded = seed_tenant_stats(engine)
+        if seeded is not None:
+            print(f"tenant_stats ilk doldurma: {seeded} satır")
+    except Exception as e:
+        print(f"tenant_stats ilk doldurma hatası: {e}")
+    if settings.tenant_stats_reconcile_minutes > 0:
+        threading.Thread(target=_tenant_stats_reconcile_loop, args=(settings.tenant_stats_reconcile_minutes,),
+                         name="tenant-stats-reconcile", daemon=True).start()
+
+
+# ==================== REPORTS (RAPORLAR) API ====================
+
+@app.get("/web/reports/income-expense")
+def web_report_income_expense(
+    year: Optional[int] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    api_key: str = Depends(verify_api_key),
+    db: Session = Depends(get_db)
+):
+    """Gelir-Gider raporu"""
+    customer = get_customer_by_api_key(api_key, db)
+    year = year or datetime.now().year
+    return report_income_expense(db, customer.customer_id, year)
+
+@app.get("/web/reports/members")
+def web_report_members(
+    api_key: str = Depends(verify_api_key),
+    db: Session = Depends(get_db)
+):
+    """Üye raporu"""
+    customer = get_customer_by_api_key(api_key, db)
+    return report_members(db, customer.customer_id)
+
+@app.get("/web/reports/dues")
+def web_report_dues(
+    year: Optional[int] = None,
+    api_key: str = Depends(verify_api_key),
+    db: Session = Depends(get_db)
+):
+    """Aidat raporu"""
+    customer = get_customer_by_api_key(api_key, db)
+    year = year or datetime.now().year
+    return report_dues(db, customer.customer_id, year)
+
 @app.get("/web/reports/cash")
 def web_report_cash(
     api_key: str = Depends(verify_api_key),
@@ -3016,36 +3604,10 @@ def web_report_yearly(
     api_key: str = Depends(verify_api_key),
     db: Session = Depends(get_db)
 ):
-    """Yıllık özet rapor"""
+    """Yıllık özet rapor (sayaçlar tenant_stats)"""
     customer = get_customer_by_api_key(api_key, db)
     year = year or datetime.now().year
-    
-    # Üye istatistikleri
-    members = db.query(Member).filter(
-        Member.customer_id == customer.customer_id,
-        Member.status == 'active'
-    ).count()
-    
-    # Gelir
-    total_income = db.query(Income).filter(
-        Income.customer_id == customer.customer_id,
-        Income.fiscal_year == year
-    ).with_entities(func.sum(Income.amount)).scalar() or 0
-    
-    # Gider
-    total_expense = db.query(Expense).filter(
-        Expense.customer_id == customer.customer_id,
-        Expense.fiscal_year == year
-    ).with_entities(func.sum(Expense.amount)).scalar() or 0
-    
-    # Aidat
-    dues_data = db.query(Due).filter(
-        Due.customer_id == customer.customer_id,
-        Due.year == year
-    ).with_entities(
-        func.sum(Due.amount).label('total'),
-        func.sum(Due.paid_amount).label('paid')
-    ).first()
+    general, yearly = tenant_stats_rows(db, customer.customer_id, year)
     
     # Toplantı ve etkinlik
     meeting_count = db.query(Meeting).filter(
@@ -3059,12 +3621,12 @@ def web_report_yearly(
     return {
         "year": year,
         "summary": {
-            "active_members": members,
-            "total_income": float(total_income),
-            "total_expense": float(total_expense),
-            "balance": float(total_income) - float(total_expense),
-            "dues_assessed": float(dues_data.total or 0) if dues_data else 0,
-            "dues_collected": float(dues_data.paid or 0) if dues_data else 0,
+            "active_members": general["active_member_count"],
+            "total_income": yearly["income_total"],
+            "total_expense": yearly["expense_total"],
+            "balance": yearly["income_total"] - yearly["expense_total"],
+            "dues_assessed": yearly["dues_assessed"],
+            "dues_collected": yearly["dues_collected"],
             "meeting_count": meeting_count,
             "event_count": event_count
         }
@@ -3072,105 +3634,233 @@ def web_report_yearly(
 
 
 # ==================== EXPORT (DIŞA AKTARMA) API ====================
+#
+# Dışa aktarımlar dosya olarak akıtılır (StreamingResponse): satırlar yield_per ile
+# sunucu taraflı cursor'dan parça parça okunur, bellek kiracı boyutundan bağımsızdır.
+# Biçimler: json | csv | ndjson | xlsx (openpyxl write-only); gzip=true ile .gz
+
+EXPORT_BATCH_SIZE = 1000
+EXPORT_CHUNK_BYTES = 64 * 1024
+EXPORT_MEDIA_TYPES = {
+    "json": "application/json",
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+EXPORT_MEMBER_FIELDS = {
+    "uye_no": (Member.member_no, _as_is),
+    "ad_soyad": (Member.full_name, _as_is),
+    "tc_no": (Member.tc_no, _as_is),
+    "telefon": (Member.phone, _as_is),
+    "email": (Member.email, _as_is),
+    "adres": (Member.address, _as_is),
+    "sehir": (Member.city, _as_is),
+    "ilce": (Member.district, _as_is),
+    "uyelik_tipi": (Member.membership_type, _as_is),
+    "aidat": (Member.membership_fee, _money),
+    "giris_tarihi": (Member.join_date, _iso),
+    "durum": (Member.status, lambda v: "Aktif" if v == 'active' else "Pasif"),
+}
+
+EXPORT_INCOME_FIELDS = {
+    "tarih": (Income.date, _iso),
+    "kategori": (Income.category, _as_is),
+    "aciklama": (Income.description, _as_is),
+    "tutar": (Income.amount, _money),
+    "kasa": (Income.cash_account, _as_is),
+    "makbuz_no": (Income.receipt_no, _as_is),
+}
+
+EXPORT_EXPENSE_FIELDS = {
+    "tarih": (Expense.date, _iso),
+    "kategori": (Expense.category, _as_is),
+    "aciklama": (Expense.description, _as_is),
+    "tutar": (Expense.amount, _money),
+    "firma": (Expense.vendor, _as_is),
+    "fatura_no": (Expense.invoice_no, _as_is),
+    "kasa": (Expense.cash_account, _as_is),
+}
+
+
+def _export_rows(build_query, fields_map: Dict[str, tuple], order_by: list):
+    """Satırları sunucu taraflı cursor'dan EXPORT_BATCH_SIZE'lık parçalarla üret
+    (yanıt akarken istek oturumu kapanmış olabilir; kendi oturumunu açar)"""
+    names = list(fields_map)
+    session = SessionLocal()
+    try:
+        query = build_query(session).with_entities(*[fields_map[n][0] for n in names])
+        for row in query.order_by(*order_by).yield_per(EXPORT_BATCH_SIZE):
+            yield [fields_map[n][1](value) for n, value in zip(names, row)]
+    finally:
+        session.close()
+
+
+def _buffered(pieces):
+    """Küçük parçaları ~64 KB'lık bloklar halinde birleştir"""
+    buffer = io.BytesIO()
+    for piece in pieces:
+        buffer.write(piece)
+        if buffer.tell() >= EXPORT_CHUNK_BYTES:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _write_csv(rows, names, **_):
+    def pieces():
+        line = io.StringIO()
+        writer = csv.writer(line)
+        yield "\ufeff".encode()  # Excel'in UTF-8'i tanıması için BOM
+        writer.writerow(names)
+        for values in rows:
+            writer.writerow(values)
+            if line.tell() >= EXPORT_CHUNK_BYTES:
+                yield line.getvalue().encode()
+                line.seek(0)
+                line.truncate()
+        yield line.getvalue().encode()
+    return _buffered(pieces())
+
+
+def _write_ndjson(rows, names, **_):
+    return _buffered(
+        (json.dumps(dict(zip(names, values)), ensure_ascii=False) + "\n").encode() for values in rows
+    )
+
+
+def _write_json(rows, names, total_field: Optional[str] = None, **_):
+    """Eski yanıt biçimi: {"data": [...], "count": n[, "total": t]} - sayaçlar dizi bitince yazılır"""
+    def pieces():
+        count, total = 0, 0.0
+        total_index = names.index(total_field) if total_field else None
+        yield b'{"data": ['
+        for values in rows:
+            yield (b"," if count else b"") + json.dumps(dict(zip(names, values)), ensure_ascii=False).encode()
+            count += 1
+            if total_index is not None:
+                total += values[total_index]
+        tail = {"count": count}
+        if total_field:
+            tail["total"] = total
+        yield ("], " + json.dumps(tail)[1:]).encode()
+    return _buffered(pieces())
+
+
+def _write_xlsx(rows, names, sheet_title: str = "Veri", **_):
+    """openpyxl write-only: satırlar diske yazılır, bellek sabit kalır; zip arşivi
+    ancak sonda kapanabildiği için dosya tamamlandıktan sonra parça parça gönderilir"""
+    from openpyxl import Workbook
+    
+    with tempfile.TemporaryFile() as tmp:
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet(sheet_title)
+        sheet.append(names)
+        for values in rows:
+            sheet.append(values)
+        workbook.save(tmp)
+        tmp.seek(0)
+        while True:
+            chunk = tmp.read(EXPORT_CHUNK_BYTES)
+            if not chunk:
+                break
+            yield chunk
+
+
+def _gzip_chunks(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: gzip başlığı
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+EXPORT_WRITERS = {"json": _write_json, "csv": _write_csv, "ndjson": _write_ndjson, "xlsx": _write_xlsx}
+
+
+def export_response(build_query, fields_map: Dict[str, tuple], order_by: list, format: str,
+                    basename: str, compress: bool, sheet_title: str,
+                    total_field: Optional[str] = None) -> StreamingResponse:
+    """Dışa aktarımı akan dosya indirmesi olarak döndür"""
+    format = (format or "json").lower()
+    if format not in EXPORT_WRITERS:
+        raise HTTPException(status_code=400, detail=f"Desteklenmeyen biçim: {format} ({', '.join(EXPORT_WRITERS)})")
+    if format == "xlsx":
+        try:
+            import openpyxl  # noqa: F401
+        except ImportError:
+            raise HTTPException(status_code=501, detail="XLSX dışa aktarım için openpyxl kurulu değil")
+    
+    body = EXPORT_WRITERS[format](_export_rows(build_query, fields_map, order_by), list(fields_map),
+                                  total_field=total_field, sheet_title=sheet_title)
+    filename = f"{basename}_{date.today()}.{format}"
+    media_type = EXPORT_MEDIA_TYPES[format]
+    if compress:
+        body = _gzip_chunks(body)
+        filename += ".gz"
+        media_type = "application/gzip"
+    return StreamingResponse(body, media_type=media_type, headers={
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "Cache-Control": "no-store",
+    })
+
 
 @app.get("/web/export/members")
 def web_export_members(
     format: str = "json",
+    gzip: bool = False,
     api_key: str = Depends(verify_api_key),
     db: Session = Depends(get_db)
 ):
-    """Üye listesi dışa aktar"""
+    """Üye listesi dışa aktar (akan dosya)"""
     customer = get_customer_by_api_key(api_key, db)
-    members = db.query(Member).filter(
-        Member.customer_id == customer.customer_id
-    ).order_by(Member.full_name).all()
-    
-    data = [
-        {
-            "uye_no": m.member_no,
-            "ad_soyad": m.full_name,
-            "tc_no": m.tc_no,
-            "telefon": m.phone,
-            "email": m.email,
-            "adres": m.address,
-            "sehir": m.city,
-            "ilce": m.district,
-            "uyelik_tipi": m.membership_type,
-            "aidat": float(m.membership_fee or 0),
-            "giris_tarihi": m.join_date.isoformat() if m.join_date else None,
-            "durum": "Aktif" if m.status == 'active' else "Pasif"
-        }
-        for m in members
-    ]
-    
-    if format == "csv":
-        import csv
-        import io
-        output = io.StringIO()
-        if data:
-            writer = csv.DictWriter(output, fieldnames=data[0].keys())
-            writer.writeheader()
-            writer.writerows(data)
-        return {"csv": output.getvalue(), "filename": f"uyeler_{date.today()}.csv"}
-    
-    return {"data": data, "count": len(data)}
+    cid = customer.customer_id
+    return export_response(
+        lambda session: session.query(Member).filter(Member.customer_id == cid),
+        EXPORT_MEMBER_FIELDS, [Member.full_name, Member.id],
+        format, "uyeler", gzip, "Üyeler"
+    )
 
 @app.get("/web/export/incomes")
 def web_export_incomes(
     year: Optional[int] = None,
     format: str = "json",
+    gzip: bool = False,
     api_key: str = Depends(verify_api_key),
     db: Session = Depends(get_db)
 ):
-    """Gelir listesi dışa aktar"""
+    """Gelir listesi dışa aktar (akan dosya)"""
     customer = get_customer_by_api_key(api_key, db)
-    query = db.query(Income).filter(Income.customer_id == customer.customer_id)
-    if year:
-        query = query.filter(Income.fiscal_year == year)
-    incomes = query.order_by(Income.date.desc()).all()
-    
-    data = [
-        {
-            "tarih": i.date.isoformat() if i.date else None,
-            "kategori": i.category,
-            "aciklama": i.description,
-            "tutar": float(i.amount or 0),
-            "kasa": i.cash_account,
-            "makbuz_no": i.receipt_no
-        }
-        for i in incomes
-    ]
+    cid = customer.customer_id
     
-    return {"data": data, "count": len(data), "total": sum([d["tutar"] for d in data])}
+    def build(session):
+        query = session.query(Income).filter(Income.customer_id == cid)
+        return query.filter(Income.fiscal_year == year) if year else query
+    
+    return export_response(build, EXPORT_INCOME_FIELDS, [Income.date.desc(), Income.id.desc()],
+                           format, "gelirler", gzip, "Gelirler", total_field="tutar")
 
 @app.get("/web/export/expenses")
 def web_export_expenses(
     year: Optional[int] = None,
     format: str = "json",
+    gzip: bool = False,
     api_key: str = Depends(verify_api_key),
     db: Session = Depends(get_db)
 ):
-    """Gider listesi dışa aktar"""
+    """Gider listesi dışa aktar (akan dosya)"""
     customer = get_customer_by_api_key(api_key, db)
-    query = db.query(Expense).filter(Expense.customer_id == customer.customer_id)
-    if year:
-        query = query.filter(Expense.fiscal_year == year)
-    expenses = query.order_by(Expense.date.desc()).all()
-    
-    data = [
-        {
-            "tarih": e.date.isoformat() if e.date else None,
-            "kategori": e.category,
-            "aciklama": e.description,
-            "tutar": float(e.amount or 0),
-            "firma": e.vendor,
-            "fatura_no": e.invoice_no,
-            "kasa": e.cash_account
-        }
-        for e in expenses
-    ]
+    cid = customer.customer_id
+    
+    def build(session):
+        query = session.query(Expense).filter(Expense.customer_id == cid)
+        return query.filter(Expense.fiscal_year == year) if year else query
     
-    return {"data": data, "count": len(data), "total": sum([d["tutar"] for d in data])}
+    return export_response(build, EXPORT_EXPENSE_FIELDS, [Expense.date.desc(), Expense.id.desc()],
+                           format, "giderler", gzip, "Giderler", total_field="tutar")
 
 
 # ==================== MULTI-YEAR DUES (ÇOKLU YIL ÖDEME) API ====================
@@ -429,6 +429,38 @@ CREATE INDEX IF NOT EXISTS idx_documents_customer ON documents(customer_id);
 CREATE INDEX IF NOT EXISTS idx_receivables_customer ON receivables(customer_id);
 CREATE INDEX IF NOT EXISTS idx_payables_customer ON payables(customer_id);
 
+-- ==================== SAYFALAMA İNDEKSLERİ ====================
+-- Liste uç noktalarının cursor sıralamasıyla birebir (customer_id + sıralama anahtarı + id)
+CREATE INDEX IF NOT EXISTS idx_members_customer_name ON members(customer_id, full_name, id);
+CREATE INDEX IF NOT EXISTS idx_incomes_customer_date ON incomes(customer_id, date DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_expenses_customer_date ON expenses(customer_id, date DESC, id DESC);
+
+-- ==================== RAPOR İNDEKSLERİ ====================
+-- Rapor sorguları (GROUP BY category / month) tablo yerine indeksten okunur (index-only scan)
+CREATE INDEX IF NOT EXISTS idx_incomes_report ON incomes(customer_id, fiscal_year, category) INCLUDE (amount);
+CREATE INDEX IF NOT EXISTS idx_expenses_report ON expenses(customer_id, fiscal_year, category) INCLUDE (amount);
+CREATE INDEX IF NOT EXISTS idx_dues_report ON dues(customer_id, year, month, status) INCLUDE (amount, paid_amount);
+CREATE INDEX IF NOT EXISTS idx_members_report ON members(customer_id, status, membership_type, gender) INCLUDE (membership_fee);
+
+-- ==================== KİRACI ÖZETİ ====================
+-- (customer_id, year) başına sayaçlar; year=0 yıldan bağımsız sayaçlar (üyeler, açık aidatlar)
+-- API yazma işlemleriyle aynı transaction'da güncellenir, periyodik mutabakatla düzeltilir
+CREATE TABLE IF NOT EXISTS tenant_stats (
+    customer_id VARCHAR(50) REFERENCES customers(customer_id) ON DELETE CASCADE,
+    year INTEGER NOT NULL,
+    member_count INTEGER NOT NULL DEFAULT 0,
+    active_member_count INTEGER NOT NULL DEFAULT 0,
+    income_total DECIMAL(14,2) NOT NULL DEFAULT 0,
+    income_count INTEGER NOT NULL DEFAULT 0,
+    expense_total DECIMAL(14,2) NOT NULL DEFAULT 0,
+    expense_count INTEGER NOT NULL DEFAULT 0,
+    dues_assessed DECIMAL(14,2) NOT NULL DEFAULT 0,
+    dues_collected DECIMAL(14,2) NOT NULL DEFAULT 0,
+    dues_open_count INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (customer_id, year)
+);
+
 -- ==================== DEMO VERİ ====================
 INSERT INTO customers (customer_id, api_key, name, email, plan, max_users, max_members, expires_at, features)
 VALUES (
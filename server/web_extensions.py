@@ -154,13 +154,17 @@ class DuePayment(BaseModel):
 
 # ==================== HELPER ====================
 
-def get_customer_by_api_key(api_key: str, db: Session) -> Customer:
-    customer = db.query(Customer).filter(Customer.api_key == api_key).first()
-    if not customer:
-        raise HTTPException(status_code=401, detail="Geçersiz API key")
-    if not customer.is_active:
-        raise HTTPException(status_code=401, detail="Hesap devre dışı")
-    return customer
+# main.py'deki önbellekli çözümleyici varsa onu kullan (admin invalidation'ı ile tutarlı kalır)
+try:
+    get_customer_by_api_key
+except NameError:
+    def get_customer_by_api_key(api_key: str, db: Session) -> Customer:
+        customer = db.query(Customer).filter(Customer.api_key == api_key).first()
+        if not customer:
+            raise HTTPException(status_code=401, detail="Geçersiz API key")
+        if not customer.is_active:
+            raise HTTPException(status_code=401, detail="Hesap devre dışı")
+        return customer
 
 
 # ==================== WEB API - MEMBERS ====================
@@ -7,6 +7,7 @@ import os
 import json
 import hashlib
 import platform
+import sqlite3
 import requests
 from pathlib import Path
 from typing import Optional, Dict, Any, Tuple
@@ -190,6 +191,14 @@ class ServerClient:
             return False, "Veritabanı dosyası bulunamadı"
         
         try:
+            # WAL modunda son işlemler ana dosyaya aktarılsın
+            try:
+                conn = sqlite3.connect(db_path)
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                conn.close()
+            except sqlite3.Error:
+                pass
+            
             # Dosya hash'i
             with open(db_path, 'rb') as f:
                 file_hash = hashlib.sha256(f.read()).hexdigest()
@@ -60,6 +60,121 @@ def test_database_connection():
         mode = result[0] if result else 'offline'
         
         log_success("Database Bağlantı", f"(mode={mode})")
+
+        # Şema sürümü güncel mi? (güncel DB'de göç çalışmamalı)
+        db.cursor.execute("PRAGMA user_version")
+        surum = db.cursor.fetchone()[0]
+        if surum == db.schema_version and db.initialize_database() == []:
+            log_success("Şema Sürümü", f"(user_version={surum})")
+        else:
+            log_warning("Şema Sürümü", f"user_version={surum}, beklenen={db.schema_version}")
+
+        # Transaction: hata olursa blok (içindeki commit'ler dahil) geri alınmalı
+        try:
+            db.cursor.execute("SELECT COUNT(*) FROM islem_loglari")
+            onceki = db.cursor.fetchone()[0]
+            try:
+                with db.transaction():
+                    db.log_islem("TEST", "TEST", "islem_loglari", 0, "TEST TRANSACTION")
+                    raise RuntimeError("geri al")
+            except RuntimeError:
+                pass
+            db.cursor.execute("SELECT COUNT(*) FROM islem_loglari")
+            if db.cursor.fetchone()[0] == onceki:
+                log_success("Transaction Geri Alma", "(log kaydı geri alındı)")
+            else:
+                log_fail("Transaction Geri Alma", "Kayıt geri alınmadı")
+        except Exception as e:
+            log_fail("Transaction Geri Alma", e)
+
+        # Transaction, çağıranın commit edilmemiş yazımını commit etmemeli
+        try:
+            db.cursor.execute("SELECT COUNT(*) FROM islem_loglari")
+            onceki = db.cursor.fetchone()[0]
+            db.cursor.execute("INSERT INTO islem_loglari (kullanici, islem_turu, tablo_adi, kayit_id, aciklama) "
+                              "VALUES ('TEST', 'TEST', 'islem_loglari', 0, 'TEST BEKLEYEN')")
+            with db.transaction() as cur:
+                cur.execute("INSERT INTO islem_loglari (kullanici, islem_turu, tablo_adi, kayit_id, aciklama) "
+                            "VALUES ('TEST', 'TEST', 'islem_loglari', 0, 'TEST BLOK')")
+            db.conn.rollback()
+            db.cursor.execute("SELECT COUNT(*) FROM islem_loglari")
+            if db.cursor.fetchone()[0] == onceki:
+                log_success("Transaction Bekleyen Yazım", "(çağıranın işlemi commit edilmedi)")
+            else:
+                log_fail("Transaction Bekleyen Yazım", "Bekleyen yazım blokla commit edildi")
+        except Exception as e:
+            log_fail("Transaction Bekleyen Yazım", e)
+
+        # Ayar kaydı, içinde bulunduğu transaction bloğunu erken commit etmemeli
+        try:
+            try:
+                with db.transaction():
+                    db.sistem_ayari_kaydet('test_ayar_islem', 'blok')
+                    okunan = db.ayarlar.get('test_ayar_islem', None, db.conn)
+                    raise RuntimeError("geri al")
+            except RuntimeError:
+                pass
+            sonra = db.ayarlar.get('test_ayar_islem', None, db.conn)
+            db.cursor.execute("SELECT COUNT(*) FROM sistem_ayarlari WHERE anahtar = 'test_ayar_islem'")
+            if okunan == 'blok' and sonra is None and db.cursor.fetchone()[0] == 0:
+                log_success("Ayar Kaydı Transaction", "(blokla birlikte geri alındı)")
+            else:
+                log_fail("Ayar Kaydı Transaction", f"blok içi={okunan}, sonra={sonra}")
+        except Exception as e:
+            log_fail("Ayar Kaydı Transaction", e)
+
+        # Paylaşılan API istemcisi, değişen zaman aşımı/yeniden deneme ayarlarını almalı
+        try:
+            from api_client import ApiClient
+            anahtar = ('http://test.invalid/api', 'test')
+            ilk = ApiClient.al(*anahtar, connect_timeout=1.0, read_timeout=5, retries=1)
+            ikinci = ApiClient.al(*anahtar, connect_timeout=2.0, read_timeout=5, retries=4)
+            ApiClient._istemciler.pop(anahtar, None)
+            if ikinci is ilk and ilk.timeout == (2.0, 5) and ilk._retries == 4:
+                log_success("API İstemci Ayarları", "(timeout/retry değişikliği uygulandı)")
+            else:
+                log_fail("API İstemci Ayarları", f"timeout={ilk.timeout}, retries={ilk._retries}")
+        except Exception as e:
+            log_fail("API İstemci Ayarları", e)
+
+        # İşlem logu grup yazımı: tampona alınır, tek commit ile yazılır
+        try:
+            db.log_bekleyenleri_yaz()
+            db.cursor.execute("SELECT COUNT(*) FROM islem_loglari")
+            onceki = db.cursor.fetchone()[0]
+            for i in range(3):
+                db.log_islem("TEST", "TEST", "islem_loglari", i, "TEST GRUP LOG")
+            yazilan = db.log_bekleyenleri_yaz()
+            db.cursor.execute("SELECT COUNT(*) FROM islem_loglari")
+            sonraki = db.cursor.fetchone()[0]
+            db.cursor.execute("DELETE FROM islem_loglari WHERE aciklama = 'TEST GRUP LOG'")
+            db.commit()
+            if yazilan == 3 and sonraki == onceki + 3:
+                log_success("İşlem Logu Grup Yazımı", "(3 kayıt tek commit)")
+            else:
+                log_fail("İşlem Logu Grup Yazımı", f"yazılan={yazilan}, fark={sonraki - onceki}")
+        except Exception as e:
+            log_fail("İşlem Logu Grup Yazımı", e)
+
+        # İşlem logu çağıranın işlemini commit etmemeli; tampondaki log hemen okunabilmeli
+        try:
+            db.cursor.execute("SELECT COUNT(*) FROM islem_loglari")
+            onceki = db.cursor.fetchone()[0]
+            db.cursor.execute("INSERT INTO islem_loglari (kullanici, aciklama) VALUES ('TEST', 'TEST İŞ YAZIMI')")
+            db.log_islem("TEST", "TEST", "islem_loglari", 0, "TEST İŞLEM İÇİ LOG")
+            db.conn.rollback()
+            db.cursor.execute("SELECT COUNT(*) FROM islem_loglari")
+            geri_alindi = db.cursor.fetchone()[0] == onceki
+            db.log_islem("TEST", "TEST", "islem_loglari", 0, "TEST ANLIK LOG")
+            gorunur = db.son_islemler(1)[0]['aciklama'] == "TEST ANLIK LOG"
+            db.cursor.execute("DELETE FROM islem_loglari WHERE aciklama = 'TEST ANLIK LOG'")
+            db.commit()
+            if geri_alindi and gorunur:
+                log_success("İşlem Logu Commit/Okuma", "(iş yazımıyla birlikte geri alındı, tampon okumada yazıldı)")
+            else:
+                log_fail("İşlem Logu Commit/Okuma", f"geri alındı={geri_alindi}, görünür={gorunur}")
+        except Exception as e:
+            log_fail("İşlem Logu Commit/Okuma", e)
         return db
     except Exception as e:
         log_fail("Database Bağlantı", e)
@@ -198,7 +313,102 @@ def test_kasa_module(db):
                 log_warning("Kasa Özet", "Kasa bulunamadı")
         except Exception as e:
             log_fail("Kasa Özet", e)
-    
+
+    # 4. Kasa Bakiye Defteri Doğrulama
+    try:
+        farklar = kasa_yoneticisi.kasa_bakiye_dogrula()
+        if not farklar:
+            log_success("Kasa Bakiye Doğrula", "(defter tutarlı)")
+        else:
+            log_fail("Kasa Bakiye Doğrula", f"{len(farklar)} kasada fark: {farklar}")
+    except Exception as e:
+        log_fail("Kasa Bakiye Doğrula", e)
+
+    # 5. Tarihli Bakiye (aylık özet + delta)
+    if test_kasa_id:
+        try:
+            guncel = kasa_yoneticisi.kasa_bakiye_hesapla(test_kasa_id)
+            tarihli = kasa_yoneticisi.kasa_bakiye_hesapla(test_kasa_id, bitis_tarih='2999-12-31')
+            if abs(guncel['net_bakiye'] - tarihli['net_bakiye']) < 0.01:
+                log_success("Tarihli Bakiye", f"({tarihli['net_bakiye']:.2f} ₺)")
+            else:
+                log_fail("Tarihli Bakiye", f"güncel {guncel['net_bakiye']} != tarihli {tarihli['net_bakiye']}")
+        except Exception as e:
+            log_fail("Tarihli Bakiye", e)
+
+        # Özet sonrası geçmiş tarihli hareket: özet geçersiz kılınmalı
+        try:
+            def _gelir(tarih, tutar):
+                with db.transaction() as cur:
+                    cur.execute("""INSERT INTO gelirler (tarih, gelir_turu, aciklama, tutar, kasa_id)
+                                   VALUES (?, 'DİĞER', 'Özet testi', ?, ?)""", (tarih, tutar, test_kasa_id))
+                    return cur.lastrowid
+            eklenen = [_gelir('2001-03-15', 1000)]
+            db.kasa_bakiye_ozetlerini_olustur()
+            once = kasa_yoneticisi.kasa_bakiye_hesapla(test_kasa_id, bitis_tarih='2001-06-30')
+            eklenen.append(_gelir('2001-02-10', 500))
+            sonra = kasa_yoneticisi.kasa_bakiye_hesapla(test_kasa_id, bitis_tarih='2001-06-30')
+            db.kasa_bakiye_ozetlerini_olustur()  # artımlı: yalnızca geçersiz kılınan aylar
+            yeniden = kasa_yoneticisi.kasa_bakiye_hesapla(test_kasa_id, bitis_tarih='2001-06-30')
+            ozet_sorgusu = "SELECT * FROM kasa_bakiye_ozet ORDER BY kasa_id, donem"
+            artimli_ozet = [tuple(r) for r in db.cursor.execute(ozet_sorgusu).fetchall()]
+            db.kasa_bakiye_ozetlerini_olustur(tam=True)
+            tam_ozet = [tuple(r) for r in db.cursor.execute(ozet_sorgusu).fetchall()]
+            with db.transaction() as cur:
+                cur.executemany("DELETE FROM gelirler WHERE gelir_id = ?", [(i,) for i in eklenen])
+            if (abs(sonra['toplam_gelir'] - once['toplam_gelir'] - 500) < 0.01
+                    and abs(yeniden['toplam_gelir'] - sonra['toplam_gelir']) < 0.01
+                    and artimli_ozet == tam_ozet and artimli_ozet):
+                log_success("Bakiye Özeti Geçersiz Kılma", f"({once['toplam_gelir']:.2f} → {sonra['toplam_gelir']:.2f} ₺)")
+            else:
+                log_fail("Bakiye Özeti Geçersiz Kılma",
+                         f"önce {once['toplam_gelir']}, sonra {sonra['toplam_gelir']}, yeniden {yeniden['toplam_gelir']}, "
+                         f"artımlı özet {len(artimli_ozet)} / tam {len(tam_ozet)} satır")
+        except Exception as e:
+            log_fail("Bakiye Özeti Geçersiz Kılma", e)
+
+    # 6. Yıl Sonu Devir Önizlemesi (gruplu hesap = kasa başına hesap, önizleme önbelleği)
+    try:
+        from models import DevirYoneticisi
+        yil = datetime.now().year
+        tarih = f"{yil}-12-31"
+        durumlar = kasa_yoneticisi.kasa_devir_durumlari(tarih)
+        hatali = [d['kasa_adi'] for d in durumlar
+                  if abs(d['fiziksel_bakiye'] - kasa_yoneticisi.kasa_bakiye_tip(d['kasa_id'], tarih, 'fiziksel')) >= 0.01
+                  or abs(d['serbest_bakiye'] - kasa_yoneticisi.kasa_bakiye_tip(d['kasa_id'], tarih, 'serbest')) >= 0.01]
+        devir_yoneticisi = DevirYoneticisi(db)
+        rapor = devir_yoneticisi.yil_sonu_devir(yil)
+        if not hatali and devir_yoneticisi._gecerli_onizleme(yil) is rapor \
+                and len(rapor['kasalar']) == len(durumlar) \
+                and all('para_birimi' in k and 'onceki_devir' in k for k in rapor['kasalar']):
+            log_success("Yıl Sonu Devir Önizleme", f"({len(durumlar)} kasa, "
+                        f"serbest={rapor['toplam']['serbest']:.2f} ₺)")
+        else:
+            log_fail("Yıl Sonu Devir Önizleme", f"uyumsuz kasalar: {hatali}")
+    except Exception as e:
+        log_fail("Yıl Sonu Devir Önizleme", e)
+
+    # 7. Devir önizlemesi, mevcut bir hareketin tarihi değişince geçersiz olmalı
+    if test_kasa_id:
+        try:
+            with db.transaction() as cur:
+                cur.execute("""INSERT INTO gelirler (tarih, gelir_turu, aciklama, tutar, kasa_id)
+                               VALUES ('2001-12-20', 'DİĞER', 'Devir testi', 5000, ?)""", (test_kasa_id,))
+                gelir_id = cur.lastrowid
+            devir_yoneticisi.yil_sonu_devir(2001)
+            gecerli_once = devir_yoneticisi._gecerli_onizleme(2001) is not None
+            with db.transaction() as cur:
+                cur.execute("UPDATE gelirler SET tarih = '2002-01-05' WHERE gelir_id = ?", (gelir_id,))
+            gecerli_sonra = devir_yoneticisi._gecerli_onizleme(2001) is not None
+            with db.transaction() as cur:
+                cur.execute("DELETE FROM gelirler WHERE gelir_id = ?", (gelir_id,))
+            if gecerli_once and not gecerli_sonra:
+                log_success("Devir Önizleme Geçersiz Kılma", "(tarih düzeltmesi algılandı)")
+            else:
+                log_fail("Devir Önizleme Geçersiz Kılma", f"önce={gecerli_once}, sonra={gecerli_sonra}")
+        except Exception as e:
+            log_fail("Devir Önizleme Geçersiz Kılma", e)
+
     return test_kasa_id
 
 
@@ -253,7 +463,19 @@ def test_gelir_module(db, kasa_id):
             log_success("Gelir Güncelle", "(tutar=750 TL)")
         except Exception as e:
             log_fail("Gelir Güncelle", e)
-    
+
+    # 3b. Gelir Ara (indeks güncellemeyi izlemeli, Türkçe harfler katlanmalı)
+    if test_gelir_id:
+        try:
+            yeni = [g['gelir_id'] for g in gelir_yoneticisi.gelir_ara('güncellendİ')]
+            onek = [g['gelir_id'] for g in gelir_yoneticisi.gelir_ara('GÜNC')]
+            if test_gelir_id in yeni and test_gelir_id in onek:
+                log_success("Gelir Ara", f"({len(yeni)} sonuç)")
+            else:
+                log_fail("Gelir Ara", f"gelir_id={test_gelir_id} bulunamadı")
+        except Exception as e:
+            log_fail("Gelir Ara", e)
+
     # 4. Gelir Sil
     if test_gelir_id:
         try:
@@ -344,7 +566,7 @@ def test_aidat_module(db):
     """Aidat modülü testleri"""
     print_separator("AİDAT MODÜLÜ TESTLERİ")
     
-    from models import AidatYoneticisi, UyeYoneticisi
+    from models import AidatYoneticisi, UyeYoneticisi, GelirYoneticisi, KasaYoneticisi
     aidat_yoneticisi = AidatYoneticisi(db)
     uye_yoneticisi = UyeYoneticisi(db)
     
@@ -407,7 +629,26 @@ def test_aidat_module(db):
                 log_fail("Aidat Ödeme Ekle", f"Geçersiz ID döndü: {test_odeme_id}")
         except Exception as e:
             log_fail("Aidat Ödeme Ekle", e)
-    
+
+    # 3b. Ödenen önbelleği ve SQL filtreleri (yıl aralığı, durum, sayfalama)
+    if test_odeme_id and test_odeme_id > 0:
+        try:
+            kayitlar = aidat_yoneticisi.aidat_listesi(uye_id=test_uye_id, baslangic_yil=test_yil - 1,
+                                                      bitis_yil=test_yil + 1, durum='Kısmi')
+            db.cursor.execute("SELECT COALESCE(SUM(tutar), 0) FROM aidat_odemeleri WHERE aidat_id = ?",
+                              (test_aidat_id,))
+            gercek_odenen = db.cursor.fetchone()[0]
+            ozet = aidat_yoneticisi.aidat_ozeti(yil=test_yil)
+            sayfa = aidat_yoneticisi.aidat_listesi(yil=test_yil, limit=1, offset=0)
+            if len(kayitlar) == 1 and kayitlar[0]['toplam_odenen'] == gercek_odenen == 500.0 \
+                    and ozet['kismi'] >= 1 and len(sayfa) == 1:
+                log_success("Aidat Listesi Filtre/Önbellek", f"(toplam_odenen={gercek_odenen}, "
+                            f"yıl özeti={ozet['toplam']} kayıt)")
+            else:
+                log_fail("Aidat Listesi Filtre/Önbellek", f"kayıtlar={kayitlar}, gerçek={gercek_odenen}, özet={ozet}")
+        except Exception as e:
+            log_fail("Aidat Listesi Filtre/Önbellek", e)
+
     # 4. Ödeme Sil
     if test_odeme_id and test_odeme_id > 0:
         try:
@@ -415,7 +656,137 @@ def test_aidat_module(db):
             log_success("Aidat Ödeme Sil", "(ödeme silindi)")
         except Exception as e:
             log_fail("Aidat Ödeme Sil", e)
-    
+
+    # 5. Toplu Aidat Oluştur (ikinci çalıştırma hiçbir kayıt oluşturmamalı)
+    if test_uye_id:
+        toplu_yil = datetime.now().year + 20
+        try:
+            ilk = aidat_yoneticisi.toplu_aidat_olustur(toplu_yil, 1000.0)
+            ikinci = aidat_yoneticisi.toplu_aidat_olustur(toplu_yil, 1000.0)
+            if ilk['olusturulan'] > 0 and ikinci['olusturulan'] == 0 \
+                    and ikinci['atlanan'] == ilk['olusturulan'] + ilk['atlanan']:
+                log_success("Toplu Aidat Oluştur", f"({ilk['olusturulan']} oluşturuldu, tekrar: {ikinci['atlanan']} atlandı)")
+            else:
+                log_fail("Toplu Aidat Oluştur", f"ilk={ilk}, ikinci={ikinci}")
+        except Exception as e:
+            log_fail("Toplu Aidat Oluştur", e)
+        finally:
+            db.cursor.execute("DELETE FROM aidat_takip WHERE yil = ?", (toplu_yil,))
+            db.commit()
+
+    # 6. Çok Yıllık Ödeme (gelir + aidat ödemesi + detay tek işlemde)
+    kasalar = KasaYoneticisi(db).kasa_listesi()
+    if test_uye_id and kasalar:
+        bas_yil = datetime.now().year + 30
+        grup_id = None
+        try:
+            grup_id = GelirYoneticisi(db).coklu_yil_gelir_ekle(
+                gelir_turu='AİDAT', kasa_id=kasalar[0]['kasa_id'],
+                baslangic_yil=bas_yil, bitis_yil=bas_yil + 2,
+                yillik_tutar=100000.0, uye_id=test_uye_id, aciklama='TEST ÇOK YILLIK'
+            )
+            db.cursor.execute("SELECT COUNT(*) FROM gelirler WHERE coklu_odeme_grup_id = ?", (grup_id,))
+            gelir_sayisi = db.cursor.fetchone()[0]
+            db.cursor.execute("""
+                SELECT COUNT(*) FROM aidat_takip a
+                JOIN aidat_odeme_detay d ON d.odeme_id IN
+                    (SELECT odeme_id FROM aidat_odemeleri WHERE aidat_id = a.aidat_id)
+                WHERE a.uye_id = ? AND a.yil >= ? AND a.durum = 'Tamamlandı' AND a.gelir_id IS NOT NULL
+            """, (test_uye_id, bas_yil))
+            bagli_yil = db.cursor.fetchone()[0]
+            if gelir_sayisi == 3 and bagli_yil == 3:
+                log_success("Çok Yıllık Ödeme", f"({grup_id}: 3 gelir, 3 aidat yılı bağlandı)")
+            else:
+                log_fail("Çok Yıllık Ödeme", f"gelir={gelir_sayisi}, bağlı yıl={bagli_yil}")
+        except Exception as e:
+            log_fail("Çok Yıllık Ödeme", e)
+        finally:
+            db.cursor.execute("DELETE FROM tahakkuklar WHERE ilgili_kayit_id IN "
+                              "(SELECT gelir_id FROM gelirler WHERE coklu_odeme_grup_id = ?)", (grup_id,))
+            db.cursor.execute("DELETE FROM gelirler WHERE coklu_odeme_grup_id = ?", (grup_id,))
+            db.cursor.execute("DELETE FROM aidat_odeme_detay WHERE yil >= ?", (bas_yil,))
+            db.cursor.execute("DELETE FROM aidat_odemeleri WHERE aidat_id IN "
+                              "(SELECT aidat_id FROM aidat_takip WHERE yil >= ?)", (bas_yil,))
+            db.cursor.execute("DELETE FROM aidat_takip WHERE yil >= ?", (bas_yil,))
+            db.commit()
+
+    # 6b. Kısmi çok yıllık ödeme + kalanın ödenmesi + mutabakat: aynı para için tek gelir
+    if test_uye_id and kasalar:
+        bas_yil = datetime.now().year + 40
+        grup_id = None
+        try:
+            grup_id = GelirYoneticisi(db).coklu_yil_gelir_ekle(
+                gelir_turu='AİDAT', kasa_id=kasalar[0]['kasa_id'],
+                baslangic_yil=bas_yil, bitis_yil=bas_yil,
+                yillik_tutar=1.0, uye_id=test_uye_id, aciklama='TEST KISMİ ÇOK YILLIK'
+            )
+            db.cursor.execute("SELECT aidat_id, yillik_aidat_tutari, toplam_odenen, aktarim_durumu "
+                              "FROM aidat_takip WHERE uye_id = ? AND yil = ?", (test_uye_id, bas_yil))
+            aidat = db.cursor.fetchone()
+            aidat_yoneticisi.aidat_odeme_ekle(aidat['aidat_id'], datetime.now().strftime("%Y-%m-%d"),
+                                              aidat['yillik_aidat_tutari'] - aidat['toplam_odenen'])
+            aidat_yoneticisi.aidat_gelir_mutabakati(yil=bas_yil)
+            db.cursor.execute("""
+                SELECT COUNT(*) FROM gelirler
+                WHERE aidat_id = ? OR gelir_id = (SELECT gelir_id FROM aidat_takip WHERE aidat_id = ?)
+            """, (aidat['aidat_id'], aidat['aidat_id']))
+            gelir_sayisi = db.cursor.fetchone()[0]
+            if aidat['aktarim_durumu'] == 'Aktarıldı' and gelir_sayisi == 1:
+                log_success("Kısmi Çok Yıllık Ödeme", "(kalan ödeme ve mutabakat sonrası tek gelir)")
+            else:
+                log_fail("Kısmi Çok Yıllık Ödeme", f"aktarım={aidat['aktarim_durumu']!r}, gelir={gelir_sayisi}")
+        except Exception as e:
+            log_fail("Kısmi Çok Yıllık Ödeme", e)
+        finally:
+            db.cursor.execute("DELETE FROM tahakkuklar WHERE ilgili_kayit_id IN "
+                              "(SELECT gelir_id FROM gelirler WHERE coklu_odeme_grup_id = ?)", (grup_id,))
+            db.cursor.execute("DELETE FROM gelirler WHERE coklu_odeme_grup_id = ? OR aidat_id IN "
+                              "(SELECT aidat_id FROM aidat_takip WHERE yil = ?)", (grup_id, bas_yil))
+            db.cursor.execute("DELETE FROM aidat_odeme_detay WHERE yil = ?", (bas_yil,))
+            db.cursor.execute("DELETE FROM aidat_odemeleri WHERE aidat_id IN "
+                              "(SELECT aidat_id FROM aidat_takip WHERE yil = ?)", (bas_yil,))
+            db.cursor.execute("DELETE FROM aidat_takip WHERE yil = ?", (bas_yil,))
+            db.commit()
+
+    # 7. Aidat-Gelir Mutabakatı (senkron dışı yazılan ödeme toplu düzeltilmeli)
+    if test_uye_id:
+        mut_yil = datetime.now().year + 40
+        try:
+            mut_aidat_id = aidat_yoneticisi.aidat_kaydi_olustur(test_uye_id, mut_yil, 300.0)
+            db.cursor.execute("INSERT INTO aidat_odemeleri (aidat_id, tarih, tutar) VALUES (?, ?, 300)",
+                              (mut_aidat_id, datetime.now().strftime('%Y-%m-%d')))
+            db.commit()
+            kuru = aidat_yoneticisi.aidat_gelir_mutabakati(mut_yil, kuru_calisma=True)
+            db.cursor.execute("SELECT COUNT(*) FROM gelirler WHERE aidat_id = ?", (mut_aidat_id,))
+            kuru_gelir = db.cursor.fetchone()[0]
+            uygula = aidat_yoneticisi.aidat_gelir_mutabakati(mut_yil)
+            db.cursor.execute("SELECT durum, aktarim_durumu, gelir_id FROM aidat_takip WHERE aidat_id = ?",
+                              (mut_aidat_id,))
+            aidat = db.cursor.fetchone()
+            tekrar = aidat_yoneticisi.aidat_gelir_mutabakati(mut_yil, kuru_calisma=True)
+            db.cursor.execute("DELETE FROM aidat_odemeleri WHERE aidat_id = ?", (mut_aidat_id,))
+            db.commit()
+            geri = aidat_yoneticisi.aidat_gelir_mutabakati(mut_yil)
+            db.cursor.execute("SELECT COUNT(*) FROM gelirler WHERE aidat_id = ?", (mut_aidat_id,))
+            kalan_gelir = db.cursor.fetchone()[0]
+            if kuru['ozet']['gelir_olustur'] == 1 and kuru_gelir == 0 \
+                    and aidat['durum'] == 'Tamamlandı' and aidat['aktarim_durumu'] == 'Aktarıldı' \
+                    and aidat['gelir_id'] and not any(tekrar['ozet'].values()) \
+                    and geri['ozet']['gelir_sil'] == 1 and kalan_gelir == 0:
+                log_success("Aidat-Gelir Mutabakatı", "(kuru çalışma, oluştur, tekrar: fark yok, geri al)")
+            else:
+                log_fail("Aidat-Gelir Mutabakatı",
+                         f"kuru={kuru['ozet']}, aidat={dict(aidat)}, tekrar={tekrar['ozet']}, geri={geri['ozet']}")
+        except Exception as e:
+            log_fail("Aidat-Gelir Mutabakatı", e)
+        finally:
+            db.cursor.execute("DELETE FROM gelirler WHERE aidat_id IN "
+                              "(SELECT aidat_id FROM aidat_takip WHERE yil = ?)", (mut_yil,))
+            db.cursor.execute("DELETE FROM aidat_odemeleri WHERE aidat_id IN "
+                              "(SELECT aidat_id FROM aidat_takip WHERE yil = ?)", (mut_yil,))
+            db.cursor.execute("DELETE FROM aidat_takip WHERE yil = ?", (mut_yil,))
+            db.commit()
+
     # Temizlik: Test üyesini sil
     if test_uye_id:
         try:
@@ -469,7 +840,23 @@ def test_virman_module(db, kasa_id):
             log_fail("Virman Ekle", f"Geçersiz ID döndü: {test_virman_id}")
     except Exception as e:
         log_fail("Virman Ekle", e)
-    
+
+    # 2b. Kasa Hareketleri (yürüyen bakiye + imleçli sayfalama)
+    try:
+        tumu = list(kasa_yoneticisi.kasa_hareketleri_akisi(kaynak_kasa_id, sayfa_boyutu=1000))
+        sayfali = list(kasa_yoneticisi.kasa_hareketleri_akisi(kaynak_kasa_id, sayfa_boyutu=1))
+        guncel = kasa_yoneticisi.kasa_bakiye_hesapla(kaynak_kasa_id)['net_bakiye']
+        if not tumu:
+            log_fail("Kasa Hareketleri", "Hareket bulunamadı")
+        elif [h['bakiye'] for h in tumu] != [h['bakiye'] for h in sayfali]:
+            log_fail("Kasa Hareketleri", "Sayfalı okuma farklı bakiye verdi")
+        elif abs(tumu[0]['bakiye'] - guncel) > 0.001:
+            log_fail("Kasa Hareketleri", f"Son bakiye {tumu[0]['bakiye']} != {guncel}")
+        else:
+            log_success("Kasa Hareketleri", f"({len(tumu)} hareket, bakiye={guncel:.2f})")
+    except Exception as e:
+        log_fail("Kasa Hareketleri", e)
+
     # 3. Virman Sil
     if test_virman_id and test_virman_id > 0:
         try:
@@ -481,6 +868,305 @@ def test_virman_module(db, kasa_id):
     return test_virman_id
 
 
+def test_rapor_module(db):
+    """Rapor modülü testleri"""
+    print_separator("RAPOR MODÜLÜ TESTLERİ")
+    
+    from models import RaporYoneticisi
+    rapor_yoneticisi = RaporYoneticisi(db)
+    yil = datetime.now().year
+    
+    # 1. Aylık Küp (tek sorgu) - yıllık toplamlarla tutarlı olmalı
+    try:
+        aylik = rapor_yoneticisi.aylik_gelir_gider(yil)
+        ozet = rapor_yoneticisi.genel_ozet(yil)
+        gelir = sum(a['gelir'] for a in aylik)
+        gider = sum(a['gider'] for a in aylik)
+        if len(aylik) == 12 and abs(gelir - ozet['toplam_gelir']) < 0.01 \
+                and abs(gider - ozet['toplam_gider']) < 0.01:
+            log_success("Aylık Gelir-Gider", f"(gelir={gelir:.2f}, gider={gider:.2f})")
+        else:
+            log_fail("Aylık Gelir-Gider", f"küp {gelir}/{gider} != özet {ozet['toplam_gelir']}/{ozet['toplam_gider']}")
+    except Exception as e:
+        log_fail("Aylık Gelir-Gider", e)
+    
+    # 2. Köy Aylık Küp
+    try:
+        kup = rapor_yoneticisi.aylik_kup(yil, koy=True)
+        log_success("Köy Aylık Küp", f"({len(kup)} hücre)")
+    except Exception as e:
+        log_fail("Köy Aylık Küp", e)
+
+
+def _sunucu_api():
+    """Sunucu modülünü SQLite üzerinde test için yükle (bağımlılıklar yoksa None)"""
+    try:
+        os.environ.setdefault('DATABASE_URL', 'sqlite://')
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'server'))
+        import warnings
+        from sqlalchemy.dialects.postgresql import UUID, JSONB
+        from sqlalchemy.ext.compiler import compiles
+        import api
+    except ImportError as e:
+        log_warning("Sunucu Testleri", f"Sunucu bağımlılıkları yok, atlandı ({e})")
+        return None
+    
+    warnings.filterwarnings('ignore', message='.*Decimal objects natively.*')
+    
+    # SQLite'ta "UUID" kolon tipi NUMERIC benzeşimi alır (rakamsal hex id'ler sayıya döner)
+    @compiles(UUID, 'sqlite')
+    def _uuid_sqlite(type_, compiler, **kw):
+        return 'CHAR(32)'
+    
+    @compiles(JSONB, 'sqlite')
+    def _jsonb_sqlite(type_, compiler, **kw):
+        return 'TEXT'
+    
+    return api
+
+
+def test_sunucu_raporlari():
+    """Sunucu rapor sorguları (GROUP BY) eski Python döngüleriyle aynı sonucu vermeli"""
+    print_separator("SUNUCU RAPOR TESTLERİ")
+    
+    api = _sunucu_api()
+    if api is None:
+        return
+    import random
+    import time
+    from sqlalchemy import create_engine, insert
+    from sqlalchemy.orm import sessionmaker
+    
+    # Eski uygulama: tüm ORM nesnelerini yükleyip Python'da gruplar
+    def eski_gelir_gider(db, cid, yil):
+        sonuc = {}
+        for model, ad in ((api.Income, 'income'), (api.Expense, 'expense')):
+            kayitlar = db.query(model).filter(model.customer_id == cid, model.fiscal_year == yil).all()
+            kategori = {}
+            for k in kayitlar:
+                kategori[k.category or "Diğer"] = kategori.get(k.category or "Diğer", 0) + float(k.amount or 0)
+            sonuc[f"{ad}_by_category"] = kategori
+            sonuc[f"total_{ad}"] = sum(kategori.values())
+            sonuc[f"{ad}_count"] = len(kayitlar)
+        sonuc["balance"] = sonuc["total_income"] - sonuc["total_expense"]
+        sonuc["year"] = yil
+        return sonuc
+    
+    def eski_uyeler(db, cid):
+        uyeler = db.query(api.Member).filter(api.Member.customer_id == cid).all()
+        tip, cinsiyet = {}, {}
+        for m in uyeler:
+            tip[m.membership_type or "Belirsiz"] = tip.get(m.membership_type or "Belirsiz", 0) + 1
+            cinsiyet[m.gender or "Belirsiz"] = cinsiyet.get(m.gender or "Belirsiz", 0) + 1
+        ucret = sum(float(m.membership_fee or 0) for m in uyeler if m.status == 'active')
+        return {"total": len(uyeler), "active": len([m for m in uyeler if m.status == 'active']),
+                "inactive": len([m for m in uyeler if m.status == 'inactive']),
+                "by_type": tip, "by_gender": cinsiyet,
+                "total_monthly_fees": ucret, "total_yearly_fees": ucret * 12}
+    
+    def eski_aidatlar(db, cid, yil):
+        aidatlar = db.query(api.Due).filter(api.Due.customer_id == cid, api.Due.year == yil).all()
+        toplam = sum(float(d.amount or 0) for d in aidatlar)
+        odenen = sum(float(d.paid_amount or 0) for d in aidatlar)
+        aylar = {}
+        for d in aidatlar:
+            aylar.setdefault(d.month, {"amount": 0, "paid": 0})
+            aylar[d.month]["amount"] += float(d.amount or 0)
+            aylar[d.month]["paid"] += float(d.paid_amount or 0)
+        return {"year": yil, "total_amount": toplam, "total_paid": odenen, "total_remaining": toplam - odenen,
+                "collection_rate": round((odenen / toplam * 100) if toplam > 0 else 0, 2),
+                "paid_count": len([d for d in aidatlar if d.status == 'paid']),
+                "pending_count": len([d for d in aidatlar if d.status == 'pending']),
+                "by_month": aylar}
+    
+    def esit(a, b):
+        if isinstance(a, dict) and isinstance(b, dict):
+            return a.keys() == b.keys() and all(esit(a[k], b[k]) for k in a)
+        if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+            return abs(a - b) < 0.01
+        return a == b
+    
+    try:
+        engine = create_engine('sqlite://')
+        api.Base.metadata.create_all(engine, tables=[api.Member.__table__, api.Income.__table__,
+                                                     api.Expense.__table__, api.Due.__table__])
+        db = sessionmaker(bind=engine)()
+        rnd = random.Random(42)
+        yil = 2024
+        kategoriler = ['Aidat', 'Bağış', 'Kira', '', 'Etkinlik', 'Diğer']
+        
+        # Büyük kiracı + aynı tablolarda ikinci bir kiracı (filtre doğrulaması)
+        for cid, adet in (('BUYUK', 6000), ('KUCUK', 300)):
+            db.execute(insert(api.Member), [{
+                'customer_id': cid, 'full_name': f'Üye {i}',
+                'status': rnd.choice(['active', 'active', 'inactive', 'left']),
+                'membership_type': rnd.choice(['Asil', 'Onursal', None, '']),
+                'gender': rnd.choice(['Erkek', 'Kadın', None]),
+                'membership_fee': rnd.choice([None, 50, 75.5, 100])} for i in range(adet)])
+            for model in (api.Income, api.Expense):
+                db.execute(insert(model), [{
+                    'customer_id': cid, 'category': rnd.choice(kategoriler),
+                    'amount': round(rnd.uniform(1, 5000), 2),
+                    'date': datetime(rnd.choice([yil - 1, yil]), rnd.randint(1, 12), rnd.randint(1, 28)).date(),
+                    'fiscal_year': rnd.choice([yil - 1, yil, yil])} for _ in range(adet * 5)])
+        uye_idleri = [m.id for m in db.query(api.Member.id).filter(api.Member.customer_id == 'BUYUK')]
+        db.execute(insert(api.Due), [{
+            'customer_id': 'BUYUK', 'member_id': uye_id, 'year': yil, 'month': ay, 'amount': 100,
+            'paid_amount': rnd.choice([0, 0, 50, 100, None]),
+            'status': rnd.choice(['paid', 'pending', 'partial'])} for uye_id in uye_idleri for ay in range(1, 13)])
+        db.commit()
+        
+        t0 = time.perf_counter()
+        eski = (eski_gelir_gider(db, 'BUYUK', yil), eski_uyeler(db, 'BUYUK'), eski_aidatlar(db, 'BUYUK', yil))
+        db.expunge_all()
+        t1 = time.perf_counter()
+        yeni = (api.report_income_expense(db, 'BUYUK', yil), api.report_members(db, 'BUYUK'),
+                api.report_dues(db, 'BUYUK', yil))
+        t2 = time.perf_counter()
+        
+        farkli = [ad for ad, e, y in zip(('gelir-gider', 'üye', 'aidat'), eski, yeni) if not esit(e, y)]
+        tahakkuk = api.report_assessment(db, 'BUYUK', yil)
+        if tahakkuk['member_count'] != eski[1]['active'] \
+                or abs(tahakkuk['total_assessed'] - eski[1]['total_yearly_fees']) > 0.01 \
+                or abs(tahakkuk['total_collected'] - eski[2]['total_paid']) > 0.01:
+            farkli.append('tahakkuk')
+        if farkli:
+            log_fail("Sunucu Rapor Eşdeğerliği", f"farklı sonuç: {', '.join(farkli)}")
+        else:
+            log_success("Sunucu Rapor Eşdeğerliği",
+                        f"({len(uye_idleri)} üye, eski {(t1 - t0) * 1000:.0f} ms, GROUP BY {(t2 - t1) * 1000:.0f} ms)")
+        db.close()
+    except Exception as e:
+        log_fail("Sunucu Rapor Eşdeğerliği", e)
+    
+    # Bozuk cursor'lar 500 değil 400 dönmeli; geçerli cursor aynen çözülmeli
+    try:
+        import base64, json, uuid
+        from datetime import date
+        kolonlar = [api.Income.__table__.c.date, api.Income.__table__.c.id]
+        def cursor_yap(deger):
+            return base64.urlsafe_b64encode(json.dumps(deger).encode()).decode().rstrip("=")
+        bozuklar = [cursor_yap(d) for d in ([1, 2], "x", {"a": 1}, None, 5, ["2024-01-01"],
+                                            ["2024-01-01", 7], ["2024-01-01", ["x"]], ["tarih", "id"])]
+        bozuklar += ["%%%", "e30", ""]
+        kabul_edilen = []
+        for cursor in bozuklar:
+            try:
+                api.decode_cursor(cursor, kolonlar)
+                kabul_edilen.append(cursor)
+            except api.HTTPException as e:
+                if e.status_code != 400:
+                    kabul_edilen.append(cursor)
+        anahtar = [date(2024, 1, 1), uuid.uuid4()]
+        if not kabul_edilen and api.decode_cursor(api.encode_cursor(anahtar), kolonlar) == anahtar:
+            log_success("Sunucu Cursor Doğrulama", f"({len(bozuklar)} bozuk cursor 400 döndü)")
+        else:
+            log_fail("Sunucu Cursor Doğrulama", f"kabul edilen: {kabul_edilen}")
+    except Exception as e:
+        log_fail("Sunucu Cursor Doğrulama", e)
+
+
+def test_sunucu_ozet_tablosu():
+    """Yazma uç noktalarının artımlı tenant_stats güncellemesi mutabakatla aynı olmalı"""
+    print_separator("SUNUCU ÖZET TABLOSU TESTLERİ")
+    
+    api = _sunucu_api()
+    if api is None:
+        return
+    import uuid
+    from sqlalchemy import create_engine, event
+    
+    def anlik(db):
+        return sorted(
+            (r.customer_id, r.year) + tuple(round(float(getattr(r, k)), 2) for k in api.TENANT_STAT_COLUMNS)
+            for r in db.query(api.TenantStats)
+            if any(getattr(r, k) for k in api.TENANT_STAT_COLUMNS))
+    
+    try:
+        engine = create_engine('sqlite://')
+        event.listen(engine, 'connect', lambda conn, _: conn.execute('PRAGMA foreign_keys=ON'))
+        api.Base.metadata.create_all(engine, tables=[
+            api.Customer.__table__, api.Member.__table__, api.Income.__table__,
+            api.Expense.__table__, api.Due.__table__, api.TenantStats.__table__])
+        api.SessionLocal.configure(bind=engine)
+        db = api.SessionLocal()
+        db.add(api.Customer(customer_id='OZET', api_key='ozet_key', name='Özet Derneği', max_members=100))
+        db.commit()
+        
+        yil = datetime.now().year
+        bugun = datetime.now().date()
+        uyeler = []
+        for i in range(4):
+            sonuc = api.create_member(api.MemberCreate(full_name=f'Üye {i}', membership_fee=50), 'ozet_key', db)
+            uyeler.append(uuid.UUID(sonuc['id']))
+        api.update_member(uyeler[1], api.MemberCreate(full_name='Üye 1', status='inactive'), 'ozet_key', db)
+        api.web_member_leave(uyeler[2], {'leave_date': bugun}, 'ozet_key', db)
+        api.web_member_reactivate(uyeler[2], 'ozet_key', db)
+        
+        gelir = api.create_income(api.IncomeCreate(category='Bağış', amount=250, date=bugun), 'ozet_key', db)
+        api.create_income(api.IncomeCreate(category='Kira', amount=100, date=bugun, fiscal_year=yil - 1), 'ozet_key', db)
+        api.web_update_income(uuid.UUID(gelir['id']), {'amount': 300}, 'ozet_key', db)
+        gider = api.create_expense(api.ExpenseCreate(category='Fatura', amount=80, date=bugun), 'ozet_key', db)
+        api.web_delete_expense(uuid.UUID(gider['id']), 'ozet_key', db)
+        api.create_expense(api.ExpenseCreate(category='Kira', amount=40, date=bugun), 'ozet_key', db)
+        
+        for ay in (1, 2, 3):
+            api.db_create_due({'uye_id': uyeler[0], 'yil': yil, 'ay': ay, 'yillik_aidat_tutari': 50}, 'ozet_key', db)
+            api.db_create_due({'uye_id': uyeler[3], 'yil': yil, 'ay': ay, 'yillik_aidat_tutari': 50}, 'ozet_key', db)
+        api.pay_due(uyeler[0], api.DuePayment(year=yil, month=1, amount=50), 'ozet_key', db)
+        api.pay_due(uyeler[0], api.DuePayment(year=yil, month=2, amount=20), 'ozet_key', db)
+        api.web_multi_year_dues_payment({'member_id': uyeler[3], 'years': [yil, yil + 1], 'months': [1, 2],
+                                         'amount_per_month': 50, 'payment_date': bugun}, 'ozet_key', db)
+        api.delete_member(uyeler[0], 'ozet_key', db)  # aidatları CASCADE ile silinir
+        
+        artimli = anlik(db)
+        panel = api.get_dashboard('ozet_key', db)['stats']
+        tutarli = api.reconcile_tenant_stats(db)
+        yeniden = anlik(db)
+        # Sapma: yalnızca bozulan satır düzeltilmeli
+        db.query(api.TenantStats).filter_by(customer_id='OZET', year=yil).update(
+            {'income_total': api.TenantStats.income_total + 999})
+        db.commit()
+        duzeltilen = api.reconcile_tenant_stats(db, 'OZET')
+        
+        beklenen_panel = {'total_members': 2, 'total_income': 500.0, 'total_expense': 40.0, 'pending_dues': 1}
+        farkli = {k: panel[k] for k in beklenen_panel if abs(panel[k] - beklenen_panel[k]) > 0.001}
+        if artimli != yeniden:
+            log_fail("Kiracı Özet Tablosu", f"artımlı {artimli} != mutabakat {yeniden}")
+        elif tutarli != 0 or duzeltilen != 1 or anlik(db) != artimli:
+            log_fail("Kiracı Özet Tablosu", f"mutabakat düzeltmesi: tutarlıda {tutarli}, sapmada {duzeltilen} satır")
+        elif farkli:
+            log_fail("Kiracı Özet Tablosu", f"dashboard beklenenden farklı: {farkli}")
+        else:
+            log_success("Kiracı Özet Tablosu", f"({len(artimli)} satır, artımlı = mutabakat, dashboard doğru)")
+        db.close()
+    except Exception as e:
+        log_fail("Kiracı Özet Tablosu", e)
+
+    # Mevcut kurulum: kaynak satırlar var, tenant_stats yeni oluşturulmuş (boş)
+    try:
+        db = api.SessionLocal()
+        db.add(api.Customer(customer_id='MEVCUT', api_key='mevcut_key', name='Mevcut Dernek', max_members=1000))
+        db.commit()
+        # Core INSERT: before_flush çalışmaz (tablo öncesinden kalan veri gibi)
+        db.execute(api.insert(api.Member), [
+            {'id': uuid.uuid4(), 'customer_id': 'MEVCUT', 'full_name': f'Eski Üye {i}', 'status': 'active'}
+            for i in range(300)])
+        db.execute(api.delete(api.TenantStats))
+        db.commit()
+        ilk = api.seed_tenant_stats(engine)
+        ikinci = api.seed_tenant_stats(engine)
+        api.create_member(api.MemberCreate(full_name='Yeni Üye'), 'mevcut_key', db)
+        toplam = api.get_dashboard('mevcut_key', db)['stats']['total_members']
+        if ilk and ikinci is None and toplam == 301:
+            log_success("Kiracı Özeti İlk Doldurma", f"({ilk} satır, dashboard {toplam} üye)")
+        else:
+            log_fail("Kiracı Özeti İlk Doldurma", f"doldurma {ilk}/{ikinci}, dashboard {toplam} üye")
+        db.close()
+    except Exception as e:
+        log_fail("Kiracı Özeti İlk Doldurma", e)
+
+
 def print_final_report():
     """Final test raporu"""
     print_separator("KAPSAMLI TEST RAPORU")
@@ -535,6 +1221,9 @@ def main():
     test_gider_module(db, kasa_id)
     test_aidat_module(db)
     test_virman_module(db, kasa_id)
+    test_rapor_module(db)
+    test_sunucu_raporlari()
+    test_sunucu_ozet_tablosu()
     
     # Final rapor
     print_final_report()
@@ -18,6 +18,8 @@ from typing import Optional
 from ui_drawer import DrawerPanel
 from ui_form_fields import create_combo_box, create_spin_box, create_double_spin_box, create_date_edit, create_line_edit
 from ui_helpers import export_table_to_excel, setup_resizable_table
+from ui_table_model import VeriTablosu, Sutun
+from ui_loader import VeriYukleyici
 from ui_login import session
 
 
@@ -242,6 +244,9 @@ class AidatWidget(QWidget):
         self.uye_yoneticisi = UyeYoneticisi(db)
         self.aidat_yoneticisi = AidatYoneticisi(db)
         self.selected_aidat_id = None
+        self.aidatlar = []
+        self._secilecek_aidat_id = None
+        self.yukleyici = VeriYukleyici("Aidat", db, self)
         self.setup_ui()
         self.load_aidatlar()
         self.apply_permissions()
@@ -252,6 +257,7 @@ class AidatWidget(QWidget):
         can_collect = session.has_permission('aidat_tahsilat')
         self.toplu_olustur_btn.setVisible(can_edit)
         self.tek_olustur_btn.setVisible(can_edit)
+        self.mutabakat_btn.setVisible(can_edit)
         self.odeme_ekle_btn.setVisible(can_collect)
         self.odeme_sil_btn.setVisible(can_edit)
         self.aidat_export_btn.setVisible(session.has_permission('rapor_export'))
@@ -312,6 +318,11 @@ class AidatWidget(QWidget):
         self.tek_olustur_btn.clicked.connect(self.tek_aidat_olustur)
         toolbar_layout.addWidget(self.tek_olustur_btn)
         
+        self.mutabakat_btn = QPushButton("🔄 Gelir Mutabakatı")
+        self.mutabakat_btn.setToolTip("Aidat durumlarını ve bağlı gelir kayıtlarını toplu olarak yeniden hesaplar")
+        self.mutabakat_btn.clicked.connect(self.gelir_mutabakati)
+        toolbar_layout.addWidget(self.mutabakat_btn)
+        
         layout.addLayout(toolbar_layout)
         
         # Splitter (üst: aidat listesi, alt: ödemeler)
@@ -322,21 +333,25 @@ class AidatWidget(QWidget):
         top_layout = QVBoxLayout()
         top_layout.setContentsMargins(0, 0, 0, 0)
         
-        self.aidat_table = QTableWidget()
-        self.aidat_table.setColumnCount(8)
-        self.aidat_table.setHorizontalHeaderLabels([
-            "ID", "Üye", "Yıl", "Yıllık Aidat", "Toplam Ödenen", 
-            "Kalan", "Durum", "Aktarım"
+        tl = lambda deger: f"{deger:.2f} ₺"
+        self.aidat_table = VeriTablosu([
+            Sutun("ID", 'aidat_id'),
+            Sutun("Üye", 'ad_soyad'),
+            Sutun("Yıl", 'yil'),
+            Sutun("Yıllık Aidat", 'yillik_aidat_tutari', tl),
+            Sutun("Toplam Ödenen", 'toplam_odenen', tl),
+            Sutun("Kalan", 'odenecek_tutar', tl,
+                  renk=lambda a: Qt.GlobalColor.darkRed if a['odenecek_tutar'] > 0 else Qt.GlobalColor.darkGreen),
+            Sutun("Durum", 'durum', renk=self._durum_rengi),
+            Sutun("Aktarım", 'aktarim_durumu',
+                  renk=lambda a: Qt.GlobalColor.darkGreen if a['aktarim_durumu'] == 'Aktarıldı' else None),
         ])
         
         # Sütun genişliklerini responsive yap
         setup_resizable_table(self.aidat_table, table_id="aidat_tablosu", stretch_column=1)
         
-        self.aidat_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.aidat_table.setSelectionMode(QTableWidget.SelectionMode.SingleSelection)
-        self.aidat_table.setAlternatingRowColors(True)
-        self.aidat_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)  # Aidat tablosu için inline editing kapalı (karmaşık hesaplamalar var)
-        self.aidat_table.itemSelectionChanged.connect(self.on_aidat_selected)
+        # Aidat tablosu için inline editing kapalı (karmaşık hesaplamalar var)
+        self.aidat_table.secim_degisti.connect(self.on_aidat_selected)
         
         top_layout.addWidget(self.aidat_table)
         top_widget.setLayout(top_layout)
@@ -426,64 +441,28 @@ class AidatWidget(QWidget):
         self.setLayout(layout)
         
     def load_aidatlar(self):
-        """Aidat kayıtlarını yükle"""
+        """Aidat kayıtlarını arka planda yükle"""
         yil_data = self.yil_filter.currentData()
         durum_text = self.durum_filter.currentText()
-        
-        # Çoklu yıl kontrolü
+        if not self.aidat_table.rowCount():
+            self.aidat_table.iskelet_goster()
+        self.yukleyici.yukle(lambda: self._aidatlari_getir(yil_data, durum_text), self._aidatlari_goster)
+
+    def _aidatlari_getir(self, yil_data, durum_text: str) -> list:
+        """Aidat sorgusu (havuz thread'inde, filtreler SQL'de)"""
+        filtre = {'durum': durum_text if durum_text != "Tümü" else None}
         if isinstance(yil_data, str) and '-' in yil_data:
             # Çoklu yıl aralığı: "2024-2026" formatı
-            try:
-                yillar = yil_data.split('-')
-                baslangic_yil = int(yillar[0])
-                bitis_yil = int(yillar[1])
-                
-                # Tüm yılları al ve filtrele
-                aidatlar = self.aidat_yoneticisi.aidat_listesi()
-                aidatlar = [a for a in aidatlar if baslangic_yil <= a['yil'] <= bitis_yil]
-            except:
-                aidatlar = self.aidat_yoneticisi.aidat_listesi()
+            baslangic_yil, bitis_yil = (int(y) for y in yil_data.split('-'))
+            filtre.update(baslangic_yil=baslangic_yil, bitis_yil=bitis_yil)
         else:
             # Tek yıl veya tümü
-            aidatlar = self.aidat_yoneticisi.aidat_listesi(yil=yil_data)
-        
-        # Durum filtreleme
-        if durum_text != "Tümü":
-            aidatlar = [a for a in aidatlar if a['durum'] == durum_text]
-        
-        self.aidat_table.setRowCount(0)
-        
-        for aidat in aidatlar:
-            row = self.aidat_table.rowCount()
-            self.aidat_table.insertRow(row)
-            
-            self.aidat_table.setItem(row, 0, QTableWidgetItem(str(aidat['aidat_id'])))
-            self.aidat_table.setItem(row, 1, QTableWidgetItem(aidat['ad_soyad']))
-            self.aidat_table.setItem(row, 2, QTableWidgetItem(str(aidat['yil'])))
-            self.aidat_table.setItem(row, 3, QTableWidgetItem(f"{aidat['yillik_aidat_tutari']:.2f} ₺"))
-            self.aidat_table.setItem(row, 4, QTableWidgetItem(f"{aidat['toplam_odenen']:.2f} ₺"))
-            
-            kalan = aidat['odenecek_tutar']
-            kalan_item = QTableWidgetItem(f"{kalan:.2f} ₺")
-            if kalan > 0:
-                kalan_item.setForeground(Qt.GlobalColor.darkRed)
-            else:
-                kalan_item.setForeground(Qt.GlobalColor.darkGreen)
-            self.aidat_table.setItem(row, 5, kalan_item)
-            
-            durum_item = QTableWidgetItem(aidat['durum'])
-            if aidat['durum'] == 'Tamamlandı':
-                durum_item.setForeground(Qt.GlobalColor.darkGreen)
-            elif aidat['durum'] == 'Kısmi':
-                durum_item.setForeground(QColor(255, 140, 0))
-            else:
-                durum_item.setForeground(Qt.GlobalColor.darkRed)
-            self.aidat_table.setItem(row, 6, durum_item)
-            
-            aktarim_item = QTableWidgetItem(aidat['aktarim_durumu'])
-            if aidat['aktarim_durumu'] == 'Aktarıldı':
-                aktarim_item.setForeground(Qt.GlobalColor.darkGreen)
-            self.aidat_table.setItem(row, 7, aktarim_item)
+            filtre['yil'] = yil_data
+        return self.aidat_yoneticisi.aidat_listesi(**filtre)
+
+    def _aidatlari_goster(self, aidatlar: list):
+        self.aidatlar = aidatlar
+        self.aidat_table.yukle(aidatlar)
         
         # İstatistikleri güncelle
         self.update_stats()
@@ -493,18 +472,25 @@ class AidatWidget(QWidget):
         self.selected_aidat_id = None
         self.odeme_ekle_btn.setEnabled(False)
         
+        # İşlem sonrası yeniden yüklemede aynı kaydı tekrar seç
+        secilecek, self._secilecek_aidat_id = self._secilecek_aidat_id, None
+        if secilecek:
+            self.aidat_table.satiri_sec(lambda a: a['aidat_id'] == secilecek)
+        
+    @staticmethod
+    def _durum_rengi(aidat: dict):
+        """Durum sütunu rengi"""
+        if aidat['durum'] == 'Tamamlandı':
+            return Qt.GlobalColor.darkGreen
+        elif aidat['durum'] == 'Kısmi':
+            return QColor(255, 140, 0)
+        return Qt.GlobalColor.darkRed
+        
     def update_stats(self):
         """İstatistikleri güncelle"""
-        toplam = self.aidat_table.rowCount()
-        tamamlanan = 0
-        eksik = 0
-        
-        for row in range(toplam):
-            durum = self.aidat_table.item(row, 6).text()
-            if durum == "Tamamlandı":
-                tamamlanan += 1
-            else:
-                eksik += 1
+        toplam = len(self.aidatlar)
+        tamamlanan = sum(1 for aidat in self.aidatlar if aidat['durum'] == "Tamamlandı")
+        eksik = toplam - tamamlanan
         
         self.toplam_label.setText(f"Toplam Kayıt: {toplam}")
         self.tamamlanan_label.setText(f"Tamamlanan: {tamamlanan}")
@@ -515,8 +501,7 @@ class AidatWidget(QWidget):
         if not self.aidat_table.selectionModel().hasSelection():
             return
             
-        row = self.aidat_table.currentRow()
-        self.selected_aidat_id = int(self.aidat_table.item(row, 0).text())
+        self.selected_aidat_id = self.aidat_table.secili_satir()['aidat_id']
         
         self.odeme_ekle_btn.setEnabled(True)
         self.load_odemeler()
@@ -560,10 +545,10 @@ class AidatWidget(QWidget):
                           self)
             if w.exec():
                 try:
-                    olusturulan = self.aidat_yoneticisi.toplu_aidat_olustur(data['yil'], data['tutar'])
+                    sonuc = self.aidat_yoneticisi.toplu_aidat_olustur(data['yil'], data['tutar'])
                     self.load_aidatlar()
-                    MessageBox("Başarılı", f"{olusturulan} adet aidat kaydı oluşturuldu!"
-                    , 
+                    MessageBox("Başarılı", f"{sonuc['olusturulan']} adet aidat kaydı oluşturuldu!\n"
+                               f"{sonuc['atlanan']} üyenin kaydı zaten mevcut.", 
                         self).show()
                     drawer.close()
                 except Exception as e:
@@ -593,35 +578,58 @@ class AidatWidget(QWidget):
         drawer.accepted.connect(on_submit)
         drawer.show()
         
+    def gelir_mutabakati(self):
+        """Aidat <-> Gelir toplu mutabakatı: önce fark raporu, onaylanırsa uygula"""
+        yil = self.yil_filter.currentData()
+        yil = yil if isinstance(yil, int) else None
+        kapsam = f"{yil} yılı" if yil else "tüm yıllar"
+        try:
+            rapor = self.aidat_yoneticisi.aidat_gelir_mutabakati(yil, kuru_calisma=True)
+        except Exception as e:
+            MessageBox("Hata", f"Mutabakat hesaplanamadı:\n{e}", self).show()
+            return
+        
+        ozet = rapor['ozet']
+        if not any(ozet.values()):
+            MessageBox("Gelir Mutabakatı", f"{kapsam}: {rapor['toplam_aidat']} aidat kaydı tutarlı, fark yok.",
+                       self).show()
+            return
+        
+        satirlar = [f"Durum/kalan güncellenecek: {ozet['durum']}"]
+        satirlar += [f"{aciklama}: {ozet[islem]}"
+                     for islem, aciklama in self.aidat_yoneticisi.MUTABAKAT_ISLEMLERI.items() if ozet[islem]]
+        w = MessageBox("Gelir Mutabakatı",
+                       f"{kapsam} ({rapor['toplam_aidat']} aidat kaydı):\n\n" + "\n".join(satirlar) +
+                       "\n\nDeğişiklikler uygulansın mı?", self)
+        if w.exec():
+            try:
+                self.aidat_yoneticisi.aidat_gelir_mutabakati(yil)
+                self._secilecek_aidat_id = self.selected_aidat_id
+                self.load_aidatlar()
+                MessageBox("Başarılı", "Mutabakat uygulandı.", self).show()
+            except Exception as e:
+                MessageBox("Hata", f"Hata oluştu:\n{e}", self).show()
+        
     def odeme_ekle(self):
         """Ödeme ekle - Yıl seçimi ile"""
         if not self.selected_aidat_id:
             return
             
         # Seçili aidat kaydının üye bilgisini al
-        row = self.aidat_table.currentRow()
-        kalan_text = self.aidat_table.item(row, 5).text().replace(" ₺", "").replace(",", "")
-        kalan = float(kalan_text)
-        mevcut_yil = int(self.aidat_table.item(row, 2).text())
-        
-        # Üyenin tüm borçlu yıllarını bul
-        uye_adi = self.aidat_table.item(row, 1).text()
+        secili = self.aidat_table.secili_satir()
+        kalan = secili['odenecek_tutar']
+        mevcut_yil = secili['yil']
+        uye_adi = secili['ad_soyad']
         
-        # Tüm aidat kayıtlarından bu üyenin borçlarını bul
+        # Listelenen aidat kayıtlarından bu üyenin borçlu yıllarını bul
         uye_yillari = []
-        for i in range(self.aidat_table.rowCount()):
-            if self.aidat_table.item(i, 1).text() == uye_adi:
-                yil = int(self.aidat_table.item(i, 2).text())
-                kalan_str = self.aidat_table.item(i, 5).text().replace(" ₺", "").replace(",", "")
-                kalan_tutar = float(kalan_str)
-                aidat_id = int(self.aidat_table.item(i, 0).text())
-                durum = self.aidat_table.item(i, 6).text()
-                
-                if kalan_tutar > 0 or durum != "Tamamlandı":
+        for aidat in self.aidatlar:
+            if aidat['uye_id'] == secili['uye_id']:
+                if aidat['odenecek_tutar'] > 0 or aidat['durum'] != "Tamamlandı":
                     uye_yillari.append({
-                        'yil': yil,
-                        'kalan': kalan_tutar,
-                        'aidat_id': aidat_id
+                        'yil': aidat['yil'],
+                        'kalan': aidat['odenecek_tutar'],
+                        'aidat_id': aidat['aidat_id']
                     })
         
         # Seçili yılı en üste al
@@ -647,12 +655,9 @@ class AidatWidget(QWidget):
                     data.get('aciklama', ''),
                     data.get('tahsilat_turu', 'Nakit')
                 )
-                self.load_aidatlar()
                 # Aynı kaydı tekrar seç
-                for i in range(self.aidat_table.rowCount()):
-                    if int(self.aidat_table.item(i, 0).text()) == aidat_id:
-                        self.aidat_table.selectRow(i)
-                        break
+                self._secilecek_aidat_id = aidat_id
+                self.load_aidatlar()
                 MessageBox("Başarılı", "Ödeme kaydedildi!", self).show()
                 drawer.close()
             except Exception as e:
@@ -674,12 +679,9 @@ class AidatWidget(QWidget):
         if w.exec():
             try:
                 self.aidat_yoneticisi.aidat_odeme_sil(odeme_id)
-                self.load_aidatlar()
                 # Aynı kaydı tekrar seç
-                for i in range(self.aidat_table.rowCount()):
-                    if int(self.aidat_table.item(i, 0).text()) == self.selected_aidat_id:
-                        self.aidat_table.selectRow(i)
-                        break
+                self._secilecek_aidat_id = self.selected_aidat_id
+                self.load_aidatlar()
                 MessageBox("Başarılı", "Ödeme silindi!", self).show()
             except Exception as e:
                 MessageBox("Hata", f"Hata oluştu:\n{e}", self).show()
@@ -700,9 +702,9 @@ class AidatWidget(QWidget):
         if not self.selected_aidat_id:
             return
         
-        aidat_row = self.aidat_table.currentRow()
-        ad_soyad = self.aidat_table.item(aidat_row, 1).text() if aidat_row >= 0 else "-"
-        yil = self.aidat_table.item(aidat_row, 2).text() if aidat_row >= 0 else "-"
+        aidat = self.aidat_table.secili_satir()
+        ad_soyad = aidat['ad_soyad'] if aidat else "-"
+        yil = str(aidat['yil']) if aidat else "-"
         
         try:
             from pdf_generator import MakbuzGenerator
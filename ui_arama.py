@@ -249,25 +249,16 @@ class GelismisAramaWidget(QWidget):
         """Gelirlerde ara"""
         results = []
         try:
-            # Tüm gelirleri al ve filtrele
-            gelirler = self.gelir_yoneticisi.gelir_listesi()
-            q_lower = query.lower()
-            
-            for gelir in gelirler:
-                aciklama = (gelir.get('aciklama') or '').lower()
-                gelir_turu = (gelir.get('gelir_turu') or '').lower()
-                tahsil_eden = (gelir.get('tahsil_eden') or '').lower()
-                
-                if q_lower in aciklama or q_lower in gelir_turu or q_lower in tahsil_eden:
-                    results.append({
-                        'id': gelir['gelir_id'],
-                        'modul': 'Gelir',
-                        'tip': gelir['gelir_turu'],
-                        'ad': gelir['aciklama'],
-                        'detay': gelir.get('kasa_adi', ''),
-                        'tutar': f"{gelir['tutar']:,.2f} ₺",
-                        'tarih': gelir['tarih']
-                    })
+            for gelir in self.gelir_yoneticisi.gelir_ara(query):
+                results.append({
+                    'id': gelir['gelir_id'],
+                    'modul': 'Gelir',
+                    'tip': gelir['gelir_turu'],
+                    'ad': gelir['aciklama'],
+                    'detay': gelir.get('kasa_adi', ''),
+                    'tutar': f"{gelir['tutar']:,.2f} ₺",
+                    'tarih': gelir['tarih']
+                })
         except:
             pass
         return results
@@ -276,24 +267,16 @@ class GelismisAramaWidget(QWidget):
         """Giderlerde ara"""
         results = []
         try:
-            giderler = self.gider_yoneticisi.gider_listesi()
-            q_lower = query.lower()
-            
-            for gider in giderler:
-                aciklama = (gider.get('aciklama') or '').lower()
-                gider_turu = (gider.get('gider_turu') or '').lower()
-                odeyen = (gider.get('odeyen') or '').lower()
-                
-                if q_lower in aciklama or q_lower in gider_turu or q_lower in odeyen:
-                    results.append({
-                        'id': gider['gider_id'],
-                        'modul': 'Gider',
-                        'tip': gider['gider_turu'],
-                        'ad': gider['aciklama'],
-                        'detay': gider.get('kasa_adi', ''),
-                        'tutar': f"-{gider['tutar']:,.2f} ₺",
-                        'tarih': gider['tarih']
-                    })
+            for gider in self.gider_yoneticisi.gider_ara(query):
+                results.append({
+                    'id': gider['gider_id'],
+                    'modul': 'Gider',
+                    'tip': gider['gider_turu'],
+                    'ad': gider['aciklama'],
+                    'detay': gider.get('kasa_adi', ''),
+                    'tutar': f"-{gider['tutar']:,.2f} ₺",
+                    'tarih': gider['tarih']
+                })
         except:
             pass
         return results
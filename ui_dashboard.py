@@ -36,6 +36,7 @@ from qfluentwidgets import (PushButton, PrimaryPushButton, ComboBox,
                             SpinBox, TitleLabel, SubtitleLabel, BodyLabel)
 from database import Database
 from models import RaporYoneticisi, KasaYoneticisi, AidatYoneticisi, EtkinlikYoneticisi
+from ui_loader import VeriYukleyici
 from datetime import datetime
 
 
@@ -379,6 +380,7 @@ class DashboardWidget(QWidget):
             self.etkinlik_yoneticisi = EtkinlikYoneticisi(db)
         except:
             self.etkinlik_yoneticisi = None
+        self.yukleyici = VeriYukleyici("Dashboard", db, self)
         self.setup_ui()
         self.load_dashboard()
         
@@ -492,17 +494,51 @@ class DashboardWidget(QWidget):
             )
         
     def load_dashboard(self):
-        """Dashboard verilerini yükle ve göster"""
+        """Dashboard verilerini arka planda yükle, gelince göster"""
         yil = self.yil_spin.value()
-        
-        # Genel özet
-        ozet = self.rapor_yoneticisi.genel_ozet(yil)
-        
-        # Kartları temizle
+        self._iskelet_kartlari_goster()
+        self.yukleyici.yukle(lambda: self._dashboard_verisi(yil), self._dashboard_ciz)
+
+    def _dashboard_verisi(self, yil) -> dict:
+        """Tüm dashboard sorguları (havuz thread'inde çalışır, widget'a dokunmaz)"""
+        baslangic = f"{yil}-01-01"
+        bitis = f"{yil}-12-31"
+        veri = {
+            'ozet': self.rapor_yoneticisi.genel_ozet(yil),
+            'aylik': self.rapor_yoneticisi.aylik_gelir_gider(yil),
+            'gelir_dagilim': self.rapor_yoneticisi.gelir_turu_dagilimi(baslangic, bitis),
+            'gider_dagilim': self.rapor_yoneticisi.gider_turu_dagilimi(baslangic, bitis),
+            'kasa_ozet': self.kasa_yoneticisi.tum_kasalar_ozet(),
+            'tahakkuk': None,
+        }
+        try:
+            from models import TahakkukYoneticisi
+            tahakkuk_ozet = TahakkukYoneticisi(self.db).tahakkuk_ozet()  # Parametre almayan versiyon
+            veri['tahakkuk'] = sum(t.get('tutar', 0) for t in tahakkuk_ozet) if tahakkuk_ozet else 0
+        except Exception as e:
+            # Tahakkuk sistemi yoksa skip
+            print(f"Tahakkuk kartı yüklenemedi: {e}")
+        return veri
+
+    def _kartlari_temizle(self):
         while self.cards_layout.count():
             item = self.cards_layout.takeAt(0)
             if item.widget():
                 item.widget().deleteLater()
+
+    def _iskelet_kartlari_goster(self):
+        """Veri gelene kadar gri yer tutucu kartlar"""
+        if self.cards_layout.count():
+            return  # Yenilemede eski kartlar veri gelene kadar kalsın
+        for baslik in ("Gelir", "Gider", "Net", "Kasa", "Aidat", "Tahakkuk"):
+            self.cards_layout.addWidget(StatCard(baslik, "···", "#E3E3E3"))
+
+    def _dashboard_ciz(self, veri: dict):
+        """Sorgu sonuçlarını kartlara ve grafiklere uygula (ana thread)"""
+        ozet = veri['ozet']
+        
+        # Kartları temizle
+        self._kartlari_temizle()
         
         # İstatistik kartları - TEK SATIR (5 kart, MİNİMAL TASARIM)
         
@@ -528,81 +564,46 @@ class DashboardWidget(QWidget):
         self.cards_layout.addWidget(kasa_card)
         
         # Aidat Kartı - Turuncu
-        aidat_orani = (ozet['aidat_odenen_uye'] / ozet['toplam_uye'] * 100) if ozet['toplam_uye'] > 0 else 0
         aidat_card = StatCard("Aidat", f"{ozet['aidat_odenen_uye']}/{ozet['toplam_uye']}", "#ff9f43")
         self.cards_layout.addWidget(aidat_card)
         
         # Tahakkuk Kartı - Açık Kırmızı (Gelecek yıl tahakkuku)
-        try:
-            from models import TahakkukYoneticisi
-            tahakkuk_yoneticisi = TahakkukYoneticisi(self.db)
-            tahakkuk_ozet = tahakkuk_yoneticisi.tahakkuk_ozet()  # Parametre almayan versiyon
-            toplam_tahakkuk = sum(t.get('tutar', 0) for t in tahakkuk_ozet) if tahakkuk_ozet else 0
+        toplam_tahakkuk = veri['tahakkuk']
+        if toplam_tahakkuk is not None:
             tahakkuk_deger = f"₺{toplam_tahakkuk/1000:.0f}K" if toplam_tahakkuk >= 1000 else f"₺{toplam_tahakkuk:.0f}"
             tahakkuk_card = StatCard("Tahakkuk", tahakkuk_deger, "#ea5455")
             self.cards_layout.addWidget(tahakkuk_card)
-        except Exception as e:
-            # Tahakkuk sistemi yoksa skip
-            print(f"Tahakkuk kartı yüklenemedi: {e}")
         
         # Grafikler
-        self.load_charts(yil)
+        self.load_charts(veri)
         
-    def load_charts(self, yil):
-        """Grafikleri yükle"""
-        # 1. Aylık Gelir-Gider (son 12 ay)
-        # Basitleştirilmiş - sadece yıllık toplam
-        baslangic = f"{yil}-01-01"
-        bitis = f"{yil}-12-31"
-        
-        # Ay bazında gelir-gider hesapla
+    def load_charts(self, veri: dict):
+        """Grafikleri çiz"""
+        # 1. Aylık Gelir-Gider
         aylar = ['Oca', 'Şub', 'Mar', 'Nis', 'May', 'Haz', 'Tem', 'Ağu', 'Eyl', 'Eki', 'Kas', 'Ara']
-        gelirler = []
-        giderler = []
-        
-        for ay in range(1, 13):
-            ay_baslangic = f"{yil}-{ay:02d}-01"
-            if ay == 12:
-                ay_bitis = f"{yil}-12-31"
-            else:
-                ay_bitis = f"{yil}-{ay+1:02d}-01"
-                
-            # Gelir
-            self.db.cursor.execute("""
-                SELECT COALESCE(SUM(tutar), 0) FROM gelirler 
-                WHERE tarih >= ? AND tarih < ?
-            """, (ay_baslangic, ay_bitis))
-            gelir = self.db.cursor.fetchone()[0]
-            gelirler.append(gelir)
-            
-            # Gider
-            self.db.cursor.execute("""
-                SELECT COALESCE(SUM(tutar), 0) FROM giderler 
-                WHERE tarih >= ? AND tarih < ?
-            """, (ay_baslangic, ay_bitis))
-            gider = self.db.cursor.fetchone()[0]
-            giderler.append(gider)
+        aylik = veri['aylik']
+        gelirler = [a['gelir'] for a in aylik]
+        giderler = [a['gider'] for a in aylik]
         
         self.gelir_gider_chart.plot_gelir_gider(aylar, gelirler, giderler)
         
         # 2. Gelir Dağılımı
-        gelir_dagilim = self.rapor_yoneticisi.gelir_turu_dagilimi(baslangic, bitis)
+        gelir_dagilim = veri['gelir_dagilim']
         if gelir_dagilim:
             turler = [g['gelir_turu'] for g in gelir_dagilim]
             tutarlar = [g['toplam'] for g in gelir_dagilim]
             self.gelir_dagilim_chart.plot_gelir_dagilim(turler, tutarlar)
         
         # 3. Gider Dağılımı
-        gider_dagilim = self.rapor_yoneticisi.gider_turu_dagilimi(baslangic, bitis)
+        gider_dagilim = veri['gider_dagilim']
         if gider_dagilim:
             turler = [g['gider_turu'] for g in gider_dagilim[:8]]  # İlk 8 tür
             tutarlar = [g['toplam'] for g in gider_dagilim[:8]]
             self.gider_dagilim_chart.plot_gider_dagilim(turler, tutarlar)
         
         # 4. Kasa Bakiyeleri
-        kasa_ozet = self.kasa_yoneticisi.tum_kasalar_ozet()
+        kasa_ozet = veri['kasa_ozet']
         if kasa_ozet:
             kasalar = [k['kasa_adi'] for k in kasa_ozet]
             bakiyeler = [k['net_bakiye'] for k in kasa_ozet]
             self.kasa_chart.plot_kasa_dagilim(kasalar, bakiyeler)
-
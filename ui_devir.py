@@ -11,7 +11,7 @@ from PyQt5.QtCore import Qt, QThread, pyqtSignal
 from PyQt5.QtGui import QColor
 from qfluentwidgets import MessageBox
 from database import Database
-from models import KasaYoneticisi
+from models import KasaYoneticisi, DevirYoneticisi
 from datetime import datetime
 from ui_drawer import DrawerPanel
 from ui_helpers import setup_resizable_table
@@ -23,44 +23,20 @@ class DevirThread(QThread):
     progress = pyqtSignal(int, str)
     finished = pyqtSignal(bool, str)
     
-    def __init__(self, db: Database, eski_yil: int, yeni_yil: int):
+    def __init__(self, devir_yoneticisi: DevirYoneticisi, eski_yil: int, yeni_yil: int):
         super().__init__()
-        self.db = db
+        self.devir_yoneticisi = devir_yoneticisi
+        self.db = devir_yoneticisi.db
         self.eski_yil = eski_yil
         self.yeni_yil = yeni_yil
         
     def run(self):
         try:
-            kasa_yoneticisi = KasaYoneticisi(self.db)
-            
-            self.progress.emit(20, "Kasa bakiyeleri hesaplanıyor...")
-            
-            # Tüm kasaların net bakiyesini hesapla
-            kasalar = kasa_yoneticisi.tum_kasalar_ozet()
+            self.progress.emit(20, "Devir bakiyeleri güncelleniyor...")
             
-            self.progress.emit(40, "Devir bakiyeleri güncelleniyor...")
-            
-            devir_sayisi = 0
-            for kasa in kasalar:
-                # Net bakiyeyi yeni devir olarak kaydet
-                self.db.cursor.execute("""
-                    UPDATE kasalar
-                    SET devir_bakiye = devir_bakiye + ?
-                    WHERE kasa_id = ?
-                """, (kasa['net_bakiye'] - kasa['devir_bakiye'], kasa['kasa_id']))
-                
-                devir_sayisi += 1
-                
-            self.progress.emit(60, "Log kaydı oluşturuluyor...")
-            
-            # Log kaydı
-            self.db.log_islem(
-                "Sistem",
-                "DEVİR",
-                "kasalar",
-                0,
-                f"{self.eski_yil} → {self.yeni_yil} yıl sonu devir işlemi tamamlandı. {devir_sayisi} kasa aktarıldı."
-            )
+            # Onay panelinde gösterilen önizleme hâlâ geçerliyse aynen uygulanır;
+            # arada veri değiştiyse rakamlar aynı yazma işleminde yeniden hesaplanır
+            devir_raporu = self.devir_yoneticisi.yil_sonu_devir(self.eski_yil, onay=True)
             
             self.progress.emit(80, "Devir raporu hazırlanıyor...")
             
@@ -70,16 +46,16 @@ class DevirThread(QThread):
             rapor += f"Tarih: {datetime.now().strftime('%d.%m.%Y %H:%M:%S')}\n"
             rapor += f"Devir: {self.eski_yil} → {self.yeni_yil}\n\n"
             
-            for kasa in kasalar:
-                rapor += f"{kasa['kasa_adi']}: {kasa['net_bakiye']:,.2f} {kasa['para_birimi']}\n"
-            
-            self.db.commit()
+            for kasa in devir_raporu['kasalar']:
+                rapor += f"{kasa['kasa_adi']}: {kasa['fiziksel_bakiye']:,.2f} {kasa['para_birimi']}\n"
             
             self.progress.emit(100, "Tamamlandı!")
             self.finished.emit(True, rapor)
             
         except Exception as e:
             self.finished.emit(False, f"Devir hatası: {str(e)}")
+        finally:
+            self.db.thread_baglantisini_kapat()
 
 
 class DevirOnayWidget(QWidget):
@@ -101,7 +77,7 @@ class DevirOnayWidget(QWidget):
         warning_label = QLabel(
             f"⚠️ {self.eski_yil} yılı kapanış ve {self.yeni_yil} yılı açılış işlemi yapılacak!\n\n"
             "Bu işlem sonrasında:\n"
-            "• Tüm kasaların mevcut net bakiyeleri devir bakiyelerine eklenecek\n"
+            f"• Tüm kasaların {self.eski_yil} yıl sonu bakiyeleri yeni devir bakiyeleri olacak\n"
             "• Bu işlem GERİ ALINAMAZ\n"
             "• İşlemden önce veritabanını yedeklemeniz ÖNERİLİR"
         )
@@ -133,7 +109,7 @@ class DevirOnayWidget(QWidget):
         self.table = QTableWidget()
         self.table.setColumnCount(6)
         self.table.setHorizontalHeaderLabels([
-            "Kasa", "Para Birimi", "Mevcut Devir", "Net Bakiye", "Yeni Devir", "Fark"
+            "Kasa", "Para Birimi", "Mevcut Devir", "Yıl Sonu Bakiye", "Yeni Devir", "Fark"
         ])
         
         # Sütun genişliklerini responsive yap
@@ -150,18 +126,18 @@ class DevirOnayWidget(QWidget):
                 
                 self.table.setItem(row, 0, QTableWidgetItem(kasa['kasa_adi']))
                 self.table.setItem(row, 1, QTableWidgetItem(kasa['para_birimi']))
-                self.table.setItem(row, 2, QTableWidgetItem(f"{kasa['devir_bakiye']:,.2f}"))
+                self.table.setItem(row, 2, QTableWidgetItem(f"{kasa['onceki_devir']:,.2f}"))
                 
-                net_item = QTableWidgetItem(f"{kasa['net_bakiye']:,.2f}")
-                if kasa['net_bakiye'] < 0:
+                net_item = QTableWidgetItem(f"{kasa['fiziksel_bakiye']:,.2f}")
+                if kasa['fiziksel_bakiye'] < 0:
                     net_item.setForeground(QColor("#C62828"))
                 else:
                     net_item.setForeground(QColor("#2E7D32"))
                 self.table.setItem(row, 3, net_item)
                 
-                # Yeni devir = mevcut devir + (net bakiye - mevcut devir)
-                yeni_devir = kasa['net_bakiye']
-                fark = yeni_devir - kasa['devir_bakiye']
+                # Yeni devir = yıl sonu (fiziksel) bakiye
+                yeni_devir = kasa['fiziksel_bakiye']
+                fark = yeni_devir - kasa['onceki_devir']
                 
                 self.table.setItem(row, 4, QTableWidgetItem(f"{yeni_devir:,.2f}"))
                 
@@ -202,6 +178,7 @@ class DevirWidget(QWidget):
         super().__init__()
         self.db = db
         self.kasa_yoneticisi = KasaYoneticisi(db)
+        self.devir_yoneticisi = DevirYoneticisi(db)
         self.devir_thread = None
         self.setup_ui()
         self.load_kasa_durumu()
@@ -318,6 +295,9 @@ class DevirWidget(QWidget):
     def load_kasa_durumu(self):
         """Kasa durumunu yükle"""
         kasalar = self.kasa_yoneticisi.tum_kasalar_ozet()
+        # Aktarılacak tutar devrin uygulayacağı yıl sonu bakiyesidir
+        devir_raporu = self.devir_yoneticisi.yil_sonu_devir(self.eski_yil_spin.value())
+        aktarilacaklar = {k['kasa_id']: k['fiziksel_bakiye'] for k in devir_raporu['kasalar']}
         
         self.durum_table.setRowCount(0)
         
@@ -336,7 +316,7 @@ class DevirWidget(QWidget):
                 net_item.setForeground(QColor("#2E7D32"))
             self.durum_table.setItem(row, 3, net_item)
             
-            aktarilacak = kasa['net_bakiye']
+            aktarilacak = aktarilacaklar.get(kasa['kasa_id'], kasa['net_bakiye'])
             akt_item = QTableWidgetItem(f"{aktarilacak:,.2f}")
             akt_item.setForeground(QColor("#1976D2"))
             akt_item.setFont(akt_item.font())
@@ -367,9 +347,9 @@ class DevirWidget(QWidget):
         eski_yil = self.eski_yil_spin.value()
         yeni_yil = self.yeni_yil_spin.value()
         
-        # Onay paneli
-        kasalar = self.kasa_yoneticisi.tum_kasalar_ozet()
-        onay_widget = DevirOnayWidget(kasalar, eski_yil, yeni_yil)
+        # Onay paneli: önizleme önbelleğe alınır, onayda aynı rakamlar uygulanır
+        devir_raporu = self.devir_yoneticisi.yil_sonu_devir(eski_yil)
+        onay_widget = DevirOnayWidget(devir_raporu['kasalar'], eski_yil, yeni_yil)
         drawer = DrawerPanel(self, "Yıl Sonu Devir Onayı", onay_widget)
         drawer.submit_btn.setText("✓ Devri Onayla ve Başlat")
         drawer.submit_btn.setProperty("class", "success")
@@ -385,7 +365,7 @@ class DevirWidget(QWidget):
             self.yedekle_btn.setEnabled(False)
             
             # Thread başlat
-            self.devir_thread = DevirThread(self.db, eski_yil, yeni_yil)
+            self.devir_thread = DevirThread(self.devir_yoneticisi, eski_yil, yeni_yil)
             self.devir_thread.progress.connect(self.on_progress)
             self.devir_thread.finished.connect(self.on_finished)
             self.devir_thread.start()
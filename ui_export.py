@@ -11,9 +11,130 @@ from database import Database
 from models import (UyeYoneticisi, AidatYoneticisi, GelirYoneticisi, 
                     GiderYoneticisi, KasaYoneticisi, RaporYoneticisi)
 from datetime import datetime
+from typing import List, Optional
 import os
 
 
+class _ExcelYazici:
+    """openpyxl write_only çalışma kitabı (satırlar yazıldıkça geçici dosyaya akar)"""
+
+    TUR = "Excel"
+
+    def __init__(self):
+        import openpyxl
+        from openpyxl.styles import Font, Alignment, PatternFill
+
+        self.wb = openpyxl.Workbook(write_only=True)
+        self.ws = None
+        # Header stili
+        self.header_font = Font(bold=True, color="FFFFFF")
+        self.header_fill = PatternFill(start_color="1976D2", end_color="1976D2", fill_type="solid")
+        self.header_align = Alignment(horizontal="center", vertical="center")
+
+    def sayfa_ac(self, ad: str, basliklar: Optional[List[str]]):
+        from openpyxl.cell import WriteOnlyCell
+
+        self.ws = self.wb.create_sheet(ad)
+        if basliklar:
+            satir = []
+            for baslik in basliklar:
+                cell = WriteOnlyCell(self.ws, value=baslik)
+                cell.font = self.header_font
+                cell.fill = self.header_fill
+                cell.alignment = self.header_align
+                satir.append(cell)
+            self.ws.append(satir)
+
+    def yaz(self, satirlar):
+        for satir in satirlar:
+            self.ws.append(satir)
+
+    def sayfa_kapat(self):
+        self.ws = None
+
+    def kaydet(self, dosya_yolu: str):
+        self.wb.save(dosya_yolu)
+
+
+class _CsvYazici:
+    """Her sayfayı ayrı CSV dosyasına akıtır: <dosya>_<sayfa>.csv"""
+
+    TUR = "CSV"
+
+    def __init__(self, dosya_yolu: str):
+        self.temel = os.path.splitext(dosya_yolu)[0]
+        self._dosya = None
+        self._yazici = None
+
+    def sayfa_ac(self, ad: str, basliklar: Optional[List[str]]):
+        import csv
+        self._dosya = open(f"{self.temel}_{ad.replace(' ', '_')}.csv", 'w', newline='', encoding='utf-8-sig')
+        self._yazici = csv.writer(self._dosya, delimiter=';')
+        if basliklar:
+            self._yazici.writerow(basliklar)
+
+    def yaz(self, satirlar):
+        self._yazici.writerows(satirlar)
+
+    def sayfa_kapat(self):
+        self._dosya.close()
+        self._dosya = None
+
+    def kaydet(self, dosya_yolu: str):
+        pass  # Sayfalar kapatılırken yazıldı
+
+
+def hesap_ekstresi_yaz(kasa_yoneticisi: KasaYoneticisi, kasa_id: int, dosya_yolu: str,
+                       baslangic_tarih: Optional[str] = None, bitis_tarih: Optional[str] = None) -> int:
+    """
+    Kasa hesap ekstresi: açılış bakiyesi, eski → yeni hareketler (yürüyen bakiye), kapanış
+    Hareketsiz dönemde de açılış/kapanış satırları yazılır.
+    Hareketler sayfa sayfa okunup akıtılır. .csv uzantısında CSV yazılır.
+    Returns: yazılan hareket sayısı
+    """
+    if dosya_yolu.lower().endswith('.csv'):
+        yazici = _CsvYazici(dosya_yolu)
+    else:
+        yazici = _ExcelYazici()
+
+    # Açılış: dönem başından önceki bakiye (tarih yoksa kasanın devir bakiyesi)
+    if baslangic_tarih:
+        bakiye = kasa_yoneticisi._kasa_bakiyesi(kasa_id, baslangic_tarih, dahil=False)
+    else:
+        bakiye = kasa_yoneticisi.kasa_bakiye_hesapla(kasa_id).get('devir_bakiye', 0)
+
+    yazici.sayfa_ac("Ekstre", ["Tarih", "Tip", "Tür", "Açıklama", "Giriş", "Çıkış", "Bakiye"])
+    yazici.yaz([(baslangic_tarih or '', "AÇILIŞ", "", "Devreden bakiye", None, None, bakiye)])
+    adet = 0
+    for parca in _parcala(kasa_yoneticisi.kasa_hareketleri_akisi(
+            kasa_id, baslangic_tarih, bitis_tarih, yeni_once=False), ExportThread.PARCA_BOYUTU):
+        yazici.yaz([
+            (h['tarih'], h['tip'], h['tur'], h['aciklama'],
+             h['tutar'] if h['yon'] == '+' else None,
+             h['tutar'] if h['yon'] == '-' else None,
+             h['bakiye'])
+            for h in parca
+        ])
+        adet += len(parca)
+        bakiye = parca[-1]['bakiye']
+    yazici.yaz([(bitis_tarih or '', "KAPANIŞ", "", "Dönem sonu bakiye", None, None, bakiye)])
+    yazici.sayfa_kapat()
+    yazici.kaydet(dosya_yolu)
+    return adet
+
+
+def _parcala(satirlar, boyut: int):
+    """Üreteci boyut'luk listelere böl"""
+    parca = []
+    for satir in satirlar:
+        parca.append(satir)
+        if len(parca) == boyut:
+            yield parca
+            parca = []
+    if parca:
+        yield parca
+
+
 class ExportThread(QThread):
     """Export işlemi için thread"""
     
@@ -29,160 +150,155 @@ class ExportThread(QThread):
     def run(self):
         try:
             if self.export_type == "excel":
-                self.export_to_excel()
+                # Thread'in kendi bağlantısında tutarlı okuma anlık görüntüsü;
+                # export sürerken arayüz yazmaya devam edebilir (WAL)
+                with self.db.transaction(readonly=True):
+                    self.export_to_excel()
             elif self.export_type == "backup":
                 self.backup_database()
             else:
                 self.finished.emit(False, "Geçersiz export tipi")
         except Exception as e:
             self.finished.emit(False, str(e))
+        finally:
+            self.db.thread_baglantisini_kapat()
             
+    PARCA_BOYUTU = 2000
+
+    # (sayfa adı, başlıklar, satır sorgusu) - satırlar imleçten parça parça okunur
+    VERI_SAYFALARI = [
+        ("Üyeler",
+         ["Üye No", "Ad Soyad", "Telefon", "Email", "Durum", "Kayıt Tarihi"],
+         """SELECT uye_id, ad_soyad, telefon, email, durum, substr(kayit_tarihi, 1, 10)
+            FROM uyeler WHERE durum != 'Ayrıldı' ORDER BY ad_soyad"""),
+        ("Aidat Takip",
+         ["Üye", "Yıl", "Yıllık Aidat", "Toplam Ödenen", "Kalan", "Durum", "Aktarım"],
+         """SELECT u.ad_soyad, at.yil, at.yillik_aidat_tutari, at.toplam_odenen,
+                   at.odenecek_tutar, at.durum, at.aktarim_durumu
+            FROM aidat_takip at
+            JOIN uyeler u ON at.uye_id = u.uye_id
+            ORDER BY u.ad_soyad, at.yil DESC"""),
+        ("Gelirler",
+         ["Tarih", "Belge No", "Gelir Türü", "Açıklama", "Tutar", "Kasa", "Tahsil Eden"],
+         """SELECT g.tarih, g.belge_no, g.gelir_turu, g.aciklama, g.tutar, k.kasa_adi, COALESCE(g.tahsil_eden, '')
+            FROM gelirler g JOIN kasalar k ON g.kasa_id = k.kasa_id
+            ORDER BY g.tarih DESC"""),
+        ("Giderler",
+         ["Tarih", "İşlem No", "Gider Türü", "Açıklama", "Tutar", "Kasa", "Ödeyen"],
+         """SELECT g.tarih, g.islem_no, g.gider_turu, g.aciklama, g.tutar, k.kasa_adi, COALESCE(g.odeyen, '')
+            FROM giderler g JOIN kasalar k ON g.kasa_id = k.kasa_id
+            ORDER BY g.tarih DESC"""),
+    ]
+
+    def _online_satirlar(self, sayfa: str) -> list:
+        """Online modda sayfa satırları (API'den, yönetici sınıfları üzerinden)"""
+        if sayfa == "Üyeler":
+            return [(u['uye_id'], u['ad_soyad'], u['telefon'], u['email'], u['durum'],
+                     (u.get('kayit_tarihi') or '')[:10]) for u in UyeYoneticisi(self.db).uye_listesi()]
+        if sayfa == "Aidat Takip":
+            return [(a['ad_soyad'], a['yil'], a['yillik_aidat_tutari'], a['toplam_odenen'],
+                     a['odenecek_tutar'], a['durum'], a['aktarim_durumu'])
+                    for a in AidatYoneticisi(self.db).aidat_listesi()]
+        if sayfa == "Gelirler":
+            return [(g['tarih'], g['belge_no'], g['gelir_turu'], g['aciklama'], g['tutar'],
+                     g['kasa_adi'], g.get('tahsil_eden', '')) for g in GelirYoneticisi(self.db).gelir_listesi()]
+        return [(g['tarih'], g['islem_no'], g['gider_turu'], g['aciklama'], g['tutar'],
+                 g['kasa_adi'], g.get('odeyen', '')) for g in GiderYoneticisi(self.db).gider_listesi()]
+
+    def _veri_kaynaklari(self) -> list:
+        """
+        Her sayfa için (ad, başlıklar, satır sayısı, parça üreteci)
+        Offline: sayım ve satırlar aynı okuma işleminden (tutarlı anlık görüntü)
+        """
+        kaynaklar = []
+        for ad, basliklar, sql in self.VERI_SAYFALARI:
+            if self.db.is_online():
+                satirlar = self._online_satirlar(ad)
+                parcalar = (satirlar[i:i + self.PARCA_BOYUTU]
+                            for i in range(0, len(satirlar), self.PARCA_BOYUTU))
+                kaynaklar.append((ad, basliklar, len(satirlar), parcalar))
+                continue
+            self.db.cursor.execute(f"SELECT COUNT(*) FROM ({sql})")
+            kaynaklar.append((ad, basliklar, self.db.cursor.fetchone()[0], self._imlec_parcalari(sql)))
+        return kaynaklar
+
+    def _imlec_parcalari(self, sql: str):
+        """Sorgu sonucunu PARCA_BOYUTU'luk tuple listeleri olarak ver (tümü belleğe alınmaz)"""
+        cursor = self.db.conn.cursor()
+        cursor.execute(sql)
+        try:
+            while True:
+                parca = cursor.fetchmany(self.PARCA_BOYUTU)
+                if not parca:
+                    break
+                yield [tuple(satir) for satir in parca]
+        finally:
+            cursor.close()
+
     def export_to_excel(self):
-        """Excel dosyasına export"""
+        """
+        Excel dosyasına export (openpyxl write_only: hücreler yazıldıkça diske akar,
+        bellek kullanımı satır sayısından bağımsız kalır)
+        .csv uzantılı hedefte her sayfa ayrı CSV dosyasına yazılır.
+        """
         try:
-            import openpyxl
-            from openpyxl.styles import Font, Alignment, PatternFill
-            
-            self.progress.emit(10, "Workbook oluşturuluyor...")
-            
-            wb = openpyxl.Workbook()
-            wb.remove(wb.active)  # Varsayılan sheet'i kaldır
-            
-            # Header stili
-            header_font = Font(bold=True, color="FFFFFF")
-            header_fill = PatternFill(start_color="1976D2", end_color="1976D2", fill_type="solid")
-            header_align = Alignment(horizontal="center", vertical="center")
-            
-            # 1. Üyeler
-            self.progress.emit(20, "Üyeler export ediliyor...")
-            uye_yoneticisi = UyeYoneticisi(self.db)
-            uyeler = uye_yoneticisi.uye_listesi()
-            
-            ws_uyeler = wb.create_sheet("Üyeler")
-            headers = ["Üye No", "Ad Soyad", "Telefon", "Email", "Durum", "Kayıt Tarihi"]
-            ws_uyeler.append(headers)
-            
-            for col in range(1, len(headers) + 1):
-                cell = ws_uyeler.cell(1, col)
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = header_align
-            
-            for uye in uyeler:
-                ws_uyeler.append([
-                    uye['uye_id'], uye['ad_soyad'], uye['telefon'], 
-                    uye['email'], uye['durum'], uye['kayit_tarihi'][:10]
-                ])
-            
-            # 2. Aidat Takip
-            self.progress.emit(35, "Aidat kayıtları export ediliyor...")
-            aidat_yoneticisi = AidatYoneticisi(self.db)
-            aidatlar = aidat_yoneticisi.aidat_listesi()
-            
-            ws_aidat = wb.create_sheet("Aidat Takip")
-            headers = ["Üye", "Yıl", "Yıllık Aidat", "Toplam Ödenen", "Kalan", "Durum", "Aktarım"]
-            ws_aidat.append(headers)
-            
-            for col in range(1, len(headers) + 1):
-                cell = ws_aidat.cell(1, col)
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = header_align
-            
-            for aidat in aidatlar:
-                ws_aidat.append([
-                    aidat['ad_soyad'], aidat['yil'], aidat['yillik_aidat_tutari'],
-                    aidat['toplam_odenen'], aidat['odenecek_tutar'], 
-                    aidat['durum'], aidat['aktarim_durumu']
-                ])
-            
-            # 3. Gelirler
-            self.progress.emit(50, "Gelirler export ediliyor...")
-            gelir_yoneticisi = GelirYoneticisi(self.db)
-            gelirler = gelir_yoneticisi.gelir_listesi()
-            
-            ws_gelir = wb.create_sheet("Gelirler")
-            headers = ["Tarih", "Belge No", "Gelir Türü", "Açıklama", "Tutar", "Kasa", "Tahsil Eden"]
-            ws_gelir.append(headers)
-            
-            for col in range(1, len(headers) + 1):
-                cell = ws_gelir.cell(1, col)
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = header_align
-            
-            for gelir in gelirler:
-                ws_gelir.append([
-                    gelir['tarih'], gelir['belge_no'], gelir['gelir_turu'],
-                    gelir['aciklama'], gelir['tutar'], gelir['kasa_adi'], gelir.get('tahsil_eden', '')
-                ])
-            
-            # 4. Giderler
-            self.progress.emit(65, "Giderler export ediliyor...")
-            gider_yoneticisi = GiderYoneticisi(self.db)
-            giderler = gider_yoneticisi.gider_listesi()
-            
-            ws_gider = wb.create_sheet("Giderler")
-            headers = ["Tarih", "İşlem No", "Gider Türü", "Açıklama", "Tutar", "Kasa", "Ödeyen"]
-            ws_gider.append(headers)
-            
-            for col in range(1, len(headers) + 1):
-                cell = ws_gider.cell(1, col)
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = header_align
-            
-            for gider in giderler:
-                ws_gider.append([
-                    gider['tarih'], gider['islem_no'], gider['gider_turu'],
-                    gider['aciklama'], gider['tutar'], gider['kasa_adi'], gider.get('odeyen', '')
-                ])
-            
+            self.progress.emit(5, "Kayıtlar sayılıyor...")
+            kaynaklar = self._veri_kaynaklari()
+            toplam = sum(k[2] for k in kaynaklar) or 1
+
+            if self.file_path.lower().endswith('.csv'):
+                yazici = _CsvYazici(self.file_path)
+            else:
+                yazici = _ExcelYazici()
+
+            # Veri sayfaları: ilerleme gerçek satır sayısına göre (%5 - %85)
+            yazilan = 0
+            for ad, basliklar, adet, parcalar in kaynaklar:
+                self.progress.emit(5 + int(80 * yazilan / toplam), f"{ad} export ediliyor ({adet} kayıt)...")
+                yazici.sayfa_ac(ad, basliklar)
+                for parca in parcalar:
+                    yazici.yaz(parca)
+                    yazilan += len(parca)
+                    self.progress.emit(5 + int(80 * yazilan / toplam),
+                                       f"{ad} export ediliyor ({yazilan}/{toplam})...")
+                yazici.sayfa_kapat()
+
             # 5. Kasa Özeti
-            self.progress.emit(80, "Kasa özeti export ediliyor...")
-            kasa_yoneticisi = KasaYoneticisi(self.db)
-            kasalar = kasa_yoneticisi.tum_kasalar_ozet()
-            
-            ws_kasa = wb.create_sheet("Kasa Özeti")
-            headers = ["Kasa Adı", "Para Birimi", "Devir", "Toplam Gelir", "Toplam Gider", "Net Bakiye"]
-            ws_kasa.append(headers)
-            
-            for col in range(1, len(headers) + 1):
-                cell = ws_kasa.cell(1, col)
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = header_align
-            
-            for kasa in kasalar:
-                ws_kasa.append([
-                    kasa['kasa_adi'], kasa['para_birimi'], kasa['devir_bakiye'],
-                    kasa['toplam_gelir'], kasa['toplam_gider'], kasa['net_bakiye']
-                ])
-            
+            self.progress.emit(87, "Kasa özeti export ediliyor...")
+            kasalar = KasaYoneticisi(self.db).tum_kasalar_ozet()
+            yazici.sayfa_ac("Kasa Özeti", ["Kasa Adı", "Para Birimi", "Devir", "Toplam Gelir", "Toplam Gider", "Net Bakiye"])
+            yazici.yaz([
+                (kasa['kasa_adi'], kasa['para_birimi'], kasa['devir_bakiye'],
+                 kasa['toplam_gelir'], kasa['toplam_gider'], kasa['net_bakiye'])
+                for kasa in kasalar
+            ])
+            yazici.sayfa_kapat()
+
             # 6. Genel Rapor
             self.progress.emit(90, "Genel rapor hazırlanıyor...")
-            rapor_yoneticisi = RaporYoneticisi(self.db)
-            ozet = rapor_yoneticisi.genel_ozet(datetime.now().year)
-            
-            ws_rapor = wb.create_sheet("Genel Rapor")
-            ws_rapor.append(["BADER DERNEĞİ GENEL RAPOR"])
-            ws_rapor.append(["Tarih:", datetime.now().strftime("%Y-%m-%d %H:%M:%S")])
-            ws_rapor.append([])
-            ws_rapor.append(["Toplam Gelir:", ozet['toplam_gelir']])
-            ws_rapor.append(["Toplam Gider:", ozet['toplam_gider']])
-            ws_rapor.append(["Net Sonuç:", ozet['net_sonuc']])
-            ws_rapor.append(["Toplam Kasa Bakiye:", ozet['toplam_kasa_bakiye']])
-            ws_rapor.append([])
-            ws_rapor.append(["Toplam Üye:", ozet['toplam_uye']])
-            ws_rapor.append(["Aidat Ödeyen Üye:", ozet['aidat_odenen_uye']])
-            ws_rapor.append(["Aidat Eksik Üye:", ozet['aidat_eksik_uye']])
-            
+            ozet = RaporYoneticisi(self.db).genel_ozet(datetime.now().year)
+            yazici.sayfa_ac("Genel Rapor", None)
+            yazici.yaz([
+                ["BADER DERNEĞİ GENEL RAPOR"],
+                ["Tarih:", datetime.now().strftime("%Y-%m-%d %H:%M:%S")],
+                [],
+                ["Toplam Gelir:", ozet['toplam_gelir']],
+                ["Toplam Gider:", ozet['toplam_gider']],
+                ["Net Sonuç:", ozet['net_sonuc']],
+                ["Toplam Kasa Bakiye:", ozet['toplam_kasa_bakiye']],
+                [],
+                ["Toplam Üye:", ozet['toplam_uye']],
+                ["Aidat Ödeyen Üye:", ozet['aidat_odenen_uye']],
+                ["Aidat Eksik Üye:", ozet['aidat_eksik_uye']],
+            ])
+            yazici.sayfa_kapat()
+
             # Kaydet
             self.progress.emit(95, "Dosya kaydediliyor...")
-            wb.save(self.file_path)
+            yazici.kaydet(self.file_path)
             
             self.progress.emit(100, "Tamamlandı!")
-            self.finished.emit(True, "Excel dosyası başarıyla oluşturuldu!")
+            self.finished.emit(True, f"{yazici.TUR} dosyası başarıyla oluşturuldu! ({yazilan} kayıt)")
             
         except ImportError:
             self.finished.emit(False, "openpyxl kütüphanesi bulunamadı! 'pip install openpyxl' komutunu çalıştırın.")
@@ -303,7 +419,7 @@ class ExportWidget(QWidget):
             self,
             "Excel Dosyası Kaydet",
             f"BADER_Export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-            "Excel Files (*.xlsx)"
+            "Excel Files (*.xlsx);;CSV - sayfa başına dosya (*.csv)"
         )
         
         if file_path:
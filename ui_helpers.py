@@ -3,6 +3,7 @@ BADER Derneği - UI Helper Fonksiyonları
 Ortak kullanılan UI yardımcı fonksiyonları
 """
 
+from itertools import chain, islice
 from PyQt5.QtWidgets import (QComboBox, QCompleter, QTableWidget, QHeaderView, 
                              QMenu, QAction, QCheckBox, QWidgetAction, QFrame,
                              QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QDialog,
@@ -213,6 +214,37 @@ def format_date(date_str: str) -> str:
         return date_str
 
 
+_GENISLIK_ORNEK = 500
+
+
+def _tablo_satirlari(table, sutunlar):
+    """Görünen satırların görünen sütun metinleri (satır satır üretilir)"""
+    # VeriTablosu: metinler doğrudan modelden (hücre başına QTableWidgetItem oluşturulmaz)
+    if hasattr(table, 'metin_satirlari'):
+        yield from table.metin_satirlari(sutunlar)
+        return
+    for row in range(table.rowCount()):
+        if table.isRowHidden(row):
+            continue
+        satir = []
+        for col in sutunlar:
+            item = table.item(row, col)
+            satir.append(item.text() if item else "")
+        yield satir
+
+
+def _sayiya_cevir(value: str):
+    """Para birimi/binlik ayraçlı metni sayıya çevir (sayı değilse metni döndür)"""
+    try:
+        # Para birimi temizle ve sayıya çevir
+        clean_val = value.replace("₺", "").replace("TL", "").replace(".", "").replace(",", ".").strip()
+        if clean_val and clean_val.replace(".", "").replace("-", "").isdigit():
+            return float(clean_val)
+    except:
+        pass
+    return value
+
+
 def export_table_to_excel(table, default_filename: str, parent_widget=None):
     """
     QTableWidget içeriğini Excel dosyasına export eder
@@ -243,17 +275,28 @@ def export_table_to_excel(table, default_filename: str, parent_widget=None):
     if not file_path:
         return False
     
+    # Sanal tablolarda (VeriTablosu) henüz görünüme verilmemiş satırlar da aktarılsın
+    if hasattr(table, 'tumunu_yukle'):
+        table.tumunu_yukle()
+    
+    sutunlar = [col for col in range(table.columnCount()) if not table.isColumnHidden(col)]
+    headers = []
+    for col in sutunlar:
+        header = table.horizontalHeaderItem(col)
+        headers.append(header.text() if header else f"Sütun {col+1}")
+    
     try:
         # Excel formatı için openpyxl dene
         if file_path.endswith('.xlsx') or 'Excel' in selected_filter:
             try:
                 from openpyxl import Workbook
+                from openpyxl.cell import WriteOnlyCell
                 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
                 from openpyxl.utils import get_column_letter
                 
-                wb = Workbook()
-                ws = wb.active
-                ws.title = default_filename[:31]  # Max 31 karakter
+                # write_only: satırlar yazıldıkça diske akar (hücre nesneleri bellekte birikmez)
+                wb = Workbook(write_only=True)
+                ws = wb.create_sheet(default_filename[:31])  # Max 31 karakter
                 
                 # Stil tanımları
                 header_font = Font(bold=True, color="FFFFFF", size=11)
@@ -266,58 +309,35 @@ def export_table_to_excel(table, default_filename: str, parent_widget=None):
                     bottom=Side(style='thin')
                 )
                 
+                # Sütun genişlikleri satırlardan önce yazılmalı: başlık + ilk örnek satırlardan
+                satirlar = _tablo_satirlari(table, sutunlar)
+                ornek = list(islice(satirlar, _GENISLIK_ORNEK))
+                for i, header in enumerate(headers):
+                    max_length = max([len(header)] + [len(str(satir[i])) for satir in ornek if satir[i]])
+                    ws.column_dimensions[get_column_letter(i + 1)].width = min(max_length + 2, 50)
+                
+                # Freeze panes (başlık satırını dondur)
+                ws.freeze_panes = 'A2'
+                
                 # Başlık satırı
-                for col in range(table.columnCount()):
-                    if table.isColumnHidden(col):
-                        continue
-                    header = table.horizontalHeaderItem(col)
-                    cell = ws.cell(row=1, column=col+1, value=header.text() if header else f"Sütun {col+1}")
+                baslik_satiri = []
+                for header in headers:
+                    cell = WriteOnlyCell(ws, value=header)
                     cell.font = header_font
                     cell.fill = header_fill
                     cell.alignment = header_alignment
                     cell.border = thin_border
+                    baslik_satiri.append(cell)
+                ws.append(baslik_satiri)
                 
                 # Veri satırları
-                row_num = 2
-                for row in range(table.rowCount()):
-                    if table.isRowHidden(row):
-                        continue
-                    
-                    for col in range(table.columnCount()):
-                        if table.isColumnHidden(col):
-                            continue
-                        item = table.item(row, col)
-                        value = item.text() if item else ""
-                        
-                        # Sayısal değerleri dönüştür
-                        try:
-                            # Para birimi temizle ve sayıya çevir
-                            clean_val = value.replace("₺", "").replace("TL", "").replace(".", "").replace(",", ".").strip()
-                            if clean_val and clean_val.replace(".", "").replace("-", "").isdigit():
-                                value = float(clean_val)
-                        except:
-                            pass
-                        
-                        cell = ws.cell(row=row_num, column=col+1, value=value)
+                for satir in chain(ornek, satirlar):
+                    hucreler = []
+                    for value in satir:
+                        cell = WriteOnlyCell(ws, value=_sayiya_cevir(value))
                         cell.border = thin_border
-                    
-                    row_num += 1
-                
-                # Sütun genişliklerini ayarla
-                for col in range(table.columnCount()):
-                    if table.isColumnHidden(col):
-                        continue
-                    column_letter = get_column_letter(col + 1)
-                    # Max genişliği bul
-                    max_length = 0
-                    for row in range(1, row_num):
-                        cell = ws.cell(row=row, column=col+1)
-                        if cell.value:
-                            max_length = max(max_length, len(str(cell.value)))
-                    ws.column_dimensions[column_letter].width = min(max_length + 2, 50)
-                
-                # Freeze panes (başlık satırını dondur)
-                ws.freeze_panes = 'A2'
+                        hucreler.append(cell)
+                    ws.append(hucreler)
                 
                 # Kaydet
                 if not file_path.endswith('.xlsx'):
@@ -339,28 +359,8 @@ def export_table_to_excel(table, default_filename: str, parent_widget=None):
             
         with open(file_path, 'w', newline='', encoding='utf-8-sig') as f:
             writer = csv.writer(f, delimiter=';')
-            
-            # Başlık satırı
-            headers = []
-            for col in range(table.columnCount()):
-                if table.isColumnHidden(col):
-                    continue
-                header = table.horizontalHeaderItem(col)
-                headers.append(header.text() if header else f"Sütun {col+1}")
             writer.writerow(headers)
-            
-            # Veri satırları
-            for row in range(table.rowCount()):
-                if table.isRowHidden(row):
-                    continue
-                    
-                row_data = []
-                for col in range(table.columnCount()):
-                    if table.isColumnHidden(col):
-                        continue
-                    item = table.item(row, col)
-                    row_data.append(item.text() if item else "")
-                writer.writerow(row_data)
+            writer.writerows(_tablo_satirlari(table, sutunlar))
         
         MessageBox("Başarılı", f"Veriler CSV dosyasına aktarıldı:\n{file_path}", parent_widget).show()
         return True
@@ -5,8 +5,9 @@ BADER Derneği - Kasa Yönetimi UI
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
                              QTableWidget, QTableWidgetItem, QLineEdit, QLabel,
                              QComboBox, QDialog, QFormLayout,
-                             QDoubleSpinBox, QHeaderView, QTextEdit, QGroupBox)
-from PyQt5.QtCore import Qt
+                             QDoubleSpinBox, QHeaderView, QTextEdit, QGroupBox,
+                             QCheckBox, QDateEdit, QFileDialog)
+from PyQt5.QtCore import Qt, QDate
 from PyQt5.QtGui import QColor
 from qfluentwidgets import MessageBox
 from database import Database
@@ -14,6 +15,11 @@ from models import KasaYoneticisi
 from ui_drawer import DrawerPanel
 from ui_form_fields import create_line_edit, create_combo_box, create_text_edit, create_double_spin_box
 from ui_helpers import export_table_to_excel, setup_resizable_table
+from ui_table_model import VeriTablosu, Sutun
+from ui_loader import VeriYukleyici
+from ui_export import hesap_ekstresi_yaz
+from itertools import chain
+from datetime import datetime
 from ui_login import session
 
 
@@ -74,6 +80,8 @@ class KasaFormWidget(QWidget):
 class KasaDetayWidget(QWidget):
     """Kasa işlem geçmişi detay widget'ı"""
     
+    SAYFA_BOYUTU = 500
+    
     def __init__(self, db: Database, kasa_id: int, kasa_adi: str, para_birimi: str):
         super().__init__()
         self.db = db
@@ -81,6 +89,8 @@ class KasaDetayWidget(QWidget):
         self.kasa_adi = kasa_adi
         self.para_birimi = para_birimi
         self.kasa_yoneticisi = KasaYoneticisi(db)
+        self.yukleyici = VeriYukleyici("Kasa Detay", db, self)
+        self.ekstre_yukleyici = VeriYukleyici("Kasa Ekstre", db, self)
         self.setup_ui()
         self.load_islemler()
         
@@ -90,8 +100,7 @@ class KasaDetayWidget(QWidget):
         layout.setSpacing(15)
         
         # Özet bilgiler
-        ozet = self.kasa_yoneticisi.tum_kasalar_ozet()
-        kasa_ozet = next((k for k in ozet if k['kasa_id'] == self.kasa_id), None)
+        kasa_ozet = self.kasa_yoneticisi.kasa_bakiye_hesapla(self.kasa_id)
         
         if kasa_ozet:
             ozet_group = QGroupBox("📊 Kasa Özeti")
@@ -121,93 +130,100 @@ class KasaDetayWidget(QWidget):
             layout.addWidget(ozet_group)
         
         # İşlem listesi
-        islem_label = QLabel("📋 Son İşlemler")
+        baslik_layout = QHBoxLayout()
+        islem_label = QLabel("📋 Hesap Hareketleri")
         islem_label.setStyleSheet("font-weight: bold; font-size: 13px;")
-        layout.addWidget(islem_label)
-        
-        self.table = QTableWidget()
-        self.table.setColumnCount(5)
-        self.table.setHorizontalHeaderLabels(["Tarih", "Tür", "Açıklama", "Tutar", "Yön"])
+        baslik_layout.addWidget(islem_label)
+        baslik_layout.addStretch()
+        
+        # Tarih aralığı (işaretli değilse tüm hareketler)
+        self.tarih_check = QCheckBox("Tarih aralığı")
+        self.tarih_check.toggled.connect(self._tarih_filtresi_degisti)
+        baslik_layout.addWidget(self.tarih_check)
+        self.baslangic_edit = QDateEdit(QDate(QDate.currentDate().year(), 1, 1))
+        self.bitis_edit = QDateEdit(QDate.currentDate())
+        for edit in (self.baslangic_edit, self.bitis_edit):
+            edit.setCalendarPopup(True)
+            edit.setDisplayFormat("dd.MM.yyyy")
+            edit.setEnabled(False)
+            edit.dateChanged.connect(lambda *_: self.load_islemler())
+            baslik_layout.addWidget(edit)
+        
+        ekstre_btn = QPushButton("📥 Ekstre")
+        ekstre_btn.setToolTip("Seçili dönemin hesap ekstresini (eski → yeni, yürüyen bakiyeli) dışa aktar")
+        ekstre_btn.clicked.connect(self.ekstre_export)
+        baslik_layout.addWidget(ekstre_btn)
+        layout.addLayout(baslik_layout)
+        
+        yon_rengi = lambda islem: QColor("#2E7D32") if islem['yon'] == '+' else QColor("#C62828")
+        bakiye_rengi = lambda islem: QColor("#C62828") if islem['bakiye'] < 0 else None
+        self.table = VeriTablosu([
+            Sutun("Tarih", 'tarih'),
+            Sutun("Tür", lambda islem: f"{islem['tip']} - {islem['tur']}"),
+            Sutun("Açıklama", 'aciklama'),
+            Sutun("Tutar", 'tutar', lambda tutar: f"{tutar:,.2f}", renk=yon_rengi),
+            Sutun("Yön", 'yon', renk=yon_rengi),
+            Sutun("Bakiye", 'bakiye', lambda bakiye: f"{bakiye:,.2f}", renk=bakiye_rengi),
+        ])
         setup_resizable_table(self.table, table_id="kasa_detay_tablosu", stretch_column=2)
-        self.table.setAlternatingRowColors(True)
-        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
         self.table.setMinimumHeight(300)
         layout.addWidget(self.table)
         
         layout.addStretch()
         self.setLayout(layout)
+    
+    def _tarih_filtresi_degisti(self, aktif: bool):
+        self.baslangic_edit.setEnabled(aktif)
+        self.bitis_edit.setEnabled(aktif)
+        self.load_islemler()
+    
+    def _tarih_araligi(self):
+        """(başlangıç, bitiş) ISO tarihleri; filtre kapalıysa (None, None)"""
+        if not self.tarih_check.isChecked():
+            return None, None
+        return (self.baslangic_edit.date().toString("yyyy-MM-dd"),
+                self.bitis_edit.date().toString("yyyy-MM-dd"))
         
     def load_islemler(self):
-        """Kasanın tüm işlemlerini yükle"""
-        self.table.setRowCount(0)
-        
-        # Gelirler
-        self.db.cursor.execute("""
-            SELECT tarih, 'GELİR' as tip, gelir_turu as tur, aciklama, tutar
-            FROM gelirler WHERE kasa_id = ?
-        """, (self.kasa_id,))
-        gelirler = self.db.cursor.fetchall()
-        
-        # Giderler
-        self.db.cursor.execute("""
-            SELECT tarih, 'GİDER' as tip, gider_turu as tur, aciklama, tutar
-            FROM giderler WHERE kasa_id = ?
-        """, (self.kasa_id,))
-        giderler = self.db.cursor.fetchall()
-        
-        # Virmanlar (gelen)
-        self.db.cursor.execute("""
-            SELECT tarih, 'VİRMAN GELEN' as tip, 'Transfer' as tur, aciklama, tutar
-            FROM virmanlar WHERE alan_kasa_id = ?
-        """, (self.kasa_id,))
-        virman_gelen = self.db.cursor.fetchall()
-        
-        # Virmanlar (giden)
-        self.db.cursor.execute("""
-            SELECT tarih, 'VİRMAN GİDEN' as tip, 'Transfer' as tur, aciklama, tutar
-            FROM virmanlar WHERE gonderen_kasa_id = ?
-        """, (self.kasa_id,))
-        virman_giden = self.db.cursor.fetchall()
-        
-        # Tüm işlemleri birleştir ve tarihe göre sırala
-        tum_islemler = []
-        for g in gelirler:
-            tum_islemler.append({'tarih': g['tarih'], 'tip': 'GELİR', 'tur': g['tur'], 
-                                'aciklama': g['aciklama'], 'tutar': g['tutar'], 'yon': '+'})
-        for g in giderler:
-            tum_islemler.append({'tarih': g['tarih'], 'tip': 'GİDER', 'tur': g['tur'], 
-                                'aciklama': g['aciklama'], 'tutar': g['tutar'], 'yon': '-'})
-        for v in virman_gelen:
-            tum_islemler.append({'tarih': v['tarih'], 'tip': 'VİRMAN', 'tur': 'Gelen', 
-                                'aciklama': v['aciklama'] or 'Transfer', 'tutar': v['tutar'], 'yon': '+'})
-        for v in virman_giden:
-            tum_islemler.append({'tarih': v['tarih'], 'tip': 'VİRMAN', 'tur': 'Giden', 
-                                'aciklama': v['aciklama'] or 'Transfer', 'tutar': v['tutar'], 'yon': '-'})
-        
-        # Tarihe göre sırala (en yeni en üstte)
-        tum_islemler.sort(key=lambda x: x['tarih'], reverse=True)
-        
-        for islem in tum_islemler:
-            row = self.table.rowCount()
-            self.table.insertRow(row)
-            
-            self.table.setItem(row, 0, QTableWidgetItem(islem['tarih']))
-            self.table.setItem(row, 1, QTableWidgetItem(f"{islem['tip']} - {islem['tur']}"))
-            self.table.setItem(row, 2, QTableWidgetItem(islem['aciklama'] or ''))
-            
-            tutar_item = QTableWidgetItem(f"{islem['tutar']:,.2f}")
-            if islem['yon'] == '+':
-                tutar_item.setForeground(QColor("#2E7D32"))
-            else:
-                tutar_item.setForeground(QColor("#C62828"))
-            self.table.setItem(row, 3, tutar_item)
-            
-            yon_item = QTableWidgetItem(islem['yon'])
-            if islem['yon'] == '+':
-                yon_item.setForeground(QColor("#2E7D32"))
-            else:
-                yon_item.setForeground(QColor("#C62828"))
-            self.table.setItem(row, 4, yon_item)
+        """Kasa hareketlerini yükle: ilk sayfa arka planda, kalanı kaydırdıkça"""
+        baslangic, bitis = self._tarih_araligi()
+        self.table.iskelet_goster()
+        self.yukleyici.yukle(lambda: self._ilk_sayfa(baslangic, bitis), self._hareketleri_goster)
+
+    def _ilk_sayfa(self, baslangic, bitis):
+        """İlk hareket sayfası (havuz thread'inde)"""
+        satirlar, imlec = self.kasa_yoneticisi.kasa_hareketleri(
+            self.kasa_id, baslangic, bitis, limit=self.SAYFA_BOYUTU)
+        return satirlar, imlec, baslangic, bitis
+
+    def _hareketleri_goster(self, sonuc):
+        satirlar, imlec, baslangic, bitis = sonuc
+        self.table.yukle(chain(satirlar, self._kalan_hareketler(imlec, baslangic, bitis)))
+
+    def _kalan_hareketler(self, imlec, baslangic, bitis):
+        """Sonraki sayfalar (tablo kaydırıldıkça imleçle okunur)"""
+        while imlec is not None:
+            satirlar, imlec = self.kasa_yoneticisi.kasa_hareketleri(
+                self.kasa_id, baslangic, bitis, imlec, self.SAYFA_BOYUTU)
+            yield from satirlar
+
+    def ekstre_export(self):
+        """Hesap ekstresini Excel/CSV olarak kaydet"""
+        baslangic, bitis = self._tarih_araligi()
+        donem = f"{baslangic}_{bitis}" if baslangic else datetime.now().strftime("%Y%m%d")
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Hesap Ekstresi Kaydet",
+            f"Ekstre_{self.kasa_adi}_{donem}.xlsx".replace(' ', '_'),
+            "Excel Dosyası (*.xlsx);;CSV Dosyası (*.csv)"
+        )
+        if not file_path:
+            return
+        # Büyük dönemlerde arayüz donmasın: ekstre havuz thread'inde yazılır
+        self.ekstre_yukleyici.yukle(
+            lambda: hesap_ekstresi_yaz(self.kasa_yoneticisi, self.kasa_id, file_path, baslangic, bitis),
+            lambda adet: MessageBox("Başarılı", f"{adet} hareket ekstreye yazıldı:\n{file_path}", self).show(),
+            lambda hata: MessageBox("Hata", f"Ekstre oluşturulamadı:\n{hata}", self).show())
 
 
 class KasaWidget(QWidget):
@@ -227,6 +243,7 @@ class KasaWidget(QWidget):
         self.duzenle_btn.setVisible(session.has_permission('kasa_islem'))
         self.sil_btn.setVisible(session.has_permission('kasa_islem'))
         self.export_btn.setVisible(session.has_permission('rapor_export'))
+        self.dogrula_btn.setVisible(session.has_permission('kasa_islem'))
         
     def setup_ui(self):
         layout = QVBoxLayout()
@@ -275,6 +292,11 @@ class KasaWidget(QWidget):
         self.tahakkuk_btn.setEnabled(False)
         toolbar_layout.addWidget(self.tahakkuk_btn)
         
+        self.dogrula_btn = QPushButton("🩺 Bakiye Doğrula")
+        self.dogrula_btn.setToolTip("Kasa bakiye defterini hareketlerden yeniden hesaplayıp karşılaştır")
+        self.dogrula_btn.clicked.connect(self.bakiye_dogrula)
+        toolbar_layout.addWidget(self.dogrula_btn)
+        
         # Excel export
         self.export_btn = QPushButton("📄 Excel")
         self.export_btn.setToolTip("Listeyi Excel'e Aktar")
@@ -325,6 +347,12 @@ class KasaWidget(QWidget):
     def load_kasalar(self):
         """Kasaları ve bakiyelerini yükle"""
         ozet = self.kasa_yoneticisi.tum_kasalar_ozet()
+        # Tahakkuk/serbest bakiyeler tüm kasalar için tek seferde
+        try:
+            devir_durumlari = {d['kasa_id']: d for d in self.kasa_yoneticisi.kasa_devir_durumlari()}
+        except Exception as e:
+            print(f"Tahakkuk hesaplama hatası: {e}")
+            devir_durumlari = {}
         
         self.table.setRowCount(0)
         
@@ -361,13 +389,9 @@ class KasaWidget(QWidget):
             self.table.setItem(row, 7, bakiye_item)
             
             # Tahakkuk ve Serbest Bakiye hesapla
-            try:
-                tahakkuk_detay = self.kasa_yoneticisi.kasa_tahakkuk_detay(kasa['kasa_id'])
-                tahakkuk_tutari = tahakkuk_detay.get('tahakkuk_toplami', 0)
-                serbest_bakiye = tahakkuk_detay.get('serbest_bakiye', kasa['net_bakiye'])
-            except:
-                tahakkuk_tutari = 0
-                serbest_bakiye = kasa['net_bakiye']
+            tahakkuk_detay = devir_durumlari.get(kasa['kasa_id'], {})
+            tahakkuk_tutari = tahakkuk_detay.get('tahakkuk_toplami', 0)
+            serbest_bakiye = tahakkuk_detay.get('serbest_bakiye', kasa['net_bakiye'])
             
             # Tahakkuk kolonu
             tahakkuk_item = QTableWidgetItem(f"{tahakkuk_tutari:.2f}")
@@ -547,3 +571,34 @@ class KasaWidget(QWidget):
         form = KasaTahakkukFormWidget(self.db, kasa_id)
         drawer = DrawerPanel(self, f"📊 {kasa_adi} - Tahakkuk Detayı", form, width=600)
         drawer.show()
+    
+    def bakiye_dogrula(self):
+        """Kasa bakiye defterini doğrula, fark varsa yeniden oluşturmayı öner"""
+        try:
+            farklar = self.kasa_yoneticisi.kasa_bakiye_dogrula()
+        except Exception as e:
+            MessageBox("Hata", f"Doğrulama hatası:\n{e}", self).show()
+            return
+        
+        if not farklar:
+            MessageBox("Başarılı", "Kasa bakiye defteri tutarlı, fark bulunmadı.", self).show()
+            return
+        
+        satirlar = []
+        for kasa in farklar:
+            for alan, fark in kasa['farklar'].items():
+                satirlar.append(f"• {kasa['kasa_adi']} / {alan}: {fark['fark']:+,.2f}")
+        
+        w = MessageBox(
+            "Bakiye Farkı",
+            f"{len(farklar)} kasada fark bulundu:\n\n" + "\n".join(satirlar[:15]) +
+            "\n\nDefter hareketlerden yeniden oluşturulsun mu?",
+            self
+        )
+        if w.exec():
+            try:
+                self.kasa_yoneticisi.kasa_bakiye_dogrula(duzelt=True)
+                self.load_kasalar()
+                MessageBox("Başarılı", "Kasa bakiye defteri yeniden oluşturuldu!", self).show()
+            except Exception as e:
+                MessageBox("Hata", f"Yeniden oluşturma hatası:\n{e}", self).show()
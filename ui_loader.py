@@ -0,0 +1,133 @@
+"""
+BADER Derneği - Arka Plan Veri Yükleyici
+Ekranların SQL/HTTP sorgularını Qt ana thread'i dışında (QThreadPool) çalıştırır:
+- her yükleme yeni bir istek numarası alır, eskiyen sonuçlar atılır
+- sonuç ana thread'de uygulanır (widget'lara yalnızca orada dokunulur)
+- sorgu ve çizim süreleri ayrı ölçülür (DEBUG seviyesinde loglanır, bkz. BADER_DEBUG)
+"""
+
+import logging
+import time
+from typing import Any, Callable, Dict, Optional
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+log = logging.getLogger("bader.yukleyici")
+
+
+class _GorevSinyalleri(QObject):
+    """İşçi thread'den ana thread'e sonuç taşır (kuyruklu bağlantı)"""
+    bitti = pyqtSignal(int, object, float)   # istek_id, sonuç, sorgu_ms
+    hata = pyqtSignal(int, str)
+
+
+class _YuklemeGorevi(QRunnable):
+    """Tek bir sorgu fonksiyonunu havuz thread'inde çalıştırır"""
+
+    def __init__(self, istek_id: int, sorgu: Callable[[], Any], guncel_mi: Callable[[int], bool],
+                 sinyaller: _GorevSinyalleri, db=None):
+        super().__init__()
+        self.istek_id = istek_id
+        self.sorgu = sorgu
+        self.guncel_mi = guncel_mi
+        self.sinyaller = sinyaller
+        self.db = db
+
+    def run(self):
+        # Sırada beklerken yenisi istendiyse hiç çalıştırma
+        if not self.guncel_mi(self.istek_id):
+            return
+        baslangic = time.perf_counter()
+        try:
+            sonuc = self.sorgu()
+        except Exception as e:
+            self._gonder(self.sinyaller.hata, self.istek_id, str(e))
+            return
+        finally:
+            # Havuz thread'leri yeniden kullanılır; thread'e özel SQLite bağlantısı açık kalmasın
+            if self.db is not None:
+                self.db.thread_baglantisini_kapat()
+        self._gonder(self.sinyaller.bitti, self.istek_id, sonuc, (time.perf_counter() - baslangic) * 1000)
+
+    @staticmethod
+    def _gonder(sinyal, *args):
+        try:
+            sinyal.emit(*args)
+        except RuntimeError:
+            pass  # Ekran sorgu sürerken kapatıldı
+
+
+class VeriYukleyici(QObject):
+    """
+    Ekran başına arka plan yükleyici
+
+    Kullanım:
+        self.yukleyici = VeriYukleyici("Dashboard", db, self)
+        self.yukleyici.yukle(lambda: self._veri_getir(yil), self._ciz)
+    """
+
+    # ad -> {'sorgu_ms', 'cizim_ms', 'zaman'} (son ölçümler, tanılama için)
+    olcumler: Dict[str, Dict] = {}
+
+    yukleniyor = pyqtSignal(bool)
+    olculdu = pyqtSignal(str, float, float)   # ad, sorgu_ms, çizim_ms
+
+    def __init__(self, ad: str, db=None, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.ad = ad
+        self.db = db
+        self._istek_id = 0
+        self._uygulayicilar: Dict[int, tuple] = {}
+        self._sinyaller = _GorevSinyalleri(self)
+        self._sinyaller.bitti.connect(self._tamamlandi)
+        self._sinyaller.hata.connect(self._basarisiz)
+
+    def yukle(self, sorgu: Callable[[], Any], uygula: Callable[[Any], None],
+              hata: Optional[Callable[[str], None]] = None) -> int:
+        """
+        sorgu() havuzda çalışır (widget'a dokunmamalı), uygula(sonuc) ana thread'de çağrılır
+        Returns: istek numarası
+        """
+        self._istek_id += 1
+        istek_id = self._istek_id
+        self._uygulayicilar = {istek_id: (uygula, hata)}
+        self.yukleniyor.emit(True)
+        QThreadPool.globalInstance().start(
+            _YuklemeGorevi(istek_id, sorgu, self.guncel_mi, self._sinyaller, self.db))
+        return istek_id
+
+    def guncel_mi(self, istek_id: int) -> bool:
+        """İstek hâlâ en son istek mi? (işçi thread'den de okunur)"""
+        return istek_id == self._istek_id
+
+    def iptal(self):
+        """Bekleyen/çalışan isteğin sonucunu yok say"""
+        self._istek_id += 1
+        self._uygulayicilar = {}
+        self.yukleniyor.emit(False)
+
+    def _tamamlandi(self, istek_id: int, sonuc: Any, sorgu_ms: float):
+        if not self.guncel_mi(istek_id):
+            return  # Eskimiş sonuç (kullanıcı filtreyi yeniden değiştirdi)
+        uygula, _ = self._uygulayicilar.pop(istek_id, (None, None))
+        if uygula is None:
+            return
+        baslangic = time.perf_counter()
+        try:
+            uygula(sonuc)
+        finally:
+            cizim_ms = (time.perf_counter() - baslangic) * 1000
+            self.yukleniyor.emit(False)
+            VeriYukleyici.olcumler[self.ad] = {
+                'sorgu_ms': sorgu_ms, 'cizim_ms': cizim_ms, 'zaman': time.time()}
+            log.debug("[%s] sorgu: %.1f ms, çizim: %.1f ms", self.ad, sorgu_ms, cizim_ms)
+            self.olculdu.emit(self.ad, sorgu_ms, cizim_ms)
+
+    def _basarisiz(self, istek_id: int, mesaj: str):
+        if not self.guncel_mi(istek_id):
+            return
+        _, hata = self._uygulayicilar.pop(istek_id, (None, None))
+        self.yukleniyor.emit(False)
+        log.warning("[%s] yükleme hatası: %s", self.ad, mesaj)
+        if hata:
+            hata(mesaj)
@@ -808,57 +808,58 @@ class OCRWidget(QWidget):
             hedef_yol = os.path.join(belge_klasoru, dosya_adi)
             shutil.copy2(kayit.dosya_yolu, hedef_yol)
         
-        # Kasa ID - formdan seçilen veya varsayılan
-        kasa_id = kayit.kasa_id
-        if not kasa_id:
-            kasa_yoneticisi = KasaYoneticisi(self.db)
-            kasalar = kasa_yoneticisi.kasa_listesi()
-            kasa_id = kasalar[0]['kasa_id'] if kasalar else 1
-        
-        if kayit.kayit_turu == KayitTuru.GELIR:
-            gelir_yoneticisi = GelirYoneticisi(self.db)
-            gelir_yoneticisi.gelir_ekle(
-                tarih=kayit.tarih.isoformat(),
-                gelir_turu=kayit.kategori or "DİĞER",
-                aciklama=kayit.aciklama or f"{kayit.firma_adi} - {kayit.kategori}",
-                tutar=kayit.tutar,
-                kasa_id=kasa_id,
-                tahsil_eden="",
-                notlar=kayit.notlar,
-                dekont_no=kayit.belge_no
-            )
-        elif kayit.kayit_turu == KayitTuru.GIDER:
-            gider_yoneticisi = GiderYoneticisi(self.db)
-            gider_yoneticisi.gider_ekle(
-                tarih=kayit.tarih.isoformat(),
-                gider_turu=kayit.kategori or "DİĞER",
-                aciklama=kayit.aciklama or f"{kayit.firma_adi} - {kayit.kategori}",
-                tutar=kayit.tutar,
-                kasa_id=kasa_id,
-                odeyen="",
-                notlar=kayit.notlar
-            )
-        elif kayit.kayit_turu == KayitTuru.AIDAT:
-            if kayit.uye_id:
-                aidat_yoneticisi = AidatYoneticisi(self.db)
-                # Mevcut yılın aidat kaydını bul veya oluştur
-                yil = kayit.tarih.year
-                aidat_id = aidat_yoneticisi.aidat_kaydi_olustur(
-                    uye_id=kayit.uye_id,
-                    yil=yil,
-                    yillik_tutar=kayit.tutar
+        # Kayıt ve bağlı işlemler tek işlemde: yarıda kalan OCR kaydı bırakmaz
+        with self.db.transaction():
+            # Kasa ID - formdan seçilen veya varsayılan
+            kasa_id = kayit.kasa_id
+            if not kasa_id:
+                kasa_yoneticisi = KasaYoneticisi(self.db)
+                kasalar = kasa_yoneticisi.kasa_listesi()
+                kasa_id = kasalar[0]['kasa_id'] if kasalar else 1
+        
+            if kayit.kayit_turu == KayitTuru.GELIR:
+                gelir_yoneticisi = GelirYoneticisi(self.db)
+                gelir_yoneticisi.gelir_ekle(
+                    tarih=kayit.tarih.isoformat(),
+                    gelir_turu=kayit.kategori or "DİĞER",
+                    aciklama=kayit.aciklama or f"{kayit.firma_adi} - {kayit.kategori}",
+                    tutar=kayit.tutar,
+                    kasa_id=kasa_id,
+                    tahsil_eden="",
+                    notlar=kayit.notlar,
+                    dekont_no=kayit.belge_no
+                )
+            elif kayit.kayit_turu == KayitTuru.GIDER:
+                gider_yoneticisi = GiderYoneticisi(self.db)
+                gider_yoneticisi.gider_ekle(
+                    tarih=kayit.tarih.isoformat(),
+                    gider_turu=kayit.kategori or "DİĞER",
+                    aciklama=kayit.aciklama or f"{kayit.firma_adi} - {kayit.kategori}",
+                    tutar=kayit.tutar,
+                    kasa_id=kasa_id,
+                    odeyen="",
+                    notlar=kayit.notlar
                 )
-                if aidat_id > 0:
-                    # Ödeme ekle
-                    aidat_yoneticisi.aidat_odeme_ekle(
-                        aidat_id=aidat_id,
-                        tarih=kayit.tarih.isoformat(),
-                        tutar=kayit.tutar,
-                        aciklama=kayit.aciklama or "OCR ile eklenen ödeme"
+            elif kayit.kayit_turu == KayitTuru.AIDAT:
+                if kayit.uye_id:
+                    aidat_yoneticisi = AidatYoneticisi(self.db)
+                    # Mevcut yılın aidat kaydını bul veya oluştur
+                    yil = kayit.tarih.year
+                    aidat_id = aidat_yoneticisi.aidat_kaydi_olustur(
+                        uye_id=kayit.uye_id,
+                        yil=yil,
+                        yillik_tutar=kayit.tutar
                     )
-        elif kayit.kayit_turu == KayitTuru.SADECE_BELGE:
-            # Sadece belge kaydet
-            try:
+                    if aidat_id > 0:
+                        # Ödeme ekle
+                        aidat_yoneticisi.aidat_odeme_ekle(
+                            aidat_id=aidat_id,
+                            tarih=kayit.tarih.isoformat(),
+                            tutar=kayit.tutar,
+                            aciklama=kayit.aciklama or "OCR ile eklenen ödeme"
+                        )
+            elif kayit.kayit_turu == KayitTuru.SADECE_BELGE:
+                # Sadece belge kaydet (hata işlemi geri alır, çağıran kullanıcıya gösterir)
                 yonetici = BelgeYoneticisi(self.db)
                 yonetici.belge_ekle(
                     belge_adi=os.path.basename(hedef_yol) if hedef_yol else "OCR Belgesi",
@@ -867,8 +868,6 @@ class OCRWidget(QWidget):
                     aciklama=kayit.aciklama,
                     dosya_boyutu=os.path.getsize(hedef_yol) if hedef_yol else 0
                 )
-            except Exception as e:
-                print(f"Belge kayıt hatası: {e}")
     
     def go_next(self):
         if self.current_step < 3:
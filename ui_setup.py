@@ -514,6 +514,7 @@ class SetupWizard(QDialog):
             """, (key, json.dumps(value) if isinstance(value, (dict, list, bool)) else str(value)))
         
         self.db.commit()
+        self.db.ayarlar.gecersiz_kil()
     
     def _create_admin_user(self):
         """Admin kullanıcısını oluştur"""
@@ -559,14 +560,8 @@ def check_setup_required(db) -> bool:
 
 
 def get_system_setting(db, key: str, default=None):
-    """Sistem ayarını al"""
+    """Sistem ayarını al (önbellekli ayar deposundan)"""
     try:
-        db.cursor.execute("""
-            SELECT deger FROM sistem_ayarlari WHERE anahtar = ?
-        """, (key,))
-        result = db.cursor.fetchone()
-        if result:
-            return result[0]
-        return default
+        return db.ayarlar.get(key, default, db.conn)
     except:
         return default
@@ -0,0 +1,300 @@
+"""
+BADER Derneği - Sanal Tablo Modeli
+Büyük listeler için QTableWidget yerine model/görünüm katmanı:
+satırlar görünüme parça parça verilir, metin/renk/hizalama data() içinde
+hesaplanır (hücre başına QTableWidgetItem oluşturulmaz).
+"""
+
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel, pyqtSignal
+from PyQt5.QtGui import QBrush, QColor
+from PyQt5.QtWidgets import QTableView, QTableWidgetItem, QAbstractItemView
+
+from database import tr_normalize
+
+
+class Sutun:
+    """Tablo sütunu tanımı"""
+
+    def __init__(self, baslik: str, alan, bicim: Optional[Callable] = None,
+                 renk: Optional[Callable] = None, hizalama=None, aranabilir: bool = True):
+        self.baslik = baslik
+        self.alan = alan              # satır anahtarı veya satır -> değer fonksiyonu
+        self.bicim = bicim            # değer -> gösterilecek metin
+        self.renk = renk              # satır -> renk (Qt.GlobalColor, QColor veya '#rrggbb'), yoksa None
+        self.hizalama = hizalama
+        self.aranabilir = aranabilir
+
+    def deger(self, satir: Dict):
+        return self.alan(satir) if callable(self.alan) else satir.get(self.alan)
+
+    def metin(self, satir: Dict) -> str:
+        deger = self.deger(satir)
+        if self.bicim:
+            return self.bicim(deger)
+        return '' if deger is None else str(deger)
+
+
+class SatirModeli(QAbstractTableModel):
+    """
+    Sözlük satırları için tablo modeli
+    Kaynak (liste veya üreteç) görünüme PARCA_BOYUTU'luk parçalarla verilir;
+    görünüm kaydırıldıkça canFetchMore/fetchMore ile devamı eklenir.
+    """
+
+    PARCA_BOYUTU = 500
+
+    def __init__(self, sutunlar: List[Sutun], parent=None):
+        super().__init__(parent)
+        self.sutunlar = sutunlar
+        self._satirlar: List[Dict] = []
+        self._arama_metinleri: Dict[int, str] = {}   # id(satir) -> katlanmış metin
+        self._kaynak = iter(())
+        self._bitti = True
+        self._iskelet = False
+
+    def iskelet_goster(self, adet: int = 12):
+        """Veri gelene kadar gri yer tutucu satırlar göster (yukle() ile kalkar)"""
+        self.beginResetModel()
+        self._satirlar = [{} for _ in range(adet)]
+        self._arama_metinleri = {}
+        self._kaynak = iter(())
+        self._bitti = True
+        self._iskelet = True
+        self.endResetModel()
+
+    @property
+    def iskelet_mi(self) -> bool:
+        return self._iskelet
+
+    def yukle(self, satirlar: Iterable[Dict]):
+        """Veri kaynağını değiştir (ilk parça hemen, kalanı kaydırdıkça)"""
+        self.beginResetModel()
+        self._iskelet = False
+        self._satirlar = []
+        self._arama_metinleri = {}
+        self._kaynak = iter(satirlar)
+        self._bitti = False
+        self.endResetModel()
+        self.fetchMore(QModelIndex())
+
+    def tumunu_yukle(self):
+        """Kalan tüm satırları tek seferde ekle (arama, sıralama, dışa aktarma için)"""
+        if self._bitti:
+            return
+        self._ekle(list(self._kaynak))
+        self._bitti = True
+
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        return not parent.isValid() and not self._bitti
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._bitti:
+            return
+        parca = list(islice(self._kaynak, self.PARCA_BOYUTU))
+        if len(parca) < self.PARCA_BOYUTU:
+            self._bitti = True
+        self._ekle(parca)
+
+    def _ekle(self, parca: List[Dict]):
+        if not parca:
+            return
+        bas = len(self._satirlar)
+        self.beginInsertRows(QModelIndex(), bas, bas + len(parca) - 1)
+        self._satirlar.extend(parca)
+        self.endInsertRows()
+
+    def satir(self, row: int) -> Dict:
+        return self._satirlar[row]
+
+    def sort(self, column: int, order=Qt.SortOrder.AscendingOrder):
+        """
+        Ham değere göre sırala (biçimli metne göre değil: "1.200,00 ₺" < "900,00 ₺" olmasın)
+        Tek bir Python sıralaması; proxy'nin satır satır lessThan çağrısından çok daha hızlı.
+        """
+        if column < 0 or self._iskelet:
+            return
+        self.tumunu_yukle()
+        sutun = self.sutunlar[column]
+
+        def anahtar(satir):
+            deger = sutun.deger(satir)
+            if deger is None:
+                return (0, 0, '')
+            if isinstance(deger, (int, float)):
+                return (1, deger, '')
+            return (2, 0, tr_normalize(str(deger)))
+
+        self.layoutAboutToBeChanged.emit()
+        self._satirlar.sort(key=anahtar, reverse=(order == Qt.SortOrder.DescendingOrder))
+        self.layoutChanged.emit()
+
+    def arama_metni(self, row: int) -> str:
+        """Satırın aranabilir sütunlarının katlanmış metni (ilk istekte hesaplanır)"""
+        satir = self._satirlar[row]
+        metin = self._arama_metinleri.get(id(satir))
+        if metin is None:
+            metin = tr_normalize(' '.join(s.metin(satir) for s in self.sutunlar if s.aranabilir))
+            self._arama_metinleri[id(satir)] = metin
+        return metin
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._satirlar)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.sutunlar)
+
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if self._iskelet:
+            if role == Qt.ItemDataRole.DisplayRole:
+                return '▒▒▒▒▒▒'
+            if role == Qt.ItemDataRole.ForegroundRole:
+                return QBrush(QColor('#d0d0d0'))
+            return None
+        satir = self._satirlar[index.row()]
+        sutun = self.sutunlar[index.column()]
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            return sutun.metin(satir)
+        if role == Qt.ItemDataRole.ForegroundRole and sutun.renk:
+            renk = sutun.renk(satir)
+            return QBrush(QColor(renk)) if renk is not None else None
+        if role == Qt.ItemDataRole.TextAlignmentRole and sutun.hizalama is not None:
+            return int(sutun.hizalama)
+        return None
+
+    def headerData(self, section: int, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self.sutunlar[section].baslik
+        return str(section + 1)
+
+
+class SatirFiltreModeli(QSortFilterProxyModel):
+    """
+    Türkçe duyarlı metin filtresi
+    Sıralama kaynak modele bırakılır; proxy kaynak sırasını korur.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._kelimeler: List[str] = []
+        self._kabul: Optional[set] = None   # kabul edilen satırların id()'leri (sıralamadan etkilenmez)
+
+    def filtrele(self, metin: str):
+        """Tüm kelimeleri içeren satırları göster (boş metin: filtre yok)"""
+        self._kelimeler = tr_normalize(metin).split()
+        self.filtreyi_yenile()
+
+    def filtreyi_yenile(self):
+        """Kabul edilen satırları tek geçişte hesapla ve filtreyi uygula"""
+        kaynak = self.sourceModel()
+        if self._kelimeler and not kaynak.iskelet_mi:
+            # Henüz görünüme verilmemiş satırlar da aransın
+            kaynak.tumunu_yukle()
+            self._kabul = {
+                id(kaynak.satir(row)) for row in range(kaynak.rowCount())
+                if all(kelime in kaynak.arama_metni(row) for kelime in self._kelimeler)
+            }
+        else:
+            self._kabul = None
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, kaynak_satir: int, parent: QModelIndex) -> bool:
+        return self._kabul is None or id(self.sourceModel().satir(kaynak_satir)) in self._kabul
+
+    def sort(self, column: int, order=Qt.SortOrder.AscendingOrder):
+        self.sourceModel().sort(column, order)
+
+
+class VeriTablosu(QTableView):
+    """
+    Satır sözlükleri için sanal tablo görünümü
+    ui_helpers'ın kullandığı QTableWidget metotlarını (columnCount, item...) da sağlar.
+    """
+
+    secim_degisti = pyqtSignal()
+
+    def __init__(self, sutunlar: List[Sutun], parent=None):
+        super().__init__(parent)
+        self.kaynak_model = SatirModeli(sutunlar, self)
+        self.filtre_model = SatirFiltreModeli(self)
+        self.filtre_model.setSourceModel(self.kaynak_model)
+        self.setModel(self.filtre_model)
+
+        self.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.setAlternatingRowColors(True)
+        # Sütun genişliği yalnızca görünen satırlardan hesaplanır (tüm satırlar taranmaz)
+        self.horizontalHeader().setResizeContentsPrecision(0)
+        self.verticalHeader().setResizeContentsPrecision(0)
+        # Başlangıçta kaynak sırası korunur; başlığa tıklanınca sıralanır
+        self.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        self.setSortingEnabled(True)
+        self.selectionModel().selectionChanged.connect(lambda *_: self.secim_degisti.emit())
+
+    def yukle(self, satirlar: Iterable[Dict]):
+        """Satırları yükle (mevcut arama filtresi korunur)"""
+        self.kaynak_model.yukle(satirlar)
+        if self.filtre_model._kelimeler:
+            self.filtre_model.filtreyi_yenile()
+
+    def tumunu_yukle(self):
+        self.kaynak_model.tumunu_yukle()
+
+    def filtrele(self, metin: str):
+        self.filtre_model.filtrele(metin)
+
+    def satir(self, row: int) -> Dict:
+        """Görünümdeki satır numarasına karşılık gelen kayıt"""
+        return self.kaynak_model.satir(self.filtre_model.mapToSource(self.filtre_model.index(row, 0)).row())
+
+    def iskelet_goster(self, adet: int = 12):
+        """Yükleme sürerken yer tutucu satırlar"""
+        self.kaynak_model.iskelet_goster(adet)
+        self.filtre_model.filtreyi_yenile()
+
+    def secili_satir(self) -> Optional[Dict]:
+        """Seçili kayıt (yoksa None)"""
+        secili = self.selectionModel().selectedRows()
+        if not secili or self.kaynak_model.iskelet_mi:
+            return None
+        return self.kaynak_model.satir(self.filtre_model.mapToSource(secili[0]).row())
+
+    def satiri_sec(self, kosul: Callable[[Dict], bool]) -> bool:
+        """Koşulu sağlayan ilk görünen satırı seç"""
+        self.tumunu_yukle()
+        for row in range(self.filtre_model.rowCount()):
+            if kosul(self.satir(row)):
+                self.selectRow(row)
+                return True
+        return False
+
+    def metin_satirlari(self, sutunlar: Optional[List[int]] = None) -> Iterator[List[str]]:
+        """Görünen (filtrelenmiş, sıralı) satırların hücre metinleri - dışa aktarma için"""
+        sutunlar = range(self.columnCount()) if sutunlar is None else sutunlar
+        kaynak_sutunlar = [self.kaynak_model.sutunlar[col] for col in sutunlar]
+        for row in range(self.filtre_model.rowCount()):
+            satir = self.satir(row)
+            yield [sutun.metin(satir) for sutun in kaynak_sutunlar]
+
+    # --- QTableWidget uyumluluğu (ui_helpers sütun ayarları ve dışa aktarma) ---
+
+    def columnCount(self) -> int:
+        return self.filtre_model.columnCount()
+
+    def rowCount(self) -> int:
+        return self.filtre_model.rowCount()
+
+    def horizontalHeaderItem(self, col: int) -> QTableWidgetItem:
+        return QTableWidgetItem(self.filtre_model.headerData(col, Qt.Orientation.Horizontal))
+
+    def item(self, row: int, col: int) -> Optional[QTableWidgetItem]:
+        index = self.filtre_model.index(row, col)
+        return QTableWidgetItem(index.data() or '') if index.isValid() else None
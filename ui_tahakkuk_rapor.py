@@ -199,9 +199,7 @@ class TahakkukRaporWidget(QWidget):
                 fiziksel = 0
                 tahakkuk = 0
                 serbest = 0
-                kasalar = self.kasa_yoneticisi.kasa_listesi()
-                for kasa in kasalar:
-                    bakiye = self.kasa_yoneticisi.kasa_tahakkuk_detay(kasa['kasa_id'])
+                for bakiye in self.kasa_yoneticisi.kasa_devir_durumlari():
                     fiziksel += bakiye.get('fiziksel_bakiye', 0)
                     tahakkuk += bakiye.get('tahakkuk_toplami', 0)
                     serbest += bakiye.get('serbest_bakiye', 0)
@@ -15,6 +15,8 @@ from ui_login import session
 from ui_form_fields import (FormField, create_line_edit, create_text_edit, create_combo_box,
                             create_spin_box, create_date_edit, create_double_spin_box)
 from ui_helpers import make_searchable_combobox, export_table_to_excel, setup_resizable_table
+from ui_table_model import VeriTablosu, Sutun
+from ui_loader import VeriYukleyici
 from typing import Optional
 
 
@@ -358,6 +360,7 @@ class UyeWidget(QWidget):
         self.db = db
         self.uye_yoneticisi = UyeYoneticisi(db)
         self.current_uye_id = None
+        self.yukleyici = VeriYukleyici("Üyeler", db, self)
         
         self.setup_ui()
         self.load_uyeler()
@@ -442,20 +445,24 @@ class UyeWidget(QWidget):
         layout.addLayout(toolbar_layout)
         
         # Tablo
-        self.table = QTableWidget()
-        self.table.setColumnCount(9)
-        self.table.setHorizontalHeaderLabels([
-            "ID", "Üye No", "TC Kimlik", "Ad Soyad", "Telefon", "E-posta", "Üyelik Tipi", "Meslek", "Durum"
+        tire = lambda deger: deger or '-'
+        self.table = VeriTablosu([
+            Sutun("ID", 'uye_id', aranabilir=False),
+            Sutun("Üye No", 'uye_no', tire),
+            Sutun("TC Kimlik", 'tc_kimlik', self._tc_maskele),
+            Sutun("Ad Soyad", 'ad_soyad'),
+            Sutun("Telefon", 'telefon', tire),
+            Sutun("E-posta", 'email', tire),
+            Sutun("Üyelik Tipi", 'uyelik_tipi', lambda deger: deger or 'Asil', aranabilir=False),
+            Sutun("Meslek", 'meslek', tire),
+            Sutun("Durum", 'durum', aranabilir=False,
+                  renk=lambda uye: Qt.GlobalColor.darkGreen if uye['durum'] == 'Aktif' else Qt.GlobalColor.darkRed),
         ])
         
         # Responsive sütunlar - hareket ettirilebilir, sağ tık ile gizle/göster
         setup_resizable_table(self.table, table_id="uyeler_tablosu", stretch_column=3)
         
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.table.setSelectionMode(QTableWidget.SelectionMode.SingleSelection)
-        self.table.setAlternatingRowColors(True)
-        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
-        self.table.itemSelectionChanged.connect(self.on_selection_changed)
+        self.table.secim_degisti.connect(self.on_selection_changed)
         self.table.doubleClicked.connect(self.uye_duzenle)
         
         layout.addWidget(self.table)
@@ -467,64 +474,47 @@ class UyeWidget(QWidget):
         self.setLayout(layout)
         
     def load_uyeler(self):
-        """Üyeleri yükle"""
+        """Üyeleri arka planda yükle"""
         # Tip filtresi
         tip = self.tip_filter.currentText() if self.tip_filter.currentIndex() > 0 else None
-        
+        if not self.table.rowCount():
+            self.table.iskelet_goster()
+        self.yukleyici.yukle(lambda: self._uyeleri_getir(tip), self._uyeleri_goster)
+
+    def _uyeleri_getir(self, tip: Optional[str]) -> list:
+        """Üye sorgusu (havuz thread'inde)"""
         uyeler = self.uye_yoneticisi.uye_listesi()
         
         # Tip filtreleme
         if tip:
             uyeler = [u for u in uyeler if u.get('uyelik_tipi') == tip]
-        
-        self.table.setRowCount(len(uyeler))
-        
-        for row, uye in enumerate(uyeler):
-            self.table.setItem(row, 0, QTableWidgetItem(str(uye['uye_id'])))
-            self.table.setItem(row, 1, QTableWidgetItem(uye.get('uye_no', '') or '-'))
-            
-            # TC Kimlik - maskeleme
-            tc = uye.get('tc_kimlik', '') or ''
-            if tc and len(tc) == 11:
-                tc = tc[:3] + '****' + tc[-2:]
-            self.table.setItem(row, 2, QTableWidgetItem(tc or '-'))
-            
-            self.table.setItem(row, 3, QTableWidgetItem(uye['ad_soyad']))
-            self.table.setItem(row, 4, QTableWidgetItem(uye['telefon'] or '-'))
-            self.table.setItem(row, 5, QTableWidgetItem(uye['email'] or '-'))
-            self.table.setItem(row, 6, QTableWidgetItem(uye.get('uyelik_tipi', 'Asil') or 'Asil'))
-            self.table.setItem(row, 7, QTableWidgetItem(uye.get('meslek', '') or '-'))
-            
-            # Durum renklendirme
-            durum_item = QTableWidgetItem(uye['durum'])
-            if uye['durum'] == 'Aktif':
-                durum_item.setForeground(Qt.GlobalColor.darkGreen)
-            else:
-                durum_item.setForeground(Qt.GlobalColor.darkRed)
-            self.table.setItem(row, 8, durum_item)
+        return uyeler
+
+    def _uyeleri_goster(self, uyeler: list):
+        # Satırlar görünüme kaydırdıkça verilir, arama metni korunur
+        self.table.yukle(uyeler)
         
         # İstatistik güncelle
         aktif = len([u for u in uyeler if u['durum'] == 'Aktif'])
         self.stats_label.setText(f"Toplam: {len(uyeler)} üye ({aktif} aktif)")
         
+    @staticmethod
+    def _tc_maskele(tc: Optional[str]) -> str:
+        """TC Kimlik - maskeleme"""
+        tc = tc or ''
+        if len(tc) == 11:
+            tc = tc[:3] + '****' + tc[-2:]
+        return tc or '-'
+        
     def ara(self):
-        """Üye ara"""
-        arama_metni = self.arama_edit.text().strip().lower()
-        
-        for row in range(self.table.rowCount()):
-            match = False
-            for col in [1, 2, 3, 4, 5, 7]:  # Üye No, TC, Ad, Telefon, Email, Meslek
-                item = self.table.item(row, col)
-                if item and arama_metni in item.text().lower():
-                    match = True
-                    break
-            self.table.setRowHidden(row, not match)
+        """Üye ara (Üye No, TC, Ad, Telefon, Email, Meslek)"""
+        self.table.filtrele(self.arama_edit.text().strip())
             
     def on_selection_changed(self):
         """Seçim değiştiğinde"""
-        selected = self.table.selectedItems()
-        if selected:
-            self.current_uye_id = int(self.table.item(selected[0].row(), 0).text())
+        uye = self.table.secili_satir()
+        if uye:
+            self.current_uye_id = uye['uye_id']
             self.duzenle_btn.setEnabled(True)
             self.sil_btn.setEnabled(True)
             self.detay_btn.setEnabled(True)